@@ -2,7 +2,8 @@ from django.contrib import admin
 from .models import (
     Projet, VersionProjet, Gamme, Produit, Rubrique, Map,
     Fonctionnalite, Audience, Media,
-    RevisionRubrique, PublicationSnapshot,
+    RevisionRubrique, PublicationSnapshot, BlobXml, TachePublication, Publication,
+    ArtefactPublication,
 )
 
 @admin.register(Projet)
@@ -61,11 +62,27 @@ class MediaAdmin(admin.ModelAdmin):
 
 @admin.register(RevisionRubrique)
 class RevisionRubriqueAdmin(admin.ModelAdmin):
-    list_display = ("rubrique", "numero", "auteur", "date_creation", "hash_contenu")
-    list_filter = ("auteur",)
+    list_display = ("rubrique", "numero", "auteur", "date_creation", "stockage", "taille", "hash_contenu")
+    list_filter = ("auteur", "stockage")
     search_fields = ("rubrique__titre",)
     ordering = ("rubrique", "numero")
-    readonly_fields = ("rubrique", "numero", "contenu_xml", "hash_contenu", "auteur", "date_creation")
+    fields = ("rubrique", "numero", "contenu_xml", "hash_contenu", "stockage", "blob", "taille", "auteur", "date_creation")
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(BlobXml)
+class BlobXmlAdmin(admin.ModelAdmin):
+    list_display = ("empreinte", "stockage", "taille", "nb_references", "date_creation")
+    list_filter = ("stockage",)
+    search_fields = ("empreinte",)
+    fields = ("empreinte", "contenu_xml", "stockage", "base", "taille", "nb_references", "date_creation")
+    readonly_fields = fields
 
     def has_add_permission(self, request):
         return False
@@ -76,13 +93,59 @@ class RevisionRubriqueAdmin(admin.ModelAdmin):
 
 @admin.register(PublicationSnapshot)
 class PublicationSnapshotAdmin(admin.ModelAdmin):
-    list_display = ("version_projet", "rubrique", "revision")
+    list_display = ("version_projet", "rubrique", "revision", "nature")
     list_filter = ("version_projet",)
     search_fields = ("rubrique__titre", "version_projet__version_numero")
     readonly_fields = ("version_projet", "rubrique", "revision")
 
+    @admin.display(description="Delta")
+    def nature(self, obj):
+        return "Retrait" if obj.revision_id is None else "Ajout / modification"
+
     def has_add_permission(self, request):
         return False
 
     def has_change_permission(self, request, obj=None):
         return False
+
+
+@admin.register(TachePublication)
+class TachePublicationAdmin(admin.ModelAdmin):
+    list_display = ("id", "projet", "map", "version_projet", "format", "statut", "progression", "date_creation")
+    list_filter = ("statut", "format")
+    search_fields = ("projet__nom", "map__nom")
+    readonly_fields = (
+        "projet", "map", "version_projet", "format", "formats", "progression", "journal", "resultat",
+        "tentatives", "auteur", "date_creation", "date_debut", "date_fin",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(Publication)
+class PublicationAdmin(admin.ModelAdmin):
+    list_display = ("id", "projet", "version_projet", "nouvelle_version", "nb_snapshots", "date_publication")
+    list_filter = ("nouvelle_version",)
+    search_fields = ("projet__nom", "version_projet__version_numero")
+    readonly_fields = (
+        "projet", "version_projet", "nouvelle_version", "nb_snapshots", "formats", "artefacts",
+        "artefacts_stockes", "tache", "auteur", "date_publication",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ArtefactPublication)
+class ArtefactPublicationAdmin(admin.ModelAdmin):
+    list_display = ("id", "format", "profil", "nom_fichier", "taille", "date_creation")
+    list_filter = ("format", "profil")
+    search_fields = ("hash_ensemble", "empreinte")
+    readonly_fields = (
+        "hash_ensemble", "format", "profil", "empreinte", "chemin", "nom_fichier",
+        "type_mime", "taille", "date_creation",
+    )
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,236 @@
+# documentation/artefacts.py
+# -- Magasin d'artefacts de publication, adressé par contenu --
+"""
+Stockage des rendus de publication (ArtefactPublication).
+
+Clé logique : (hash_ensemble, format, profil). hash_ensemble résume tout ce qui
+détermine le rendu d'une version publiée : révisions publiées des rubriques de
+la map et structure de la map (ordre, hiérarchie, titres). Une republication
+sans changement retrouve donc l'artefact existant : ni rendu, ni copie.
+
+Stockage physique : un fichier par empreinte SHA-256 du contenu, sous
+get_dossier_artefacts()/<2 premiers caractères>/<empreinte>. Deux clés dont le
+rendu est identique partagent le même fichier. L'empreinte sert aussi d'ETag
+au téléchargement.
+
+Un rendu réduit à un seul fichier (PDF…) est stocké tel quel ; un rendu en
+plusieurs fichiers (HTML5…) est archivé en zip. Copie, archivage et hash
+travaillent par blocs : la mémoire ne dépend pas de la taille du rendu.
+"""
+import hashlib
+import mimetypes
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils.timezone import now
+
+from .exporters import _noeuds_structure
+from .models import ArtefactPublication, MapRubrique, Publication
+from .utils import snapshots_publies
+
+PROFIL_DEFAUT = "defaut"
+
+# Taille des blocs lus pour le hash, la copie et le streaming des téléchargements.
+TAILLE_BLOC = 64 * 1024
+
+# Âge minimal, en secondes, d'un artefact orphelin avant sa suppression : un
+# artefact rangé par le worker n'est lié à sa publication qu'en fin d'export.
+DEFAULT_ARTEFACT_GRACE_SECONDS = 24 * 3600
+
+
+def get_dossier_artefacts() -> str:
+    return getattr(
+        settings, "PUBLICATION_ARTEFACT_ROOT", os.path.join(settings.MEDIA_ROOT, "artefacts")
+    )
+
+
+def get_delai_grace_artefacts() -> int:
+    return max(
+        0, int(getattr(settings, "PUBLICATION_ARTEFACT_GRACE_SECONDS", DEFAULT_ARTEFACT_GRACE_SECONDS))
+    )
+
+
+def chemin_absolu(artefact: ArtefactPublication) -> str:
+    return os.path.join(get_dossier_artefacts(), artefact.chemin)
+
+
+def hash_ensemble_publie(version_projet, map_obj) -> str:
+    """
+    Empreinte de ce qui détermine le rendu de `map_obj` pour `version_projet` :
+    (rubrique, hash de la révision publiée) des rubriques de la map, puis les
+    nœuds de la structure. Deux requêtes, lues en flux.
+    """
+    h = hashlib.sha256()
+    publies = (
+        snapshots_publies(version_projet)
+        .filter(rubrique_id__in=MapRubrique.objects.filter(map=map_obj).values("rubrique_id"))
+        .order_by("rubrique_id")
+        .values_list("rubrique_id", "revision__hash_contenu")
+    )
+    for rubrique_id, hash_contenu in publies.iterator(chunk_size=2000):
+        h.update(f"{rubrique_id}:{hash_contenu}\n".encode())
+    h.update(b"--\n")
+    for noeud in _noeuds_structure(map_obj):
+        h.update(("\t".join(str(v) for v in noeud) + "\n").encode())
+    return h.hexdigest()
+
+
+def artefacts_stockes(hash_ensemble: str, formats, profil: str = PROFIL_DEFAUT) -> dict:
+    """{format: ArtefactPublication} des formats déjà présents au magasin (une requête)."""
+    return {
+        a.format: a
+        for a in ArtefactPublication.objects.filter(
+            hash_ensemble=hash_ensemble, format__in=list(formats), profil=profil
+        )
+    }
+
+
+def _fichiers(sortie: str) -> list:
+    if os.path.isfile(sortie):
+        return [sortie]
+    return sorted(
+        os.path.join(dossier, nom)
+        for dossier, _, noms in os.walk(sortie)
+        for nom in noms
+    )
+
+
+def _hacher_fichier(chemin: str) -> str:
+    h = hashlib.sha256()
+    with open(chemin, "rb") as f:
+        for bloc in iter(lambda: f.read(TAILLE_BLOC), b""):
+            h.update(bloc)
+    return h.hexdigest()
+
+
+def _preparer_fichier(sortie: str, output_format: str, temporaire: str) -> tuple[str, str]:
+    """
+    (fichier à stocker, nom de téléchargement) pour le rendu `sortie`
+    (fichier ou dossier). Plusieurs fichiers : archive zip écrite dans
+    `temporaire`, fichier par fichier.
+    """
+    fichiers = _fichiers(sortie)
+    if not fichiers:
+        raise ValueError(f"Rendu {output_format} vide : {sortie}")
+    if len(fichiers) == 1:
+        return fichiers[0], os.path.basename(fichiers[0])
+    racine = sortie if os.path.isdir(sortie) else os.path.dirname(sortie)
+    with zipfile.ZipFile(temporaire, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for chemin in fichiers:
+            archive.write(chemin, os.path.relpath(chemin, racine))
+    return temporaire, f"{output_format}.zip"
+
+
+def stocker_artefact(
+    *, hash_ensemble: str, output_format: str, sortie: str, profil: str = PROFIL_DEFAUT
+) -> ArtefactPublication:
+    """
+    Range le rendu `sortie` au magasin sous (hash_ensemble, output_format, profil)
+    et retourne l'artefact. Clé déjà présente : artefact existant, rien n'est copié.
+    Le fichier n'est copié que si son empreinte est inconnue du magasin.
+    """
+    existant = ArtefactPublication.objects.filter(
+        hash_ensemble=hash_ensemble, format=output_format, profil=profil
+    ).first()
+    if existant is not None:
+        return existant
+
+    racine = get_dossier_artefacts()
+    os.makedirs(racine, exist_ok=True)
+    descripteur, temporaire = tempfile.mkstemp(dir=racine, suffix=".tmp")
+    os.close(descripteur)
+    try:
+        fichier, nom_fichier = _preparer_fichier(sortie, output_format, temporaire)
+        empreinte = _hacher_fichier(fichier)
+        chemin = os.path.join(empreinte[:2], empreinte)
+        destination = os.path.join(racine, chemin)
+        if not os.path.exists(destination):
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            if fichier == temporaire:
+                os.replace(temporaire, destination)
+            else:
+                # Copie dans le magasin puis renommage atomique : jamais de fichier partiel.
+                shutil.copyfile(fichier, temporaire)
+                os.replace(temporaire, destination)
+        taille = os.path.getsize(destination)
+    finally:
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+
+    try:
+        with transaction.atomic():
+            return ArtefactPublication.objects.create(
+                hash_ensemble=hash_ensemble,
+                format=output_format,
+                profil=profil,
+                empreinte=empreinte,
+                chemin=chemin,
+                nom_fichier=nom_fichier,
+                type_mime=mimetypes.guess_type(nom_fichier)[0] or "application/octet-stream",
+                taille=taille,
+            )
+    except IntegrityError:
+        # Même clé stockée en concurrence par un autre worker.
+        return ArtefactPublication.objects.get(
+            hash_ensemble=hash_ensemble, format=output_format, profil=profil
+        )
+
+
+def artefacts_archives():
+    """
+    Artefacts dont aucune publication ne porte sur une version non archivée :
+    supprimables par prune_artefacts.
+
+    Un artefact orphelin (lié à aucune publication) n'est supprimable qu'après
+    le délai de grâce (get_delai_grace_artefacts) : il peut venir d'être rangé
+    par un export en cours, qui ne l'a pas encore lié à sa publication.
+    """
+    liens = Publication.artefacts_stockes.through.objects.filter(artefactpublication=OuterRef("pk"))
+    recent = Q(date_creation__gt=now() - timedelta(seconds=get_delai_grace_artefacts()))
+    return ArtefactPublication.objects.exclude(
+        Exists(liens.filter(publication__version_projet__is_archived=False))
+    ).exclude(recent & ~Exists(liens))
+
+
+def supprimer_artefacts(artefacts) -> tuple[int, int]:
+    """
+    Supprime les artefacts (lignes) puis les fichiers que plus aucun artefact
+    ne référence. Retourne (nb d'artefacts supprimés, octets libérés).
+    """
+    lignes = list(artefacts.values_list("pk", "empreinte", "chemin", "taille"))
+    if not lignes:
+        return 0, 0
+    ArtefactPublication.objects.filter(pk__in=[pk for pk, *_ in lignes]).delete()
+    encore_utilisees = set(
+        ArtefactPublication.objects.filter(
+            empreinte__in={empreinte for _, empreinte, _, _ in lignes}
+        ).values_list("empreinte", flat=True)
+    )
+    octets = 0
+    for empreinte, chemin, taille in {(e, c, t) for _, e, c, t in lignes}:
+        if empreinte in encore_utilisees:
+            continue
+        try:
+            os.remove(os.path.join(get_dossier_artefacts(), chemin))
+            octets += taille
+        except FileNotFoundError:
+            pass
+    return len(lignes), octets
+
+
+def lire_plage(chemin: str, debut: int, longueur: int):
+    """Itère sur `longueur` octets de `chemin` à partir de `debut`, par blocs."""
+    with open(chemin, "rb") as f:
+        f.seek(debut)
+        while longueur > 0:
+            bloc = f.read(min(TAILLE_BLOC, longueur))
+            if not bloc:
+                break
+            longueur -= len(bloc)
+            yield bloc
@@ -0,0 +1,238 @@
+# documentation/backfill.py
+# -- Moteur de backfill des hash de contenu (parallèle, par lots, reprenable) --
+"""
+Recalcul en masse des hash canoniques (utils.compute_xml_hash).
+
+Principe :
+1. La table cible est parcourue par pk croissant, un lot à la fois (pagination
+   par clé) : la mémoire est bornée par la taille d'un lot, quel que soit le volume.
+2. Les contenus du lot sont hashés par un pool de processus (le parsing XML est
+   lié au CPU : les threads n'apporteraient rien sous le GIL).
+3. Les écritures du lot (bulk_update / bulk_create) et le PointDeReprise sont
+   validés dans la même transaction : une exécution interrompue reprend au lot
+   suivant, sans trou ni doublon.
+
+Les lignes sont verrouillées le temps de l'écriture seulement ; une ligne
+modifiée par un utilisateur entre la lecture et l'écriture est ignorée (son
+hash a déjà été recalculé par le chemin d'écriture normal). Le traitement peut
+donc tourner en production, sans interruption de service.
+
+Cibles (CIBLES) :
+- "rubriques"           : Rubrique.hash_contenu
+- "revisions"           : RevisionRubrique.hash_contenu
+- "revisions-initiales" : révision numero=1 des rubriques qui n'en ont aucune
+                          (équivalent reprenable de la migration 0010)
+
+Les adresses des BlobXml ne sont pas concernées : un blob est identifié par
+l'empreinte de ses octets exacts (utils.empreinte_exacte), indépendante du hash
+canonique.
+"""
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
+
+from . import revision_storage
+from .backfill_worker import hacher_contenus, init_worker
+from .models import BlobXml, PointDeReprise, RevisionRubrique, Rubrique
+from .utils import empreinte_exacte
+
+DEFAULT_TAILLE_LOT = 500
+
+
+# ---------------------------------------------------------------------------
+# Cibles : lecture d'un lot et écriture des hash calculés
+# ---------------------------------------------------------------------------
+
+def _ecrire_hashes(modele, lignes, hashes) -> int:
+    """
+    Écrit les hash qui diffèrent de la valeur lue. Les lignes sont verrouillées
+    et comparées au hash lu : une ligne modifiée entre la lecture et l'écriture
+    a déjà été rehashée par le chemin d'écriture normal, elle est ignorée.
+    """
+    a_corriger = [(ligne, h) for ligne, h in zip(lignes, hashes, strict=True) if ligne.hash_contenu != h]
+    if not a_corriger:
+        return 0
+    actuels = dict(
+        modele.objects.select_for_update()
+        .filter(pk__in=[ligne.pk for ligne, _ in a_corriger])
+        .values_list("pk", "hash_contenu")
+    )
+    lot = []
+    for ligne, hash_contenu in a_corriger:
+        if actuels.get(ligne.pk) == ligne.hash_contenu:
+            ligne.hash_contenu = hash_contenu
+            lot.append(ligne)
+    return modele.objects.bulk_update(lot, ["hash_contenu"]) if lot else 0
+
+
+class _CibleRubriques:
+
+    def queryset(self):
+        return Rubrique.objects.only("id", "contenu_xml", "hash_contenu")
+
+    def contenu(self, rubrique) -> str:
+        return rubrique.contenu_xml
+
+    def ecrire(self, rubriques, hashes) -> int:
+        return _ecrire_hashes(Rubrique, rubriques, hashes)
+
+
+class _CibleRevisions:
+
+    def queryset(self):
+        return RevisionRubrique.objects.select_related("base", "blob__base")
+
+    def contenu(self, revision) -> str:
+        return revision.contenu_xml
+
+    def ecrire(self, revisions, hashes) -> int:
+        return _ecrire_hashes(RevisionRubrique, revisions, hashes)
+
+
+class _CibleRevisionsInitiales:
+
+    def queryset(self):
+        return Rubrique.objects.filter(
+            ~Exists(RevisionRubrique.objects.filter(rubrique=OuterRef("pk")))
+        ).only("id", "contenu_xml", "auteur_id")
+
+    def contenu(self, rubrique) -> str:
+        return rubrique.contenu_xml
+
+    def ecrire(self, rubriques, hashes) -> int:
+        # Verrou + re-filtre : une rubrique ayant reçu sa révision entre-temps est ignorée.
+        ids = set(
+            self.queryset()
+            .select_for_update(of=("self",))
+            .filter(pk__in=[r.pk for r in rubriques])
+            .values_list("pk", flat=True)
+        )
+        lot = [(r, h) for r, h in zip(rubriques, hashes, strict=True) if r.pk in ids]
+        if not lot:
+            return 0
+
+        # Blobs : réutilisation des contenus connus, création groupée des autres
+        # (keyframes : une révision initiale n'a pas de base).
+        empreintes = {r.pk: empreinte_exacte(r.contenu_xml) for r, _ in lot}
+        blobs = dict(
+            BlobXml.objects.filter(empreinte__in=set(empreintes.values())).values_list("empreinte", "pk")
+        )
+        nouveaux = {}
+        for rubrique, _ in lot:
+            empreinte = empreintes[rubrique.pk]
+            if empreinte not in blobs and empreinte not in nouveaux:
+                xml = rubrique.contenu_xml or ""
+                nouveaux[empreinte] = BlobXml(
+                    empreinte=empreinte,
+                    stockage=revision_storage.STOCKAGE_KEYFRAME,
+                    donnees=revision_storage.encode_keyframe(xml),
+                    taille=len(xml.encode("utf-8")),
+                )
+        if nouveaux:
+            # ignore_conflicts : un blob créé en concurrence est relu ci-dessous.
+            BlobXml.objects.bulk_create(nouveaux.values(), ignore_conflicts=True)
+            blobs.update(
+                BlobXml.objects.filter(empreinte__in=nouveaux).values_list("empreinte", "pk")
+            )
+
+        RevisionRubrique.objects.bulk_create([
+            RevisionRubrique(
+                rubrique_id=rubrique.pk,
+                numero=1,
+                stockage=revision_storage.STOCKAGE_BLOB,
+                blob_id=blobs[empreintes[rubrique.pk]],
+                taille=len((rubrique.contenu_xml or "").encode("utf-8")),
+                hash_contenu=hash_contenu,
+                auteur_id=rubrique.auteur_id,
+            )
+            for rubrique, hash_contenu in lot
+        ])
+        for blob_id, nb in Counter(blobs[empreintes[r.pk]] for r, _ in lot).items():
+            BlobXml.objects.filter(pk=blob_id).update(nb_references=F("nb_references") + nb)
+        Rubrique.objects.filter(pk__in=[r.pk for r, _ in lot]).update(revision_courante_numero=1)
+        return len(lot)
+
+
+CIBLES = {
+    "rubriques": _CibleRubriques,
+    "revisions": _CibleRevisions,
+    "revisions-initiales": _CibleRevisionsInitiales,
+}
+
+
+# ---------------------------------------------------------------------------
+# Moteur
+# ---------------------------------------------------------------------------
+
+def get_nb_workers_defaut() -> int:
+    return os.cpu_count() or 1
+
+
+def executer_backfill(
+    nom_cible: str,
+    *,
+    taille_lot: int = DEFAULT_TAILLE_LOT,
+    workers: int | None = None,
+    reprendre: bool = True,
+    rapport=None,
+) -> dict:
+    """
+    Exécute le backfill de la cible `nom_cible` (clé de CIBLES).
+
+    workers <= 1 : calcul dans le processus courant (pas de pool).
+    reprendre=False : ignore le point de reprise d'une exécution interrompue.
+    rapport : callable(dict) appelé après chaque lot validé.
+
+    Retourne {"lues", "ecrites", "reprise_apres"}.
+    """
+    cible = CIBLES[nom_cible]()
+    nom_reprise = f"backfill_hashes:{nom_cible}"
+    if not reprendre:
+        PointDeReprise.objects.filter(nom=nom_reprise).delete()
+    reprise, _ = PointDeReprise.objects.get_or_create(nom=nom_reprise)
+    resultat = {"lues": 0, "ecrites": 0, "reprise_apres": reprise.dernier_id}
+
+    workers = get_nb_workers_defaut() if workers is None else workers
+    pool = (
+        ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"), initializer=init_worker)
+        if workers > 1
+        else None
+    )
+    try:
+        while True:
+            lignes = list(
+                cible.queryset().filter(pk__gt=reprise.dernier_id).order_by("pk")[:taille_lot]
+            )
+            if not lignes:
+                break
+            contenus = [cible.contenu(ligne) or "" for ligne in lignes]
+            if pool is None:
+                hashes = hacher_contenus(contenus)
+            else:
+                # Un sous-lot par processus : peu d'allers-retours de sérialisation.
+                pas = -(-len(contenus) // workers)
+                hashes = [
+                    h
+                    for sous_lot in pool.map(
+                        hacher_contenus, (contenus[i:i + pas] for i in range(0, len(contenus), pas))
+                    )
+                    for h in sous_lot
+                ]
+
+            with transaction.atomic():
+                resultat["ecrites"] += cible.ecrire(lignes, hashes)
+                reprise.dernier_id = lignes[-1].pk
+                reprise.save(update_fields=["dernier_id", "date_mise_a_jour"])
+            resultat["lues"] += len(lignes)
+            if rapport:
+                rapport({**resultat, "dernier_id": reprise.dernier_id})
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    reprise.delete()
+    return resultat
@@ -0,0 +1,22 @@
+# documentation/backfill_worker.py
+# -- Point d'entrée des processus de calcul du backfill (documentation.backfill) --
+"""
+Fonctions exécutées dans les processus du pool de backfill.
+
+Les processus sont lancés en "spawn" : ils n'héritent ni de l'état ni des
+connexions DB du parent. Ce module est importé avant django.setup() : il ne
+doit pas importer de modèles au niveau module.
+"""
+import django
+
+
+def init_worker() -> None:
+    # L'application est initialisée depuis DJANGO_SETTINGS_MODULE (environnement hérité).
+    django.setup()
+
+
+def hacher_contenus(contenus: list[str]) -> list[str]:
+    """Hash canonique (utils.compute_xml_hash) de chaque contenu."""
+    from .utils import compute_xml_hash
+
+    return [compute_xml_hash(xml) for xml in contenus]
@@ -1,32 +1,621 @@
 # documentation/exporters.py
-from .models import Map
+# -- Export d'une Map en bundle DITA (.ditamap + topics) puis rendu --
+"""
+Export DITA en flux.
+
+Phases (durées rapportées dans "durees_ms") :
+1. structure : arbre MapRubrique lu en une requête (identifiants et titres seulement).
+2. topics    : un fichier .dita par révision. Les topics déjà préparés pour
+               le même contenu et le même format sont repris du cache (lien
+               physique, sans lecture du contenu en base) ; les autres sont lus
+               par lots et écrits aussitôt — aucun contenu n'est conservé en mémoire.
+3. ditamap   : la .ditamap est écrite sur disque au fil du parcours de l'arbre.
+4. rendu     : le bundle est confié au moteur de rendu configuré (DITA_RENDERER).
+
+La mémoire consommée ne dépend que de la structure de la map (quelques entiers
+par nœud), jamais du volume des contenus.
+
+Révisions exportées : celles figées par les PublicationSnapshot de
+`version_projet` si elle est fournie (ensemble résolu depuis les deltas,
+utils.snapshots_publies), sinon la révision courante de chaque rubrique.
+
+Cache des topics (DITA_TOPIC_CACHE_ROOT) : un fichier par (hash_contenu, format),
+adressé par contenu, donc jamais périmé. Une republication ne régénère que les
+topics dont la révision a changé ; le taux de réutilisation est rapporté dans
+le résultat ("cache").
+
+Multi-format (export_map_multi_formats) : les phases 1 à 3 sont communes (une
+lecture de structure, une lecture de contenu par révision), seul le rendu est
+exécuté par format, en parallèle dans un pool de processus
+(DITA_RENDER_CONCURRENCY).
+
+Dossier de travail : chaque export écrit dans un dossier temporaire sous
+DITA_EXPORT_ROOT, supprimé si l'export est interrompu par une exception. Sinon
+il appartient à l'appelant, qui le supprime (supprimer_export) une fois les
+rendus rangés au magasin d'artefacts.
+"""
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from xml.sax.saxutils import quoteattr
+
+from django.conf import settings
+from django.db.models import F
+from django.utils.module_loading import import_string
+
+from .backfill_worker import init_worker
+from .models import Map, MapRubrique, RevisionRubrique
+from .rendu_worker import rendre_bundle
+from .utils import snapshots_publies
+
+# Nombre de révisions chargées par aller-retour DB pendant l'écriture des topics.
+_TOPICS_CHUNK = 100
+
+# Hash canonique d'un contenu vide (rubrique racine) : aucun topic à écrire.
+_HASH_VIDE = hashlib.sha256(b"").hexdigest()
+
+DEFAULT_DITA_RENDERER = "documentation.exporters.RenduDitaOt"
+
+
+def get_dossier_exports() -> str:
+    return getattr(settings, "DITA_EXPORT_ROOT", os.path.join(settings.MEDIA_ROOT, "exports"))
+
+
+def get_dossier_cache_topics() -> str:
+    return getattr(settings, "DITA_TOPIC_CACHE_ROOT", os.path.join(get_dossier_exports(), "cache"))
+
+
+def get_concurrence_rendu() -> int:
+    """Nombre maximal de rendus simultanés (settings.DITA_RENDER_CONCURRENCY, défaut : nb de CPU)."""
+    return getattr(settings, "DITA_RENDER_CONCURRENCY", os.cpu_count() or 1)
+
+
+def get_renderer():
+    """Instancie le moteur de rendu configuré (settings.DITA_RENDERER, chemin pointé)."""
+    return import_string(getattr(settings, "DITA_RENDERER", DEFAULT_DITA_RENDERER))()
+
+
+def artefacts_export(resultat: dict) -> dict:
+    """
+    {format: emplacement du rendu} des formats rendus avec succès, pour un
+    résultat de export_map_to_dita ou de export_map_multi_formats. Rendus
+    rangés au magasin ("artefacts") : leurs emplacements au magasin.
+    """
+    if "artefacts" in resultat:
+        return dict(resultat["artefacts"])
+    if "formats" in resultat:
+        par_format = resultat["formats"]
+    elif "format" in resultat:
+        par_format = {resultat["format"]: resultat}
+    else:
+        return {}
+    return {
+        output_format: (r.get("rendu") or {}).get("sortie") or r.get("dossier")
+        for output_format, r in par_format.items()
+        if r.get("status") == "success"
+    }
+
+
+def supprimer_export(resultat: dict) -> None:
+    """
+    Supprime le dossier de travail d'un export (bundle et rendus), pour un
+    résultat de export_map_to_dita ou de export_map_multi_formats. Sans effet
+    pour un dossier hors de DITA_EXPORT_ROOT ou déjà supprimé.
+    """
+    dossier = resultat.get("dossier")
+    if not dossier:
+        return
+    racine = os.path.realpath(get_dossier_exports())
+    dossier = os.path.realpath(dossier)
+    if dossier != racine and os.path.commonpath([racine, dossier]) == racine:
+        shutil.rmtree(dossier, ignore_errors=True)
+
+
+# ---------------------------------------------------------------------------
+# Moteurs de rendu
+# ---------------------------------------------------------------------------
+
+class RenduBase:
+    """
+    Interface des moteurs de rendu.
+
+    preparer_topic : transformation d'un topic avant rendu, propre au format
+    (résultat mis en cache par (hash_contenu, format)).
+    rendre : rendu du bundle complet.
+    """
+
+    def preparer_topic(self, xml: str, output_format: str) -> str:
+        if xml.startswith("<?xml"):
+            return xml
+        return '<?xml version="1.0" encoding="UTF-8"?>\n' + xml
+
+    def rendre(self, *, ditamap: str, output_format: str, dossier_sortie: str) -> dict:
+        raise NotImplementedError
+
+
+class RenduDitaOt(RenduBase):
+    """
+    Rendu via la ligne de commande DITA-OT (settings.DITA_OT_BIN, défaut "dita").
+    Un échec (binaire absent, code retour non nul, délai dépassé) est rapporté
+    dans le résultat, jamais levé : l'export ne remet pas en cause la publication.
+    """
+
+    def rendre(self, *, ditamap: str, output_format: str, dossier_sortie: str) -> dict:
+        commande = [
+            getattr(settings, "DITA_OT_BIN", "dita"),
+            "--input", ditamap,
+            "--format", output_format,
+            "--output", dossier_sortie,
+        ]
+        try:
+            processus = subprocess.run(
+                commande,
+                capture_output=True,
+                text=True,
+                timeout=getattr(settings, "DITA_OT_TIMEOUT", 600),
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            return {"status": "error", "message": f"DITA-OT indisponible : {e}"}
+        if processus.returncode != 0:
+            return {
+                "status": "error",
+                "message": f"DITA-OT a échoué (code {processus.returncode}).",
+                "stderr": processus.stderr[-4000:],
+            }
+        return {"status": "success", "sortie": dossier_sortie}
+
+
+class RenduLocal(RenduBase):
+    """
+    Rendu local sans DITA-OT (tests, développement) : produit un index texte
+    des fichiers du bundle dans le dossier de sortie.
+    """
+
+    def rendre(self, *, ditamap: str, output_format: str, dossier_sortie: str) -> dict:
+        os.makedirs(dossier_sortie, exist_ok=True)
+        racine = os.path.dirname(ditamap)
+        index = os.path.join(dossier_sortie, f"index.{output_format}.txt")
+        with open(index, "w", encoding="utf-8") as f:
+            for dossier, _, fichiers in os.walk(racine):
+                if os.path.commonpath([dossier, dossier_sortie]) == dossier_sortie:
+                    continue
+                for nom in sorted(fichiers):
+                    f.write(os.path.relpath(os.path.join(dossier, nom), racine) + "\n")
+        return {"status": "success", "sortie": dossier_sortie}
+
+
+# ---------------------------------------------------------------------------
+# Écriture du bundle
+# ---------------------------------------------------------------------------
+
+def _chemin_topic(rubrique_id: int) -> str:
+    return f"topics/rubrique-{rubrique_id}.dita"
+
+
+def _revisions_a_exporter(map_obj, version_projet):
+    """QuerySet des révisions à exporter, une par rubrique de la map."""
+    rubrique_ids = MapRubrique.objects.filter(map=map_obj).values("rubrique_id")
+    if version_projet is not None:
+        revision_ids = snapshots_publies(version_projet).filter(
+            rubrique_id__in=rubrique_ids
+        ).values("revision_id")
+        qs = RevisionRubrique.objects.filter(pk__in=revision_ids)
+    else:
+        qs = RevisionRubrique.objects.filter(
+            rubrique_id__in=rubrique_ids, numero=F("rubrique__revision_courante_numero")
+        )
+    return qs.select_related("base", "blob__base").order_by("rubrique_id")
+
+
+def _noeuds_structure(map_obj) -> list:
+    """Arbre de la map en une requête : [(id, parent_id, rubrique_id, titre)] dans l'ordre."""
+    return list(
+        MapRubrique.objects.filter(map=map_obj)
+        .order_by("ordre", "pk")
+        .values_list("pk", "parent_id", "rubrique_id", "rubrique__titre")
+    )
+
+
+def _ecrire_ditamap(chemin: str, map_obj, noeuds: list, avec_topic: set) -> None:
+    """
+    Écrit la .ditamap en parcours préfixe sur pile explicite.
+    noeuds : [(id, parent_id, rubrique_id, titre)] dans l'ordre de la map.
+    Une rubrique sans topic (contenu vide, ex. racine) devient un topichead.
+    """
+    enfants = {}
+    for noeud in noeuds:
+        enfants.setdefault(noeud[1], []).append(noeud)
+
+    with open(chemin, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<!DOCTYPE map PUBLIC "-//OASIS//DTD DITA Map//EN" "map.dtd">\n')
+        f.write(f"<map title={quoteattr(map_obj.nom)}>\n")
+        # Pile de (noeud, profondeur) ; une chaîne = balise fermante à écrire.
+        pile = [(n, 1) for n in reversed(enfants.get(None, []))]
+        while pile:
+            noeud, profondeur = pile.pop()
+            if isinstance(noeud, str):
+                f.write(noeud)
+                continue
+            noeud_id, _, rubrique_id, titre = noeud
+            indent = "  " * profondeur
+            if rubrique_id in avec_topic:
+                balise = "topicref"
+                ouverture = f"{indent}<topicref href={quoteattr(_chemin_topic(rubrique_id))} navtitle={quoteattr(titre)}"
+            else:
+                balise = "topichead"
+                ouverture = f"{indent}<topichead navtitle={quoteattr(titre)}"
+            sous_noeuds = enfants.get(noeud_id)
+            if not sous_noeuds:
+                f.write(ouverture + "/>\n")
+                continue
+            f.write(ouverture + ">\n")
+            pile.append((f"{indent}</{balise}>\n", profondeur))
+            pile.extend((n, profondeur + 1) for n in reversed(sous_noeuds))
+        f.write("</map>\n")
+
+
+def _placer(source: str, destination: str) -> None:
+    """Lien physique depuis le cache (copie si le système de fichiers l'interdit)."""
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+def _mettre_en_cache(chemin: str, contenu: str) -> None:
+    """Écriture atomique (fichier temporaire + rename) : jamais de topic tronqué en cache."""
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    fd, temporaire = tempfile.mkstemp(dir=os.path.dirname(chemin), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(contenu)
+        os.replace(temporaire, chemin)
+    except BaseException:
+        os.remove(temporaire)
+        raise
+
+
+def _ecrire_topics(dossiers: dict, revisions, renderer) -> dict:
+    """
+    Écrit un fichier par révision dans <dossier>/topics, pour chaque format de
+    `dossiers` ({format: dossier du bundle}).
+
+    1. Index des révisions (pk, rubrique, hash) sans contenu.
+    2. Hash présent dans le cache du format : lien vers le fichier en cache.
+    3. Sinon : contenu lu par lots de _TOPICS_CHUNK — une seule fois, quel que
+       soit le nombre de formats à générer — préparé par le moteur de rendu
+       pour chaque format, mis en cache puis lié.
+
+    Retourne {format: {"rubriques": set des rubriques écrites, "octets",
+    "reutilises", "generes"}}.
+    """
+    etats = {}
+    for output_format, dossier in dossiers.items():
+        os.makedirs(os.path.join(dossier, "topics"), exist_ok=True)
+        etats[output_format] = {"rubriques": set(), "octets": 0, "reutilises": 0, "generes": 0}
+
+    def _chemin_cache(output_format, hash_contenu):
+        return os.path.join(
+            get_dossier_cache_topics(), output_format, hash_contenu[:2], f"{hash_contenu}.dita"
+        )
+
+    # pk de révision → formats dont le topic doit être généré
+    a_generer = {}
+    for pk, rubrique_id, hash_contenu in revisions.values_list("pk", "rubrique_id", "hash_contenu"):
+        if hash_contenu == _HASH_VIDE:
+            continue
+        for output_format, dossier in dossiers.items():
+            source = _chemin_cache(output_format, hash_contenu) if hash_contenu else None
+            if source and os.path.exists(source):
+                destination = os.path.join(dossier, _chemin_topic(rubrique_id))
+                _placer(source, destination)
+                etat = etats[output_format]
+                etat["octets"] += os.path.getsize(destination)
+                etat["rubriques"].add(rubrique_id)
+                etat["reutilises"] += 1
+            else:
+                a_generer.setdefault(pk, []).append(output_format)
+
+    pks = list(a_generer)
+    for i in range(0, len(pks), _TOPICS_CHUNK):
+        lot = revisions.filter(pk__in=pks[i:i + _TOPICS_CHUNK])
+        for revision in lot:
+            brut = (revision.contenu_xml or "").strip()
+            if not brut:
+                continue
+            for output_format in a_generer[revision.pk]:
+                contenu = renderer.preparer_topic(brut, output_format)
+                destination = os.path.join(dossiers[output_format], _chemin_topic(revision.rubrique_id))
+                if revision.hash_contenu:
+                    chemin_cache = _chemin_cache(output_format, revision.hash_contenu)
+                    _mettre_en_cache(chemin_cache, contenu)
+                    _placer(chemin_cache, destination)
+                else:
+                    # Révision historique sans hash : pas de clé de cache.
+                    with open(destination, "w", encoding="utf-8") as f:
+                        f.write(contenu)
+                etat = etats[output_format]
+                etat["octets"] += len(contenu.encode("utf-8"))
+                etat["rubriques"].add(revision.rubrique_id)
+                etat["generes"] += 1
+    return etats
+
+
+def _resume_cache(etat: dict) -> dict:
+    return {
+        "reutilises": etat["reutilises"],
+        "generes": etat["generes"],
+        "taux_reutilisation": round(
+            etat["reutilises"] / max(1, etat["reutilises"] + etat["generes"]), 3
+        ),
+    }
 
 
 # -- Fonction pour exporter une Map en DITA --
-def export_map_to_dita(map_id, output_format="pdf"):
+def export_map_to_dita(map_id, output_format="pdf", *, version_projet=None, renderer=None, suivi=None):
     """
-    Fonction simulant l'export d'une Map en format DITA.
-    À terme, cette fonction devra :
-    - récupérer la Map et ses rubriques
-    - générer un document DITA valide
-    - lancer l'export via DITA-OT
+    Exporte une Map en bundle DITA sur disque puis la confie au moteur de rendu.
+
+    Le bundle est écrit dans un dossier propre à l'export, sous DITA_EXPORT_ROOT :
+      <dossier>/<map>.ditamap, <dossier>/topics/*.dita, <dossier>/out/ (rendu).
+
+    suivi : callable(phase) appelé au début de chaque phase (progression d'une
+    tâche de publication).
+
+    Retourne un dict : status, message, map, rubriques_count, topics_count,
+    format, dossier, octets, cache (topics réutilisés / générés et taux de
+    réutilisation), rendu (résultat du moteur) et durees_ms par phase.
     """
+    debut = time.perf_counter()
+    durees = {}
+
+    def _phase(nom):
+        # Le suivi (écriture de la progression) n'est pas compté dans la phase.
+        if suivi is not None:
+            suivi(nom)
+        return time.perf_counter()
+
+    def _chrono(phase, depuis):
+        durees[phase] = round((time.perf_counter() - depuis) * 1000, 1)
+
     try:
         map_obj = Map.objects.get(pk=map_id)
-        rubriques = map_obj.rubriques.all()
+    except Map.DoesNotExist:
+        return {"status": "error", "message": f"Aucune map trouvée avec l'ID {map_id}"}
 
-        # Simulation d'une logique de traitement
-        print(
-            f"Export de la map '{map_obj.nom}' avec {rubriques.count()} rubriques au format {output_format.upper()}"
+    # Phase 1 : structure (une requête, sans contenu)
+    t = _phase("structure")
+    noeuds = _noeuds_structure(map_obj)
+    _chrono("structure", t)
+
+    racine = get_dossier_exports()
+    os.makedirs(racine, exist_ok=True)
+    dossier = tempfile.mkdtemp(prefix=f"map-{map_obj.pk}-{output_format}-", dir=racine)
+    try:
+        # Phase 2 : topics (avant la map : seules les rubriques écrites y sont référencées)
+        t = _phase("topics")
+        renderer = renderer or get_renderer()
+        topics = _ecrire_topics(
+            {output_format: dossier}, _revisions_a_exporter(map_obj, version_projet), renderer
+        )[output_format]
+        avec_topic = topics["rubriques"]
+        _chrono("topics", t)
+
+        # Phase 3 : ditamap
+        t = _phase("ditamap")
+        ditamap = os.path.join(dossier, f"map-{map_obj.pk}.ditamap")
+        _ecrire_ditamap(ditamap, map_obj, noeuds, avec_topic)
+        _chrono("ditamap", t)
+    except OSError as e:
+        shutil.rmtree(dossier, ignore_errors=True)
+        return {"status": "error", "message": f"Écriture du bundle DITA impossible : {e}"}
+    except BaseException:
+        shutil.rmtree(dossier, ignore_errors=True)
+        raise
+
+    # Phase 4 : rendu
+    t = _phase("rendu")
+    try:
+        rendu = renderer.rendre(
+            ditamap=ditamap, output_format=output_format, dossier_sortie=os.path.join(dossier, "out")
         )
+    except BaseException:
+        shutil.rmtree(dossier, ignore_errors=True)
+        raise
+    _chrono("rendu", t)
+    durees["total"] = round((time.perf_counter() - debut) * 1000, 1)
 
-        return {
-            "status": "success",
-            "message": f"Export DITA effectué avec succès au format {output_format.upper()}",
-            "map": map_obj.nom,
-            "rubriques_count": rubriques.count(),
-            "format": output_format,
+    succes = rendu.get("status") == "success"
+    return {
+        "status": "success" if succes else "error",
+        "message": (
+            f"Export DITA effectué avec succès au format {output_format.upper()}"
+            if succes
+            else rendu.get("message", "Échec du rendu DITA.")
+        ),
+        "map": map_obj.nom,
+        "rubriques_count": len(noeuds),
+        "topics_count": len(avec_topic),
+        "format": output_format,
+        "dossier": dossier,
+        "octets": topics["octets"],
+        "cache": _resume_cache(topics),
+        "rendu": rendu,
+        "durees_ms": durees,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Export multi-format
+# ---------------------------------------------------------------------------
+
+def _rendre_formats(renderer, bundles: dict, concurrence: int) -> dict:
+    """
+    Rendu de chaque bundle ({format: (ditamap, dossier_sortie)}).
+
+    concurrence <= 1 (ou un seul format) : rendus successifs dans le processus
+    courant. Sinon : pool de processus "spawn" ; le moteur y est réinstancié
+    depuis sa classe (les moteurs sont sans état).
+
+    Retourne {format: {"rendu": dict du moteur, "duree_ms": float}}.
+    """
+    if concurrence <= 1 or len(bundles) <= 1:
+        resultats = {}
+        for output_format, (ditamap, sortie) in bundles.items():
+            debut = time.perf_counter()
+            try:
+                rendu = renderer.rendre(ditamap=ditamap, output_format=output_format, dossier_sortie=sortie)
+            except Exception as e:
+                rendu = {"status": "error", "message": f"Rendu {output_format} interrompu : {e}"}
+            resultats[output_format] = {
+                "rendu": rendu,
+                "duree_ms": round((time.perf_counter() - debut) * 1000, 1),
+            }
+        return resultats
+
+    chemin_renderer = f"{type(renderer).__module__}.{type(renderer).__qualname__}"
+    resultats = {}
+    with ProcessPoolExecutor(
+        max_workers=min(concurrence, len(bundles)),
+        mp_context=get_context("spawn"),
+        initializer=init_worker,
+    ) as pool:
+        futures = {
+            output_format: pool.submit(rendre_bundle, chemin_renderer, ditamap, output_format, sortie)
+            for output_format, (ditamap, sortie) in bundles.items()
         }
+        for output_format, future in futures.items():
+            try:
+                resultats[output_format] = future.result()
+            except Exception as e:
+                # Processus de rendu perdu (ex. BrokenProcessPool) : seul ce format échoue.
+                resultats[output_format] = {
+                    "rendu": {"status": "error", "message": f"Rendu {output_format} interrompu : {e}"},
+                    "duree_ms": None,
+                }
+    return resultats
+
+
+def export_map_multi_formats(
+    map_id, formats, *, version_projet=None, renderer=None, suivi=None, concurrence=None
+):
+    """
+    Exporte une Map dans plusieurs formats à partir d'une seule préparation.
+
+    Phases communes : structure (une requête), topics (contenu de chaque
+    révision lu au plus une fois, préparé par format et mis en cache),
+    ditamap (écrite une fois, liée dans chaque bundle). Le rendu de chaque
+    format est ensuite exécuté en parallèle (concurrence, défaut
+    DITA_RENDER_CONCURRENCY).
+
+    Un bundle par format : <dossier>/<format>/<map>.ditamap, topics/, out/.
+
+    Retourne un dict : status ("success", "partial" si au moins un format a
+    échoué, "error" si tous ont échoué), message, map, rubriques_count,
+    topics_count, dossier, formats ({format: status, message, dossier, octets,
+    cache, rendu, durees_ms}) et durees_ms par phase commune.
+    """
+    formats = list(dict.fromkeys(formats))
+    debut = time.perf_counter()
+    durees = {}
 
+    def _phase(nom):
+        if suivi is not None:
+            suivi(nom)
+        return time.perf_counter()
+
+    def _chrono(phase, depuis):
+        durees[phase] = round((time.perf_counter() - depuis) * 1000, 1)
+
+    try:
+        map_obj = Map.objects.get(pk=map_id)
     except Map.DoesNotExist:
         return {"status": "error", "message": f"Aucune map trouvée avec l'ID {map_id}"}
+
+    t = _phase("structure")
+    noeuds = _noeuds_structure(map_obj)
+    _chrono("structure", t)
+
+    racine = get_dossier_exports()
+    os.makedirs(racine, exist_ok=True)
+    dossier = tempfile.mkdtemp(prefix=f"map-{map_obj.pk}-multi-", dir=racine)
+    dossiers = {output_format: os.path.join(dossier, output_format) for output_format in formats}
+    nom_ditamap = f"map-{map_obj.pk}.ditamap"
+    try:
+        t = _phase("topics")
+        renderer = renderer or get_renderer()
+        topics = _ecrire_topics(dossiers, _revisions_a_exporter(map_obj, version_projet), renderer)
+        # Rubriques écrites : identiques pour tous les formats (contenu non vide).
+        avec_topic = topics[formats[0]]["rubriques"]
+        _chrono("topics", t)
+
+        t = _phase("ditamap")
+        reference = os.path.join(dossiers[formats[0]], nom_ditamap)
+        _ecrire_ditamap(reference, map_obj, noeuds, avec_topic)
+        for output_format in formats[1:]:
+            _placer(reference, os.path.join(dossiers[output_format], nom_ditamap))
+        _chrono("ditamap", t)
+    except OSError as e:
+        shutil.rmtree(dossier, ignore_errors=True)
+        return {"status": "error", "message": f"Écriture du bundle DITA impossible : {e}"}
+    except BaseException:
+        shutil.rmtree(dossier, ignore_errors=True)
+        raise
+
+    t = _phase("rendu")
+    try:
+        rendus = _rendre_formats(
+            renderer,
+            {
+                output_format: (os.path.join(d, nom_ditamap), os.path.join(d, "out"))
+                for output_format, d in dossiers.items()
+            },
+            get_concurrence_rendu() if concurrence is None else concurrence,
+        )
+    except BaseException:
+        shutil.rmtree(dossier, ignore_errors=True)
+        raise
+    _chrono("rendu", t)
+    durees["total"] = round((time.perf_counter() - debut) * 1000, 1)
+
+    par_format = {}
+    for output_format in formats:
+        rendu = rendus[output_format]["rendu"]
+        succes = rendu.get("status") == "success"
+        par_format[output_format] = {
+            "status": "success" if succes else "error",
+            "message": (
+                f"Export DITA effectué avec succès au format {output_format.upper()}"
+                if succes
+                else rendu.get("message", "Échec du rendu DITA.")
+            ),
+            "dossier": dossiers[output_format],
+            "octets": topics[output_format]["octets"],
+            "cache": _resume_cache(topics[output_format]),
+            "rendu": rendu,
+            "durees_ms": {"rendu": rendus[output_format]["duree_ms"]},
+        }
+
+    echecs = [f for f, r in par_format.items() if r["status"] != "success"]
+    if not echecs:
+        statut, message = "success", f"Export DITA effectué avec succès ({', '.join(formats)})."
+    elif len(echecs) == len(formats):
+        statut, message = "error", "Échec du rendu DITA pour tous les formats."
+    else:
+        statut, message = "partial", f"Échec du rendu DITA : {', '.join(echecs)}."
+    return {
+        "status": statut,
+        "message": message,
+        "map": map_obj.nom,
+        "rubriques_count": len(noeuds),
+        "topics_count": len(avec_topic),
+        "dossier": dossier,
+        "formats": par_format,
+        "durees_ms": durees,
+    }
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+from documentation.backfill import (
+    CIBLES,
+    DEFAULT_TAILLE_LOT,
+    executer_backfill,
+    get_nb_workers_defaut,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule en masse les hash de contenu (rubriques, révisions) ou crée les "
+        "révisions initiales manquantes. Calcul parallèle, écriture par lots, "
+        "reprise automatique après interruption."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "cible",
+            choices=sorted(CIBLES),
+            help="Table à traiter.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_TAILLE_LOT,
+            help=f"Nombre de lignes par lot et par transaction (défaut : {DEFAULT_TAILLE_LOT}).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Nombre de processus de calcul (défaut : nombre de CPU ; 1 = sans pool).",
+        )
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Ignore le point de reprise d'une exécution interrompue.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size doit être strictement positif.")
+        workers = options["workers"] if options["workers"] is not None else get_nb_workers_defaut()
+
+        def rapport(etat):
+            self.stdout.write(
+                f"- {etat['lues']} ligne(s) lue(s), {etat['ecrites']} écrite(s) "
+                f"(jusqu'à l'id {etat['dernier_id']})"
+            )
+
+        resultat = executer_backfill(
+            options["cible"],
+            taille_lot=options["batch_size"],
+            workers=workers,
+            reprendre=not options["reset"],
+            rapport=rapport,
+        )
+        reprise = f" (reprise après l'id {resultat['reprise_apres']})" if resultat["reprise_apres"] else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n✅ {options['cible']} : {resultat['lues']} ligne(s) traitée(s), "
+                f"{resultat['ecrites']} écrite(s){reprise}."
+            )
+        )
@@ -0,0 +1,194 @@
+import time
+import tracemalloc
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from documentation import revision_storage
+from documentation.models import (
+    Gamme,
+    Map,
+    MapRubrique,
+    Projet,
+    PublicationSnapshot,
+    RevisionRubrique,
+    Rubrique,
+    VersionProjet,
+)
+from documentation.services import _build_rubrique_revision_map, _detect_changes
+from documentation.utils import snapshots_publies
+
+_LOT = 5000
+
+
+def _detect_changes_python(rubrique_revision_map: dict, last_published) -> dict:
+    """Implémentation historique (dict des snapshots + ensembles en mémoire), pour comparaison."""
+    published_map = {
+        snap.rubrique_id: snap.revision_id
+        for snap in snapshots_publies(last_published)
+    }
+    current_ids = set(rubrique_revision_map.keys())
+    published_ids = set(published_map.keys())
+    nouvelles = list(current_ids - published_ids)
+    retirees = list(published_ids - current_ids)
+    modifiees = [
+        rid for rid in current_ids & published_ids
+        if rubrique_revision_map[rid].id != published_map[rid]
+    ]
+    return {
+        "nouvelles": nouvelles,
+        "modifiees": modifiees,
+        "retirees": retirees,
+        "has_changes": bool(nouvelles or modifiees or retirees),
+    }
+
+
+def _mesurer(fonction, repetitions: int) -> tuple[dict, float, int]:
+    """Retourne (résultat, meilleur temps en s, pic mémoire Python en octets)."""
+    meilleur = float("inf")
+    resultat = None
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        resultat = fonction()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    tracemalloc.start()
+    fonction()
+    _, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultat, meilleur, pic
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare la détection des changements de publication en mémoire (historique) "
+        "et en SQL (anti-jointures) sur un jeu synthétique, annulé en fin de mesure."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=100_000,
+            help="Nombre de snapshots de la dernière publication (défaut : 100000).",
+        )
+        parser.add_argument(
+            "--change-ratio",
+            type=float,
+            default=0.01,
+            help="Part des rubriques modifiées, retirées et ajoutées (défaut : 0.01).",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Nombre de mesures par méthode, le meilleur temps est retenu (défaut : 3).",
+        )
+
+    def handle(self, *args, **options):
+        nb = options["rows"]
+        if nb < 1:
+            raise CommandError("--rows doit être strictement positif.")
+        nb_changes = max(1, int(nb * options["change_ratio"]))
+        repetitions = max(1, options["repeat"])
+
+        with transaction.atomic():
+            self.stdout.write(f"Préparation : {nb} snapshots, {nb_changes} changement(s) par type…")
+            map_obj, publiee = self._jeu_de_donnees(nb, nb_changes)
+
+            self.stdout.write(
+                f"{'méthode':<22} | {'temps (ms)':>10} | {'pic mémoire (KB)':>16}"
+            )
+            resultats = {}
+            for nom, fonction in (
+                ("python (historique)", lambda: _detect_changes_python(
+                    _build_rubrique_revision_map(map_obj), publiee
+                )),
+                ("sql (détail)", lambda: _detect_changes(map_obj, publiee)),
+                ("sql (effectifs)", lambda: _detect_changes(map_obj, publiee, details=False)),
+            ):
+                resultat, duree, pic = _mesurer(fonction, repetitions)
+                resultats[nom] = resultat
+                self.stdout.write(f"{nom:<22} | {duree * 1000:>10.1f} | {pic / 1024:>16.0f}")
+
+            transaction.set_rollback(True)
+
+        historique, sql = resultats["python (historique)"], resultats["sql (détail)"]
+        for cle in ("nouvelles", "modifiees", "retirees"):
+            if sorted(historique[cle]) != sorted(sql[cle]):
+                raise CommandError(f"Résultats divergents pour « {cle} ».")
+            if resultats["sql (effectifs)"][cle] != len(sql[cle]):
+                raise CommandError(f"Effectif divergent pour « {cle} ».")
+
+        self.stdout.write(self.style.SUCCESS("\n✅ Résultats identiques pour les trois méthodes."))
+
+    def _jeu_de_donnees(self, nb: int, nb_changes: int):
+        """
+        Projet publié (nb snapshots) puis état courant de la map :
+        nb_changes rubriques modifiées, retirées et ajoutées.
+        """
+        gamme = Gamme.objects.create(nom=f"bench-{uuid.uuid4().hex[:12]}")
+        projet = Projet.objects.create(nom="Bench", description="", gamme=gamme)
+        publiee = VersionProjet.objects.create(
+            projet=projet, version_numero="1.0.0", is_active=False, rang_publication=1
+        )
+        wip = VersionProjet.objects.create(projet=projet, version_numero="1.1.0", is_active=True)
+        map_obj = Map.objects.create(nom="Master", projet=projet, is_master=True)
+
+        def _rubriques(n):
+            rubriques = Rubrique.objects.bulk_create(
+                [
+                    Rubrique(
+                        projet=projet, version_projet=wip, titre=f"R{i}",
+                        contenu_xml="", revision_courante_numero=1,
+                    )
+                    for i in range(n)
+                ],
+                batch_size=_LOT,
+            )
+            revisions = RevisionRubrique.objects.bulk_create(
+                [
+                    RevisionRubrique(
+                        rubrique=r, numero=1, stockage=revision_storage.STOCKAGE_BRUT,
+                        hash_contenu="0" * 64,
+                    )
+                    for r in rubriques
+                ],
+                batch_size=_LOT,
+            )
+            MapRubrique.objects.bulk_create(
+                [MapRubrique(map=map_obj, rubrique=r, ordre=i) for i, r in enumerate(rubriques)],
+                batch_size=_LOT,
+            )
+            return rubriques, revisions
+
+        rubriques, revisions = _rubriques(nb)
+        PublicationSnapshot.objects.bulk_create(
+            [
+                PublicationSnapshot(version_projet=publiee, rubrique=r, revision=rev)
+                for r, rev in zip(rubriques, revisions, strict=True)
+            ],
+            batch_size=_LOT,
+        )
+
+        modifiees = rubriques[:nb_changes]
+        RevisionRubrique.objects.bulk_create(
+            [
+                RevisionRubrique(
+                    rubrique=r, numero=2, stockage=revision_storage.STOCKAGE_BRUT,
+                    hash_contenu="1" * 64,
+                )
+                for r in modifiees
+            ],
+            batch_size=_LOT,
+        )
+        Rubrique.objects.filter(pk__in=[r.pk for r in modifiees]).update(revision_courante_numero=2)
+        MapRubrique.objects.filter(
+            map=map_obj, rubrique_id__in=[r.pk for r in rubriques[-nb_changes:]]
+        ).delete()
+        _rubriques(nb_changes)
+
+        # Statistiques du planificateur à jour, comme sur une base en service.
+        with connection.cursor() as cursor:
+            for modele in (Rubrique, RevisionRubrique, MapRubrique, PublicationSnapshot):
+                cursor.execute(f"ANALYZE {modele._meta.db_table}")
+        return map_obj, publiee
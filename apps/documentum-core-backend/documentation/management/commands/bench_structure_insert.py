@@ -0,0 +1,129 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import F
+from documentation.models import Gamme, Map, MapRubrique, Projet, Rubrique, VersionProjet
+from documentation.services import ORDRE_PAS, _cle_ordre
+
+_LOT = 5000
+
+
+def _inserer_decalage(map_obj, parent, rubrique) -> None:
+    """Implémentation historique : décale tous les frères suivants puis insère en tête."""
+    MapRubrique.objects.filter(map=map_obj, parent=parent, ordre__gte=1).update(ordre=F("ordre") + 1)
+    MapRubrique.objects.create(map=map_obj, rubrique=rubrique, parent=parent, ordre=1)
+
+
+def _inserer_ecart(map_obj, parent, rubrique) -> None:
+    """Clés espacées : une clé prise dans l'écart avant le premier frère."""
+    premier = (
+        MapRubrique.objects.filter(map=map_obj, parent=parent)
+        .order_by("ordre", "pk")
+        .values_list("pk", flat=True)
+        .first()
+    )
+    ordre = _cle_ordre(map_obj.pk, parent.pk, avant_id=premier)
+    MapRubrique.objects.create(map=map_obj, rubrique=rubrique, parent=parent, ordre=ordre)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare l'insertion en tête d'un niveau large par décalage des frères "
+        "(historique) et par clés d'ordre espacées, sur un jeu synthétique annulé "
+        "en fin de mesure."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--width",
+            type=int,
+            default=2000,
+            help="Nombre de frères du niveau (défaut : 2000).",
+        )
+        parser.add_argument(
+            "--inserts",
+            type=int,
+            default=100,
+            help="Nombre d'insertions en tête par méthode (défaut : 100).",
+        )
+
+    def handle(self, *args, **options):
+        largeur, nb_insertions = options["width"], options["inserts"]
+        if largeur < 1 or nb_insertions < 1:
+            raise CommandError("--width et --inserts doivent être strictement positifs.")
+
+        with transaction.atomic():
+            self.stdout.write(f"Préparation : 2 niveaux de {largeur} frères…")
+            projet, wip = self._projet()
+            self.stdout.write(
+                f"{'méthode':<22} | {'temps (ms)':>10} | {'lignes écrites':>14}"
+            )
+            ordres = {}
+            for nom, inserer, pas in (
+                ("décalage (historique)", _inserer_decalage, 1),
+                ("clés espacées", _inserer_ecart, ORDRE_PAS),
+            ):
+                map_obj, parent = self._niveau(projet, wip, largeur, pas)
+                nouvelles = self._rubriques(projet, wip, nb_insertions, "N")
+                avant = self._lignes_ecrites()
+
+                debut = time.perf_counter()
+                for rubrique in nouvelles:
+                    inserer(map_obj, parent, rubrique)
+                duree = time.perf_counter() - debut
+
+                ecrites = self._lignes_ecrites() - avant
+                ordres[nom] = [
+                    titre for titre in MapRubrique.objects.filter(map=map_obj, parent=parent)
+                    .order_by("ordre", "pk").values_list("rubrique__titre", flat=True)
+                ]
+                self.stdout.write(f"{nom:<22} | {duree * 1000:>10.1f} | {ecrites:>14}")
+
+            transaction.set_rollback(True)
+
+        if ordres["décalage (historique)"] != ordres["clés espacées"]:
+            raise CommandError("Ordres résultants divergents.")
+        self.stdout.write(self.style.SUCCESS("\n✅ Ordre résultant identique pour les deux méthodes."))
+
+    def _projet(self):
+        gamme = Gamme.objects.create(nom=f"bench-{uuid.uuid4().hex[:12]}")
+        projet = Projet.objects.create(nom="Bench", description="", gamme=gamme)
+        wip = VersionProjet.objects.create(projet=projet, version_numero="1.0.0", is_active=True)
+        return projet, wip
+
+    def _rubriques(self, projet, wip, n, prefixe):
+        return Rubrique.objects.bulk_create(
+            [
+                Rubrique(projet=projet, version_projet=wip, titre=f"{prefixe}{i}", contenu_xml="")
+                for i in range(n)
+            ],
+            batch_size=_LOT,
+        )
+
+    def _niveau(self, projet, wip, largeur, pas):
+        """Map dont la racine porte `largeur` enfants numérotés pas, 2 × pas, …"""
+        map_obj = Map.objects.create(nom=f"Bench {pas}", projet=projet, is_master=False)
+        racine = MapRubrique.objects.create(
+            map=map_obj, rubrique=self._rubriques(projet, wip, 1, "Racine")[0], ordre=pas
+        )
+        MapRubrique.objects.bulk_create(
+            [
+                MapRubrique(map=map_obj, rubrique=r, parent=racine, ordre=pas * (i + 1))
+                for i, r in enumerate(self._rubriques(projet, wip, largeur, "R"))
+            ],
+            batch_size=_LOT,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {MapRubrique._meta.db_table}")
+        return map_obj, racine
+
+    def _lignes_ecrites(self) -> int:
+        """Lignes MapRubrique insérées ou mises à jour dans la transaction courante."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT n_tup_ins + n_tup_upd FROM pg_stat_xact_user_tables WHERE relid = %s::regclass",
+                [MapRubrique._meta.db_table],
+            )
+            return cursor.fetchone()[0]
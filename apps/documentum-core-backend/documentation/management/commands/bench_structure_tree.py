@@ -0,0 +1,149 @@
+import json
+import time
+import tracemalloc
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from documentation.models import Gamme, Map, MapRubrique, Projet, Rubrique, VersionProjet
+from documentation.serializers import MapRubriqueStructureSerializer
+from documentation.utils import flux_structure_arbre
+from rest_framework.renderers import JSONRenderer
+
+_LOT = 5000
+
+
+def _structure_serializer(map_id: int) -> bytes:
+    """Chemin historique : liste à plat, jointure sur le parent, sérialiseur DRF."""
+    qs = (
+        MapRubrique.objects.filter(map_id=map_id)
+        .select_related("rubrique", "parent")
+        .order_by("ordre")
+    )
+    return JSONRenderer().render(MapRubriqueStructureSerializer(qs, many=True).data)
+
+
+def _structure_arbre(map_id: int) -> bytes:
+    return b"".join(morceau.encode() for morceau in flux_structure_arbre(map_id))
+
+
+def _mesurer(fonction, repetitions: int) -> tuple[bytes, float, int, int]:
+    """Retourne (résultat, meilleur temps en s, pic mémoire Python en octets, nb de requêtes)."""
+    meilleur = float("inf")
+    resultat = None
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        resultat = fonction()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    with CaptureQueriesContext(connection) as requetes:
+        tracemalloc.start()
+        fonction()
+        _, pic = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return resultat, meilleur, pic, len(requetes.captured_queries)
+
+
+def _aretes_arbre(noeuds, parent=None):
+    """{(id, parent_id)} d'un arbre imbriqué, parcouru sur pile explicite."""
+    aretes, pile = set(), [(n, parent) for n in noeuds]
+    while pile:
+        noeud, parent_id = pile.pop()
+        aretes.add((noeud["id"], parent_id))
+        pile.extend((e, noeud["id"]) for e in noeud["enfants"])
+    return aretes
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare la structure d'une map servie à plat par le sérialiseur (historique) "
+        "et en arbre imbriqué construit en un passage (?format=tree), sur un jeu "
+        "synthétique annulé en fin de mesure."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--nodes",
+            type=int,
+            default=50_000,
+            help="Nombre de nœuds de la map (défaut : 50000).",
+        )
+        parser.add_argument(
+            "--fanout",
+            type=int,
+            default=8,
+            help="Nombre d'enfants par nœud (défaut : 8).",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Nombre de mesures par méthode, le meilleur temps est retenu (défaut : 3).",
+        )
+
+    def handle(self, *args, **options):
+        nb, largeur = options["nodes"], options["fanout"]
+        if nb < 1 or largeur < 1:
+            raise CommandError("--nodes et --fanout doivent être strictement positifs.")
+        repetitions = max(1, options["repeat"])
+
+        with transaction.atomic():
+            self.stdout.write(f"Préparation : map de {nb} nœuds, {largeur} enfants par nœud…")
+            map_id = self._jeu_de_donnees(nb, largeur)
+
+            self.stdout.write(
+                f"{'méthode':<22} | {'temps (ms)':>10} | {'pic mémoire (KB)':>16} "
+                f"| {'taille (KB)':>11} | {'requêtes':>8}"
+            )
+            resultats = {}
+            for nom, fonction in (
+                ("sérialiseur (à plat)", lambda: _structure_serializer(map_id)),
+                ("arbre (flux)", lambda: _structure_arbre(map_id)),
+            ):
+                resultat, duree, pic, requetes = _mesurer(fonction, repetitions)
+                resultats[nom] = resultat
+                self.stdout.write(
+                    f"{nom:<22} | {duree * 1000:>10.1f} | {pic / 1024:>16.0f} "
+                    f"| {len(resultat) / 1024:>11.0f} | {requetes:>8}"
+                )
+
+            transaction.set_rollback(True)
+
+        a_plat = {(n["id"], n["parent"]) for n in json.loads(resultats["sérialiseur (à plat)"])}
+        if _aretes_arbre(json.loads(resultats["arbre (flux)"])) != a_plat:
+            raise CommandError("Structures divergentes.")
+        self.stdout.write(self.style.SUCCESS("\n✅ Même structure pour les deux méthodes."))
+
+    def _jeu_de_donnees(self, nb: int, largeur: int) -> int:
+        """Map de nb nœuds : une racine, puis largeur enfants par nœud, niveau par niveau."""
+        gamme = Gamme.objects.create(nom=f"bench-{uuid.uuid4().hex[:12]}")
+        projet = Projet.objects.create(nom="Bench", description="", gamme=gamme)
+        wip = VersionProjet.objects.create(projet=projet, version_numero="1.0.0", is_active=True)
+        map_obj = Map.objects.create(nom="Master", projet=projet, is_master=True)
+        rubriques = Rubrique.objects.bulk_create(
+            [
+                Rubrique(projet=projet, version_projet=wip, titre=f"Rubrique {i}", contenu_xml="")
+                for i in range(nb)
+            ],
+            batch_size=_LOT,
+        )
+
+        niveau = [MapRubrique.objects.create(map=map_obj, rubrique=rubriques[0], ordre=1)]
+        suivante = 1
+        while suivante < nb:
+            nouveaux = []
+            for parent in niveau:
+                for ordre in range(1, largeur + 1):
+                    if suivante == nb:
+                        break
+                    nouveaux.append(MapRubrique(
+                        map=map_obj, rubrique=rubriques[suivante], parent=parent, ordre=ordre,
+                        chemin=parent.prefixe_descendants, profondeur=parent.profondeur + 1,
+                    ))
+                    suivante += 1
+            niveau = MapRubrique.objects.bulk_create(nouveaux, batch_size=_LOT)
+
+        with connection.cursor() as cursor:
+            for modele in (Rubrique, MapRubrique):
+                cursor.execute(f"ANALYZE {modele._meta.db_table}")
+        return map_obj.pk
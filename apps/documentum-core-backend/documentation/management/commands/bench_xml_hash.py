@@ -0,0 +1,100 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from documentation.utils import _compute_xml_hash_arbre, compute_xml_hash
+
+_UNITES = {"KB": 1024, "MB": 1024 * 1024}
+
+
+def _parse_taille(valeur: str) -> int:
+    valeur = valeur.strip().upper()
+    for suffixe, facteur in _UNITES.items():
+        if valeur.endswith(suffixe):
+            return int(float(valeur[:-len(suffixe)]) * facteur)
+    return int(valeur)
+
+
+def generer_topic(taille: int) -> str:
+    """Topic DITA synthétique d'environ `taille` octets (sections, listes, tableaux)."""
+    bloc = (
+        "<section id='s{i}'><title>Section {i}</title>"
+        "<p>Paragraphe {i} avec <b>gras</b>, <i>italique</i> &amp; entité.</p>"
+        "<ul><li>Élément A</li><li>Élément B</li></ul>"
+        "<table><tgroup cols='2'><tbody><row><entry>{i}</entry><entry/></row>"
+        "</tbody></tgroup></table></section>"
+    )
+    morceaux = ["<topic id='bench'><title>Benchmark</title><body>"]
+    courant = len(morceaux[0])
+    i = 0
+    while courant < taille:
+        morceau = bloc.format(i=i)
+        morceaux.append(morceau)
+        courant += len(morceau.encode("utf-8"))
+        i += 1
+    morceaux.append("</body></topic>")
+    return "".join(morceaux)
+
+
+def _mesurer(fonction, xml: str, repetitions: int) -> tuple[str, float, int]:
+    """Retourne (hash, meilleur temps en s, pic mémoire en octets)."""
+    meilleur = float("inf")
+    resultat = ""
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        resultat = fonction(xml)
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    tracemalloc.start()
+    fonction(xml)
+    _, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultat, meilleur, pic
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare le hash XML en flux et l'implémentation historique (arbre + "
+        "re-sérialisation) : débit, pic mémoire et identité des hashes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="10KB,1MB,20MB",
+            help="Tailles de topics à mesurer, séparées par des virgules (défaut : 10KB,1MB,20MB).",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Nombre de mesures par taille, le meilleur temps est retenu (défaut : 3).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            tailles = [_parse_taille(t) for t in options["sizes"].split(",") if t.strip()]
+        except ValueError as err:
+            raise CommandError(f"Tailles invalides : {options['sizes']}") from err
+        repetitions = max(1, options["repeat"])
+
+        self.stdout.write(
+            f"{'taille':>10} | {'méthode':<8} | {'temps (ms)':>10} | {'débit (MB/s)':>12} | {'pic mémoire (KB)':>16}"
+        )
+        for taille in tailles:
+            xml = generer_topic(taille)
+            octets = len(xml.encode("utf-8"))
+            hashes = set()
+            for nom, fonction in (
+                ("arbre", lambda x: _compute_xml_hash_arbre(x.strip())),
+                ("flux", compute_xml_hash),
+            ):
+                resultat, duree, pic = _mesurer(fonction, xml, repetitions)
+                hashes.add(resultat)
+                debit = octets / (1024 * 1024) / duree if duree else float("inf")
+                self.stdout.write(
+                    f"{octets:>10} | {nom:<8} | {duree * 1000:>10.2f} | {debit:>12.1f} | {pic / 1024:>16.0f}"
+                )
+            if len(hashes) != 1:
+                raise CommandError(f"Hashes divergents pour {octets} octets : {sorted(hashes)}")
+
+        self.stdout.write(self.style.SUCCESS("\n✅ Hashes identiques pour toutes les tailles."))
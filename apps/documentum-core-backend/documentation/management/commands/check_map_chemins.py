@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from documentation.models import Map
+from documentation.services import verifier_chemins_map
+
+
+class Command(BaseCommand):
+    help = (
+        "Vérifie l'index de chemin de la structure des maps (MapRubrique.chemin, "
+        "profondeur) contre les pointeurs parent et, avec --fix, le reconstruit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--map", type=int, help="Limite la vérification à une map (id).")
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Réécrit le chemin et la profondeur des nœuds incohérents.",
+        )
+
+    def handle(self, *args, **options):
+        maps = Map.objects.order_by("pk")
+        if options["map"] is not None:
+            maps = maps.filter(pk=options["map"])
+
+        incoherents = hors_arbre = 0
+        for map_id in maps.values_list("pk", flat=True).iterator():
+            resultat = verifier_chemins_map(map_id, corriger=options["fix"])
+            if resultat["incoherents"]:
+                self.stdout.write(
+                    f"- Map {map_id} : {len(resultat['incoherents'])} chemin(s) incohérent(s)"
+                )
+            if resultat["hors_arbre"]:
+                self.stdout.write(
+                    f"- Map {map_id} : nœud(s) inaccessible(s) depuis une racine "
+                    f"(cycle ?) : {resultat['hors_arbre']}"
+                )
+            incoherents += len(resultat["incoherents"])
+            hors_arbre += len(resultat["hors_arbre"])
+
+        if hors_arbre:
+            self.stdout.write(
+                self.style.WARNING(f"\n⚠ {hors_arbre} nœud(s) hors arbre, à corriger à la main.")
+            )
+        if not incoherents:
+            self.stdout.write(self.style.SUCCESS("\n✅ Index de chemin cohérent avec les pointeurs parent."))
+        elif options["fix"]:
+            self.stdout.write(self.style.SUCCESS(f"\n✅ {incoherents} chemin(s) reconstruit(s)."))
+        else:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"\n⚠ {incoherents} chemin(s) incohérent(s). Relancer avec --fix pour reconstruire."
+                )
+            )
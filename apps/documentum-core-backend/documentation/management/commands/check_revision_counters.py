@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from documentation.models import RevisionRubrique, Rubrique
+
+
+def _rubriques_incoherentes():
+    """Rubriques dont le compteur diffère du dernier numéro de révision réel."""
+    dernier = (
+        RevisionRubrique.objects.filter(rubrique=OuterRef("pk"))
+        .values("rubrique")
+        .annotate(m=Max("numero"))
+        .values("m")
+    )
+    return (
+        Rubrique.objects.annotate(numero_reel=Coalesce(Subquery(dernier), Value(0)))
+        .exclude(revision_courante_numero=F("numero_reel"))
+        .order_by("pk")
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Vérifie Rubrique.revision_courante_numero contre la table des révisions "
+        "et, avec --fix, corrige les compteurs incohérents."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Réaligne les compteurs incohérents sur le dernier numéro de révision.",
+        )
+
+    def handle(self, *args, **options):
+        incoherentes = list(
+            _rubriques_incoherentes().values_list("pk", "revision_courante_numero", "numero_reel")
+        )
+        for pk, compteur, reel in incoherentes:
+            self.stdout.write(f"- Rubrique {pk} : compteur={compteur}, dernière révision={reel}")
+
+        if not incoherentes:
+            self.stdout.write(self.style.SUCCESS("\n✅ Tous les compteurs de révision sont cohérents."))
+            return
+
+        if not options["fix"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"\n⚠ {len(incoherentes)} compteur(s) incohérent(s). Relancer avec --fix pour corriger."
+                )
+            )
+            return
+
+        with transaction.atomic():
+            # Recalcul sous verrou : une révision créée entre-temps est prise en compte.
+            ids = [pk for pk, _, _ in incoherentes]
+            list(Rubrique.objects.select_for_update().filter(pk__in=ids).values_list("pk", flat=True))
+            corrigees = 0
+            for pk, reel in _rubriques_incoherentes().filter(pk__in=ids).values_list("pk", "numero_reel"):
+                corrigees += Rubrique.objects.filter(pk=pk).update(revision_courante_numero=reel)
+
+        self.stdout.write(self.style.SUCCESS(f"\n✅ {corrigees} compteur(s) de révision corrigé(s)."))
@@ -0,0 +1,118 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from documentation import revision_storage
+from documentation.models import BlobXml, RevisionRubrique
+from documentation.services import obtenir_blob
+
+
+def _octets_stockes(revision) -> int:
+    """Place occupée par le contenu d'une révision dans sa forme de stockage historique."""
+    if revision.stockage == revision_storage.STOCKAGE_BRUT:
+        return len((revision.contenu_xml_brut or "").encode("utf-8"))
+    return len(revision.donnees or b"")
+
+
+class Command(BaseCommand):
+    help = (
+        "Transfère l'historique des révisions (stockage en ligne : brut, keyframe, delta) "
+        "vers le stockage de blobs partagés adressés par hash, et rapporte l'espace récupéré."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rubrique", type=int, help="Limiter la conversion à une rubrique."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Nombre de rubriques converties par transaction (défaut : 100).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Calcule l'espace récupérable sans rien écrire.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+
+        # Seules les rubriques possédant encore des révisions hors blob sont concernées.
+        rubrique_ids = RevisionRubrique.objects.exclude(
+            stockage=revision_storage.STOCKAGE_BLOB
+        )
+        if options["rubrique"]:
+            rubrique_ids = rubrique_ids.filter(rubrique_id=options["rubrique"])
+        rubrique_ids = sorted(set(rubrique_ids.values_list("rubrique_id", flat=True)))
+
+        total_avant = total_apres = nb_revisions = 0
+        batch_size = max(1, options["batch_size"])
+
+        for i in range(0, len(rubrique_ids), batch_size):
+            lot = rubrique_ids[i:i + batch_size]
+            with transaction.atomic():
+                for rubrique_id in lot:
+                    avant, apres, nb = self._convertir_rubrique(rubrique_id)
+                    total_avant += avant
+                    total_apres += apres
+                    nb_revisions += nb
+                if dry_run:
+                    transaction.set_rollback(True)
+            self.stdout.write(
+                f"- {min(i + batch_size, len(rubrique_ids))}/{len(rubrique_ids)} rubriques traitées"
+            )
+
+        recupere = total_avant - total_apres
+        ratio = (recupere / total_avant * 100) if total_avant else 0.0
+        prefixe = "[dry-run] " if dry_run else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n✅ {prefixe}{nb_revisions} révision(s) sur {len(rubrique_ids)} rubrique(s) : "
+                f"{total_avant} → {total_apres} octets, {recupere} octets récupérés ({ratio:.1f} %)."
+            )
+        )
+
+    def _convertir_rubrique(self, rubrique_id: int) -> tuple[int, int, int]:
+        """
+        Transfère les révisions hors blob d'une rubrique, dans l'ordre des numéros.
+        Un contenu déjà connu réutilise le blob existant (aucun octet ajouté).
+        Le texte du blob est comparé au texte de la révision : en cas d'écart,
+        la révision reste dans sa forme actuelle.
+        """
+        # of=("self",) : PostgreSQL interdit FOR UPDATE sur le LEFT JOIN vers base.
+        revisions = list(
+            RevisionRubrique.objects.select_for_update(of=("self",))
+            .filter(rubrique_id=rubrique_id)
+            .exclude(stockage=revision_storage.STOCKAGE_BLOB)
+            .select_related("base")
+            .order_by("numero")
+        )
+        # Textes lus avant toute réécriture (les keyframes historiques vont être vidées).
+        textes = {r.pk: r.contenu_xml for r in revisions}
+
+        avant = apres = 0
+        for revision in revisions:
+            texte = textes[revision.pk]
+            avant += _octets_stockes(revision)
+
+            blob, cree = obtenir_blob(xml=texte, rubrique_id=rubrique_id, numero=revision.numero)
+            if blob.contenu_xml != texte:
+                self.stderr.write(
+                    f"⚠ Révision {revision.pk} : reconstruction divergente, conservée en l'état."
+                )
+                BlobXml.objects.filter(pk=blob.pk).update(nb_references=F("nb_references") - 1)
+                apres += _octets_stockes(revision)
+                continue
+
+            if cree:
+                apres += len(blob.donnees)
+            RevisionRubrique.objects.filter(pk=revision.pk).update(
+                stockage=revision_storage.STOCKAGE_BLOB,
+                blob=blob,
+                donnees=None,
+                base=None,
+                contenu_xml_brut="",
+                taille=len(texte.encode("utf-8")),
+            )
+        return avant, apres, len(revisions)
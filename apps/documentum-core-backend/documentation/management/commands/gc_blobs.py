@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from documentation.models import BlobXml, RevisionRubrique
+
+
+def _recompter_references() -> int:
+    """Recalcule nb_references depuis les révisions (dérive après suppressions en cascade)."""
+    nb = (
+        RevisionRubrique.objects.filter(blob=OuterRef("pk"))
+        .values("blob")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    return BlobXml.objects.update(nb_references=Coalesce(Subquery(nb), Value(0)))
+
+
+def _collectables():
+    """Blobs sans référence, ni révision pointant dessus, ni delta basé dessus."""
+    return BlobXml.objects.filter(nb_references=0).exclude(
+        Exists(RevisionRubrique.objects.filter(blob=OuterRef("pk")))
+    ).exclude(
+        Exists(BlobXml.objects.filter(base=OuterRef("pk")))
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Supprime les blobs XML qui ne sont plus référencés par aucune révision "
+        "(ni utilisés comme base d'un delta) et rapporte l'espace libéré."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--recount",
+            action="store_true",
+            help="Recalcule d'abord les compteurs de références depuis les révisions.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Liste les blobs collectables sans rien supprimer.",
+        )
+
+    def handle(self, *args, **options):
+        if options["recount"] and not options["dry_run"]:
+            self.stdout.write(f"- {_recompter_references()} compteur(s) recalculé(s)")
+
+        nb_supprimes = octets = 0
+        with transaction.atomic():
+            # Un delta supprimé peut libérer sa keyframe : on boucle jusqu'au point fixe
+            # (au plus deux passes, un delta ne repose jamais sur un autre delta).
+            while True:
+                # skip_locked : un blob en cours de réutilisation (obtenir_blob) est ignoré.
+                lot = list(
+                    _collectables()
+                    .select_for_update(skip_locked=True)
+                    .values_list("pk", "taille")
+                )
+                if not lot or options["dry_run"]:
+                    break
+                BlobXml.objects.filter(pk__in=[pk for pk, _ in lot]).delete()
+                nb_supprimes += len(lot)
+                octets += sum(taille for _, taille in lot)
+
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"\n✅ [dry-run] {len(lot)} blob(s) collectable(s), "
+                    f"{sum(taille for _, taille in lot)} octets de contenu."
+                )
+            )
+            return
+        self.stdout.write(
+            self.style.SUCCESS(f"\n✅ {nb_supprimes} blob(s) supprimé(s), {octets} octets de contenu libérés.")
+        )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+from documentation.artefacts import artefacts_archives, supprimer_artefacts
+
+
+class Command(BaseCommand):
+    help = (
+        "Supprime du magasin les artefacts de publication des versions archivées "
+        "(artefacts qu'aucune publication d'une version active ne référence). "
+        "Un artefact orphelin n'est supprimé qu'après PUBLICATION_ARTEFACT_GRACE_SECONDS "
+        "(export en cours). Un fichier partagé avec un artefact conservé n'est pas supprimé."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Affiche les artefacts supprimables sans rien supprimer.",
+        )
+
+    def handle(self, *args, **options):
+        candidats = artefacts_archives()
+        if options["dry_run"]:
+            nb = candidats.count()
+            octets = candidats.aggregate(total=Sum("taille"))["total"] or 0
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"\n✅ [dry-run] {nb} artefact(s) supprimable(s), {octets} octets au plus."
+                )
+            )
+            return
+
+        nb, octets = supprimer_artefacts(candidats)
+        self.stdout.write(
+            self.style.SUCCESS(f"\n✅ {nb} artefact(s) supprimé(s), {octets} octets libérés.")
+        )
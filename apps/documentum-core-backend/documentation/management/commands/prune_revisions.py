@@ -0,0 +1,102 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.timezone import now
+from documentation.models import PointDeReprise
+from documentation.services import (
+    get_revision_retention_days,
+    purger_lot_revisions,
+    statistiques_retention,
+)
+
+NOM_REPRISE = "prune_revisions"
+
+
+class Command(BaseCommand):
+    help = (
+        "Purge les révisions intermédiaires plus anciennes que la fenêtre de rétention. "
+        "Les révisions publiées (PublicationSnapshot), courantes et brouillons sont "
+        "toujours conservées. Traitement par lots, reprenable après interruption."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Fenêtre de rétention en jours (défaut : settings.REVISION_RETENTION_DAYS).",
+        )
+        parser.add_argument(
+            "--keep-daily",
+            action="store_true",
+            help="Compacte au lieu de purger : conserve la dernière révision de chaque jour.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Nombre de révisions examinées par transaction (défaut : 1000).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Affiche les statistiques de la politique sans rien supprimer.",
+        )
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Ignore le point de reprise d'une exécution interrompue.",
+        )
+
+    def handle(self, *args, **options):
+        jours = options["days"] if options["days"] is not None else get_revision_retention_days()
+        if jours < 0:
+            raise CommandError("--days doit être positif.")
+        avant = now() - timedelta(days=jours)
+        garder_quotidienne = options["keep_daily"]
+
+        stats = statistiques_retention(avant=avant, garder_quotidienne=garder_quotidienne)
+        self.stdout.write(
+            f"Révisions de plus de {jours} jour(s) : {stats['examinees']}\n"
+            f"- protégées (publiées)     : {stats['publiees']}\n"
+            f"- protégées (courantes)    : {stats['courantes']}\n"
+            f"- protégées (brouillons)   : {stats['brouillons']}\n"
+            f"- protégées (bases delta)  : {stats['bases_delta']}\n"
+            f"- supprimables             : {stats['purgeables']} ({stats['octets_purgeables']} octets)"
+        )
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS("\n✅ [dry-run] Aucune révision supprimée."))
+            return
+
+        if options["reset"]:
+            PointDeReprise.objects.filter(nom=NOM_REPRISE).delete()
+        reprise, _ = PointDeReprise.objects.get_or_create(nom=NOM_REPRISE)
+        if reprise.dernier_id:
+            self.stdout.write(f"Reprise après la révision {reprise.dernier_id}.")
+
+        batch_size = max(1, options["batch_size"])
+        total = octets = 0
+        while True:
+            with transaction.atomic():
+                lot = purger_lot_revisions(
+                    avant=avant,
+                    garder_quotidienne=garder_quotidienne,
+                    apres_id=reprise.dernier_id,
+                    taille_lot=batch_size,
+                )
+                if lot["dernier_id"] is None:
+                    break
+                # Point de reprise enregistré dans la transaction du lot.
+                reprise.dernier_id = lot["dernier_id"]
+                reprise.save(update_fields=["dernier_id", "date_mise_a_jour"])
+            total += lot["supprimees"]
+            octets += lot["octets"]
+            self.stdout.write(f"- {total} révision(s) supprimée(s) (jusqu'à l'id {reprise.dernier_id})")
+
+        reprise.delete()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n✅ {total} révision(s) supprimée(s), {octets} octets libérés. "
+                "Lancer gc_blobs pour collecter les blobs devenus orphelins."
+            )
+        )
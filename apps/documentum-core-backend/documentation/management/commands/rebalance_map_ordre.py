@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import Lag
+from documentation.models import Map, MapRubrique
+from documentation.services import _reequilibrer_niveau
+
+
+def _niveaux_epuises(map_id=None) -> list[tuple[int, int | None]]:
+    """
+    (map_id, parent_id) des niveaux où deux frères consécutifs ont des clés
+    d'ordre sans écart (égales ou contiguës, ex. numérotation historique 1, 2, 3…) :
+    une insertion entre eux forcerait un rééquilibrage en ligne.
+    """
+    lignes = MapRubrique.objects.all()
+    if map_id is not None:
+        lignes = lignes.filter(map_id=map_id)
+    ecarts = lignes.annotate(
+        precedent=Window(
+            Lag("ordre"),
+            partition_by=[F("map_id"), F("parent_id")],
+            order_by=[F("ordre").asc(), F("id").asc()],
+        )
+    ).values_list("map_id", "parent_id", "ordre", "precedent")
+    niveaux = set()
+    for map_pk, parent_id, ordre, precedent in ecarts.iterator(chunk_size=5000):
+        if precedent is not None and ordre - precedent < 2:
+            niveaux.add((map_pk, parent_id))
+    return sorted(niveaux, key=lambda n: (n[0], n[1] or 0))
+
+
+class Command(BaseCommand):
+    help = (
+        "Renumérote avec des clés espacées les niveaux de structure des maps dont "
+        "l'écart entre frères est épuisé (clés égales ou contiguës). "
+        "Les insertions et déplacements suivants n'écrivent plus qu'une ligne."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--map", type=int, help="Limite le traitement à une map (id).")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Affiche les niveaux à rééquilibrer sans rien modifier.",
+        )
+
+    def handle(self, *args, **options):
+        niveaux = _niveaux_epuises(options["map"])
+        if options["dry_run"]:
+            for map_id, parent_id in niveaux:
+                self.stdout.write(f"  map {map_id}, parent {parent_id}")
+            self.stdout.write(
+                self.style.SUCCESS(f"\n✅ [dry-run] {len(niveaux)} niveau(x) à rééquilibrer.")
+            )
+            return
+
+        lignes = 0
+        for map_id, parent_id in niveaux:
+            with transaction.atomic():
+                # Même verrou que les services de structure : pas d'écriture concurrente.
+                Map.objects.select_for_update().filter(pk=map_id).first()
+                lignes += _reequilibrer_niveau(map_id, parent_id)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n✅ {len(niveaux)} niveau(x) rééquilibré(s), {lignes} ligne(s) écrite(s)."
+            )
+        )
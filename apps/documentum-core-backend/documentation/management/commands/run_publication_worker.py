@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+from documentation.services import executer_tache_publication, prendre_tache_publication
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker local des publications : exécute l'export DITA des tâches de "
+        "publication en attente (POST /api/publier-map/), une à la fois."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Traite les tâches en attente puis s'arrête (cron, tests).",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Délai en secondes entre deux consultations de la file vide (défaut : 5).",
+        )
+
+    def handle(self, *args, **options):
+        traitees = 0
+        try:
+            while True:
+                tache = prendre_tache_publication()
+                if tache is None:
+                    if options["once"]:
+                        break
+                    time.sleep(max(0.1, options["interval"]))
+                    continue
+                self.stdout.write(f"- Tâche {tache.pk} : export map {tache.map_id} ({tache.format})…")
+                tache = executer_tache_publication(tache)
+                self.stdout.write(f"  → {tache.statut}")
+                traitees += 1
+        except KeyboardInterrupt:
+            self.stdout.write("\nArrêt demandé.")
+
+        self.stdout.write(self.style.SUCCESS(f"\n✅ {traitees} tâche(s) de publication traitée(s)."))
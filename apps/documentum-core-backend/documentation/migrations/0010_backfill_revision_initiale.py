@@ -12,6 +12,9 @@
 #
 # Reverse : noop — on ne peut pas supprimer proprement les révisions backfillées
 # sans risquer de supprimer des révisions créées après coup.
+#
+# Sur gros volume, préférer la commande reprenable et parallèle :
+#   manage.py backfill_hashes revisions-initiales
 
 import hashlib
 import xml.etree.ElementTree as ET
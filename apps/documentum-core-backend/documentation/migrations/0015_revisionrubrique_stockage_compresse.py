@@ -0,0 +1,86 @@
+# Generated by Django 5.2.4 — Stockage compressé des révisions (keyframes + deltas)
+#
+# - contenu_xml devient une propriété calculée sur RevisionRubrique ; le champ texte
+#   est renommé contenu_xml_brut côté état Django, la colonne SQL "contenu_xml"
+#   est conservée telle quelle (aucune réécriture de table).
+# - Les révisions existantes restent en stockage "brut" ; la conversion est faite
+#   hors migration par la commande compress_revisions (volumétrie).
+# - taille est backfillée par lots (octets UTF-8 du texte en clair).
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_taille(apps, schema_editor):
+    RevisionRubrique = apps.get_model("documentation", "RevisionRubrique")
+    lot = []
+    for revision in RevisionRubrique.objects.only("id", "contenu_xml_brut").iterator(
+        chunk_size=1000
+    ):
+        revision.taille = len((revision.contenu_xml_brut or "").encode("utf-8"))
+        lot.append(revision)
+        if len(lot) >= 1000:
+            RevisionRubrique.objects.bulk_update(lot, ["taille"])
+            lot = []
+    if lot:
+        RevisionRubrique.objects.bulk_update(lot, ["taille"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documentation", "0014_impactdocumentaire_notes"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RenameField(
+                    model_name="revisionrubrique",
+                    old_name="contenu_xml",
+                    new_name="contenu_xml_brut",
+                ),
+                migrations.AlterField(
+                    model_name="revisionrubrique",
+                    name="contenu_xml_brut",
+                    field=models.TextField(blank=True, db_column="contenu_xml", default=""),
+                ),
+            ],
+            database_operations=[],
+        ),
+        migrations.AddField(
+            model_name="revisionrubrique",
+            name="stockage",
+            field=models.CharField(
+                choices=[
+                    ("brut", "Texte brut"),
+                    ("keyframe", "Keyframe compressée"),
+                    ("delta", "Delta compressé"),
+                ],
+                default="brut",
+                max_length=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="revisionrubrique",
+            name="donnees",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="revisionrubrique",
+            name="base",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="deltas",
+                to="documentation.revisionrubrique",
+            ),
+        ),
+        migrations.AddField(
+            model_name="revisionrubrique",
+            name="taille",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_taille, reverse_code=migrations.RunPython.noop),
+    ]
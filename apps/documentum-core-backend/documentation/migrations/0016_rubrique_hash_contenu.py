@@ -0,0 +1,54 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:51
+#
+# Ajoute Rubrique.hash_contenu (hash canonique du contenu de travail) et le
+# backfille par lots. Le calcul est dupliqué depuis utils.compute_xml_hash pour
+# l'isolation de la migration (cf. 0010).
+#
+# Reverse : suppression du champ (automatique) — aucune donnée métier perdue.
+
+import hashlib
+import xml.etree.ElementTree as ET
+
+from django.db import migrations, models
+
+
+def _compute_xml_hash(xml_str):
+    """Identique à utils.compute_xml_hash — inline pour isolation de migration."""
+    stripped = (xml_str or "").strip()
+    if not stripped:
+        return hashlib.sha256(b"").hexdigest()
+    try:
+        root = ET.fromstring(stripped)
+        normalized = ET.tostring(root, encoding="unicode")
+    except ET.ParseError:
+        normalized = stripped
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def backfill_hash_contenu(apps, schema_editor):
+    Rubrique = apps.get_model("documentation", "Rubrique")
+    lot = []
+    for rubrique in Rubrique.objects.only("id", "contenu_xml").iterator(chunk_size=500):
+        rubrique.hash_contenu = _compute_xml_hash(rubrique.contenu_xml)
+        lot.append(rubrique)
+        if len(lot) >= 500:
+            Rubrique.objects.bulk_update(lot, ["hash_contenu"])
+            lot = []
+    if lot:
+        Rubrique.objects.bulk_update(lot, ["hash_contenu"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documentation", "0015_revisionrubrique_stockage_compresse"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="rubrique",
+            name="hash_contenu",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.RunPython(backfill_hash_contenu, reverse_code=migrations.RunPython.noop),
+    ]
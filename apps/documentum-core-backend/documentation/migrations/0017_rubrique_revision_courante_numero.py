@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:57
+#
+# Ajoute Rubrique.revision_courante_numero (compteur dénormalisé du dernier
+# RevisionRubrique.numero) et le backfille en une requête UPDATE ... SUBQUERY.
+#
+# Reverse : suppression du champ (automatique) — recalculable à tout moment
+# par la commande check_revision_counters --fix.
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_revision_courante_numero(apps, schema_editor):
+    Rubrique = apps.get_model("documentation", "Rubrique")
+    RevisionRubrique = apps.get_model("documentation", "RevisionRubrique")
+    dernier = (
+        RevisionRubrique.objects.filter(rubrique=OuterRef("pk"))
+        .values("rubrique")
+        .annotate(m=Max("numero"))
+        .values("m")
+    )
+    Rubrique.objects.update(
+        revision_courante_numero=Coalesce(Subquery(dernier), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documentation", "0016_rubrique_hash_contenu"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="rubrique",
+            name="revision_courante_numero",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(
+            backfill_revision_courante_numero, reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:06
+#
+# Stockage de contenu adressé par hash (BlobXml) partagé par les révisions.
+# Les révisions existantes gardent leur stockage en ligne (brut / keyframe / delta) ;
+# leur transfert vers les blobs est fait hors migration par compress_revisions.
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documentation', '0017_rubrique_revision_courante_numero'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='revisionrubrique',
+            name='stockage',
+            field=models.CharField(choices=[('brut', 'Texte brut'), ('keyframe', 'Keyframe compressée'), ('delta', 'Delta compressé'), ('blob', 'Blob partagé')], default='brut', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='BlobXml',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash_contenu', models.CharField(max_length=64, unique=True)),
+                ('stockage', models.CharField(choices=[('keyframe', 'Keyframe compressée'), ('delta', 'Delta compressé')], default='keyframe', max_length=10)),
+                ('donnees', models.BinaryField()),
+                ('taille', models.PositiveIntegerField(default=0)),
+                ('nb_references', models.PositiveIntegerField(default=0)),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+                ('base', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='deltas', to='documentation.blobxml')),
+            ],
+            options={
+                'verbose_name': 'Blob XML',
+                'verbose_name_plural': 'Blobs XML',
+            },
+        ),
+        migrations.AddField(
+            model_name='revisionrubrique',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='revisions', to='documentation.blobxml'),
+        ),
+        migrations.AddIndex(
+            model_name='blobxml',
+            index=models.Index(fields=['nb_references'], name='documentati_nb_refe_6a27c1_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:08
+#
+# Fenêtre de regroupement des autosaves : révision brouillon mise à jour en place.
+# Les révisions existantes sont scellées (brouillon=False) ; date_mise_a_jour
+# reprend leur date de création.
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_date_mise_a_jour(apps, schema_editor):
+    RevisionRubrique = apps.get_model("documentation", "RevisionRubrique")
+    RevisionRubrique.objects.update(date_mise_a_jour=F("date_creation"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documentation', '0018_blobxml'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='revisionrubrique',
+            name='brouillon',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='revisionrubrique',
+            name='date_mise_a_jour',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_date_mise_a_jour, reverse_code=migrations.RunPython.noop),
+    ]
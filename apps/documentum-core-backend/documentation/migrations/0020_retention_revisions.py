@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:12
+#
+# Rétention de l'historique des révisions :
+# - PointDeReprise : dernier pk traité par un traitement par lots (reprise).
+# - PublicationSnapshot.revision passe en RESTRICT : une révision publiée ne
+#   peut plus être supprimée isolément.
+#
+# Reverse : automatique (suppression de la table, retour à CASCADE).
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documentation', '0019_revisionrubrique_brouillon'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointDeReprise',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom', models.CharField(max_length=100, unique=True)),
+                ('dernier_id', models.BigIntegerField(default=0)),
+                ('date_mise_a_jour', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Point de reprise',
+                'verbose_name_plural': 'Points de reprise',
+            },
+        ),
+        migrations.AlterField(
+            model_name='publicationsnapshot',
+            name='revision',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='publication_snapshots', to='documentation.revisionrubrique'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:22
+#
+# Ajoute TachePublication : phase d'export d'une publication, exécutée par le
+# worker (run_publication_worker) hors requête HTTP.
+#
+# Reverse : suppression de la table (automatique).
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documentation', '0020_retention_revisions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TachePublication',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('format', models.CharField(max_length=20)),
+                ('statut', models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', 'En cours'), ('terminee', 'Terminée'), ('echec', 'Échec')], default='en_attente', max_length=20)),
+                ('progression', models.PositiveSmallIntegerField(default=0)),
+                ('journal', models.TextField(blank=True, default='')),
+                ('resultat', models.JSONField(blank=True, default=dict)),
+                ('tentatives', models.PositiveSmallIntegerField(default=0)),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+                ('date_debut', models.DateTimeField(blank=True, null=True)),
+                ('date_fin', models.DateTimeField(blank=True, null=True)),
+                ('date_mise_a_jour', models.DateTimeField(auto_now=True)),
+                ('auteur', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('map', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='taches_publication', to='documentation.map')),
+                ('projet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='taches_publication', to='documentation.projet')),
+                ('version_projet', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='taches_publication', to='documentation.versionprojet')),
+            ],
+            options={
+                'verbose_name': 'Tâche de publication',
+                'verbose_name_plural': 'Tâches de publication',
+                'indexes': [models.Index(fields=['statut', 'date_creation'], name='documentati_statut_5badca_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:29
+#
+# Index (map, rubrique) sur MapRubrique : semi-jointure de résolution des
+# révisions courantes d'une map (_build_rubrique_revision_map).
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documentation', '0021_taches_publication'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='maprubrique',
+            index=models.Index(fields=['map', 'rubrique'], name='documentati_map_id_8f1360_idx'),
+        ),
+    ]
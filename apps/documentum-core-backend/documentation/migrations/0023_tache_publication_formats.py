@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:47
+#
+# Ajoute TachePublication.formats : publication multi-format (rendus parallèles
+# d'une même préparation). Liste vide pour les tâches existantes (format seul).
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documentation', '0022_maprubrique_index_map_rubrique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tachepublication',
+            name='formats',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:51
+#
+# Registre des publications (Publication) et pointeur Projet.derniere_publication :
+# la dernière version publiée se lit par clé primaire.
+#
+# Backfill : une Publication par VersionProjet déjà publiée (figée, avec
+# snapshots), dans l'ordre chronologique (date_lancement) ; le pointeur de
+# chaque projet désigne la plus récente. Formats et artefacts des publications
+# historiques sont inconnus (laissés vides).
+#
+# Reverse : noop pour le backfill ; tables et colonne supprimées par le schéma.
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F
+
+
+def backfill_registre(apps, schema_editor):
+    Projet = apps.get_model("documentation", "Projet")
+    Publication = apps.get_model("documentation", "Publication")
+    VersionProjet = apps.get_model("documentation", "VersionProjet")
+
+    versions = (
+        VersionProjet.objects.filter(is_active=False)
+        .annotate(nb=Count("publication_snapshots"))
+        .filter(nb__gt=0)
+        .order_by(F("date_lancement").asc(nulls_first=True), "pk")
+    )
+    derniere = {}
+    for version in versions.iterator():
+        publication = Publication.objects.create(
+            projet_id=version.projet_id,
+            version_projet=version,
+            nb_snapshots=version.nb,
+            date_publication=version.date_lancement or django.utils.timezone.now(),
+        )
+        derniere[version.projet_id] = publication.pk
+    for projet_id, publication_id in derniere.items():
+        Projet.objects.filter(pk=projet_id).update(derniere_publication_id=publication_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documentation', '0023_tache_publication_formats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Publication',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nouvelle_version', models.BooleanField(default=True)),
+                ('nb_snapshots', models.PositiveIntegerField(default=0)),
+                ('formats', models.JSONField(blank=True, default=list)),
+                ('artefacts', models.JSONField(blank=True, default=dict)),
+                ('date_publication', models.DateTimeField(default=django.utils.timezone.now)),
+                ('auteur', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('projet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='publications', to='documentation.projet')),
+                ('tache', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='publication', to='documentation.tachepublication')),
+                ('version_projet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='publications', to='documentation.versionprojet')),
+            ],
+            options={
+                'verbose_name': 'Publication',
+                'verbose_name_plural': 'Publications',
+            },
+        ),
+        migrations.AddField(
+            model_name='projet',
+            name='derniere_publication',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='documentation.publication'),
+        ),
+        migrations.AddIndex(
+            model_name='publication',
+            index=models.Index(fields=['projet', '-id'], name='documentati_projet__cf8298_idx'),
+        ),
+        migrations.RunPython(backfill_registre, migrations.RunPython.noop),
+    ]
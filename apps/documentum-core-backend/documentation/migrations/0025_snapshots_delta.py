@@ -0,0 +1,115 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:02
+#
+# Snapshots de publication stockés en delta sur la publication précédente.
+#
+# 1. VersionProjet.rang_publication : rang des versions publiées (figées, avec
+#    snapshots) de chaque projet, dans l'ordre chronologique (date_lancement).
+# 2. PublicationSnapshot.revision nullable : NULL = rubrique retirée.
+# 3. Conversion des ensembles complets en deltas, de la version la plus
+#    récente à la plus ancienne (la version précédente est encore complète
+#    quand on la compare) :
+#    - une ligne de retrait pour chaque rubrique de la précédente absente ;
+#    - suppression des lignes identiques (même rubrique, même révision).
+#
+# Reverse : ré-expansion en ensembles complets, de la plus ancienne à la plus
+# récente, puis retour au schéma initial.
+
+from itertools import pairwise
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Exists, F, OuterRef
+
+
+def _versions_publiees(apps):
+    """{projet_id: [VersionProjet publiées, dans l'ordre chronologique]}"""
+    PublicationSnapshot = apps.get_model("documentation", "PublicationSnapshot")
+    VersionProjet = apps.get_model("documentation", "VersionProjet")
+    versions = (
+        VersionProjet.objects.filter(
+            is_active=False,
+            pk__in=PublicationSnapshot.objects.values("version_projet_id"),
+        )
+        .order_by("projet_id", F("date_lancement").asc(nulls_first=True), "pk")
+    )
+    par_projet = {}
+    for version in versions:
+        par_projet.setdefault(version.projet_id, []).append(version)
+    return par_projet
+
+
+def convertir_en_deltas(apps, schema_editor):
+    PublicationSnapshot = apps.get_model("documentation", "PublicationSnapshot")
+    VersionProjet = apps.get_model("documentation", "VersionProjet")
+
+    for versions in _versions_publiees(apps).values():
+        for rang, version in enumerate(versions, start=1):
+            VersionProjet.objects.filter(pk=version.pk).update(rang_publication=rang)
+
+        for precedente, version in reversed(list(pairwise(versions))):
+            presentes = PublicationSnapshot.objects.filter(version_projet=version).values("rubrique_id")
+            retirees = (
+                PublicationSnapshot.objects.filter(version_projet=precedente)
+                .exclude(rubrique_id__in=presentes)
+                .values_list("rubrique_id", flat=True)
+            )
+            PublicationSnapshot.objects.bulk_create(
+                [
+                    PublicationSnapshot(version_projet=version, rubrique_id=rubrique_id, revision=None)
+                    for rubrique_id in retirees.iterator()
+                ],
+                batch_size=1000,
+            )
+            PublicationSnapshot.objects.filter(
+                Exists(
+                    PublicationSnapshot.objects.filter(
+                        version_projet=precedente,
+                        rubrique_id=OuterRef("rubrique_id"),
+                        revision_id=OuterRef("revision_id"),
+                    )
+                ),
+                version_projet=version,
+            ).delete()
+
+
+def reconstituer_ensembles(apps, schema_editor):
+    PublicationSnapshot = apps.get_model("documentation", "PublicationSnapshot")
+
+    for versions in _versions_publiees(apps).values():
+        versions.sort(key=lambda v: v.rang_publication or 0)
+        for precedente, version in pairwise(versions):
+            # La précédente est déjà complète : ses lignes non redéfinies sont héritées.
+            heritees = PublicationSnapshot.objects.filter(version_projet=precedente).exclude(
+                rubrique_id__in=PublicationSnapshot.objects.filter(version_projet=version).values("rubrique_id")
+            )
+            PublicationSnapshot.objects.bulk_create(
+                [
+                    PublicationSnapshot(
+                        version_projet=version, rubrique_id=s.rubrique_id, revision_id=s.revision_id
+                    )
+                    for s in heritees.iterator()
+                ],
+                batch_size=1000,
+            )
+            PublicationSnapshot.objects.filter(version_projet=version, revision__isnull=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documentation', '0024_registre_publications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='versionprojet',
+            name='rang_publication',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='publicationsnapshot',
+            name='revision',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='publication_snapshots', to='documentation.revisionrubrique'),
+        ),
+        migrations.RunPython(convertir_en_deltas, reconstituer_ensembles),
+    ]
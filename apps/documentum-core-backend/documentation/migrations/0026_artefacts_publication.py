@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:03
+#
+# Magasin d'artefacts de publication (ArtefactPublication), adressé par contenu,
+# et lien Publication.artefacts_stockes. Aucune donnée reprise : les rendus
+# historiques restent décrits par Publication.artefacts.
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documentation', '0025_snapshots_delta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtefactPublication',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash_ensemble', models.CharField(max_length=64)),
+                ('format', models.CharField(max_length=50)),
+                ('profil', models.CharField(default='defaut', max_length=100)),
+                ('empreinte', models.CharField(db_index=True, max_length=64)),
+                ('chemin', models.CharField(max_length=255)),
+                ('nom_fichier', models.CharField(max_length=255)),
+                ('type_mime', models.CharField(default='application/octet-stream', max_length=100)),
+                ('taille', models.BigIntegerField(default=0)),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Artefact de publication',
+                'verbose_name_plural': 'Artefacts de publication',
+                'unique_together': {('hash_ensemble', 'format', 'profil')},
+            },
+        ),
+        migrations.AddField(
+            model_name='publication',
+            name='artefacts_stockes',
+            field=models.ManyToManyField(blank=True, related_name='publications', to='documentation.artefactpublication'),
+        ),
+    ]
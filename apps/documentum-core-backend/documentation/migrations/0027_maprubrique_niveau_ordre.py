@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:16
+#
+# Index (map, parent, ordre) : lecture des voisins d'une insertion dans un
+# niveau (clés d'ordre espacées). Les niveaux numérotés 1, 2, 3… restent
+# valides ; rebalance_map_ordre les réespace à froid.
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documentation', '0026_artefacts_publication'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='maprubrique',
+            index=models.Index(fields=['map', 'parent', 'ordre'], name='maprubrique_niveau_ordre'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:25
+#
+# Index de chemin de la structure des maps : MapRubrique.chemin (ids des
+# ancêtres, "12/57/") et profondeur, calculés pour l'existant depuis les
+# pointeurs parent, map par map. Reverse : suppression des colonnes.
+
+from django.db import migrations, models
+
+
+def calculer_chemins(apps, schema_editor):
+    MapRubrique = apps.get_model("documentation", "MapRubrique")
+    map_ids = MapRubrique.objects.values_list("map_id", flat=True).distinct()
+    for map_id in map_ids.iterator():
+        enfants = {}
+        for pk, parent_id in MapRubrique.objects.filter(map_id=map_id).values_list("pk", "parent_id"):
+            enfants.setdefault(parent_id, []).append(pk)
+        modifies = []
+        pile = [(pk, "", 0) for pk in enfants.get(None, [])]
+        while pile:
+            pk, chemin, profondeur = pile.pop()
+            if profondeur:
+                modifies.append(MapRubrique(pk=pk, chemin=chemin, profondeur=profondeur))
+            pile.extend((e, f"{chemin}{pk}/", profondeur + 1) for e in enfants.get(pk, []))
+        MapRubrique.objects.bulk_update(modifies, ["chemin", "profondeur"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documentation', '0027_maprubrique_niveau_ordre'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='maprubrique',
+            name='chemin',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='maprubrique',
+            name='profondeur',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='maprubrique',
+            index=models.Index(fields=['chemin'], name='maprubrique_chemin', opclasses=['text_pattern_ops']),
+        ),
+        migrations.RunPython(calculer_chemins, migrations.RunPython.noop),
+    ]
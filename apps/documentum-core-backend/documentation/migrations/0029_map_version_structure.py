@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:35
+#
+# Map.version_structure : compteur monotone de la structure, ETag des vues
+# /structure/. Départ à 0 pour toutes les maps existantes.
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documentation', '0028_maprubrique_chemin'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='map',
+            name='version_structure',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
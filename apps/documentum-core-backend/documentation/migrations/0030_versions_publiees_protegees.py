@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:51
+#
+# Versions publiées protégées : PublicationSnapshot.version_projet et
+# Publication.version_projet passent en RESTRICT (deltas chaînés par
+# rang_publication). Aucune donnée modifiée.
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documentation', '0029_map_version_structure'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='publication',
+            name='version_projet',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='publications', to='documentation.versionprojet'),
+        ),
+        migrations.AlterField(
+            model_name='publicationsnapshot',
+            name='version_projet',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='publication_snapshots', to='documentation.versionprojet'),
+        ),
+    ]
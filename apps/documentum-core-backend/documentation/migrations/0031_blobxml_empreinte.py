@@ -0,0 +1,94 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:20
+#
+# BlobXml adressé par l'empreinte des octets exacts (SHA-256 du texte UTF-8)
+# au lieu du hash canonique : deux XML équivalents mais non identiques
+# (commentaires, DOCTYPE, guillemets…) ne partagent plus le même blob.
+#
+# - hash_contenu est renommé empreinte (même colonne, même contrainte unique).
+# - Les empreintes des blobs existants sont recalculées depuis leur texte
+#   reconstruit. Le décodage est dupliqué depuis revision_storage pour
+#   l'isolation de la migration (cf. 0016).
+#
+# Reverse : renommage inverse ; les valeurs restent des empreintes exactes
+# (toujours uniques), le hash canonique n'étant pas recalculable sans collision.
+
+import hashlib
+import json
+import re
+import zlib
+
+from django.db import migrations
+
+_JETONS_RE = re.compile(r"[^>]*>|[^>]+")
+_LOT = 500
+
+
+def _decode_keyframe(donnees):
+    return zlib.decompress(bytes(donnees)).decode("utf-8")
+
+
+def _decode_delta(base_xml, donnees):
+    """Identique à revision_storage.decode_delta — inline pour isolation de migration."""
+    base = _JETONS_RE.findall(base_xml or "")
+    morceaux = []
+    for op in json.loads(zlib.decompress(bytes(donnees)).decode("utf-8")):
+        if op[0] == 0:
+            morceaux.extend(base[op[1]:op[2]])
+        else:
+            morceaux.append(op[1])
+    return "".join(morceaux)
+
+
+def _empreinte(texte):
+    return hashlib.sha256((texte or "").encode()).hexdigest()
+
+
+def recalculer_empreintes(apps, schema_editor):
+    BlobXml = apps.get_model("documentation", "BlobXml")
+    lot = []
+
+    def _ajouter(blob, texte):
+        empreinte = _empreinte(texte)
+        if blob.empreinte != empreinte:
+            blob.empreinte = empreinte
+            lot.append(blob)
+        if len(lot) >= _LOT:
+            BlobXml.objects.bulk_update(lot, ["empreinte"])
+            lot.clear()
+
+    for blob in BlobXml.objects.filter(base__isnull=True).only("id", "empreinte", "donnees").iterator(
+        chunk_size=_LOT
+    ):
+        _ajouter(blob, _decode_keyframe(blob.donnees))
+
+    # Deltas triés par base : le texte de la keyframe n'est décodé qu'une fois.
+    base_id = base_xml = None
+    deltas = (
+        BlobXml.objects.filter(base__isnull=False)
+        .only("id", "empreinte", "donnees", "base_id")
+        .order_by("base_id", "id")
+    )
+    for blob in deltas.iterator(chunk_size=_LOT):
+        if blob.base_id != base_id:
+            base_id = blob.base_id
+            base_xml = _decode_keyframe(BlobXml.objects.only("donnees").get(pk=base_id).donnees)
+        _ajouter(blob, _decode_delta(base_xml, blob.donnees))
+
+    if lot:
+        BlobXml.objects.bulk_update(lot, ["empreinte"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documentation', '0030_versions_publiees_protegees'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='blobxml',
+            old_name='hash_contenu',
+            new_name='empreinte',
+        ),
+        migrations.RunPython(recalculer_empreintes, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from documentation.constants.publication import TYPE_SORTIE_CHOICES
+from documentation import revision_storage
 import xml.etree.ElementTree as ET
 from django.utils.timezone import now
 
@@ -91,6 +92,14 @@ class Projet(models.Model):
     # DÉPRÉCIÉ — doublon de VersionProjet.notes_version. À supprimer dans un lot ultérieur.
     notes_version = models.TextField(blank=True, null=True)
     gamme = models.ForeignKey(Gamme, on_delete=models.SET_NULL, null=True)
+    # Dernier événement du registre des publications (lecture par clé primaire).
+    derniere_publication = models.ForeignKey(
+        "Publication",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
 
     def get_detailed_info(self):
         version = (
@@ -113,6 +122,9 @@ class VersionProjet(models.Model):
     notes_version = models.TextField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
     is_archived = models.BooleanField(default=False)
+    # Ordre de publication dans le projet (1, 2, …), attribué au gel de la
+    # version : les snapshots d'une version sont des deltas sur la précédente.
+    rang_publication = models.PositiveIntegerField(null=True, blank=True)
 
     def __str__(self):
         return f"{self.projet.nom} - v{self.version_numero}"
@@ -135,6 +147,14 @@ class Rubrique(models.Model):
     titre = models.CharField(max_length=200)
     # État de travail courant (WIP). Les snapshots immuables sont dans RevisionRubrique.
     contenu_xml = models.TextField()
+    # Hash canonique (utils.compute_xml_hash) de contenu_xml — maintenu par save().
+    # Évite de re-parser le XML stocké à chaque sauvegarde (create_revision_if_changed).
+    hash_contenu = models.CharField(max_length=64, blank=True, default="")
+    # Numéro de la dernière RevisionRubrique (0 = aucune). Dénormalisé : écrit
+    # uniquement par les services de révision, sous verrou, via QuerySet.update().
+    # Jamais réécrit par save() (cf. CHAMPS_HORS_SAVE) pour qu'une instance
+    # périmée ne puisse pas faire reculer le compteur.
+    revision_courante_numero = models.PositiveIntegerField(default=0)
     auteur = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     date_creation = models.DateField(auto_now_add=True)
     date_mise_a_jour = models.DateField(auto_now=True)
@@ -166,6 +186,59 @@ class Rubrique(models.Model):
     )
     locked_at = models.DateTimeField(null=True, blank=True)
 
+    # Champs maintenus hors save() sur une ligne existante.
+    CHAMPS_HORS_SAVE = ("revision_courante_numero",)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Texte pour lequel hash_contenu est à jour (cf. save()).
+        if "contenu_xml" in field_names:
+            instance._xml_hashe = instance.contenu_xml
+        return instance
+
+    def definir_hash_contenu(self, xml: str, hash_contenu: str) -> None:
+        """
+        Renseigne un hash déjà calculé pour xml (ex. par create_revision_if_changed).
+        Le prochain save() avec contenu_xml == xml ne re-parse pas le document.
+        """
+        self.hash_contenu = hash_contenu
+        self._xml_hashe = xml
+
+    def save(self, *args, **kwargs):
+        # Recalcul du hash uniquement si contenu_xml a changé depuis le dernier
+        # hash connu — couvre tous les chemins d'écriture passant par save().
+        # Limite : QuerySet.update() ne passe pas par ici.
+        update_fields = kwargs.get("update_fields")
+        contenu_ecrit = (
+            "contenu_xml" in update_fields
+            if update_fields is not None
+            else "contenu_xml" not in self.get_deferred_fields()
+        )
+        if contenu_ecrit and (
+            getattr(self, "_xml_hashe", None) != self.contenu_xml or not self.hash_contenu
+        ):
+            from .utils import compute_xml_hash
+
+            self.hash_contenu = compute_xml_hash(self.contenu_xml)
+            self._xml_hashe = self.contenu_xml
+            if update_fields is not None and "hash_contenu" not in update_fields:
+                kwargs["update_fields"] = [*update_fields, "hash_contenu"]
+        # Sauvegarde complète : CHAMPS_HORS_SAVE retirés de l'UPDATE (_do_update).
+        self._sauvegarde_complete = kwargs.get("update_fields") is None
+        try:
+            super().save(*args, **kwargs)
+        finally:
+            self._sauvegarde_complete = False
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        # Seul l'UPDATE d'une sauvegarde complète est restreint : le repli en
+        # INSERT (ligne absente) et les signaux (update_fields=None) gardent la
+        # sémantique d'un save() complet ; un update_fields explicite est respecté.
+        if getattr(self, "_sauvegarde_complete", False):
+            values = [v for v in values if v[0].name not in self.CHAMPS_HORS_SAVE]
+        return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+
     def clean(self):
         if self.contenu_xml:
             try:
@@ -179,34 +252,130 @@ class Rubrique(models.Model):
 
 # --- Versioning documentaire ---
 
+class BlobXml(models.Model):
+    """
+    Contenu XML adressé par l'empreinte de ses octets exacts (utils.empreinte_exacte),
+    partagé par toutes les révisions de même texte (toutes rubriques confondues).
+
+    Invariants :
+    - Un seul blob par empreinte (contrainte unique) : savoir si un contenu
+      est déjà connu est une lecture d'index.
+    - Immuable après création ; le texte conservé est exactement celui de
+      chaque révision qui le référence. L'empreinte n'est pas le hash canonique
+      (compute_xml_hash) : deux formes équivalentes ont deux blobs distincts.
+    - nb_references compte les RevisionRubrique qui pointent sur le blob ;
+      incrémenté à la création de révision, recalculable par gc_blobs --recount.
+    - Un blob à 0 référence, qui ne sert de base à aucun delta, est collectable
+      (commande gc_blobs).
+
+    Stockage (cf. revision_storage) : keyframe, ou delta contre un blob keyframe
+    `base` (jamais contre un autre delta). Penser à select_related("base").
+    """
+    # SHA-256 des octets UTF-8 exacts du contenu (utils.empreinte_exacte).
+    empreinte = models.CharField(max_length=64, unique=True)
+    stockage = models.CharField(
+        max_length=10,
+        choices=revision_storage.STOCKAGE_BLOB_CHOICES,
+        default=revision_storage.STOCKAGE_KEYFRAME,
+    )
+    donnees = models.BinaryField()
+    base = models.ForeignKey(
+        "self", on_delete=models.PROTECT, null=True, blank=True, related_name="deltas"
+    )
+    # Taille en octets (UTF-8) du XML reconstruit.
+    taille = models.PositiveIntegerField(default=0)
+    nb_references = models.PositiveIntegerField(default=0)
+    date_creation = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Blob XML"
+        verbose_name_plural = "Blobs XML"
+        indexes = [models.Index(fields=["nb_references"])]
+
+    @property
+    def contenu_xml(self) -> str:
+        if getattr(self, "_contenu_xml", None) is None:
+            if self.stockage == revision_storage.STOCKAGE_DELTA:
+                self._contenu_xml = revision_storage.decode_delta(
+                    self.base.contenu_xml, self.donnees
+                )
+            else:
+                self._contenu_xml = revision_storage.decode_keyframe(self.donnees)
+        return self._contenu_xml
+
+    def __str__(self):
+        return f"Blob {self.empreinte[:12]} ({self.nb_references} réf.)"
+
+
 class RevisionRubrique(models.Model):
     """
     Snapshot immuable d'une modification réelle du contenu XML d'une rubrique.
 
     Invariants :
     - Créée uniquement lorsque hash(nouveau_xml) ≠ hash(xml_courant).
-    - Immuable après création : aucun update() autorisé.
+    - Immuable une fois scellée (brouillon=False) : aucun update() autorisé.
     - numero est séquentiel par rubrique (1, 2, 3…).
     - contenu_xml est la copie exacte du XML au moment de la révision.
 
+    Brouillon (fenêtre de regroupement, settings.REVISION_COALESCING_SECONDS) :
+    - Avec une fenêtre > 0, la dernière révision reste ouverte (brouillon=True) :
+      les éditions suivantes du même auteur dans la fenêtre la mettent à jour
+      en place (même numero) au lieu de créer une nouvelle révision.
+    - Elle est scellée à l'édition suivante hors fenêtre ou par un autre auteur,
+      et à la publication (une révision référencée par un PublicationSnapshot
+      est toujours scellée).
+
     Champ hash_contenu :
     - Algorithme : SHA-256
     - Encodage : hexadécimal, 64 caractères ASCII fixes
     - Calculé via utils.compute_xml_hash() — normalisation ElementTree appliquée
     - Invariant : deux appels sur le même contenu XML produisent toujours le même hash
     - Usage : détecter une modification réelle sans comparer les chaînes XML entières
+
+    Stockage (cf. revision_storage) :
+    - blob     : contenu porté par le BlobXml `blob`, partagé entre révisions
+                 de même hash (forme de toutes les nouvelles révisions).
+    - brut     : texte en clair dans contenu_xml_brut (révisions historiques).
+    - keyframe : texte complet compressé dans donnees (historique).
+    - delta    : différence compressée contre la keyframe `base` (historique).
+    - contenu_xml est une propriété : reconstruction transparente quelle que soit
+      la forme de stockage. Penser à select_related("base", "blob__base") sur les listes.
+    - La conversion de forme (commande compress_revisions) ne modifie jamais
+      le contenu reconstruit : seule la représentation physique change.
     """
     rubrique = models.ForeignKey(
         "Rubrique", on_delete=models.CASCADE, related_name="revisions"
     )
     numero = models.PositiveIntegerField()
-    contenu_xml = models.TextField()
+    # Texte en clair — renseigné uniquement pour stockage="brut".
+    contenu_xml_brut = models.TextField(blank=True, default="", db_column="contenu_xml")
+    stockage = models.CharField(
+        max_length=10,
+        choices=revision_storage.STOCKAGE_CHOICES,
+        default=revision_storage.STOCKAGE_BRUT,
+    )
+    donnees = models.BinaryField(null=True, blank=True)
+    # Keyframe de référence d'une révision delta. PROTECT : une keyframe ne peut
+    # pas disparaître tant que des deltas en dépendent.
+    base = models.ForeignKey(
+        "self", on_delete=models.PROTECT, null=True, blank=True, related_name="deltas"
+    )
+    # Contenu partagé — renseigné uniquement pour stockage="blob". PROTECT : un blob
+    # référencé ne peut pas être collecté.
+    blob = models.ForeignKey(
+        BlobXml, on_delete=models.PROTECT, null=True, blank=True, related_name="revisions"
+    )
+    # Taille en octets (UTF-8) du XML reconstruit.
+    taille = models.PositiveIntegerField(default=0)
     # SHA-256 hex — 64 caractères. Calculé par utils.compute_xml_hash().
     hash_contenu = models.CharField(max_length=64)
     auteur = models.ForeignKey(
         User, on_delete=models.SET_NULL, null=True, related_name="revisions_rubriques"
     )
     date_creation = models.DateTimeField(auto_now_add=True)
+    # Dernière écriture du contenu (création, ou regroupement d'une édition en brouillon).
+    date_mise_a_jour = models.DateTimeField(default=now)
+    brouillon = models.BooleanField(default=False)
 
     class Meta:
         unique_together = ("rubrique", "numero")
@@ -214,6 +383,32 @@ class RevisionRubrique(models.Model):
         verbose_name = "Révision de rubrique"
         verbose_name_plural = "Révisions de rubrique"
 
+    @property
+    def contenu_xml(self) -> str:
+        if getattr(self, "_contenu_xml", None) is None:
+            self._contenu_xml = self._reconstruire_contenu()
+        return self._contenu_xml
+
+    @contenu_xml.setter
+    def contenu_xml(self, value):
+        # Affectation directe : stockage en clair (compatibilité des appelants historiques).
+        self.contenu_xml_brut = value or ""
+        self.stockage = revision_storage.STOCKAGE_BRUT
+        self.donnees = None
+        self.base = None
+        self.blob = None
+        self.taille = len(self.contenu_xml_brut.encode("utf-8"))
+        self._contenu_xml = self.contenu_xml_brut
+
+    def _reconstruire_contenu(self) -> str:
+        if self.stockage == revision_storage.STOCKAGE_BLOB:
+            return self.blob.contenu_xml
+        if self.stockage == revision_storage.STOCKAGE_KEYFRAME:
+            return revision_storage.decode_keyframe(self.donnees)
+        if self.stockage == revision_storage.STOCKAGE_DELTA:
+            return revision_storage.decode_delta(self.base.contenu_xml, self.donnees)
+        return self.contenu_xml_brut
+
     def __str__(self):
         return f"Rubrique {self.rubrique_id} — Révision {self.numero}"
 
@@ -221,7 +416,14 @@ class RevisionRubrique(models.Model):
 class PublicationSnapshot(models.Model):
     """
     Jointure figée entre une VersionProjet publiée et les révisions exactes
-    de chaque rubrique au moment de la publication.
+    de chaque rubrique au moment de la publication, stockée en delta.
+
+    Une version ne porte que les lignes qui diffèrent de la publication
+    précédente du projet (rang_publication - 1) :
+    - rubrique ajoutée ou modifiée : revision = révision publiée ;
+    - rubrique retirée : revision = NULL.
+    L'ensemble complet d'une version (une ligne par rubrique publiée) est
+    résolu en une requête par utils.snapshots_publies().
 
     Invariants :
     - Créée uniquement lors d'une publication (service publish_project).
@@ -231,14 +433,24 @@ class PublicationSnapshot(models.Model):
 
     Périmètre v1 : basé sur la map master uniquement.
     """
+    # RESTRICT : les snapshots sont des deltas chaînés par rang_publication ;
+    # supprimer une version publiée fausserait l'ensemble publié de toutes les
+    # suivantes. La suppression du projet entier reste possible.
     version_projet = models.ForeignKey(
-        "VersionProjet", on_delete=models.CASCADE, related_name="publication_snapshots"
+        "VersionProjet", on_delete=models.RESTRICT, related_name="publication_snapshots"
     )
     rubrique = models.ForeignKey(
         "Rubrique", on_delete=models.CASCADE, related_name="publication_snapshots"
     )
+    # RESTRICT : une révision publiée ne peut pas être supprimée isolément
+    # (rétention) ; la suppression de la rubrique entière reste possible.
+    # NULL : rubrique retirée par cette publication.
     revision = models.ForeignKey(
-        "RevisionRubrique", on_delete=models.CASCADE, related_name="publication_snapshots"
+        "RevisionRubrique",
+        on_delete=models.RESTRICT,
+        null=True,
+        blank=True,
+        related_name="publication_snapshots",
     )
 
     class Meta:
@@ -247,11 +459,139 @@ class PublicationSnapshot(models.Model):
         verbose_name_plural = "Publication Snapshots"
 
     def __str__(self):
-        return (
-            f"Snapshot v{self.version_projet.version_numero}"
-            f" — Rubrique {self.rubrique_id}"
-            f" — Révision {self.revision.numero}"
-        )
+        etat = f"Révision {self.revision.numero}" if self.revision_id else "Retirée"
+        return f"Snapshot v{self.version_projet.version_numero} — Rubrique {self.rubrique_id} — {etat}"
+
+
+class TachePublication(models.Model):
+    """
+    Phase d'export d'une publication, exécutée hors requête HTTP par le worker
+    (commande run_publication_worker).
+
+    Le versionnage (snapshots, bump de version) est déjà validé à la création de
+    la tâche ; un échec d'export n'a aucun effet sur la version publiée.
+
+    Cycle de vie : en_attente → en_cours → terminee | echec.
+    date_mise_a_jour sert de battement de cœur : une tâche en_cours dont le
+    worker ne donne plus signe de vie est remise en attente.
+    """
+    STATUT_CHOICES = [
+        ("en_attente", "En attente"),
+        ("en_cours", "En cours"),
+        ("terminee", "Terminée"),
+        ("echec", "Échec"),
+    ]
+
+    projet = models.ForeignKey("Projet", on_delete=models.CASCADE, related_name="taches_publication")
+    map = models.ForeignKey("Map", on_delete=models.CASCADE, related_name="taches_publication")
+    version_projet = models.ForeignKey(
+        "VersionProjet",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="taches_publication",
+    )
+    format = models.CharField(max_length=20)
+    # Publication multi-format : tous les formats rendus (format = le premier).
+    formats = models.JSONField(default=list, blank=True)
+    statut = models.CharField(max_length=20, choices=STATUT_CHOICES, default="en_attente")
+    progression = models.PositiveSmallIntegerField(default=0)
+    journal = models.TextField(blank=True, default="")
+    # Résultat de export_map_to_dita / export_map_multi_formats (bundle, rendu, durées par phase)
+    resultat = models.JSONField(default=dict, blank=True)
+    tentatives = models.PositiveSmallIntegerField(default=0)
+    auteur = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    date_creation = models.DateTimeField(auto_now_add=True)
+    date_debut = models.DateTimeField(null=True, blank=True)
+    date_fin = models.DateTimeField(null=True, blank=True)
+    date_mise_a_jour = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["statut", "date_creation"])]
+        verbose_name = "Tâche de publication"
+        verbose_name_plural = "Tâches de publication"
+
+    def __str__(self):
+        return f"Publication {self.pk} — map {self.map_id} ({', '.join(self.liste_formats)}, {self.statut})"
+
+    @property
+    def liste_formats(self) -> list:
+        return self.formats or [self.format]
+
+
+class Publication(models.Model):
+    """
+    Registre des publications : une ligne par événement de publication
+    (nouvelle version figée ou republication sans changement).
+
+    Projet.derniere_publication pointe vers la plus récente : la dernière
+    version publiée se lit par clé primaire, sans parcourir les snapshots.
+    L'historique d'un projet est une lecture indexée (projet, -id).
+
+    artefacts : {format: emplacement du rendu}, renseigné à la fin de l'export.
+    artefacts_stockes : rendus rangés au magasin d'artefacts (téléchargement).
+    """
+    projet = models.ForeignKey("Projet", on_delete=models.CASCADE, related_name="publications")
+    # RESTRICT : une version publiée n'est pas supprimable isolément (voir
+    # PublicationSnapshot.version_projet).
+    version_projet = models.ForeignKey(
+        "VersionProjet", on_delete=models.RESTRICT, related_name="publications"
+    )
+    # False : republication sans changement (version déjà figée).
+    nouvelle_version = models.BooleanField(default=True)
+    nb_snapshots = models.PositiveIntegerField(default=0)
+    formats = models.JSONField(default=list, blank=True)
+    artefacts = models.JSONField(default=dict, blank=True)
+    artefacts_stockes = models.ManyToManyField(
+        "ArtefactPublication", blank=True, related_name="publications"
+    )
+    tache = models.OneToOneField(
+        "TachePublication",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="publication",
+    )
+    auteur = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    date_publication = models.DateTimeField(default=now)
+
+    class Meta:
+        indexes = [models.Index(fields=["projet", "-id"])]
+        verbose_name = "Publication"
+        verbose_name_plural = "Publications"
+
+    def __str__(self):
+        return f"Publication {self.pk} — projet {self.projet_id}, version {self.version_projet_id}"
+
+
+class ArtefactPublication(models.Model):
+    """
+    Rendu de publication rangé au magasin d'artefacts (documentation.artefacts).
+
+    Clé : (hash_ensemble, format, profil). hash_ensemble résume les révisions
+    publiées et la structure de la map : une republication sans changement
+    réutilise l'artefact existant.
+    Le fichier est adressé par son empreinte SHA-256 (chemin relatif au
+    magasin) : des clés au rendu identique partagent le même fichier.
+    L'empreinte sert d'ETag au téléchargement.
+    """
+    hash_ensemble = models.CharField(max_length=64)
+    format = models.CharField(max_length=50)
+    profil = models.CharField(max_length=100, default="defaut")
+    empreinte = models.CharField(max_length=64, db_index=True)
+    chemin = models.CharField(max_length=255)
+    nom_fichier = models.CharField(max_length=255)
+    type_mime = models.CharField(max_length=100, default="application/octet-stream")
+    taille = models.BigIntegerField(default=0)
+    date_creation = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("hash_ensemble", "format", "profil")
+        verbose_name = "Artefact de publication"
+        verbose_name_plural = "Artefacts de publication"
+
+    def __str__(self):
+        return f"Artefact {self.format} ({self.profil}) — {self.empreinte[:12]}"
 
 
 # --- Maps et Relations ---
@@ -262,6 +602,10 @@ class Map(models.Model):
         Rubrique, through="MapRubrique", related_name="maps"
     )
     is_master = models.BooleanField(default=False)
+    # Version de la structure (MapRubrique de la map, titres et états des
+    # rubriques affichés) : incrémentée par chaque modification, sert d'ETag
+    # aux vues de structure (services.incrementer_version_structure).
+    version_structure = models.PositiveBigIntegerField(default=0)
 
     class Meta:
         ordering = ["nom"]
@@ -277,15 +621,46 @@ class MapRubrique(models.Model):
     parent = models.ForeignKey(
         "self", on_delete=models.CASCADE, blank=True, null=True, related_name="enfants"
     )
+    # Chemin matérialisé : ids des ancêtres, de la racine au parent, chacun suivi
+    # de "/" ("" pour une racine). Tenu à jour par les services de structure ;
+    # check_map_chemins le reconstruit depuis les pointeurs parent.
+    chemin = models.TextField(blank=True, default="")
+    profondeur = models.PositiveSmallIntegerField(default=0)
 
     class Meta:
         ordering = ["ordre"]
+        indexes = [
+            # Résolution map → révisions courantes (_build_rubrique_revision_map)
+            models.Index(fields=["map", "rubrique"]),
+            # Frères d'un niveau dans l'ordre : voisins d'une insertion (_cle_ordre)
+            models.Index(fields=["map", "parent", "ordre"], name="maprubrique_niveau_ordre"),
+            # Descendants d'un nœud : chemin LIKE '<préfixe>%'
+            models.Index(fields=["chemin"], name="maprubrique_chemin", opclasses=["text_pattern_ops"]),
+        ]
 
     def __str__(self):
         return (
             f"Rubrique: {self.rubrique.titre} in {self.map.nom} (Order: {self.ordre})"
         )
 
+    def save(self, *args, **kwargs):
+        # Création : le chemin se déduit du parent. Les déplacements
+        # (indent, outdent, lot) le recalculent explicitement, sous-arbre compris.
+        if self._state.adding and self.parent_id is not None and not self.chemin:
+            self.chemin = self.parent.prefixe_descendants
+            self.profondeur = self.parent.profondeur + 1
+        super().save(*args, **kwargs)
+
+    @property
+    def prefixe_descendants(self) -> str:
+        """Préfixe commun aux chemins de tous les descendants du nœud."""
+        return f"{self.chemin}{self.pk}/"
+
+    @property
+    def ancetres_ids(self) -> list[int]:
+        """Ids des ancêtres, de la racine au parent."""
+        return [int(i) for i in self.chemin.split("/") if i]
+
 
 # --- ProductDocSync : VersionProduit ---
 
@@ -440,3 +815,24 @@ class LogModification(models.Model):
 
     def __str__(self):
         return f"Modification de {self.rubrique} par {self.utilisateur} le {self.date_modification}"
+
+
+# --- Maintenance : reprise des traitements par lots ---
+class PointDeReprise(models.Model):
+    """
+    Position d'avancement d'un traitement de maintenance par lots (commande).
+
+    Un traitement parcourt sa table par pk croissant et enregistre ici le dernier
+    pk traité après chaque lot validé : une exécution interrompue reprend au lot
+    suivant. La ligne est supprimée quand le traitement arrive à son terme.
+    """
+    nom = models.CharField(max_length=100, unique=True)
+    dernier_id = models.BigIntegerField(default=0)
+    date_mise_a_jour = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Point de reprise"
+        verbose_name_plural = "Points de reprise"
+
+    def __str__(self):
+        return f"{self.nom} — après id {self.dernier_id}"
@@ -0,0 +1,32 @@
+# documentation/pagination.py
+# -- Classes de pagination DRF du module documentation --
+from rest_framework.pagination import CursorPagination
+
+
+class RevisionCursorPagination(CursorPagination):
+    """
+    Pagination par curseur (keyset) de l'historique des révisions d'une rubrique.
+
+    Tri sur numero décroissant — unique par rubrique, donc curseur stable même
+    si de nouvelles révisions sont créées pendant la navigation. Le coût d'une
+    page ne dépend pas de sa position dans l'historique (pas d'OFFSET).
+    """
+
+    ordering = "-numero"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+class PublicationCursorPagination(CursorPagination):
+    """
+    Pagination par curseur de l'historique des publications d'un projet.
+
+    Tri sur id décroissant (ordre d'enregistrement), servi par l'index
+    (projet, -id) du registre.
+    """
+
+    ordering = "-id"
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
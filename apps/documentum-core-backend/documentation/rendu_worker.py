@@ -0,0 +1,30 @@
+# documentation/rendu_worker.py
+# -- Point d'entrée des processus de rendu multi-format (documentation.exporters) --
+"""
+Fonctions exécutées dans les processus du pool de rendu.
+
+Les processus sont lancés en "spawn" et initialisés par
+backfill_worker.init_worker (django.setup()). Ce module ne doit pas importer
+de modèles au niveau module.
+"""
+import time
+
+
+def rendre_bundle(chemin_renderer: str, ditamap: str, output_format: str, dossier_sortie: str) -> dict:
+    """
+    Rendu d'un bundle par le moteur `chemin_renderer` (chemin pointé de la
+    classe, réinstanciée dans le processus). Une exception du moteur est
+    rapportée dans le résultat, jamais levée.
+
+    Retourne {"rendu": dict du moteur, "duree_ms": float}.
+    """
+    from django.utils.module_loading import import_string
+
+    debut = time.perf_counter()
+    try:
+        rendu = import_string(chemin_renderer)().rendre(
+            ditamap=ditamap, output_format=output_format, dossier_sortie=dossier_sortie
+        )
+    except Exception as e:
+        rendu = {"status": "error", "message": f"Rendu {output_format} interrompu : {e}"}
+    return {"rendu": rendu, "duree_ms": round((time.perf_counter() - debut) * 1000, 1)}
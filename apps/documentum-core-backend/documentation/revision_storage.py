@@ -0,0 +1,157 @@
+# documentation/revision_storage.py
+# -- Moteur de stockage compressé des révisions (keyframes + deltas) --
+"""
+Encodage du contenu XML des BlobXml (et des RevisionRubrique historiques).
+
+Deux formes de stockage coexistent :
+- keyframe : texte complet compressé (zlib).
+- delta    : différence compressée contre la dernière keyframe de la rubrique.
+
+Le delta est calculé sur des jetons XML (découpe après chaque '>'), ce qui reste
+pertinent pour le XML mono-ligne produit par l'éditeur. Un delta s'applique
+toujours sur une keyframe, jamais sur un autre delta : la reconstruction d'une
+révision coûte au plus une décompression de keyframe + une application de delta.
+
+Aucune dépendance aux modèles : module pur, utilisable depuis les migrations
+et les commandes de conversion.
+"""
+import difflib
+import json
+import re
+import zlib
+
+from django.conf import settings
+
+# Formes de stockage d'une révision (RevisionRubrique.stockage)
+STOCKAGE_BRUT = "brut"  # historique : contenu_xml en clair, non compressé
+STOCKAGE_KEYFRAME = "keyframe"
+STOCKAGE_DELTA = "delta"
+STOCKAGE_BLOB = "blob"  # contenu porté par un BlobXml partagé
+
+STOCKAGE_CHOICES = [
+    (STOCKAGE_BRUT, "Texte brut"),
+    (STOCKAGE_KEYFRAME, "Keyframe compressée"),
+    (STOCKAGE_DELTA, "Delta compressé"),
+    (STOCKAGE_BLOB, "Blob partagé"),
+]
+
+# Formes de stockage d'un BlobXml (BlobXml.stockage)
+STOCKAGE_BLOB_CHOICES = [
+    (STOCKAGE_KEYFRAME, "Keyframe compressée"),
+    (STOCKAGE_DELTA, "Delta compressé"),
+]
+
+# Une keyframe toutes les N révisions au maximum (surcharge via settings)
+DEFAULT_KEYFRAME_INTERVAL = 20
+
+# Au-delà de ce produit de jetons, on n'aligne plus finement la zone modifiée :
+# elle est stockée telle quelle (borne le coût CPU de SequenceMatcher).
+_MAX_ALIGNEMENT = 4_000_000
+
+_NIVEAU_ZLIB = 6
+_JETONS_RE = re.compile(r"[^>]*>|[^>]+")
+
+# Opérations de delta
+_OP_COPIE = 0
+_OP_INSERTION = 1
+
+
+def get_keyframe_interval() -> int:
+    return max(1, int(getattr(settings, "REVISION_KEYFRAME_INTERVAL", DEFAULT_KEYFRAME_INTERVAL)))
+
+
+def _jetons(texte: str) -> list[str]:
+    return _JETONS_RE.findall(texte)
+
+
+def encode_keyframe(xml: str) -> bytes:
+    """Compresse le texte complet d'une révision."""
+    return zlib.compress((xml or "").encode("utf-8"), _NIVEAU_ZLIB)
+
+
+def decode_keyframe(donnees: bytes) -> str:
+    return zlib.decompress(bytes(donnees)).decode("utf-8")
+
+
+def encode_delta(base_xml: str, xml: str) -> bytes:
+    """
+    Calcule le delta compressé permettant de reconstruire xml à partir de base_xml.
+
+    Format (avant compression) : liste JSON d'opérations
+    - [0, i, j]  : copier les jetons base[i:j]
+    - [1, texte] : insérer texte
+
+    Les préfixe et suffixe communs sont détectés en temps linéaire ; seule la zone
+    centrale modifiée est alignée par SequenceMatcher (cas typique de l'autosave).
+    """
+    base = _jetons(base_xml or "")
+    cible = _jetons(xml or "")
+
+    debut = 0
+    limite = min(len(base), len(cible))
+    while debut < limite and base[debut] == cible[debut]:
+        debut += 1
+
+    fin = 0
+    limite -= debut
+    while fin < limite and base[-1 - fin] == cible[-1 - fin]:
+        fin += 1
+
+    ops: list = []
+    if debut:
+        ops.append([_OP_COPIE, 0, debut])
+
+    base_milieu = base[debut:len(base) - fin]
+    cible_milieu = cible[debut:len(cible) - fin]
+
+    if len(base_milieu) * len(cible_milieu) > _MAX_ALIGNEMENT or not base_milieu:
+        if cible_milieu:
+            ops.append([_OP_INSERTION, "".join(cible_milieu)])
+    else:
+        matcher = difflib.SequenceMatcher(None, base_milieu, cible_milieu, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                ops.append([_OP_COPIE, debut + i1, debut + i2])
+            elif tag in ("replace", "insert"):
+                ops.append([_OP_INSERTION, "".join(cible_milieu[j1:j2])])
+            # "delete" : rien à émettre
+
+    if fin:
+        ops.append([_OP_COPIE, len(base) - fin, len(base)])
+
+    payload = json.dumps(ops, ensure_ascii=False, separators=(",", ":"))
+    return zlib.compress(payload.encode("utf-8"), _NIVEAU_ZLIB)
+
+
+def decode_delta(base_xml: str, donnees: bytes) -> str:
+    """Reconstruit le texte d'une révision delta à partir du texte de sa keyframe."""
+    base = _jetons(base_xml or "")
+    ops = json.loads(zlib.decompress(bytes(donnees)).decode("utf-8"))
+    morceaux = []
+    for op in ops:
+        if op[0] == _OP_COPIE:
+            morceaux.extend(base[op[1]:op[2]])
+        else:
+            morceaux.append(op[1])
+    return "".join(morceaux)
+
+
+def encode_revision(xml: str, *, base_xml: str | None, distance: int) -> tuple[str, bytes]:
+    """
+    Choisit la forme de stockage d'une nouvelle révision.
+
+    - base_xml : texte de la dernière keyframe de la rubrique (None si aucune).
+    - distance : écart de numéro entre la nouvelle révision et cette keyframe.
+
+    Une keyframe est émise si aucune base n'existe, si l'intervalle est atteint,
+    ou si le delta n'est pas plus compact que la keyframe elle-même.
+    Retourne (stockage, donnees).
+    """
+    keyframe = encode_keyframe(xml)
+    if base_xml is None or distance >= get_keyframe_interval():
+        return STOCKAGE_KEYFRAME, keyframe
+
+    delta = encode_delta(base_xml, xml)
+    if len(delta) >= len(keyframe):
+        return STOCKAGE_KEYFRAME, keyframe
+    return STOCKAGE_DELTA, delta
@@ -1,4 +1,5 @@
 from django.contrib.auth.models import User
+from django.urls import reverse
 from rest_framework import serializers
 
 from .models import (
@@ -14,13 +15,16 @@ from .models import (
     Produit,
     ProfilPublication,
     Projet,
+    Publication,
     RevisionRubrique,
     Rubrique,
+    TachePublication,
     Tag,
     TypeRubrique,
     VersionProjet,
     VersionProduit,
 )
+from .exporters import artefacts_export
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -54,7 +58,8 @@ class ProduitSerializer(serializers.ModelSerializer):
 class MapSerializer(serializers.ModelSerializer):
     class Meta:
         model = Map
-        fields = ["id", "nom", "projet", "is_master"]
+        fields = ["id", "nom", "projet", "is_master", "version_structure"]
+        read_only_fields = ["version_structure"]
 
     def create(self, validated_data):
         # Validation ou logique supplémentaire si nécessaire
@@ -235,12 +240,10 @@ class RubriqueSerializer(serializers.ModelSerializer):
         required=False,
     )
     locked_by = serializers.StringRelatedField(read_only=True)
-    # Numéro de la révision courante — lu depuis l'annotation Max("revisions__numero")
-    # injectée par RubriqueViewSet.queryset. Zéro requête N+1 : l'agrégat est calculé
-    # une seule fois par le queryset annoté du ViewSet.
-    # Null uniquement si aucune RevisionRubrique n'existe (impossible post-migrations).
-    # Ne pas inclure dans RubriqueMiniSerializer (structure list — non annoté).
-    revision_courante_numero = serializers.IntegerField(read_only=True, allow_null=True)
+    # Numéro de la révision courante — colonne dénormalisée Rubrique.revision_courante_numero,
+    # maintenue par les services de révision. 0 uniquement si aucune RevisionRubrique
+    # n'existe (impossible post-migrations).
+    revision_courante_numero = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Rubrique
@@ -326,6 +329,53 @@ class MapStructureAttachSerializer(serializers.Serializer):
     ordre = serializers.IntegerField(required=False, allow_null=True)
 
 
+class MapStructureNoeudSerializer(serializers.Serializer):
+    """Payload d'une opération indent / outdent dans un lot."""
+    mapRubriqueId = serializers.IntegerField()
+
+
+class MapStructureBatchAttachSerializer(MapStructureAttachSerializer):
+    # ordre : clé de tri parmi les frères, comme pour l'endpoint unitaire.
+    # Référence temporaire du nœud créé, utilisable par les opérations suivantes du lot.
+    ref = serializers.IntegerField(required=False, max_value=-1)
+
+
+class MapStructureBatchCreateSerializer(CreateRubriqueInMapSerializer):
+    ref = serializers.IntegerField(required=False, max_value=-1)
+
+
+class MapStructureBatchSerializer(serializers.Serializer):
+    """
+    Payload pour POST /api/maps/{id}/structure/batch/ :
+    {"operations": [{"op": "indent", "mapRubriqueId": 12}, ...]}.
+    Chaque opération reprend le payload de l'endpoint unitaire correspondant.
+    """
+    OPERATIONS = {
+        "reorder": MapStructureReorderSerializer,
+        "indent": MapStructureNoeudSerializer,
+        "outdent": MapStructureNoeudSerializer,
+        "attach": MapStructureBatchAttachSerializer,
+        "create": MapStructureBatchCreateSerializer,
+    }
+
+    operations = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+
+    def validate_operations(self, operations):
+        validees = []
+        for rang, operation in enumerate(operations):
+            nom = operation.get("op")
+            serializer_class = self.OPERATIONS.get(nom)
+            if serializer_class is None:
+                raise serializers.ValidationError(
+                    {rang: [f"Opération inconnue : {nom!r}. Attendu : {', '.join(self.OPERATIONS)}."]}
+                )
+            serializer = serializer_class(data=operation)
+            if not serializer.is_valid():
+                raise serializers.ValidationError({rang: serializer.errors})
+            validees.append({"op": nom, **serializer.validated_data})
+        return validees
+
+
 # ---------------------------------------------------------------------------
 # ProductDocSync — VersionProduit
 # ---------------------------------------------------------------------------
@@ -439,10 +489,10 @@ class UpdateNotesImpactSerializer(serializers.Serializer):
 # ---------------------------------------------------------------------------
 
 
-class RevisionRubriqueSerializer(serializers.ModelSerializer):
+class RevisionRubriqueMetaSerializer(serializers.ModelSerializer):
     """
-    Serializer en lecture seule pour l'historique des révisions d'une rubrique.
-    Utilisé par GET /api/rubriques/{id}/revisions/
+    Métadonnées d'une révision, sans contenu XML.
+    Utilisé par GET /api/rubriques/{id}/revisions/ (liste paginée).
     """
     auteur_username = serializers.CharField(source="auteur.username", read_only=True, default=None)
 
@@ -452,8 +502,105 @@ class RevisionRubriqueSerializer(serializers.ModelSerializer):
             "id",
             "numero",
             "hash_contenu",
-            "contenu_xml",
             "auteur_username",
             "date_creation",
+            "date_mise_a_jour",
+            "brouillon",
+            "taille",
+        ]
+        read_only_fields = fields
+
+
+class RevisionRubriqueSerializer(RevisionRubriqueMetaSerializer):
+    """
+    Révision complète, contenu XML reconstruit inclus.
+    Utilisé par GET /api/rubriques/{id}/revisions/{numero}/
+    """
+
+    class Meta(RevisionRubriqueMetaSerializer.Meta):
+        fields = RevisionRubriqueMetaSerializer.Meta.fields + ["contenu_xml"]
+        read_only_fields = fields
+
+
+class TachePublicationSerializer(serializers.ModelSerializer):
+    """
+    État d'une tâche de publication.
+    Utilisé par GET /api/publications/{id}/ (suivi côté frontend).
+    """
+    version_publiee = serializers.CharField(
+        source="version_projet.version_numero", read_only=True, default=None
+    )
+    auteur_username = serializers.CharField(source="auteur.username", read_only=True, default=None)
+    formats = serializers.ListField(source="liste_formats", read_only=True)
+    journal = serializers.SerializerMethodField()
+    artefact = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TachePublication
+        fields = [
+            "id",
+            "projet",
+            "map",
+            "version_publiee",
+            "format",
+            "formats",
+            "statut",
+            "progression",
+            "journal",
+            "artefact",
+            "resultat",
+            "tentatives",
+            "auteur_username",
+            "date_creation",
+            "date_debut",
+            "date_fin",
         ]
         read_only_fields = fields
+
+    def get_journal(self, obj):
+        return obj.journal.splitlines()
+
+    def get_artefact(self, obj):
+        """
+        Emplacement du rendu (None tant que l'export n'a pas abouti) ;
+        multi-format : {format: emplacement}.
+        """
+        if obj.statut != "terminee":
+            return None
+        artefacts = artefacts_export(obj.resultat)
+        return artefacts if "formats" in obj.resultat else artefacts.get(obj.format)
+
+
+class PublicationSerializer(serializers.ModelSerializer):
+    """
+    Événement du registre des publications.
+    Utilisé par GET /api/projets/{id}/publications/ (historique paginé).
+    """
+    version_publiee = serializers.CharField(source="version_projet.version_numero", read_only=True)
+    auteur_username = serializers.CharField(source="auteur.username", read_only=True, default=None)
+    telechargements = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Publication
+        fields = [
+            "id",
+            "version_publiee",
+            "nouvelle_version",
+            "nb_snapshots",
+            "formats",
+            "artefacts",
+            "telechargements",
+            "tache",
+            "auteur_username",
+            "date_publication",
+        ]
+        read_only_fields = fields
+
+    def get_telechargements(self, obj) -> dict:
+        """{format: URL de téléchargement} des artefacts rangés au magasin."""
+        request = self.context.get("request")
+        telechargements = {}
+        for artefact in obj.artefacts_stockes.all():
+            url = reverse("telecharger_artefact", args=[artefact.pk])
+            telechargements[artefact.format] = request.build_absolute_uri(url) if request else url
+        return telechargements
@@ -1,24 +1,37 @@
 # documentation/services.py
 import logging
-from django.db import transaction
-from django.db.models import Max, F, Subquery, OuterRef
+import uuid
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, F, Max, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Concat, Greatest, Substr, TruncDate
 from django.utils.timezone import now
 from rest_framework.exceptions import ValidationError
 
 from .models import (
+    BlobXml,
     EvolutionProduit,
     ImpactDocumentaire,
     Map,
     MapRubrique,
     Projet,
+    Publication,
     Rubrique,
     RevisionRubrique,
     VersionProjet,
     VersionProduit,
     PublicationSnapshot,
+    TachePublication,
 )
-from .utils import get_active_version, compute_xml_hash
-from .exporters import export_map_to_dita
+from .utils import get_active_version, compute_xml_hash, empreinte_exacte, snapshots_publies
+from .exporters import artefacts_export, export_map_multi_formats, export_map_to_dita, supprimer_export
+from .artefacts import artefacts_stockes, chemin_absolu, hash_ensemble_publie, stocker_artefact
+from . import revision_storage, xml_diff
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +40,143 @@ logger = logging.getLogger(__name__)
 # Versioning documentaire — Lot 2
 # ---------------------------------------------------------------------------
 
+def obtenir_blob(*, xml: str, rubrique_id: int, numero: int) -> tuple[BlobXml, bool]:
+    """
+    Retourne le BlobXml du texte xml, créé s'il est inconnu, et incrémente
+    son compteur de références. Retourne (blob, cree).
+
+    Le blob est adressé par l'empreinte des octets exacts (utils.empreinte_exacte),
+    pas par le hash canonique : deux XML équivalents mais non identiques
+    (commentaires, DOCTYPE, guillemets…) ont chacun leur blob, et contenu_xml
+    reste la copie exacte du XML de la révision.
+
+    Un contenu déjà connu (révision restaurée, même texte dans une autre rubrique)
+    coûte une lecture d'index : rien n'est réencodé ni stocké à nouveau.
+    Un nouveau blob est encodé en keyframe, ou en delta contre le dernier blob
+    keyframe de la rubrique (revision_storage.encode_revision).
+
+    Doit être appelé dans une transaction : la ligne du blob est verrouillée
+    pour sérialiser l'incrément avec une collecte gc_blobs concurrente.
+    """
+    xml = xml or ""
+    empreinte = empreinte_exacte(xml)
+    blob = BlobXml.objects.select_for_update().filter(empreinte=empreinte).first()
+    cree = False
+    if blob is None:
+        reference = (
+            RevisionRubrique.objects.filter(
+                rubrique_id=rubrique_id,
+                blob__stockage=revision_storage.STOCKAGE_KEYFRAME,
+            )
+            .select_related("blob")
+            .order_by("-numero")
+            .first()
+        )
+        stockage, donnees = revision_storage.encode_revision(
+            xml,
+            base_xml=reference.blob.contenu_xml if reference else None,
+            distance=numero - reference.numero if reference else 0,
+        )
+        try:
+            # Savepoint : une création concurrente du même contenu n'annule pas
+            # la transaction englobante.
+            with transaction.atomic():
+                blob = BlobXml.objects.create(
+                    empreinte=empreinte,
+                    stockage=stockage,
+                    donnees=donnees,
+                    base=reference.blob if stockage == revision_storage.STOCKAGE_DELTA else None,
+                    taille=len(xml.encode("utf-8")),
+                )
+            cree = True
+        except IntegrityError:
+            blob = BlobXml.objects.select_for_update().get(empreinte=empreinte)
+
+    BlobXml.objects.filter(pk=blob.pk).update(nb_references=F("nb_references") + 1)
+    blob.nb_references += 1
+    return blob, cree
+
+
+def liberer_blob(blob_id: int) -> None:
+    """
+    Décrémente le compteur de références d'un BlobXml (révision supprimée ou
+    dont le contenu a été remplacé). Le blob devient collectable par gc_blobs
+    à zéro référence.
+    """
+    BlobXml.objects.filter(pk=blob_id, nb_references__gt=0).update(
+        nb_references=F("nb_references") - 1
+    )
+
+
+def _encoder_contenu_revision(*, rubrique_id: int, numero: int, xml: str) -> dict:
+    """
+    Calcule les champs de stockage d'une nouvelle RevisionRubrique : le contenu
+    est porté par un BlobXml partagé (obtenir_blob).
+    Retourne un dict prêt à passer à RevisionRubrique.objects.create().
+    """
+    blob, _ = obtenir_blob(xml=xml, rubrique_id=rubrique_id, numero=numero)
+    return {
+        "stockage": revision_storage.STOCKAGE_BLOB,
+        "blob": blob,
+        "taille": blob.taille,
+    }
+
+
+# Fenêtre de regroupement des autosaves, en secondes (0 = désactivé :
+# une révision par modification réelle).
+DEFAULT_REVISION_COALESCING_SECONDS = 0
+
+
+def get_revision_coalescing_seconds() -> int:
+    return max(0, int(getattr(settings, "REVISION_COALESCING_SECONDS", DEFAULT_REVISION_COALESCING_SECONDS)))
+
+
+def _regrouper_dans_brouillon(
+    *, locked: Rubrique, new_xml: str, hash_new: str, user, fenetre: int
+) -> "RevisionRubrique | None":
+    """
+    Met à jour en place la révision brouillon courante si l'édition provient du
+    même auteur dans la fenêtre de regroupement. Sinon, scelle le brouillon
+    (s'il existe) et retourne None : l'appelant crée une nouvelle révision.
+
+    Appelée sous le verrou de la rubrique. La ligne du brouillon est elle-même
+    verrouillée : un scellement concurrent (publication) est attendu, et un
+    brouillon déjà scellé n'est jamais modifié.
+    """
+    brouillon = (
+        RevisionRubrique.objects.select_for_update()
+        .filter(rubrique=locked, numero=locked.revision_courante_numero, brouillon=True)
+        .first()
+    )
+    if brouillon is None:
+        return None
+
+    if (
+        not fenetre  # regroupement désactivé depuis l'ouverture du brouillon
+        or brouillon.auteur_id != getattr(user, "pk", None)
+        or now() - brouillon.date_mise_a_jour > timedelta(seconds=fenetre)
+    ):
+        RevisionRubrique.objects.filter(pk=brouillon.pk).update(brouillon=False)
+        return None
+
+    ancien_blob_id = brouillon.blob_id
+    champs = _encoder_contenu_revision(rubrique_id=locked.pk, numero=brouillon.numero, xml=new_xml)
+    champs.update(hash_contenu=hash_new, date_mise_a_jour=now())
+    RevisionRubrique.objects.filter(pk=brouillon.pk).update(**champs)
+    if ancien_blob_id:
+        liberer_blob(ancien_blob_id)
+    for champ, valeur in champs.items():
+        setattr(brouillon, champ, valeur)
+    invalider_publication_diff(rubrique_id=locked.pk)
+
+    logger.debug(
+        "[RevisionRubrique] Édition regroupée dans la révision %s. rubrique_id=%s",
+        brouillon.numero,
+        locked.pk,
+    )
+    return brouillon
+
+
 @transaction.atomic
 def create_revision_if_changed(
     *, rubrique: Rubrique, new_xml: str, user
@@ -35,9 +185,18 @@ def create_revision_if_changed(
     Crée une RevisionRubrique si new_xml diffère réellement du contenu actuel.
 
     Règles métier :
-    - Comparaison par hash SHA-256 normalisé (compute_xml_hash).
+    - Comparaison par hash SHA-256 normalisé (compute_xml_hash) du nouveau XML
+      contre Rubrique.hash_contenu (hash persisté du contenu courant).
     - Hash identique → retourne None, aucune écriture en base.
     - Hash différent → crée RevisionRubrique(numero = dernier + 1), retourne la révision.
+    - Fenêtre de regroupement active (REVISION_COALESCING_SECONDS > 0) : une édition
+      du même auteur dans la fenêtre met à jour la révision brouillon courante
+      (même numero) au lieu d'en créer une (_regrouper_dans_brouillon).
+    - Rubrique.revision_courante_numero est incrémenté dans la même transaction,
+      sous le verrou (source du numéro suivant, plus d'agrégat Max).
+    - Stockage : contenu porté par un BlobXml adressé par empreinte (obtenir_blob),
+      partagé avec toute révision de même texte exact — transparent pour les
+      lecteurs de contenu_xml.
     - Ne modifie PAS rubrique.contenu_xml : c'est la responsabilité de l'appelant
       (serializer.save() dans RubriqueViewSet.update()).
 
@@ -55,15 +214,18 @@ def create_revision_if_changed(
     - Si la transaction englobante est déjà en cours (cas RubriqueViewSet.update()),
       le select_for_update ré-acquiert le lock sur la même ligne — idempotent en PG.
 
-    Retourne : RevisionRubrique créée, ou None si contenu identique.
+    Retourne : RevisionRubrique créée (ou brouillon mis à jour), ou None si contenu identique.
     """
     # 🔒 Verrou sur la ligne Rubrique — sérialise les révisions concurrentes.
     # Pas de select_related ici → pas de JOIN → select_for_update() sans of=("self",).
     # Robuste multi-environnement (PostgreSQL row-lock, SQLite ignoré gracieusement).
-    locked = Rubrique.objects.select_for_update().get(pk=rubrique.pk)
+    # contenu_xml différé : le hash courant est lu depuis Rubrique.hash_contenu,
+    # seul le document entrant est parsé pendant la détention du verrou.
+    locked = Rubrique.objects.select_for_update().defer("contenu_xml").get(pk=rubrique.pk)
 
     hash_new = compute_xml_hash(new_xml)
-    hash_current = compute_xml_hash(locked.contenu_xml)
+    # Repli défensif : hash absent (ligne antérieure au backfill 0016).
+    hash_current = locked.hash_contenu or compute_xml_hash(locked.contenu_xml)
 
     if hash_new == hash_current:
         logger.debug(
@@ -72,20 +234,27 @@ def create_revision_if_changed(
         )
         return None
 
-    dernier_numero = (
-        RevisionRubrique.objects.filter(rubrique=locked)
-        .aggregate(m=Max("numero"))["m"]
-        or 0
+    fenetre = get_revision_coalescing_seconds()
+    revision = _regrouper_dans_brouillon(
+        locked=locked, new_xml=new_xml, hash_new=hash_new, user=user, fenetre=fenetre
     )
-    nouveau_numero = dernier_numero + 1
+    if revision is not None:
+        return revision
+
+    # Compteur dénormalisé lu sous le verrou : pas d'agrégat sur les révisions.
+    nouveau_numero = locked.revision_courante_numero + 1
 
     revision = RevisionRubrique.objects.create(
         rubrique=locked,
         numero=nouveau_numero,
-        contenu_xml=new_xml,
         hash_contenu=hash_new,
         auteur=user,
+        brouillon=bool(fenetre),
+        **_encoder_contenu_revision(rubrique_id=locked.pk, numero=nouveau_numero, xml=new_xml),
     )
+    Rubrique.objects.filter(pk=locked.pk).update(revision_courante_numero=nouveau_numero)
+    rubrique.revision_courante_numero = nouveau_numero
+    invalider_publication_diff(rubrique_id=locked.pk)
 
     logger.info(
         "[RevisionRubrique] Révision %s créée. rubrique_id=%s auteur=%s",
@@ -109,13 +278,209 @@ def create_initial_revision(*, rubrique: Rubrique, user) -> RevisionRubrique:
     Pas de verrou nécessaire : la rubrique vient d'être créée dans la même transaction,
     aucune révision concurrente ne peut exister sur un pk inexistant.
     """
-    return RevisionRubrique.objects.create(
+    # Hash déjà calculé par Rubrique.save() à la création.
+    hash_contenu = rubrique.hash_contenu or compute_xml_hash(rubrique.contenu_xml)
+    revision = RevisionRubrique.objects.create(
         rubrique=rubrique,
         numero=1,
-        contenu_xml=rubrique.contenu_xml or "",
-        hash_contenu=compute_xml_hash(rubrique.contenu_xml),
+        hash_contenu=hash_contenu,
         auteur=user,
+        brouillon=bool(get_revision_coalescing_seconds()),
+        **_encoder_contenu_revision(rubrique_id=rubrique.pk, numero=1, xml=rubrique.contenu_xml),
     )
+    Rubrique.objects.filter(pk=rubrique.pk).update(revision_courante_numero=1)
+    rubrique.revision_courante_numero = 1
+    invalider_publication_diff(rubrique_id=rubrique.pk)
+    return revision
+
+
+# Durée de conservation des diffs en cache — la clé désigne des contenus,
+# jamais périmée ; seule la mémoire du cache borne cette durée.
+REVISION_DIFF_CACHE_TIMEOUT = 7 * 24 * 3600
+
+
+def diff_revisions(*, rubrique: Rubrique, numero_from: int, numero_to: int) -> dict:
+    """
+    Diff structurel (xml_diff) entre deux révisions d'une même rubrique.
+
+    Le résultat ne dépend que des deux contenus : il est mis en cache sous la
+    paire (hash_contenu from, hash_contenu to), partagé entre rubriques et
+    valable indéfiniment (un brouillon mis à jour change de hash, donc de clé).
+    Les plafonds de sortie (xml_diff.get_max_*) font partie de la clé.
+
+    Lève ValidationError si une révision est introuvable ou non parsable.
+    """
+    revisions = {
+        r.numero: r
+        for r in RevisionRubrique.objects.filter(
+            rubrique=rubrique, numero__in=(numero_from, numero_to)
+        ).defer("contenu_xml_brut", "donnees")
+    }
+    manquants = [n for n in (numero_from, numero_to) if n not in revisions]
+    if manquants:
+        raise ValidationError(
+            {"revision": [f"Révision {n} introuvable pour cette rubrique." for n in manquants]}
+        )
+    avant, apres = revisions[numero_from], revisions[numero_to]
+    max_operations, max_octets = xml_diff.get_max_operations(), xml_diff.get_max_octets()
+
+    cle = f"xml-diff:{avant.hash_contenu}:{apres.hash_contenu}:{max_operations}:{max_octets}"
+    resultat = cache.get(cle)
+    if resultat is None:
+        if avant.hash_contenu == apres.hash_contenu:
+            resultat = {"operations": [], "tronque": False}
+        else:
+            contenus = {
+                r.numero: r.contenu_xml
+                for r in RevisionRubrique.objects.filter(pk__in=(avant.pk, apres.pk))
+                .select_related("base", "blob__base")
+            }
+            try:
+                resultat = xml_diff.diff_xml(
+                    contenus[numero_from],
+                    contenus[numero_to],
+                    max_operations=max_operations,
+                    max_octets=max_octets,
+                )
+            except xml_diff.XmlDiffError as err:
+                raise ValidationError({"contenu_xml": [str(err)]}) from err
+            if resultat["tronque"]:
+                logger.warning(
+                    "[RevisionRubrique] Diff tronqué. rubrique_id=%s from=%s to=%s",
+                    rubrique.pk, numero_from, numero_to,
+                )
+        cache.set(
+            cle,
+            resultat,
+            getattr(settings, "REVISION_DIFF_CACHE_TIMEOUT", REVISION_DIFF_CACHE_TIMEOUT),
+        )
+
+    return {
+        "from": numero_from,
+        "to": numero_to,
+        "hash_from": avant.hash_contenu,
+        "hash_to": apres.hash_contenu,
+        **resultat,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Rétention de l'historique des révisions
+# ---------------------------------------------------------------------------
+
+# Âge (en jours) au-delà duquel les révisions intermédiaires sont purgeables.
+DEFAULT_REVISION_RETENTION_DAYS = 90
+
+
+def get_revision_retention_days() -> int:
+    return max(0, int(getattr(settings, "REVISION_RETENTION_DAYS", DEFAULT_REVISION_RETENTION_DAYS)))
+
+
+def _revisions_anciennes_annotees(*, avant):
+    """
+    Révisions créées avant `avant`, annotées des motifs qui les protègent
+    de la rétention. Toutes les conditions sont évaluées en SQL (EXISTS / JOIN).
+    """
+    meme_jour_plus_recente = RevisionRubrique.objects.filter(
+        rubrique=OuterRef("rubrique"),
+        numero__gt=OuterRef("numero"),
+        date_creation__date=OuterRef("jour"),
+    )
+    return (
+        RevisionRubrique.objects.filter(date_creation__lt=avant)
+        .annotate(
+            jour=TruncDate("date_creation"),
+            est_publiee=Exists(PublicationSnapshot.objects.filter(revision=OuterRef("pk"))),
+            est_base=Exists(RevisionRubrique.objects.filter(base=OuterRef("pk"))),
+            est_courante=Q(numero=F("rubrique__revision_courante_numero")),
+            est_derniere_du_jour=~Exists(meme_jour_plus_recente),
+        )
+    )
+
+
+def revisions_purgeables(*, avant, garder_quotidienne: bool = False):
+    """
+    QuerySet des révisions intermédiaires supprimables par la rétention.
+
+    Jamais supprimées :
+    - une révision référencée par un PublicationSnapshot ;
+    - la révision courante de sa rubrique (numero == revision_courante_numero) ;
+    - un brouillon (fenêtre de regroupement) ;
+    - une keyframe historique servant de base à un delta en ligne.
+    Avec garder_quotidienne, la dernière révision de chaque jour est conservée
+    (historique compacté à une révision par jour et par rubrique).
+    """
+    qs = _revisions_anciennes_annotees(avant=avant).filter(
+        est_publiee=False, est_base=False, est_courante=False, brouillon=False
+    )
+    if garder_quotidienne:
+        qs = qs.filter(est_derniere_du_jour=False)
+    return qs
+
+
+def statistiques_retention(*, avant, garder_quotidienne: bool = False) -> dict:
+    """
+    Statistiques de la politique de rétention, en deux requêtes agrégées :
+    révisions examinées, protégées par motif, et supprimables (nombre, octets).
+    """
+    stats = _revisions_anciennes_annotees(avant=avant).aggregate(
+        examinees=Count("pk"),
+        publiees=Count("pk", filter=Q(est_publiee=True)),
+        courantes=Count("pk", filter=Q(est_courante=True)),
+        brouillons=Count("pk", filter=Q(brouillon=True)),
+        bases_delta=Count("pk", filter=Q(est_base=True)),
+    )
+    purgeables = revisions_purgeables(avant=avant, garder_quotidienne=garder_quotidienne).aggregate(
+        nb=Count("pk"), octets=Coalesce(Sum("taille"), 0)
+    )
+    stats["purgeables"] = purgeables["nb"]
+    stats["octets_purgeables"] = purgeables["octets"]
+    return stats
+
+
+@transaction.atomic
+def purger_lot_revisions(
+    *, avant, garder_quotidienne: bool = False, apres_id: int = 0, taille_lot: int = 1000
+) -> dict:
+    """
+    Supprime le prochain lot de révisions purgeables, par pk croissant à partir
+    de apres_id (parcours par clé : coût constant par lot, reprise possible).
+
+    Les protections sont réévaluées dans la requête de suppression elle-même :
+    une révision devenue publiée ou courante entre la sélection et la
+    suppression est épargnée. Les compteurs de références des blobs libérés
+    sont décrémentés dans la même transaction.
+
+    Retourne {"supprimees", "octets", "dernier_id"} ; dernier_id vaut None
+    lorsqu'il ne reste plus rien à examiner.
+    """
+    purgeables = revisions_purgeables(avant=avant, garder_quotidienne=garder_quotidienne)
+    lot = list(
+        purgeables.filter(pk__gt=apres_id).order_by("pk").values_list("pk", flat=True)[:taille_lot]
+    )
+    if not lot:
+        return {"supprimees": 0, "octets": 0, "dernier_id": None}
+
+    cibles = list(
+        RevisionRubrique.objects.select_for_update()
+        .filter(pk__in=lot)
+        .filter(pk__in=purgeables.values("pk"))
+        .values_list("pk", "blob_id", "taille")
+    )
+    ids = [pk for pk, _, _ in cibles]
+    RevisionRubrique.objects.filter(pk__in=ids).delete()
+
+    liberes = Counter(blob_id for _, blob_id, _ in cibles if blob_id)
+    for blob_id, nb in liberes.items():
+        BlobXml.objects.filter(pk=blob_id).update(
+            nb_references=Greatest(F("nb_references") - nb, 0)
+        )
+
+    return {
+        "supprimees": len(ids),
+        "octets": sum(taille for _, _, taille in cibles),
+        "dernier_id": lot[-1],
+    }
 
 
 @transaction.atomic
@@ -199,6 +564,7 @@ def create_project(*, data: dict, user) -> dict:
         parent=None,
         ordre=1,
     )
+    incrementer_version_structure(map_ids=[map_obj.pk])
     logger.info(
         "[CreateProject] MapRubrique racine créée id=%s map_id=%s rubrique_id=%s",
         map_rubrique.id, map_obj.id, rubrique.id,
@@ -213,6 +579,284 @@ def create_project(*, data: dict, user) -> dict:
     }
 
 
+# ---------------------------------------------------------------------------
+# Clés d'ordre espacées (MapRubrique.ordre)
+# ---------------------------------------------------------------------------
+#
+# Les frères d'un niveau sont numérotés ORDRE_PAS, 2 × ORDRE_PAS, … : une
+# insertion ou un déplacement prend une clé dans l'écart entre ses voisins et
+# n'écrit qu'une ligne. Quand l'écart est épuisé, seule une fenêtre de frères
+# autour du point d'insertion est réespacée (_reequilibrer_niveau) ; la
+# commande rebalance_map_ordre renumérote à froid les niveaux épuisés.
+
+ORDRE_PAS = 1024
+ORDRE_MAX = 2**31 - 1  # PositiveIntegerField
+# Écart minimal laissé entre frères par un rééquilibrage local.
+ORDRE_ECART_MIN = ORDRE_PAS // 16
+
+
+def _ordre_entre(bas: int | None, haut: int | None) -> int | None:
+    """Clé strictement entre bas et haut (None : borne ouverte), ou None si l'écart est épuisé."""
+    bas = bas or 0
+    if haut is None:
+        return bas + ORDRE_PAS if bas + ORDRE_PAS <= ORDRE_MAX else None
+    return (bas + haut) // 2 if haut - bas >= 2 else None
+
+
+def _cles_renumerotees(n: int) -> list[int]:
+    pas = min(ORDRE_PAS, ORDRE_MAX // (n + 1))
+    return [pas * (i + 1) for i in range(n)]
+
+
+def _fenetre_reequilibree(freres: list, position: int) -> tuple[int, list[int]]:
+    """
+    (début, clés) de la plus petite fenêtre de frères autour de `position`
+    (écart où s'insère un nœud) dont les clés peuvent être réparties avec un
+    écart d'au moins ORDRE_ECART_MIN entre les bornes voisines. La fenêtre
+    double à chaque essai : le coût d'écriture reste local et amorti.
+    Aucune fenêtre ne suffit : tout le niveau est renuméroté.
+    """
+    n = len(freres)
+    taille = 8
+    while taille < 2 * n:
+        debut = max(0, min(position - taille // 2, n - taille))
+        fin = min(n, debut + taille)
+        bas = freres[debut - 1][1] if debut else 0
+        if fin == n:
+            pas = ORDRE_PAS if bas + (fin - debut + 1) * ORDRE_PAS <= ORDRE_MAX else 0
+        else:
+            pas = (freres[fin][1] - bas) // (fin - debut + 1)
+        if pas >= ORDRE_ECART_MIN:
+            return debut, [bas + pas * (k + 1) for k in range(fin - debut)]
+        taille *= 2
+    return 0, _cles_renumerotees(n)
+
+
+def _reequilibrer_niveau(map_id: int, parent_id: int | None, position_id: int | None = None) -> int:
+    """
+    Réespace les clés d'un niveau (bulk_update). position_id : frère devant
+    lequel le niveau manque de place ; seule une fenêtre autour de lui est
+    réécrite. Sans position_id, tout le niveau est renuméroté.
+    Retourne le nb de lignes écrites.
+    """
+    freres = list(
+        MapRubrique.objects.filter(map_id=map_id, parent_id=parent_id)
+        .order_by("ordre", "pk")
+        .values_list("id", "ordre")
+    )
+    if position_id is None:
+        debut, cles = 0, _cles_renumerotees(len(freres))
+    else:
+        position = next(i for i, (pk, _) in enumerate(freres) if pk == position_id)
+        debut, cles = _fenetre_reequilibree(freres, position)
+    modifies = [
+        MapRubrique(pk=pk, ordre=cle)
+        for (pk, ordre), cle in zip(freres[debut:debut + len(cles)], cles, strict=True)
+        if ordre != cle
+    ]
+    MapRubrique.objects.bulk_update(modifies, ["ordre"], batch_size=1000)
+    if modifies:
+        incrementer_version_structure(map_ids=[map_id])
+    logger.info(
+        "[MapRubrique] rééquilibrage map_id=%s parent_id=%s lignes=%s",
+        map_id, parent_id, len(modifies),
+    )
+    return len(modifies)
+
+
+def _cle_ordre(
+    map_id: int, parent_id: int | None, *, apres_id: int | None = None, avant_id: int | None = None
+) -> int:
+    """
+    Clé d'ordre d'un nœud placé au niveau (map_id, parent_id) : juste après
+    le frère apres_id, juste avant le frère avant_id, sinon en fin de niveau.
+    Lecture des seuls voisins (agrégats indexés) ; les clés voisines ne sont
+    réespacées que si l'écart est épuisé.
+    """
+    freres = MapRubrique.objects.filter(map_id=map_id, parent_id=parent_id)
+    for _ in range(2):
+        suivant = avant_id
+        if apres_id is not None:
+            bas = freres.values_list("ordre", flat=True).get(pk=apres_id)
+            suivant = (
+                freres.filter(ordre__gte=bas).exclude(pk=apres_id)
+                .order_by("ordre", "pk").values_list("id", flat=True).first()
+            )
+            haut = freres.values_list("ordre", flat=True).get(pk=suivant) if suivant else None
+        elif avant_id is not None:
+            haut = freres.values_list("ordre", flat=True).get(pk=avant_id)
+            bas = freres.filter(ordre__lte=haut).exclude(pk=avant_id).aggregate(m=Max("ordre"))["m"]
+        else:
+            bas, haut = freres.aggregate(m=Max("ordre"))["m"], None
+        cle = _ordre_entre(bas, haut)
+        if cle is not None:
+            return cle
+        _reequilibrer_niveau(map_id, parent_id, suivant)
+    raise RuntimeError("Clé d'ordre introuvable après rééquilibrage.")
+
+
+def _sous_suite_croissante(cles: list) -> set:
+    """Indices d'une plus longue sous-suite strictement croissante (None ignorés), O(n log n)."""
+    fins, indices, precedent = [], [], {}
+    for i, cle in enumerate(cles):
+        if cle is None:
+            continue
+        rang = bisect_left(fins, cle)
+        precedent[i] = indices[rang - 1] if rang else None
+        if rang == len(fins):
+            fins.append(cle)
+            indices.append(i)
+        else:
+            fins[rang], indices[rang] = cle, i
+    gardes = set()
+    i = indices[-1] if indices else None
+    while i is not None:
+        gardes.add(i)
+        i = precedent[i]
+    return gardes
+
+
+def _cles_ordre(cles: list) -> list[int]:
+    """
+    Clés d'un niveau donné dans son nouvel ordre, à partir des clés actuelles
+    (None : nœud nouveau ou venu d'un autre niveau). La plus longue
+    sous-suite croissante est conservée, les autres nœuds prennent une clé
+    dans les écarts : déplacer un nœud ne change qu'une clé. Écart
+    insuffisant : tout le niveau est renuméroté.
+    """
+    gardes = _sous_suite_croissante(cles)
+    resultat = list(cles)
+    bas, i = 0, 0
+    while i < len(cles):
+        if i in gardes:
+            bas = cles[i]
+            i += 1
+            continue
+        j = i
+        while j < len(cles) and j not in gardes:
+            j += 1
+        nb = j - i
+        if j < len(cles):
+            pas = (cles[j] - bas) // (nb + 1)
+        else:
+            pas = ORDRE_PAS if bas + nb * ORDRE_PAS <= ORDRE_MAX else 0
+        if pas < 1:
+            return _cles_renumerotees(len(cles))
+        resultat[i:j] = [bas + pas * (k + 1) for k in range(nb)]
+        bas = resultat[j - 1]
+        i = j
+    return resultat
+
+
+# ---------------------------------------------------------------------------
+# Version de structure (Map.version_structure)
+# ---------------------------------------------------------------------------
+
+def incrementer_version_structure(*, map_ids=None, rubrique_id: int | None = None) -> None:
+    """
+    Incrémente Map.version_structure des maps concernées (map_ids, et/ou maps
+    contenant rubrique_id), en un UPDATE. À appeler à chaque écriture sur
+    MapRubrique et à chaque changement d'un champ de rubrique affiché dans la
+    structure : la version sert d'ETag aux vues /structure/.
+    """
+    filtre = Q(pk__in=list(map_ids or ()))
+    if rubrique_id is not None:
+        filtre |= Q(pk__in=MapRubrique.objects.filter(rubrique_id=rubrique_id).values("map_id"))
+    Map.objects.filter(filtre).update(version_structure=F("version_structure") + 1)
+
+
+# ---------------------------------------------------------------------------
+# Index de chemin de la structure (MapRubrique.chemin, profondeur)
+# ---------------------------------------------------------------------------
+#
+# Chaque nœud porte le chemin de ses ancêtres ("12/57/") et sa profondeur.
+# Descendants, ancêtres et profondeur se lisent en une requête indexée ;
+# un déplacement réécrit le sous-arbre déplacé en un seul UPDATE.
+
+def descendants_map_rubrique(mr: MapRubrique):
+    """Descendants de `mr` (tous niveaux), en une requête sur l'index de chemin."""
+    return MapRubrique.objects.filter(map_id=mr.map_id, chemin__startswith=mr.prefixe_descendants)
+
+
+def ancetres_map_rubrique(mr: MapRubrique):
+    """Ancêtres de `mr`, de la racine au parent, en une requête par clé primaire."""
+    return MapRubrique.objects.filter(pk__in=mr.ancetres_ids).order_by("profondeur")
+
+
+def _chemin_sous(parent: MapRubrique | None) -> tuple[str, int]:
+    """(chemin, profondeur) d'un enfant de `parent` (None : racine)."""
+    if parent is None:
+        return "", 0
+    return parent.prefixe_descendants, parent.profondeur + 1
+
+
+def _deplacer_sous_arbre(mr: MapRubrique, nouveau_parent: MapRubrique | None) -> int:
+    """
+    Recalcule le chemin de `mr` sous `nouveau_parent` (sans l'enregistrer :
+    l'appelant sauve mr avec chemin et profondeur) et réécrit celui de ses
+    descendants en un UPDATE. Retourne le nb de descendants réécrits.
+    """
+    ancien_prefixe, ancienne_profondeur = mr.prefixe_descendants, mr.profondeur
+    mr.chemin, mr.profondeur = _chemin_sous(nouveau_parent)
+    return MapRubrique.objects.filter(
+        map_id=mr.map_id, chemin__startswith=ancien_prefixe
+    ).update(
+        chemin=Concat(Value(mr.prefixe_descendants), Substr("chemin", len(ancien_prefixe) + 1)),
+        profondeur=F("profondeur") + (mr.profondeur - ancienne_profondeur),
+    )
+
+
+def _chemins_calcules(parents: dict) -> dict:
+    """
+    {id: (chemin, profondeur)} recalculés depuis les pointeurs parent
+    ({id: parent_id}), en un parcours. Un nœud inaccessible depuis une racine
+    (cycle, parent hors de la map) est absent du résultat.
+    """
+    enfants = defaultdict(list)
+    for pk, parent_id in parents.items():
+        enfants[parent_id].append(pk)
+    resultat = {}
+    pile = [(pk, "", 0) for pk in enfants[None]]
+    while pile:
+        pk, chemin, profondeur = pile.pop()
+        resultat[pk] = (chemin, profondeur)
+        pile.extend((e, f"{chemin}{pk}/", profondeur + 1) for e in enfants.get(pk, ()))
+    return resultat
+
+
+def verifier_chemins_map(map_id: int, *, corriger: bool = False) -> dict:
+    """
+    Compare l'index de chemin d'une map aux pointeurs parent.
+    Retourne {"incoherents": [ids au chemin ou à la profondeur faux],
+    "hors_arbre": [ids inaccessibles depuis une racine]}. corriger=True
+    réécrit les nœuds incohérents (bulk_update), sous verrou de la map.
+    """
+    with transaction.atomic():
+        if corriger:
+            Map.objects.select_for_update().filter(pk=map_id).first()
+        noeuds = {
+            pk: (parent_id, chemin, profondeur)
+            for pk, parent_id, chemin, profondeur in MapRubrique.objects.filter(map_id=map_id)
+            .values_list("pk", "parent_id", "chemin", "profondeur")
+            .iterator(chunk_size=5000)
+        }
+        attendus = _chemins_calcules({pk: n[0] for pk, n in noeuds.items()})
+        incoherents = sorted(
+            pk for pk, attendu in attendus.items() if noeuds[pk][1:] != attendu
+        )
+        if corriger and incoherents:
+            MapRubrique.objects.bulk_update(
+                [MapRubrique(pk=pk, chemin=attendus[pk][0], profondeur=attendus[pk][1]) for pk in incoherents],
+                ["chemin", "profondeur"],
+                batch_size=1000,
+            )
+            incrementer_version_structure(map_ids=[map_id])
+            logger.info(
+                "[MapRubrique] chemins reconstruits map_id=%s lignes=%s", map_id, len(incoherents)
+            )
+    return {"incoherents": incoherents, "hors_arbre": sorted(set(noeuds) - set(attendus))}
+
+
 @transaction.atomic
 def add_rubrique_to_map(
     *,
@@ -260,15 +904,8 @@ def add_rubrique_to_map(
     # Verrouille toutes les entrées de la map pour un calcul d'ordre stable en concurrence
     MapRubrique.objects.select_for_update().filter(map_id=map_id)
 
-    # dans add_rubrique_to_map(), remplacer le calcul max :
-
     if ordre is None:
-        current_max = (
-            MapRubrique.objects.filter(map_id=map_id, parent_id=parent_id)
-            .aggregate(m=Max("ordre"))
-            .get("m")
-        )
-        ordre = (current_max or 0) + 1
+        ordre = _cle_ordre(map_id, parent_id)
 
     mr = MapRubrique.objects.create(
         map_id=map_id,
@@ -276,6 +913,8 @@ def add_rubrique_to_map(
         ordre=ordre,
         parent=parent,
     )
+    invalider_publication_diff(map_ids=[map_id])
+    incrementer_version_structure(map_ids=[map_id])
 
     logger.info(
         f"[MapRubrique] Ajout rubrique_id={rubrique_id} à map_id={map_id} ordre={ordre} parent_id={parent_id}"
@@ -365,23 +1004,19 @@ def create_rubrique_in_map(
     create_initial_revision(rubrique=rubrique, user=auteur)
 
     # --- siblings verrouillés pour ordre stable ---
-    siblings_qs = MapRubrique.objects.select_for_update().filter(
-        map_id=map_id, parent_id=parent_id
+    list(
+        MapRubrique.objects.select_for_update()
+        .filter(map_id=map_id, parent_id=parent_id)
+        .values_list("pk", flat=True)
     )
 
-    # --- calcul de l’ordre ---
-    if anchor is None:
-        # insertion en fin
-        current_max = siblings_qs.aggregate(m=Max("ordre")).get("m")
-        ordre = (current_max or 0) + 1
-    else:
-        if insert_before_id:
-            ordre = anchor.ordre
-        else:
-            ordre = anchor.ordre + 1
-
-        # décale les suivants
-        siblings_qs.filter(ordre__gte=ordre).update(ordre=F("ordre") + 1)
+    # --- calcul de l’ordre : clé dans l'écart entre les voisins, sans décaler les suivants ---
+    ordre = _cle_ordre(
+        map_id,
+        parent_id,
+        apres_id=anchor.pk if anchor is not None and insert_after_id else None,
+        avant_id=anchor.pk if anchor is not None and insert_before_id else None,
+    )
 
     # --- création du nœud MapRubrique ---
     mr = MapRubrique.objects.create(
@@ -390,6 +1025,8 @@ def create_rubrique_in_map(
         parent=parent,
         ordre=ordre,
     )
+    invalider_publication_diff(map_ids=[map_id])
+    incrementer_version_structure(map_ids=[map_id])
 
     logger.info(
         "[MapRubrique] create_rubrique_in_map map_id=%s rubrique_id=%s parent_id=%s ordre=%s",
@@ -446,18 +1083,22 @@ def indent_map_rubrique(*, map_id: int, map_rubrique_id: int) -> None:
     new_parent = previous_sibling
 
     # 🔒 verrouille les futurs enfants du nouveau parent
-    children_qs = MapRubrique.objects.select_for_update().filter(
-        map_id=map_id, parent_id=new_parent.id
+    list(
+        MapRubrique.objects.select_for_update()
+        .filter(map_id=map_id, parent_id=new_parent.id)
+        .values_list("pk", flat=True)
     )
 
-    # 📐 nouvel ordre = dernier enfant + 1
-    max_ordre = children_qs.aggregate(m=Max("ordre")).get("m")
-    new_ordre = (max_ordre or 0) + 1
+    # 📐 nouvel ordre = après le dernier enfant
+    new_ordre = _cle_ordre(map_id, new_parent.id)
 
-    # 🧠 mise à jour de la cible
+    # 🧠 mise à jour de la cible, chemin du sous-arbre compris
+    _deplacer_sous_arbre(mr, new_parent)
     mr.parent = new_parent
     mr.ordre = new_ordre
-    mr.save(update_fields=["parent", "ordre"])
+    mr.save(update_fields=["parent", "ordre", "chemin", "profondeur"])
+    invalider_publication_diff(map_ids=[map_id])
+    incrementer_version_structure(map_ids=[map_id])
 
     logger.info(
         "[MapRubrique] indent map_id=%s map_rubrique_id=%s → nouveau parent_id=%s ordre=%s",
@@ -512,20 +1153,22 @@ def outdent_map_rubrique(*, map_id: int, map_rubrique_id: int) -> None:
         )
 
     # 🔒 verrouillage des siblings du futur niveau
-    siblings_qs = MapRubrique.objects.select_for_update().filter(
-        map_id=map_id, parent_id=grandparent.id if grandparent else None
+    list(
+        MapRubrique.objects.select_for_update()
+        .filter(map_id=map_id, parent_id=grandparent.id)
+        .values_list("pk", flat=True)
     )
 
-    # 📐 nouvel ordre = juste après le parent
-    new_ordre = parent.ordre + 1
-
-    # 🔁 décale les suivants
-    siblings_qs.filter(ordre__gte=new_ordre).update(ordre=F("ordre") + 1)
+    # 📐 nouvel ordre = juste après le parent, sans décaler les suivants
+    new_ordre = _cle_ordre(map_id, grandparent.id, apres_id=parent.id)
 
-    # 🧠 mise à jour de la cible
+    # 🧠 mise à jour de la cible, chemin du sous-arbre compris
+    _deplacer_sous_arbre(mr, grandparent)
     mr.parent = grandparent
     mr.ordre = new_ordre
-    mr.save(update_fields=["parent", "ordre"])
+    mr.save(update_fields=["parent", "ordre", "chemin", "profondeur"])
+    invalider_publication_diff(map_ids=[map_id])
+    incrementer_version_structure(map_ids=[map_id])
 
     logger.info(
         "[MapRubrique] outdent map_id=%s map_rubrique_id=%s → nouveau parent_id=%s ordre=%s",
@@ -540,7 +1183,7 @@ def reorder_map_rubriques(
     """
     Réordonne les enfants d’un même parent dans une map.
     - Ne modifie pas la hiérarchie
-    - Met à jour uniquement le champ 'ordre'
+    - Met à jour uniquement le champ 'ordre', des seules lignes déplacées
     """
 
     if not ordered_ids:
@@ -562,12 +1205,26 @@ def reorder_map_rubriques(
     if len(set(ordered_ids)) != len(ordered_ids):
         raise ValidationError({"orderedIds": ["La liste contient des doublons."]})
 
-    # 🔄 application de l’ordre
-    ordre_map = {rid: idx + 1 for idx, rid in enumerate(ordered_ids)}
-
-    for mr in rubriques:
-        mr.ordre = ordre_map[mr.id]
-        mr.save(update_fields=["ordre"])
+    # 🔄 les éléments listés reprennent, dans le nouvel ordre, les places qu'ils
+    # occupaient ; seules les clés qui changent sont écrites (bulk_update).
+    freres = list(
+        MapRubrique.objects.select_for_update()
+        .filter(map_id=map_id, parent_id=parent_id)
+        .order_by("ordre", "pk")
+        .only("id", "ordre")
+    )
+    ids = set(ordered_ids)
+    listes = {mr.id: mr for mr in freres if mr.id in ids}
+    suite = iter(ordered_ids)
+    niveau = [listes[next(suite)] if mr.id in listes else mr for mr in freres]
+    modifies = []
+    for mr, cle in zip(niveau, _cles_ordre([mr.ordre for mr in niveau]), strict=True):
+        if mr.ordre != cle:
+            mr.ordre = cle
+            modifies.append(mr)
+    MapRubrique.objects.bulk_update(modifies, ["ordre"], batch_size=1000)
+    invalider_publication_diff(map_ids=[map_id])
+    incrementer_version_structure(map_ids=[map_id])
 
     logger.info(
         "[MapRubrique] reorder map_id=%s parent_id=%s count=%s",
@@ -575,6 +1232,288 @@ def reorder_map_rubriques(
     )
 
 
+DEFAULT_STRUCTURE_BATCH_MAX_OPERATIONS = 500
+
+
+def get_structure_batch_max_operations() -> int:
+    return getattr(settings, "STRUCTURE_BATCH_MAX_OPERATIONS", DEFAULT_STRUCTURE_BATCH_MAX_OPERATIONS)
+
+
+class _ArbreMap:
+    """
+    Structure d'une map en mémoire, le temps d'un lot d'opérations
+    (apply_map_structure_batch). Les nœuds sont désignés par leur id, ou par
+    leur référence temporaire (entier négatif) s'ils sont créés dans le lot.
+    Seuls les niveaux modifiés sont renumérotés à l'écriture.
+    """
+
+    def __init__(self, noeuds):
+        self.noeuds = {n.pk: n for n in noeuds}
+        self.parent = {n.pk: n.parent_id for n in noeuds}
+        self.enfants = defaultdict(list)
+        for n in sorted(noeuds, key=lambda n: (n.ordre, n.pk)):
+            self.enfants[n.parent_id].append(n.pk)
+        self.rubriques = {n.rubrique_id for n in noeuds}
+        self.niveaux_modifies = set()
+        self.nouveaux = []
+        # Clé d'ordre demandée pour un nœud attaché (op attach avec ordre).
+        self.ordres_demandes = {}
+
+    def cle(self, valeur, champ: str):
+        if valeur not in self.parent:
+            raise ValidationError({champ: ["Élément introuvable dans cette map."]})
+        return valeur
+
+    def cle_ordre(self, cle):
+        """Clé d'ordre d'un nœud dans son niveau (None : nœud créé sans clé)."""
+        if cle in self.nouveaux:
+            return self.ordres_demandes.get(cle)
+        return self.noeuds[cle].ordre
+
+    def retirer(self, cle) -> None:
+        # Un nœud déplacé perd la clé demandée à son attachement.
+        self.ordres_demandes.pop(cle, None)
+        self.enfants[self.parent[cle]].remove(cle)
+        self.niveaux_modifies.add(self.parent[cle])
+
+    def inserer(self, cle, parent, position: int) -> None:
+        self.parent[cle] = parent
+        self.enfants[parent].insert(position, cle)
+        self.niveaux_modifies.add(parent)
+
+    def ajouter(self, *, rubrique_id: int, parent, position: int, ref: int | None):
+        if ref is not None and ref in self.parent:
+            raise ValidationError({"ref": ["Référence déjà utilisée dans le lot."]})
+        cle = ref if ref is not None else object()
+        self.noeuds[cle] = MapRubrique(rubrique_id=rubrique_id, ordre=0)
+        self.nouveaux.append(cle)
+        self.rubriques.add(rubrique_id)
+        self.inserer(cle, parent, position)
+        return cle
+
+
+def _lot_reorder(arbre: _ArbreMap, op: dict, **_) -> None:
+    parent = op.get("parentId")
+    if parent is not None:
+        parent = arbre.cle(parent, "parentId")
+    ordered = [arbre.cle(i, "orderedIds") for i in op["orderedIds"]]
+    if len(set(ordered)) != len(ordered):
+        raise ValidationError({"orderedIds": ["La liste contient des doublons."]})
+    if any(arbre.parent[c] != parent for c in ordered):
+        raise ValidationError({"orderedIds": ["Liste incohérente ou rubriques introuvables."]})
+    # Les éléments listés reprennent, dans le nouvel ordre, les places qu'ils occupaient.
+    freres = arbre.enfants[parent]
+    index = {c: i for i, c in enumerate(freres)}
+    places = sorted(index[c] for c in ordered)
+    for place, cle in zip(places, ordered, strict=True):
+        freres[place] = cle
+    arbre.niveaux_modifies.add(parent)
+
+
+def _lot_indent(arbre: _ArbreMap, op: dict, **_) -> None:
+    cle = arbre.cle(op["mapRubriqueId"], "mapRubriqueId")
+    freres = arbre.enfants[arbre.parent[cle]]
+    index = freres.index(cle)
+    if index == 0:
+        raise ValidationError(
+            {"mapRubriqueId": ["Impossible d'indenter le premier élément du niveau."]}
+        )
+    nouveau_parent = freres[index - 1]
+    arbre.retirer(cle)
+    arbre.inserer(cle, nouveau_parent, len(arbre.enfants[nouveau_parent]))
+
+
+def _lot_outdent(arbre: _ArbreMap, op: dict, **_) -> None:
+    cle = arbre.cle(op["mapRubriqueId"], "mapRubriqueId")
+    parent = arbre.parent[cle]
+    if parent is None:
+        raise ValidationError(
+            {"mapRubriqueId": ["Impossible de désindenter un élément racine."]}
+        )
+    grand_parent = arbre.parent[parent]
+    if grand_parent is None:
+        raise ValidationError(
+            {"mapRubriqueId": ["Impossible de désindenter : la rubrique est déjà au premier niveau."]}
+        )
+    arbre.retirer(cle)
+    arbre.inserer(cle, grand_parent, arbre.enfants[grand_parent].index(parent) + 1)
+
+
+def _lot_attach(arbre: _ArbreMap, op: dict, *, map_obj, rubriques_projet, **_) -> None:
+    rubrique_id = op["rubrique_id"]
+    if rubrique_id not in rubriques_projet:
+        raise ValidationError(
+            {"rubrique": ["Rubrique introuvable ou d'un autre projet que la map."]}
+        )
+    if rubrique_id in arbre.rubriques:
+        raise ValidationError(
+            {"rubrique": ["Cette rubrique est déjà présente dans cette map."]}
+        )
+    parent = op.get("parent_id")
+    if parent is not None:
+        parent = arbre.cle(parent, "parent")
+    # ordre est une clé de tri, comme pour l'endpoint unitaire : le nœud se
+    # place après les frères de clé inférieure ou égale (tri par ordre, pk).
+    ordre = op.get("ordre")
+    freres = arbre.enfants[parent]
+    position = len(freres)
+    if ordre is not None:
+        position = next(
+            (i for i, c in enumerate(freres) if (arbre.cle_ordre(c) or 0) > ordre), len(freres)
+        )
+    cle = arbre.ajouter(rubrique_id=rubrique_id, parent=parent, position=position, ref=op.get("ref"))
+    if ordre is not None:
+        arbre.ordres_demandes[cle] = ordre
+
+
+def _lot_create(arbre: _ArbreMap, op: dict, *, map_obj, version_active, auteur, **_) -> None:
+    if op.get("insert_after") is not None and op.get("insert_before") is not None:
+        raise ValidationError(
+            {"insert": ["Choisir insert_after OU insert_before (pas les deux)."]}
+        )
+    if version_active is None:
+        raise ValidationError(
+            {"version_projet": ["Aucune version active pour ce projet."]}
+        )
+    parent = op.get("parent")
+    if parent is not None:
+        parent = arbre.cle(parent, "parent")
+    ancre = op.get("insert_after") if op.get("insert_after") is not None else op.get("insert_before")
+    if ancre is None:
+        position = len(arbre.enfants[parent])
+    else:
+        ancre = arbre.cle(ancre, "insert")
+        if op.get("parent") is None:
+            parent = arbre.parent[ancre]
+        if arbre.parent[ancre] != parent:
+            raise ValidationError({"insert": ["Ancre et parent incohérents."]})
+        position = arbre.enfants[parent].index(ancre) + (op.get("insert_after") is not None)
+
+    rubrique = Rubrique.objects.create(
+        projet=map_obj.projet,
+        version_projet=version_active,
+        titre=op["titre"],
+        contenu_xml=op["contenu_xml"],
+        auteur=auteur,
+        is_active=True,
+        is_archived=False,
+        revision_numero=1,
+        version_precedente=None,
+    )
+    create_initial_revision(rubrique=rubrique, user=auteur)
+    arbre.ajouter(rubrique_id=rubrique.pk, parent=parent, position=position, ref=op.get("ref"))
+
+
+_OPERATIONS_STRUCTURE = {
+    "reorder": _lot_reorder,
+    "indent": _lot_indent,
+    "outdent": _lot_outdent,
+    "attach": _lot_attach,
+    "create": _lot_create,
+}
+
+
+@transaction.atomic
+def apply_map_structure_batch(*, map_id: int, operations: list[dict], auteur) -> dict:
+    """
+    Applique un lot ordonné d'opérations de structure en une transaction :
+    reorder, indent, outdent, attach, create (mêmes règles que les services
+    unitaires). Chaque opération est un dict {"op": ..., <payload de l'endpoint
+    unitaire>} ; attach et create acceptent "ref" (entier négatif) pour désigner
+    le nouveau nœud dans les opérations suivantes.
+
+    - Un seul verrouillage : la map et toutes ses lignes MapRubrique.
+    - Les opérations sont validées et appliquées sur l'arbre en mémoire.
+    - Écriture finale : bulk_create des nouveaux nœuds, bulk_update des
+      seules lignes dont le parent, la clé d'ordre (_cles_ordre) ou le
+      chemin (sous-arbres déplacés) a changé.
+    Une opération invalide annule tout le lot (ValidationError indiquant son rang).
+
+    Retourne {"refs": {ref: id du nœud créé}, "lignes_modifiees": int,
+    "version": Map.version_structure après le lot}.
+    """
+    if len(operations) > get_structure_batch_max_operations():
+        raise ValidationError(
+            {"operations": [f"Au plus {get_structure_batch_max_operations()} opérations par lot."]}
+        )
+    try:
+        map_obj = Map.objects.select_for_update().select_related("projet").get(pk=map_id)
+    except Map.DoesNotExist:
+        raise ValidationError({"map": ["Map introuvable."]}) from None
+
+    arbre = _ArbreMap(
+        MapRubrique.objects.select_for_update()
+        .filter(map_id=map_id)
+        .only("id", "parent_id", "rubrique_id", "ordre", "chemin", "profondeur")
+    )
+    contexte = {"map_obj": map_obj, "auteur": auteur}
+    if any(op["op"] == "attach" for op in operations):
+        contexte["rubriques_projet"] = set(
+            Rubrique.objects.filter(
+                projet_id=map_obj.projet_id,
+                pk__in=[op["rubrique_id"] for op in operations if op["op"] == "attach"],
+            ).values_list("pk", flat=True)
+        )
+    if any(op["op"] == "create" for op in operations):
+        contexte["version_active"] = get_active_version(map_obj.projet)
+
+    for rang, op in enumerate(operations):
+        try:
+            _OPERATIONS_STRUCTURE[op["op"]](arbre, op, **contexte)
+        except ValidationError as err:
+            raise ValidationError({"operations": {rang: {"op": op["op"], **err.detail}}}) from err
+
+    # --- Écriture : nouveaux nœuds, puis parent et ordre des niveaux modifiés ---
+    crees = MapRubrique.objects.bulk_create(
+        [MapRubrique(map_id=map_id, rubrique_id=arbre.noeuds[c].rubrique_id, ordre=0) for c in arbre.nouveaux]
+    )
+    pks = {cle: mr.pk for cle, mr in zip(arbre.nouveaux, crees, strict=True)}
+    for cle, mr in zip(arbre.nouveaux, crees, strict=True):
+        arbre.noeuds[cle] = mr
+
+    modifiees = {}
+    for parent in arbre.niveaux_modifies:
+        parent_id = pks.get(parent, parent)
+        noeuds = [arbre.noeuds[cle] for cle in arbre.enfants[parent]]
+        # Clé actuelle conservable seulement pour un nœud resté dans ce niveau ;
+        # un nœud attaché garde si possible la clé demandée.
+        cles = _cles_ordre([
+            arbre.ordres_demandes.get(cle) if cle in pks
+            else n.ordre if n.parent_id == parent_id else None
+            for n, cle in zip(noeuds, arbre.enfants[parent], strict=True)
+        ])
+        for noeud, ordre in zip(noeuds, cles, strict=True):
+            if noeud.parent_id != parent_id or noeud.ordre != ordre:
+                noeud.parent_id, noeud.ordre = parent_id, ordre
+                modifiees[noeud.pk] = noeud
+
+    # Index de chemin : seuls les sous-arbres déplacés ou créés diffèrent.
+    if modifiees:
+        noeuds = {n.pk: n for n in arbre.noeuds.values()}
+        chemins = _chemins_calcules({pk: n.parent_id for pk, n in noeuds.items()})
+        for pk, (chemin, profondeur) in chemins.items():
+            noeud = noeuds[pk]
+            if (noeud.chemin, noeud.profondeur) != (chemin, profondeur):
+                noeud.chemin, noeud.profondeur = chemin, profondeur
+                modifiees[pk] = noeud
+    modifiees = list(modifiees.values())
+    MapRubrique.objects.bulk_update(
+        modifiees, ["parent", "ordre", "chemin", "profondeur"], batch_size=1000
+    )
+    invalider_publication_diff(map_ids=[map_id])
+    incrementer_version_structure(map_ids=[map_id])
+
+    logger.info(
+        "[MapRubrique] batch map_id=%s operations=%s crees=%s lignes_modifiees=%s",
+        map_id, len(operations), len(crees), len(modifiees),
+    )
+    return {
+        "refs": {cle: pks[cle] for cle in arbre.nouveaux if isinstance(cle, int)},
+        "lignes_modifiees": len(modifiees),
+        "version": Map.objects.values_list("version_structure", flat=True).get(pk=map_id),
+    }
+
+
 # ---------------------------------------------------------------------------
 # Publication versionnante — Lot 3
 # ---------------------------------------------------------------------------
@@ -594,59 +1533,121 @@ def bump_minor_version(version_str: str) -> str:
 
 def _get_last_published_version(projet: Projet) -> "VersionProjet | None":
     """
-    Retourne la dernière VersionProjet publiée pour ce projet.
-    Critères : is_active=False + au moins un PublicationSnapshot attaché.
-    Tri par date_lancement décroissante — None si aucune publication antérieure.
+    Retourne la dernière VersionProjet publiée pour ce projet, via le pointeur
+    Projet.derniere_publication (registre des publications) : lectures par clé
+    primaire uniquement, relues en base (l'instance `projet` peut être ancienne).
+
+    Un pointeur NULL ne signifie pas « jamais publié » : la dernière ligne du
+    registre a pu être supprimée (SET_NULL). On retombe alors sur la version de
+    plus haut rang de publication. None si aucune publication antérieure.
     """
-    return (
-        VersionProjet.objects.filter(
-            projet=projet,
-            is_active=False,
-            publication_snapshots__isnull=False,
+    pointeur = Projet.objects.filter(pk=projet.pk).values(
+        "derniere_publication__version_projet_id"
+    )
+    version = VersionProjet.objects.filter(pk=Subquery(pointeur)).first()
+    if version is None:
+        version = (
+            VersionProjet.objects.filter(projet_id=projet.pk, rang_publication__isnull=False)
+            .order_by("-rang_publication")
+            .first()
         )
-        .order_by("-date_lancement")
-        .distinct()
-        .first()
+    return version
+
+
+def _enregistrer_publication(
+    *, projet: Projet, version: VersionProjet, user, formats, nouvelle_version: bool, nb_snapshots: int
+) -> Publication:
+    """
+    Ajoute un événement au registre des publications et y fait pointer
+    Projet.derniere_publication (même transaction que le versionnage).
+    """
+    publication = Publication.objects.create(
+        projet=projet,
+        version_projet=version,
+        nouvelle_version=nouvelle_version,
+        nb_snapshots=nb_snapshots,
+        formats=list(formats),
+        auteur=user if getattr(user, "pk", None) else None,
     )
+    Projet.objects.filter(pk=projet.pk).update(derniere_publication=publication)
+    projet.derniere_publication = publication
+    return publication
 
 
-def _build_rubrique_revision_map(map_obj: Map) -> dict:
+def _build_rubrique_revision_map(map_obj: Map, rubrique_ids=None) -> dict:
     """
-    Construit {rubrique_id: RevisionRubrique} pour toutes les rubriques de la map.
-    Sélectionne la révision la plus récente (numéro max) par rubrique.
-    Une seule requête DB via Subquery/annotation — zéro N+1.
+    Construit {rubrique_id: RevisionRubrique} pour toutes les rubriques de la map
+    (ou celles de rubrique_ids seulement, ex. le delta d'une publication).
+    Sélectionne la révision courante de chaque rubrique.
+
+    Une seule requête, résolue côté base :
+    - la révision courante est désignée par Rubrique.revision_courante_numero,
+      tenu à jour sous verrou à chaque création de révision : jointure directe
+      sur l'index unique (rubrique, numero), sans recherche du numéro max ;
+    - l'appartenance à la map est une semi-jointure (EXISTS) sur MapRubrique :
+      ni liste d'identifiants côté Python, ni doublon si une rubrique figure
+      plusieurs fois dans la map.
 
     Périmètre v1 : map passée en paramètre (map master en production).
     """
-    rubrique_ids = list(
-        MapRubrique.objects.filter(map=map_obj).values_list("rubrique_id", flat=True)
+    dans_la_map = MapRubrique.objects.filter(map=map_obj, rubrique_id=OuterRef("rubrique_id"))
+    revisions = RevisionRubrique.objects.filter(
+        Exists(dans_la_map), numero=F("rubrique__revision_courante_numero")
     )
-    if not rubrique_ids:
-        return {}
+    if rubrique_ids is not None:
+        revisions = revisions.filter(rubrique_id__in=rubrique_ids)
+    return {r.rubrique_id: r for r in revisions}
 
-    # Sous-requête : numéro max de révision pour la même rubrique
-    latest_num_sq = (
-        RevisionRubrique.objects.filter(rubrique_id=OuterRef("rubrique_id"))
-        .order_by("-numero")
-        .values("numero")[:1]
-    )
 
-    revisions = (
-        RevisionRubrique.objects.filter(rubrique_id__in=rubrique_ids)
-        .annotate(_max_num=Subquery(latest_num_sq))
-        .filter(numero=F("_max_num"))
+def _rubriques_publiables(map_obj: Map):
+    """Rubriques de la map possédant une révision courante (semi-jointure MapRubrique)."""
+    return Rubrique.objects.filter(
+        Exists(MapRubrique.objects.filter(map=map_obj, rubrique_id=OuterRef("pk"))),
+        revision_courante_numero__gt=0,
     )
 
-    return {r.rubrique_id: r for r in revisions}
+
+def _requetes_changements(map_obj: Map, last_published: "VersionProjet | None") -> dict:
+    """
+    Requêtes (non évaluées) des rubriques_id nouvelles / modifiées / retirées.
+
+    - nouvelles : anti-jointure map → snapshots de la dernière publication.
+    - modifiees : snapshots dont la révision publiée n'est plus la révision
+      courante (inégalité numero ≠ revision_courante_numero, unique par rubrique).
+    - retirees  : anti-jointure snapshots → map.
+    Snapshots de la dernière publication : ensemble complet résolu depuis les
+    deltas (snapshots_publies), en sous-requête.
+    """
+    courantes = _rubriques_publiables(map_obj)
+    if last_published is None:
+        return {
+            "nouvelles": courantes.values_list("pk", flat=True),
+            "modifiees": Rubrique.objects.none().values_list("pk", flat=True),
+            "retirees": Rubrique.objects.none().values_list("pk", flat=True),
+        }
+    snapshots = snapshots_publies(last_published)
+    dans_la_map = Exists(courantes.filter(pk=OuterRef("rubrique_id")))
+    return {
+        "nouvelles": courantes.filter(
+            ~Exists(snapshots.filter(rubrique_id=OuterRef("pk")))
+        ).values_list("pk", flat=True),
+        "modifiees": snapshots.filter(dans_la_map)
+        .exclude(revision__numero=F("rubrique__revision_courante_numero"))
+        .values_list("rubrique_id", flat=True),
+        "retirees": snapshots.filter(~dans_la_map).values_list("rubrique_id", flat=True),
+    }
 
 
 def _detect_changes(
-    rubrique_revision_map: dict,
+    map_obj: Map,
     last_published: "VersionProjet | None",
+    *,
+    details: bool = True,
 ) -> dict:
     """
-    Compare l'état courant de la map (rubrique_revision_map) avec la dernière
-    publication (last_published).
+    Compare l'état courant de la map (révisions courantes de ses rubriques) avec
+    la dernière publication (last_published), entièrement en base : aucun
+    snapshot n'est chargé en mémoire.
 
     Retourne :
     {
@@ -655,51 +1656,35 @@ def _detect_changes(
         "retirees":   [rubrique_id, ...],   # dans la dernière pub, absentes de la map
         "has_changes": bool,
     }
+    Avec details=False, les listes sont remplacées par leurs effectifs (COUNT).
 
     Cas première publication (last_published is None) : tout est "nouvelle".
     """
-    if last_published is None:
-        return {
-            "nouvelles": list(rubrique_revision_map.keys()),
-            "modifiees": [],
-            "retirees": [],
-            "has_changes": bool(rubrique_revision_map),
+    requetes = _requetes_changements(map_obj, last_published)
+    if details:
+        changes = {
+            cle: list(qs.order_by().iterator(chunk_size=5000)) for cle, qs in requetes.items()
         }
-
-    # {rubrique_id: revision_id} au moment de la dernière publication
-    published_map = {
-        snap.rubrique_id: snap.revision_id
-        for snap in last_published.publication_snapshots.all()
-    }
-
-    current_ids = set(rubrique_revision_map.keys())
-    published_ids = set(published_map.keys())
-
-    nouvelles = list(current_ids - published_ids)
-    retirees = list(published_ids - current_ids)
-    modifiees = [
-        rid for rid in current_ids & published_ids
-        if rubrique_revision_map[rid].id != published_map[rid]
-    ]
-
-    return {
-        "nouvelles": nouvelles,
-        "modifiees": modifiees,
-        "retirees": retirees,
-        "has_changes": bool(nouvelles or modifiees or retirees),
-    }
+    else:
+        changes = {cle: qs.order_by().count() for cle, qs in requetes.items()}
+    changes["has_changes"] = any(changes[cle] for cle in requetes)
+    return changes
 
 
 @transaction.atomic
 def _create_publication_snapshot(
-    *, projet: Projet, rubrique_revision_map: dict, user
+    *, projet: Projet, rubrique_revision_map: dict, user, retirees=()
 ) -> tuple:
     """
     Opération atomique de versionnage métier :
 
-    1. Verrouille et fige la VersionProjet WIP courante (is_active=False).
-    2. Crée un PublicationSnapshot pour chaque rubrique de la map.
-    3. Crée la prochaine VersionProjet WIP (version mineure incrémentée, is_active=True).
+    1. Verrouille et fige la VersionProjet WIP courante (is_active=False) et lui
+       attribue le rang de publication suivant.
+    2. Scelle les révisions brouillon publiées (fenêtre de regroupement).
+    3. Crée les PublicationSnapshot du delta sur la publication précédente :
+       rubrique_revision_map = rubriques ajoutées ou modifiées,
+       retirees = rubriques retirées (revision NULL).
+    4. Crée la prochaine VersionProjet WIP (version mineure incrémentée, is_active=True).
 
     Invariants :
     - Si publish_project() échoue avant cette fonction → aucune écriture.
@@ -720,21 +1705,38 @@ def _create_publication_snapshot(
             {"version": ["Aucune version active (WIP) trouvée pour ce projet."]}
         )
 
+    # Rang dérivé des versions publiées elles-mêmes (sous le verrou WIP), jamais
+    # du pointeur de registre : un rang ne peut pas être réattribué.
+    rang_max = VersionProjet.objects.filter(projet=projet).aggregate(rang=Max("rang_publication"))["rang"]
     wip_version.is_active = False
     wip_version.date_lancement = now()
-    wip_version.save(update_fields=["is_active", "date_lancement"])
-
-    # 2. Création des snapshots (un par rubrique)
-    PublicationSnapshot.objects.bulk_create([
-        PublicationSnapshot(
-            version_projet=wip_version,
-            rubrique_id=rubrique_id,
-            revision=revision,
-        )
-        for rubrique_id, revision in rubrique_revision_map.items()
-    ])
+    wip_version.rang_publication = (rang_max or 0) + 1
+    wip_version.save(update_fields=["is_active", "date_lancement", "rang_publication"])
+
+    # 2. Scellement des brouillons publiés : une révision référencée par un
+    #    snapshot n'est plus jamais modifiée en place.
+    RevisionRubrique.objects.filter(
+        pk__in=[revision.pk for revision in rubrique_revision_map.values()],
+        brouillon=True,
+    ).update(brouillon=False)
+
+    # 3. Création des snapshots (delta : ajouts/modifications, puis retraits)
+    PublicationSnapshot.objects.bulk_create(
+        [
+            PublicationSnapshot(
+                version_projet=wip_version,
+                rubrique_id=rubrique_id,
+                revision=revision,
+            )
+            for rubrique_id, revision in rubrique_revision_map.items()
+        ]
+        + [
+            PublicationSnapshot(version_projet=wip_version, rubrique_id=rubrique_id, revision=None)
+            for rubrique_id in retirees
+        ]
+    )
 
-    # 3. Nouvelle version WIP
+    # 4. Nouvelle version WIP
     new_version_numero = bump_minor_version(wip_version.version_numero)
     new_wip = VersionProjet.objects.create(
         projet=projet,
@@ -744,9 +1746,11 @@ def _create_publication_snapshot(
     )
 
     logger.info(
-        "[Publication] Version %s figée (%s snapshots). Prochaine WIP : %s. projet_id=%s user=%s",
+        "[Publication] Version %s figée (delta : %s snapshot(s), %s retrait(s)). "
+        "Prochaine WIP : %s. projet_id=%s user=%s",
         wip_version.version_numero,
         len(rubrique_revision_map),
+        len(retirees),
         new_version_numero,
         projet.pk,
         getattr(user, "username", str(user)),
@@ -755,46 +1759,41 @@ def _create_publication_snapshot(
     return (wip_version, new_wip)
 
 
-def publish_project(
-    *, projet: Projet, map_obj: Map, format_output: str, user
-) -> dict:
+@transaction.atomic
+def _versionner_publication(*, projet: Projet, map_obj: Map, user, formats) -> dict:
     """
-    Service central de publication — point d'entrée unique.
-
-    Séparation nette entre les deux responsabilités :
-    - Versionnage métier (atomique) : décide s'il y a changement, fige la version,
-      crée les snapshots, ouvre la prochaine WIP. → _create_publication_snapshot()
-    - Export technique DITA : délégué à export_map_to_dita() APRÈS la transaction.
-      Un échec d'export ne remet PAS en cause le versionnage.
-
-    Flux :
-    1. Collecter les révisions courantes de la map.
+    Phases 1 à 3 de la publication (versionnage métier) :
+    1. Vérifier que la map contient des rubriques publiables.
     2. Détecter les changements vs dernière publication.
-    3. Si changements → versionnage atomique.
-    4. Export DITA (hors transaction).
-    5. Retourner un dict de résultat complet.
+    3. Si changements → révisions courantes des rubriques ajoutées ou modifiées
+       + versionnage atomique, snapshots en delta (_create_publication_snapshot).
+    Dans tous les cas, l'événement est inscrit au registre des publications.
 
-    Si aucun changement : republication de la map sans bump de version.
+    Retourne {"version_publiee": VersionProjet, "nouvelle_wip": VersionProjet | None,
+    "changements": dict, "publication": Publication}.
     """
-    # --- Phase 1 : révisions courantes de la map ---
-    rubrique_revision_map = _build_rubrique_revision_map(map_obj)
-
-    if not rubrique_revision_map:
+    # --- Phase 1 : la map doit contenir au moins une rubrique publiable ---
+    if not _rubriques_publiables(map_obj).exists():
         raise ValidationError(
             {"map": ["La map ne contient aucune rubrique publiable."]}
         )
 
-    # --- Phase 2 : comparaison avec la dernière publication ---
+    # --- Phase 2 : comparaison avec la dernière publication (en base) ---
     last_published = _get_last_published_version(projet)
-    changes = _detect_changes(rubrique_revision_map, last_published)
+    changes = _detect_changes(map_obj, last_published)
 
     # --- Phase 3 : versionnage métier [atomique] ---
     if changes["has_changes"]:
+        # Révisions courantes chargées pour le delta seulement.
         published_version, new_wip = _create_publication_snapshot(
             projet=projet,
-            rubrique_revision_map=rubrique_revision_map,
+            rubrique_revision_map=_build_rubrique_revision_map(
+                map_obj, rubrique_ids=changes["nouvelles"] + changes["modifiees"]
+            ),
             user=user,
+            retirees=changes["retirees"],
         )
+        invalider_publication_diff(map_ids=[map_obj.pk])
     else:
         # Aucun changement : republication sans bump de version
         published_version = last_published
@@ -804,45 +1803,407 @@ def publish_project(
             projet.pk,
         )
 
-    # --- Phase 4 : export technique DITA (hors transaction) ---
-    export_result = export_map_to_dita(map_obj.pk, output_format=format_output)
+    publication = _enregistrer_publication(
+        projet=projet,
+        version=published_version,
+        user=user,
+        formats=formats,
+        nouvelle_version=new_wip is not None,
+        nb_snapshots=snapshots_publies(published_version).count(),
+    )
+    return {
+        "version_publiee": published_version,
+        "nouvelle_wip": new_wip,
+        "changements": changes,
+        "publication": publication,
+    }
+
 
+def _resultat_versionnage(versionnage: dict) -> dict:
+    published_version = versionnage["version_publiee"]
+    new_wip = versionnage["nouvelle_wip"]
     return {
-        "status": "ok",
         "version_publiee": published_version.version_numero if published_version else None,
         "nouvelle_version_wip": new_wip.version_numero if new_wip else None,
-        "has_changes": changes["has_changes"],
-        "changements": changes,
-        "export": export_result,
+        "has_changes": versionnage["changements"]["has_changes"],
+        "changements": versionnage["changements"],
     }
 
 
-def get_publication_diff(*, projet: Projet, map_obj: Map) -> dict:
+def _resultat_magasin(existants: dict) -> dict:
+    """Résultat d'export quand tous les rendus demandés sont déjà au magasin d'artefacts."""
+    return {
+        "status": "success",
+        "message": "Rendu identique déjà présent au magasin d'artefacts : export évité.",
+        "magasin": {output_format: a.pk for output_format, a in existants.items()},
+    }
+
+
+def _ranger_artefacts(publication_id, resultat: dict, hash_ensemble: str, existants: dict) -> dict:
+    """
+    Range au magasin les rendus réussis de `resultat`, puis les lie (avec les
+    artefacts `existants` réutilisés) à la publication. Un rendu impossible à
+    ranger est journalisé et n'est pas conservé : le dossier de travail de
+    l'export est supprimé ensuite (supprimer_export).
+
+    Retourne {format: emplacement au magasin}, aussi enregistré dans
+    Publication.artefacts.
+    """
+    emplacements = artefacts_export(resultat)
+    stockes = dict(existants)
+    for output_format, sortie in emplacements.items():
+        if output_format in stockes:
+            continue
+        try:
+            stockes[output_format] = stocker_artefact(
+                hash_ensemble=hash_ensemble, output_format=output_format, sortie=sortie
+            )
+        except (OSError, ValueError) as e:
+            logger.warning("[Publication] Rendu %s non rangé au magasin : %s", output_format, e)
+    emplacements = {output_format: chemin_absolu(a) for output_format, a in stockes.items()}
+
+    Publication.objects.filter(pk=publication_id).update(artefacts=emplacements)
+    if publication_id is not None and stockes:
+        Publication.objects.get(pk=publication_id).artefacts_stockes.add(
+            *(a.pk for a in stockes.values())
+        )
+    return emplacements
+
+
+def publish_project(
+    *, projet: Projet, map_obj: Map, format_output: str, user
+) -> dict:
+    """
+    Service central de publication synchrone (commandes, tests).
+    L'API passe par planifier_publication() : export différé au worker.
+
+    Séparation nette entre les deux responsabilités :
+    - Versionnage métier (atomique) : décide s'il y a changement, fige la version,
+      crée les snapshots, ouvre la prochaine WIP. → _versionner_publication()
+    - Export technique DITA : délégué à export_map_to_dita() APRÈS la transaction.
+      Un échec d'export ne remet PAS en cause le versionnage.
+
+    Si aucun changement : republication de la map sans bump de version.
+    Rendu déjà présent au magasin d'artefacts (même ensemble publié) : pas d'export.
+    """
+    versionnage = _versionner_publication(
+        projet=projet, map_obj=map_obj, user=user, formats=[format_output]
+    )
+
+    # --- Phase 4 : export technique DITA (hors transaction) ---
+    hash_ensemble = hash_ensemble_publie(versionnage["version_publiee"], map_obj)
+    existants = artefacts_stockes(hash_ensemble, [format_output])
+    if existants:
+        export_result = _resultat_magasin(existants)
+    else:
+        export_result = export_map_to_dita(
+            map_obj.pk, output_format=format_output, version_projet=versionnage["version_publiee"]
+        )
+    try:
+        export_result["artefacts"] = _ranger_artefacts(
+            versionnage["publication"].pk, export_result, hash_ensemble, existants
+        )
+    finally:
+        supprimer_export(export_result)
+
+    return {"status": "ok", **_resultat_versionnage(versionnage), "export": export_result}
+
+
+def get_publication_diff(*, projet: Projet, map_obj: Map, details: bool = True) -> dict:
     """
     Calcule le diff entre l'état courant de la map et la dernière version publiée.
     Lecture seule — aucune écriture en base.
 
     Utilisé par GET /api/projets/{id}/publication-diff/ pour informer l'utilisateur
     avant de déclencher une publication.
+
+    details=False : effectifs seulement (COUNT en base), "detail" vaut None.
+
+    Résultat mis en cache par map : un sondage répété coûte une requête
+    d'agrégat (_empreinte_publication_diff) et une lecture de cache tant que
+    ni révision, ni structure, ni publication n'a modifié la map. La clé porte
+    l'empreinte (dernière révision, dernière publication, structure) : une
+    écriture qui n'appelle pas invalider_publication_diff (admin, ORM direct)
+    ne sert jamais un diff périmé.
     """
-    rubrique_revision_map = _build_rubrique_revision_map(map_obj)
+    empreinte = ":".join(str(v) for v in _empreinte_publication_diff(map_obj.pk))
+    cle_resultat = f"publication-diff:{map_obj.pk}:{empreinte}:{'detail' if details else 'effectifs'}"
+    cle_jeton = _cle_jeton_publication_diff(map_obj.pk)
+    valeurs = cache.get_many([cle_resultat, cle_jeton])
+    jeton = valeurs.get(cle_jeton)
+    entree = valeurs.get(cle_resultat)
+    if jeton is not None and entree is not None and entree["jeton"] == jeton:
+        return entree["diff"]
+
+    if jeton is None:
+        jeton = uuid.uuid4().hex
+        if not cache.add(cle_jeton, jeton, get_publication_diff_cache_timeout()):
+            # Jeton posé en concurrence : c'est lui qui fait foi.
+            jeton = cache.get(cle_jeton, jeton)
+
+    diff = _calculer_publication_diff(projet=projet, map_obj=map_obj, details=details)
+    # Calculé sous l'ancien jeton si une invalidation est survenue entre-temps :
+    # l'entrée est alors ignorée à la lecture suivante.
+    cache.set(cle_resultat, {"jeton": jeton, "diff": diff}, get_publication_diff_cache_timeout())
+    return diff
+
+
+def _empreinte_publication_diff(map_id: int) -> tuple:
+    """
+    (dernière révision, dernière mise à jour de révision, dernière publication,
+    version de structure, nb de nœuds, dernier nœud) de la map, en une requête.
+    Change à toute révision créée ou brouillon mis à jour, toute publication,
+    tout ajout ou retrait de nœud.
+    """
+    valeurs = Map.objects.filter(pk=map_id).aggregate(
+        revision=Max("maprubrique__rubrique__revisions__id"),
+        maj=Max("maprubrique__rubrique__revisions__date_mise_a_jour"),
+        publication=Max("projet__derniere_publication_id"),
+        structure=Max("version_structure"),
+        noeuds=Count("maprubrique", distinct=True),
+        dernier_noeud=Max("maprubrique__id"),
+    )
+    if valeurs["maj"] is not None:
+        valeurs["maj"] = valeurs["maj"].timestamp()
+    return tuple(valeurs.values())
+
+
+def _calculer_publication_diff(*, projet: Projet, map_obj: Map, details: bool) -> dict:
     last_published = _get_last_published_version(projet)
-    changes = _detect_changes(rubrique_revision_map, last_published)
+    changes = _detect_changes(map_obj, last_published, details=details)
     wip_version = get_active_version(projet)
 
+    if details:
+        compteurs = {cle: len(changes[cle]) for cle in ("nouvelles", "modifiees", "retirees")}
+    else:
+        compteurs = {cle: changes[cle] for cle in ("nouvelles", "modifiees", "retirees")}
     return {
         "version_wip_courante": wip_version.version_numero if wip_version else None,
         "derniere_version_publiee": last_published.version_numero if last_published else None,
         "has_changes": changes["has_changes"],
-        "changements": {
-            "nouvelles": len(changes["nouvelles"]),
-            "modifiees": len(changes["modifiees"]),
-            "retirees": len(changes["retirees"]),
-        },
-        "detail": changes,
+        "changements": compteurs,
+        "detail": changes if details else None,
     }
 
 
+# ---------------------------------------------------------------------------
+# Cache du diff de publication — invalidation par jeton
+# ---------------------------------------------------------------------------
+
+# Les entrées sont invalidées explicitement ; ce délai ne borne que la mémoire.
+DEFAULT_PUBLICATION_DIFF_CACHE_TIMEOUT = 24 * 3600
+
+
+def get_publication_diff_cache_timeout() -> int:
+    return getattr(
+        settings, "PUBLICATION_DIFF_CACHE_TIMEOUT", DEFAULT_PUBLICATION_DIFF_CACHE_TIMEOUT
+    )
+
+
+def _cle_jeton_publication_diff(map_id: int) -> str:
+    return f"publication-diff:jeton:{map_id}"
+
+
+def invalider_publication_diff(*, map_ids=None, rubrique_id: int | None = None) -> None:
+    """
+    Invalide le diff de publication en cache des maps concernées
+    (map_ids, et/ou maps contenant rubrique_id).
+
+    À appeler à chaque révision créée, modification de structure ou publication.
+    Le jeton de la map est supprimé immédiatement et de nouveau après le COMMIT :
+    un diff recalculé pendant la transaction, sur l'état antérieur, ne survit
+    pas à sa validation.
+    """
+    map_ids = set(map_ids or ())
+    if rubrique_id is not None:
+        map_ids.update(
+            MapRubrique.objects.filter(rubrique_id=rubrique_id).values_list("map_id", flat=True)
+        )
+    if not map_ids:
+        return
+    cles = [_cle_jeton_publication_diff(map_id) for map_id in map_ids]
+    cache.delete_many(cles)
+    transaction.on_commit(lambda: cache.delete_many(cles))
+
+
+# ---------------------------------------------------------------------------
+# Publication asynchrone — export exécuté par le worker (TachePublication)
+# ---------------------------------------------------------------------------
+
+# Délai sans battement de cœur au-delà duquel une tâche en_cours est reprise.
+DEFAULT_PUBLICATION_JOB_TIMEOUT_SECONDS = 3600
+# Nombre d'exécutions d'une tâche avant abandon (worker interrompu à répétition).
+MAX_TENTATIVES_PUBLICATION = 3
+
+# Progression (%) atteinte au début de chaque phase de l'export.
+_PROGRESSION_PHASES = {"structure": 5, "topics": 10, "ditamap": 60, "rendu": 70}
+
+
+def get_publication_job_timeout_seconds() -> int:
+    return max(
+        60,
+        int(getattr(settings, "PUBLICATION_JOB_TIMEOUT_SECONDS", DEFAULT_PUBLICATION_JOB_TIMEOUT_SECONDS)),
+    )
+
+
+def _journaliser(tache: TachePublication, message: str) -> None:
+    tache.journal += f"{now():%Y-%m-%d %H:%M:%S} {message}\n"
+
+
+def planifier_publication(
+    *, projet: Projet, map_obj: Map, format_output: str | None = None, formats=None, user
+) -> tuple[dict, TachePublication]:
+    """
+    Publication via l'API : versionnage immédiat, export différé.
+
+    Le versionnage (_versionner_publication) et la création de la tâche sont
+    validés ensemble : toute version figée a sa tâche d'export. Le worker
+    (run_publication_worker) exécute ensuite la phase 4.
+
+    formats : publication multi-format (une préparation, un rendu par format,
+    en parallèle) ; sinon format_output seul.
+
+    Retourne (résultat du versionnage + "tache_id", tâche créée).
+    """
+    formats = list(dict.fromkeys(formats or [format_output]))
+    with transaction.atomic():
+        versionnage = _versionner_publication(
+            projet=projet, map_obj=map_obj, user=user, formats=formats
+        )
+        tache = TachePublication(
+            projet=projet,
+            map=map_obj,
+            version_projet=versionnage["version_publiee"],
+            format=formats[0],
+            formats=formats if len(formats) > 1 else [],
+            auteur=user,
+        )
+        _journaliser(
+            tache,
+            f"Tâche créée par {getattr(user, 'username', user)} (format {', '.join(formats)}).",
+        )
+        tache.save()
+        Publication.objects.filter(pk=versionnage["publication"].pk).update(tache=tache)
+
+    logger.info(
+        "[Publication] Tâche %s planifiée. projet_id=%s map_id=%s formats=%s",
+        tache.pk, projet.pk, map_obj.pk, formats,
+    )
+    return {"status": "accepted", "tache_id": tache.pk, **_resultat_versionnage(versionnage)}, tache
+
+
+def prendre_tache_publication() -> "TachePublication | None":
+    """
+    Réserve la prochaine tâche à exécuter (la plus ancienne) pour ce worker.
+
+    Éligibles : tâches en_attente et tâches en_cours sans battement de cœur
+    depuis get_publication_job_timeout_seconds() (worker arrêté en cours de route).
+    skip_locked : plusieurs workers se partagent la file sans se bloquer.
+    Au-delà de MAX_TENTATIVES_PUBLICATION exécutions, la tâche passe en échec.
+    """
+    limite = now() - timedelta(seconds=get_publication_job_timeout_seconds())
+    with transaction.atomic():
+        while True:
+            tache = (
+                TachePublication.objects.select_for_update(skip_locked=True)
+                .filter(Q(statut="en_attente") | Q(statut="en_cours", date_mise_a_jour__lt=limite))
+                .order_by("date_creation")
+                .first()
+            )
+            if tache is None:
+                return None
+            if tache.statut == "en_cours":
+                _journaliser(tache, "Worker sans réponse : tâche reprise.")
+            if tache.tentatives >= MAX_TENTATIVES_PUBLICATION:
+                tache.statut = "echec"
+                tache.date_fin = now()
+                _journaliser(tache, f"Abandon après {tache.tentatives} tentative(s).")
+                tache.save()
+                continue
+            tache.statut = "en_cours"
+            tache.tentatives += 1
+            tache.progression = 0
+            tache.date_debut = now()
+            _journaliser(tache, f"Export démarré (tentative {tache.tentatives}).")
+            tache.save()
+            return tache
+
+
+def executer_tache_publication(tache: TachePublication) -> TachePublication:
+    """
+    Phase 4 de la publication : export DITA de la version figée de la tâche.
+    Progression et journal sont enregistrés à chaque phase de l'export
+    (battement de cœur). Toute erreur est consignée dans la tâche, jamais levée.
+    Plusieurs formats : export_map_multi_formats ; la tâche n'est terminée que
+    si tous les rendus ont abouti (statut et durée par format au journal).
+    Seuls les formats absents du magasin d'artefacts sont rendus ; les rendus
+    réussis y sont rangés et liés à la publication.
+    """
+
+    def suivi(phase: str) -> None:
+        tache.progression = _PROGRESSION_PHASES.get(phase, tache.progression)
+        _journaliser(tache, f"Phase {phase}.")
+        tache.save(update_fields=["progression", "journal", "date_mise_a_jour"])
+
+    hash_ensemble, existants = None, {}
+    try:
+        hash_ensemble = hash_ensemble_publie(tache.version_projet, tache.map_id)
+        existants = artefacts_stockes(hash_ensemble, tache.liste_formats)
+        a_rendre = [f for f in tache.liste_formats if f not in existants]
+        if not a_rendre:
+            resultat = _resultat_magasin(existants)
+        elif len(a_rendre) > 1:
+            resultat = export_map_multi_formats(
+                tache.map_id, a_rendre, version_projet=tache.version_projet, suivi=suivi
+            )
+        else:
+            resultat = export_map_to_dita(
+                tache.map_id,
+                output_format=a_rendre[0],
+                version_projet=tache.version_projet,
+                suivi=suivi,
+            )
+    except Exception as e:
+        logger.exception("[Publication] Erreur inattendue tache_id=%s", tache.pk)
+        resultat = {"status": "error", "message": f"Erreur système lors de l'export : {e}"}
+
+    # Rendus rangés avant la fin de la tâche : l'artefact suivi pointe vers le magasin.
+    try:
+        if hash_ensemble is not None:
+            publication_id = Publication.objects.filter(tache=tache).values_list("pk", flat=True).first()
+            resultat["artefacts"] = _ranger_artefacts(publication_id, resultat, hash_ensemble, existants)
+    finally:
+        supprimer_export(resultat)
+
+    succes = resultat.get("status") == "success"
+    tache.resultat = resultat
+    tache.statut = "terminee" if succes else "echec"
+    tache.progression = 100
+    tache.date_fin = now()
+    if "cache" in resultat:
+        cache_topics = resultat["cache"]
+        _journaliser(
+            tache,
+            f"Topics : {cache_topics['reutilises']} réutilisé(s) du cache, {cache_topics['generes']} généré(s).",
+        )
+    for output_format, rendu in resultat.get("formats", {}).items():
+        _journaliser(
+            tache,
+            f"Format {output_format} : {rendu['status']} en {rendu['durees_ms']['rendu']} ms "
+            f"(topics : {rendu['cache']['reutilises']} réutilisé(s), {rendu['cache']['generes']} généré(s)).",
+        )
+    if existants:
+        _journaliser(tache, f"Réutilisé(s) depuis le magasin d'artefacts : {', '.join(sorted(existants))}.")
+    _journaliser(tache, "Export terminé." if succes else f"Échec : {resultat.get('message', '')}")
+    tache.save()
+
+    logger.info(
+        "[Publication] Tâche %s %s. map_id=%s durees_ms=%s",
+        tache.pk, tache.statut, tache.map_id, resultat.get("durees_ms"),
+    )
+    return tache
+
+
 # ---------------------------------------------------------------------------
 # ProductDocSync — VersionProduit et EvolutionProduit
 # ---------------------------------------------------------------------------
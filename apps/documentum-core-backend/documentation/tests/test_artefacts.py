@@ -0,0 +1,381 @@
+# documentation/tests/test_artefacts.py
+"""
+Tests du magasin d'artefacts de publication (documentation.artefacts).
+
+Couverture :
+- Rangement d'un rendu (fichier unique ou archive zip), adressage par empreinte
+- Déduplication : même clé, même contenu sous deux clés
+- hash_ensemble_publie : sensible aux révisions publiées et à la structure
+- Republication sans changement : export évité, artefact partagé
+- Téléchargement : flux, ETag / 304, plages (206 / 416), If-Range
+- Commande prune_artefacts (versions archivées, délai de grâce des orphelins)
+"""
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils.timezone import now
+from rest_framework.test import APITestCase
+
+from documentation import artefacts
+from documentation.models import ArtefactPublication, Publication, TachePublication, VersionProjet
+from documentation.services import (
+    create_revision_if_changed,
+    export_map_to_dita,
+    planifier_publication,
+    publish_project,
+)
+
+from .test_publication import _attach, _make_projet, _make_rubrique, _make_user
+
+CONTENU = bytes(range(256)) * 1000
+
+
+class _MagasinTemporaireMixin:
+    """Magasin, exports et rendus dans un dossier temporaire (rendu local, sans DITA-OT)."""
+
+    def setUp(self):
+        super().setUp()
+        self.dossier = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dossier, ignore_errors=True)
+        reglages = override_settings(
+            DITA_EXPORT_ROOT=os.path.join(self.dossier, "exports"),
+            DITA_RENDERER="documentation.exporters.RenduLocal",
+            DITA_RENDER_CONCURRENCY=1,
+            PUBLICATION_ARTEFACT_ROOT=os.path.join(self.dossier, "artefacts"),
+        )
+        reglages.enable()
+        self.addCleanup(reglages.disable)
+
+    def _rendu(self, nom="rendu", fichiers=None):
+        """Dossier de rendu : {nom de fichier: contenu}."""
+        sortie = os.path.join(self.dossier, nom)
+        for chemin, contenu in (fichiers or {"manuel.pdf": CONTENU}).items():
+            os.makedirs(os.path.dirname(os.path.join(sortie, chemin)), exist_ok=True)
+            with open(os.path.join(sortie, chemin), "wb") as f:
+                f.write(contenu)
+        return sortie
+
+    def _fichiers_magasin(self):
+        racine = os.path.join(self.dossier, "artefacts")
+        return [nom for _, _, noms in os.walk(racine) for nom in noms]
+
+
+# ---------------------------------------------------------------------------
+# 1. Rangement et déduplication
+# ---------------------------------------------------------------------------
+
+class StockerArtefactTest(_MagasinTemporaireMixin, TestCase):
+
+    def test_fichier_unique_stocke_tel_quel(self):
+        artefact = artefacts.stocker_artefact(hash_ensemble="a" * 64, output_format="pdf", sortie=self._rendu())
+
+        self.assertEqual(artefact.nom_fichier, "manuel.pdf")
+        self.assertEqual(artefact.type_mime, "application/pdf")
+        self.assertEqual(artefact.taille, len(CONTENU))
+        self.assertEqual(artefact.chemin, os.path.join(artefact.empreinte[:2], artefact.empreinte))
+        with open(artefacts.chemin_absolu(artefact), "rb") as f:
+            self.assertEqual(f.read(), CONTENU)
+
+    def test_rendu_multi_fichiers_archive_en_zip(self):
+        sortie = self._rendu(fichiers={"index.html": b"<html/>", "css/site.css": b"body{}"})
+        artefact = artefacts.stocker_artefact(hash_ensemble="a" * 64, output_format="html5", sortie=sortie)
+
+        self.assertEqual(artefact.nom_fichier, "html5.zip")
+        with zipfile.ZipFile(artefacts.chemin_absolu(artefact)) as archive:
+            self.assertEqual(sorted(archive.namelist()), ["css/site.css", "index.html"])
+        self.assertEqual(len(self._fichiers_magasin()), 1)
+
+    def test_meme_cle_reutilisee(self):
+        premier = artefacts.stocker_artefact(hash_ensemble="a" * 64, output_format="pdf", sortie=self._rendu())
+        second = artefacts.stocker_artefact(
+            hash_ensemble="a" * 64, output_format="pdf", sortie=self._rendu("autre", {"x.pdf": b"autre"})
+        )
+        self.assertEqual(premier.pk, second.pk)
+        self.assertEqual(ArtefactPublication.objects.count(), 1)
+
+    def test_meme_contenu_partage_le_fichier(self):
+        premier = artefacts.stocker_artefact(hash_ensemble="a" * 64, output_format="pdf", sortie=self._rendu())
+        second = artefacts.stocker_artefact(hash_ensemble="b" * 64, output_format="pdf", sortie=self._rendu("bis"))
+
+        self.assertNotEqual(premier.pk, second.pk)
+        self.assertEqual(premier.chemin, second.chemin)
+        self.assertEqual(len(self._fichiers_magasin()), 1)
+
+    def test_rendu_vide_refuse(self):
+        os.makedirs(os.path.join(self.dossier, "vide"))
+        with self.assertRaises(ValueError):
+            artefacts.stocker_artefact(
+                hash_ensemble="a" * 64, output_format="pdf", sortie=os.path.join(self.dossier, "vide")
+            )
+        self.assertEqual(self._fichiers_magasin(), [])
+
+
+class HashEnsemblePublieTest(TestCase):
+
+    def setUp(self):
+        self.user = _make_user()
+        self.projet, self.wip, self.map_obj = _make_projet(self.user)
+        self.r1 = _make_rubrique(self.projet, self.wip, self.user, titre="R1", xml="<topic>1</topic>")
+        self.r2 = _make_rubrique(self.projet, self.wip, self.user, titre="R2", xml="<topic>2</topic>")
+        self.n1 = _attach(self.map_obj, self.r1, ordre=1)
+        self.n2 = _attach(self.map_obj, self.r2, ordre=2)
+
+    @patch("documentation.services.export_map_to_dita", return_value={"status": "stub"})
+    def _publier(self, _mock):
+        publish_project(projet=self.projet, map_obj=self.map_obj, format_output="pdf", user=self.user)
+        return Publication.objects.latest("id").version_projet
+
+    def test_stable_sans_changement(self):
+        version = self._publier()
+        self.assertEqual(
+            artefacts.hash_ensemble_publie(version, self.map_obj),
+            artefacts.hash_ensemble_publie(self._publier(), self.map_obj),
+        )
+
+    def test_change_avec_une_revision_publiee(self):
+        avant = artefacts.hash_ensemble_publie(self._publier(), self.map_obj)
+        create_revision_if_changed(rubrique=self.r1, new_xml="<topic>1 bis</topic>", user=self.user)
+        self.assertNotEqual(avant, artefacts.hash_ensemble_publie(self._publier(), self.map_obj))
+
+    def test_change_avec_la_structure(self):
+        version = self._publier()
+        avant = artefacts.hash_ensemble_publie(version, self.map_obj)
+        self.n1.ordre, self.n2.ordre = 2, 1
+        self.n1.save()
+        self.n2.save()
+        self.assertNotEqual(avant, artefacts.hash_ensemble_publie(version, self.map_obj))
+
+
+# ---------------------------------------------------------------------------
+# 2. Publication : rangement et republication sans changement
+# ---------------------------------------------------------------------------
+
+class PublicationMagasinTest(_MagasinTemporaireMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = _make_user()
+        self.projet, self.wip, self.map_obj = _make_projet(self.user)
+        _attach(self.map_obj, _make_rubrique(self.projet, self.wip, self.user))
+
+    def _publier_via_worker(self, formats):
+        planifier_publication(projet=self.projet, map_obj=self.map_obj, formats=formats, user=self.user)
+        call_command("run_publication_worker", "--once", stdout=StringIO())
+        return Publication.objects.latest("id")
+
+    def test_rendus_ranges_et_lies_a_la_publication(self):
+        publication = self._publier_via_worker(["pdf", "html5"])
+
+        self.assertEqual(
+            sorted(publication.artefacts_stockes.values_list("format", flat=True)), ["html5", "pdf"]
+        )
+        self.assertEqual(
+            publication.artefacts,
+            {a.format: artefacts.chemin_absolu(a) for a in publication.artefacts_stockes.all()},
+        )
+
+    def test_dossiers_de_travail_supprimes_apres_l_export(self):
+        self._publier_via_worker(["pdf", "html5"])
+        publish_project(projet=self.projet, map_obj=self.map_obj, format_output="markdown", user=self.user)
+        # Export en échec : dossier supprimé aussi.
+        with override_settings(DITA_RENDERER="documentation.exporters.RenduDitaOt", DITA_OT_BIN="/inexistant/dita"):
+            self._publier_via_worker(["xhtml"])
+
+        self.assertEqual(os.listdir(os.path.join(self.dossier, "exports")), ["cache"])
+
+    def test_republication_sans_changement_evite_l_export(self):
+        premiere = self._publier_via_worker(["pdf"])
+        with patch("documentation.services.export_map_to_dita", wraps=export_map_to_dita) as export:
+            seconde = self._publier_via_worker(["pdf"])
+
+        export.assert_not_called()
+        self.assertFalse(seconde.nouvelle_version)
+        self.assertEqual(
+            list(premiere.artefacts_stockes.values_list("pk", flat=True)),
+            list(seconde.artefacts_stockes.values_list("pk", flat=True)),
+        )
+        self.assertEqual(ArtefactPublication.objects.count(), 1)
+        tache = TachePublication.objects.get(pk=seconde.tache_id)
+        self.assertEqual(tache.statut, "terminee")
+        self.assertIn("Réutilisé(s) depuis le magasin d'artefacts : pdf.", tache.journal)
+
+    def test_seuls_les_formats_absents_sont_rendus(self):
+        self._publier_via_worker(["pdf"])
+        with patch("documentation.services.export_map_to_dita", wraps=export_map_to_dita) as export:
+            publication = self._publier_via_worker(["pdf", "html5"])
+
+        self.assertEqual(export.call_args.kwargs["output_format"], "html5")
+        self.assertEqual(publication.artefacts_stockes.count(), 2)
+
+    def test_publication_synchrone_reutilise_le_rendu(self):
+        publish_project(projet=self.projet, map_obj=self.map_obj, format_output="pdf", user=self.user)
+        with patch("documentation.services.export_map_to_dita") as export:
+            result = publish_project(projet=self.projet, map_obj=self.map_obj, format_output="pdf", user=self.user)
+
+        export.assert_not_called()
+        self.assertEqual(result["export"]["status"], "success")
+        self.assertEqual(Publication.objects.latest("id").artefacts_stockes.count(), 1)
+
+
+# ---------------------------------------------------------------------------
+# 3. Téléchargement
+# ---------------------------------------------------------------------------
+
+class TelechargementArtefactAPITest(_MagasinTemporaireMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = _make_user()
+        self.client.force_authenticate(user=self.user)
+        self.artefact = artefacts.stocker_artefact(
+            hash_ensemble="a" * 64, output_format="pdf", sortie=self._rendu()
+        )
+        self.url = f"/api/artefacts/{self.artefact.pk}/"
+        self.etag = f'"{self.artefact.empreinte}"'
+
+    def test_telechargement_complet_en_flux(self):
+        response = self.client.get(self.url, HTTP_ACCEPT="application/pdf")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(b"".join(response.streaming_content), CONTENU)
+        self.assertEqual(response["ETag"], self.etag)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertIn('attachment; filename="manuel.pdf"', response["Content-Disposition"])
+
+    def test_if_none_match_retourne_304(self):
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=f"W/{self.etag}")
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], self.etag)
+
+    def test_plage_retourne_206(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=100-199")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), CONTENU[100:200])
+        self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(CONTENU)}")
+        self.assertEqual(response["Content-Length"], "100")
+
+    def test_plage_suffixe_et_ouverte(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=-10")
+        self.assertEqual(b"".join(response.streaming_content), CONTENU[-10:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(CONTENU) - 3}-")
+        self.assertEqual(b"".join(response.streaming_content), CONTENU[-3:])
+
+    def test_plage_hors_fichier_retourne_416(self):
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(CONTENU)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(CONTENU)}")
+
+    def test_plages_multiples_ou_invalides_ignorees(self):
+        for entete in ("bytes=0-1,5-6", "lignes=0-1", "bytes=abc"):
+            self.assertEqual(self.client.get(self.url, HTTP_RANGE=entete).status_code, 200)
+
+    def test_if_range_perime_retourne_le_fichier_complet(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"perime"')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=self.etag)
+        self.assertEqual(response.status_code, 206)
+
+    def test_artefact_inexistant_retourne_404(self):
+        self.assertEqual(self.client.get("/api/artefacts/99999/").status_code, 404)
+
+    def test_non_authentifie_refuse(self):
+        self.client.force_authenticate(user=None)
+        self.assertIn(self.client.get(self.url).status_code, [401, 403])
+
+    def test_historique_expose_les_liens_de_telechargement(self):
+        projet, wip, _ = _make_projet(self.user)
+        publication = Publication.objects.create(projet=projet, version_projet=wip, formats=["pdf"])
+        publication.artefacts_stockes.add(self.artefact)
+
+        data = self.client.get(f"/api/projets/{projet.pk}/publications/").json()
+        self.assertTrue(data["results"][0]["telechargements"]["pdf"].endswith(self.url))
+
+
+# ---------------------------------------------------------------------------
+# 4. Commande prune_artefacts
+# ---------------------------------------------------------------------------
+
+class PruneArtefactsCommandTest(_MagasinTemporaireMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = _make_user()
+        self.projet, self.ancienne, _ = _make_projet(self.user)
+        self.courante = VersionProjet.objects.create(projet=self.projet, version_numero="1.1.0")
+
+    def _artefact(self, version, hash_ensemble, sortie):
+        artefact = artefacts.stocker_artefact(hash_ensemble=hash_ensemble, output_format="pdf", sortie=sortie)
+        Publication.objects.create(projet=self.projet, version_projet=version).artefacts_stockes.add(artefact)
+        return artefact
+
+    def test_supprime_les_artefacts_des_versions_archivees(self):
+        archive = self._artefact(self.ancienne, "a" * 64, self._rendu("a", {"a.pdf": b"ancien"}))
+        conserve = self._artefact(self.courante, "b" * 64, self._rendu("b", {"b.pdf": b"courant"}))
+        VersionProjet.objects.filter(pk=self.ancienne.pk).update(is_archived=True)
+
+        out = StringIO()
+        call_command("prune_artefacts", stdout=out)
+
+        self.assertEqual(list(ArtefactPublication.objects.values_list("pk", flat=True)), [conserve.pk])
+        self.assertFalse(os.path.exists(artefacts.chemin_absolu(archive)))
+        self.assertIn("1 artefact(s) supprimé(s), 6 octets libérés", out.getvalue())
+
+    def test_fichier_partage_conserve(self):
+        archive = self._artefact(self.ancienne, "a" * 64, self._rendu("a"))
+        self._artefact(self.courante, "b" * 64, self._rendu("b"))
+        VersionProjet.objects.filter(pk=self.ancienne.pk).update(is_archived=True)
+
+        call_command("prune_artefacts", stdout=StringIO())
+
+        self.assertFalse(ArtefactPublication.objects.filter(pk=archive.pk).exists())
+        self.assertTrue(os.path.exists(artefacts.chemin_absolu(archive)))
+
+    def test_artefact_partage_avec_une_version_active_conserve(self):
+        artefact = self._artefact(self.ancienne, "a" * 64, self._rendu())
+        Publication.objects.create(projet=self.projet, version_projet=self.courante).artefacts_stockes.add(artefact)
+        VersionProjet.objects.filter(pk=self.ancienne.pk).update(is_archived=True)
+
+        call_command("prune_artefacts", stdout=StringIO())
+        self.assertTrue(ArtefactPublication.objects.filter(pk=artefact.pk).exists())
+
+    def test_orphelin_recent_conserve(self):
+        # Rangé par un export en cours, pas encore lié à sa publication.
+        orphelin = artefacts.stocker_artefact(hash_ensemble="c" * 64, output_format="pdf", sortie=self._rendu())
+
+        call_command("prune_artefacts", stdout=StringIO())
+
+        self.assertTrue(ArtefactPublication.objects.filter(pk=orphelin.pk).exists())
+        self.assertTrue(os.path.exists(artefacts.chemin_absolu(orphelin)))
+
+    def test_orphelin_ancien_supprime(self):
+        orphelin = artefacts.stocker_artefact(hash_ensemble="c" * 64, output_format="pdf", sortie=self._rendu())
+        ArtefactPublication.objects.filter(pk=orphelin.pk).update(
+            date_creation=now() - timedelta(seconds=artefacts.get_delai_grace_artefacts() + 60)
+        )
+
+        call_command("prune_artefacts", stdout=StringIO())
+
+        self.assertFalse(ArtefactPublication.objects.filter(pk=orphelin.pk).exists())
+        self.assertFalse(os.path.exists(artefacts.chemin_absolu(orphelin)))
+
+    def test_dry_run_ne_supprime_rien(self):
+        artefact = self._artefact(self.ancienne, "a" * 64, self._rendu())
+        VersionProjet.objects.filter(pk=self.ancienne.pk).update(is_archived=True)
+
+        out = StringIO()
+        call_command("prune_artefacts", "--dry-run", stdout=out)
+
+        self.assertIn("1 artefact(s) supprimable(s)", out.getvalue())
+        self.assertTrue(os.path.exists(artefacts.chemin_absolu(artefact)))
@@ -0,0 +1,103 @@
+# documentation/tests/test_backfill_hashes.py
+"""
+Tests du moteur de backfill des hash (commande backfill_hashes).
+
+Couverture :
+- Recalcul de Rubrique.hash_contenu et RevisionRubrique.hash_contenu
+- Création groupée des révisions initiales manquantes (blobs partagés)
+- Reprise depuis le PointDeReprise
+- Calcul dans un pool de processus
+"""
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from documentation.models import BlobXml, PointDeReprise, RevisionRubrique, Rubrique
+from documentation.utils import compute_xml_hash
+
+from .test_revision_storage import XML_BASE, _editer, _make_rubrique, _variante
+
+
+class BackfillHashesCommandTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="auteur", password="pw")
+        self.rubrique = _make_rubrique(self.user)
+        _editer(self.rubrique, _variante(2), self.user)
+
+    def _lancer(self, *args):
+        out = StringIO()
+        call_command("backfill_hashes", *args, "--workers", "1", stdout=out)
+        return out.getvalue()
+
+    def test_rubriques_hash_corrige(self):
+        Rubrique.objects.filter(pk=self.rubrique.pk).update(hash_contenu="x" * 64)
+        out = self._lancer("rubriques")
+        self.rubrique.refresh_from_db()
+        self.assertEqual(self.rubrique.hash_contenu, compute_xml_hash(_variante(2)))
+        self.assertIn("1 écrite(s)", out)
+        self.assertFalse(PointDeReprise.objects.exists())
+
+    def test_rubriques_a_jour_non_reecrites(self):
+        self.assertIn("0 écrite(s)", self._lancer("rubriques"))
+
+    def test_revisions_hash_corrige(self):
+        RevisionRubrique.objects.filter(rubrique=self.rubrique).update(hash_contenu="")
+        self._lancer("revisions", "--batch-size", "1")
+        hashes = dict(
+            RevisionRubrique.objects.filter(rubrique=self.rubrique).values_list("numero", "hash_contenu")
+        )
+        self.assertEqual(hashes, {1: compute_xml_hash(XML_BASE), 2: compute_xml_hash(_variante(2))})
+
+    def test_revisions_initiales_creees(self):
+        sans_revision = Rubrique.objects.create(
+            projet=self.rubrique.projet, version_projet=self.rubrique.version_projet,
+            titre="Nouvelle", contenu_xml=XML_BASE, auteur=self.user,
+        )
+        vide = Rubrique.objects.create(
+            projet=self.rubrique.projet, version_projet=self.rubrique.version_projet,
+            titre="Racine", contenu_xml="", auteur=self.user,
+        )
+        self._lancer("revisions-initiales")
+
+        revision = RevisionRubrique.objects.select_related("blob").get(rubrique=sans_revision)
+        self.assertEqual(revision.numero, 1)
+        self.assertEqual(revision.contenu_xml, XML_BASE)
+        # Contenu déjà connu : blob de la révision 1 de self.rubrique réutilisé.
+        self.assertEqual(
+            revision.blob_id, RevisionRubrique.objects.get(rubrique=self.rubrique, numero=1).blob_id
+        )
+        self.assertEqual(revision.blob.nb_references, 2)
+        self.assertEqual(RevisionRubrique.objects.get(rubrique=vide).contenu_xml, "")
+        sans_revision.refresh_from_db()
+        self.assertEqual(sans_revision.revision_courante_numero, 1)
+        # Aucune révision supplémentaire pour une rubrique déjà initialisée.
+        self.assertEqual(RevisionRubrique.objects.filter(rubrique=self.rubrique).count(), 2)
+
+    def test_reprise_apres_interruption(self):
+        autre = _make_rubrique(self.user, nom="G2")
+        Rubrique.objects.update(hash_contenu="")
+        PointDeReprise.objects.create(nom="backfill_hashes:rubriques", dernier_id=self.rubrique.pk)
+        out = self._lancer("rubriques")
+        self.assertIn(f"reprise après l'id {self.rubrique.pk}", out)
+        self.rubrique.refresh_from_db()
+        autre.refresh_from_db()
+        self.assertEqual(self.rubrique.hash_contenu, "")
+        self.assertEqual(autre.hash_contenu, compute_xml_hash(XML_BASE))
+
+    def test_reset_ignore_le_point_de_reprise(self):
+        Rubrique.objects.update(hash_contenu="")
+        PointDeReprise.objects.create(nom="backfill_hashes:rubriques", dernier_id=self.rubrique.pk)
+        self._lancer("rubriques", "--reset")
+        self.rubrique.refresh_from_db()
+        self.assertEqual(self.rubrique.hash_contenu, compute_xml_hash(_variante(2)))
+
+    def test_pool_de_processus(self):
+        RevisionRubrique.objects.filter(rubrique=self.rubrique).update(hash_contenu="")
+        call_command("backfill_hashes", "revisions", "--workers", "2", stdout=StringIO())
+        self.assertFalse(
+            RevisionRubrique.objects.filter(rubrique=self.rubrique, hash_contenu="").exists()
+        )
+        self.assertEqual(BlobXml.objects.count(), 2)
@@ -0,0 +1,240 @@
+# documentation/tests/test_exporters.py
+"""
+Tests de l'export DITA en flux (exporters.export_map_to_dita,
+exporters.export_map_multi_formats).
+
+Couverture :
+- Écriture de la .ditamap (arborescence, topicref / topichead)
+- Un topic par révision exportée (snapshot publié ou révision courante)
+- Délégation au moteur de rendu configuré (RenduLocal)
+- Cache des topics par (hash_contenu, format) : republication incrémentale
+- Rapport : compteurs et durées par phase
+- Erreurs : map introuvable, échec du rendu DITA-OT
+- Dossier de travail : supprimé après une exception ou par supprimer_export
+- Multi-format : préparation commune, rendus parallèles, statut par format
+"""
+import os
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from documentation.exporters import (
+    RenduDitaOt,
+    RenduLocal,
+    export_map_multi_formats,
+    export_map_to_dita,
+    supprimer_export,
+)
+from documentation.models import PublicationSnapshot, RevisionRubrique, Rubrique, VersionProjet
+from documentation.services import create_revision_if_changed
+
+from .test_publication import _attach, _make_projet, _make_rubrique
+
+
+class _MapExportee:
+
+    def setUp(self):
+        self.dossier = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dossier, ignore_errors=True)
+        reglages = override_settings(
+            DITA_EXPORT_ROOT=self.dossier, DITA_RENDERER="documentation.exporters.RenduLocal"
+        )
+        reglages.enable()
+        self.addCleanup(reglages.disable)
+
+        self.user = User.objects.create_user(username="auteur", password="pw")
+        self.projet, self.wip, self.map_obj = _make_projet(self.user)
+        self.racine = _make_rubrique(self.projet, self.wip, self.user, titre="Racine", xml="")
+        self.chapitre = _make_rubrique(
+            self.projet, self.wip, self.user, titre="Chapitre & co", xml="<topic id='c'><title>C</title></topic>"
+        )
+        self.section = _make_rubrique(
+            self.projet, self.wip, self.user, titre="Section", xml="<topic id='s'><title>S</title></topic>"
+        )
+        noeud_racine = _attach(self.map_obj, self.racine, ordre=1)
+        noeud_chapitre = _attach(self.map_obj, self.chapitre, ordre=1, parent=noeud_racine)
+        _attach(self.map_obj, self.section, ordre=1, parent=noeud_chapitre)
+
+    def _lire(self, chemin):
+        with open(chemin, encoding="utf-8") as f:
+            return f.read()
+
+
+class ExportMapToDitaTest(_MapExportee, TestCase):
+
+    def test_bundle_ecrit_sur_disque(self):
+        result = export_map_to_dita(self.map_obj.pk, output_format="html5")
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["rubriques_count"], 3)
+        self.assertEqual(result["topics_count"], 2)
+        self.assertTrue(result["dossier"].startswith(self.dossier))
+
+        carte = ET.parse(os.path.join(result["dossier"], f"map-{self.map_obj.pk}.ditamap")).getroot()
+        tete = carte.find("topichead")
+        self.assertEqual(tete.get("navtitle"), "Racine")
+        chapitre = tete.find("topicref")
+        self.assertEqual(chapitre.get("navtitle"), "Chapitre & co")
+        self.assertEqual(
+            chapitre.find("topicref").get("href"), f"topics/rubrique-{self.section.pk}.dita"
+        )
+        topic = self._lire(os.path.join(result["dossier"], chapitre.get("href")))
+        self.assertIn("<topic id='c'>", topic)
+
+    def test_rendu_local_et_durees_par_phase(self):
+        result = export_map_to_dita(self.map_obj.pk, output_format="pdf")
+        index = self._lire(os.path.join(result["dossier"], "out", "index.pdf.txt"))
+        self.assertIn(f"topics/rubrique-{self.chapitre.pk}.dita", index)
+        self.assertEqual(
+            set(result["durees_ms"]), {"structure", "topics", "ditamap", "rendu", "total"}
+        )
+
+    def test_export_des_revisions_figees(self):
+        VersionProjet.objects.filter(pk=self.wip.pk).update(is_active=False, rang_publication=1)
+        self.wip.refresh_from_db()
+        PublicationSnapshot.objects.bulk_create([
+            PublicationSnapshot(version_projet=self.wip, rubrique=r, revision=r.revisions.get(numero=1))
+            for r in (self.racine, self.chapitre, self.section)
+        ])
+        # Édition postérieure à la publication : non exportée.
+        RevisionRubrique.objects.create(
+            rubrique=self.chapitre, numero=2, contenu_xml="<topic id='c'><title>C2</title></topic>",
+            hash_contenu="2" * 64, auteur=self.user,
+        )
+        Rubrique.objects.filter(pk=self.chapitre.pk).update(revision_courante_numero=2)
+
+        fige = export_map_to_dita(self.map_obj.pk, version_projet=self.wip)
+        courant = export_map_to_dita(self.map_obj.pk)
+        chemin = f"topics/rubrique-{self.chapitre.pk}.dita"
+        self.assertIn("<title>C</title>", self._lire(os.path.join(fige["dossier"], chemin)))
+        self.assertIn("<title>C2</title>", self._lire(os.path.join(courant["dossier"], chemin)))
+
+    def test_nombre_de_requetes_constant(self):
+        for i in range(10):
+            _attach(self.map_obj, _make_rubrique(self.projet, self.wip, self.user, titre=f"T{i}"), ordre=i + 2)
+        # map, structure, index des révisions, contenus (un seul lot)
+        with self.assertNumQueries(4):
+            export_map_to_dita(self.map_obj.pk)
+        # Cache chaud : aucun contenu relu
+        with self.assertNumQueries(3):
+            export_map_to_dita(self.map_obj.pk)
+
+    def test_republication_ne_regenere_que_les_topics_modifies(self):
+        premier = export_map_to_dita(self.map_obj.pk)
+        self.assertEqual(premier["cache"], {"reutilises": 0, "generes": 2, "taux_reutilisation": 0.0})
+
+        xml = "<topic id='c'><title>C modifié</title></topic>"
+        create_revision_if_changed(rubrique=self.chapitre, new_xml=xml, user=self.user)
+
+        second = export_map_to_dita(self.map_obj.pk)
+        self.assertEqual(second["cache"], {"reutilises": 1, "generes": 1, "taux_reutilisation": 0.5})
+        self.assertIn(
+            "C modifié",
+            self._lire(os.path.join(second["dossier"], f"topics/rubrique-{self.chapitre.pk}.dita")),
+        )
+
+    def test_cache_distinct_par_format(self):
+        export_map_to_dita(self.map_obj.pk, output_format="pdf")
+        result = export_map_to_dita(self.map_obj.pk, output_format="html5")
+        self.assertEqual(result["cache"]["reutilises"], 0)
+
+    def test_map_introuvable(self):
+        result = export_map_to_dita(999999)
+        self.assertEqual(result["status"], "error")
+
+    @override_settings(DITA_OT_BIN="/inexistant/dita")
+    def test_echec_dita_ot_rapporte_sans_exception(self):
+        result = export_map_to_dita(self.map_obj.pk, renderer=RenduDitaOt())
+        self.assertEqual(result["status"], "error")
+        self.assertIn("DITA-OT indisponible", result["message"])
+
+    def _exports(self):
+        return [nom for nom in os.listdir(self.dossier) if nom.startswith("map-")]
+
+    def test_dossier_de_travail_supprime_apres_exception_du_rendu(self):
+        with self.assertRaises(RuntimeError):
+            export_map_to_dita(self.map_obj.pk, output_format="html5", renderer=RenduEchecHtml5())
+        with self.assertRaises(RuntimeError):
+            export_map_multi_formats(
+                self.map_obj.pk, ["pdf", "markdown"], renderer=PreparationEnPanne(), concurrence=1
+            )
+        self.assertEqual(self._exports(), [])
+
+    def test_supprimer_export(self):
+        result = export_map_to_dita(self.map_obj.pk)
+        multi = export_map_multi_formats(self.map_obj.pk, ["pdf", "html5"], concurrence=1)
+        self.assertEqual(len(self._exports()), 2)
+
+        supprimer_export(result)
+        supprimer_export(multi)
+        self.assertEqual(self._exports(), [])
+        # Cache des topics conservé ; dossier hors de DITA_EXPORT_ROOT ignoré.
+        self.assertTrue(os.path.isdir(os.path.join(self.dossier, "cache")))
+        supprimer_export({"dossier": os.path.dirname(self.dossier)})
+        self.assertTrue(os.path.isdir(self.dossier))
+
+
+class RenduEchecHtml5(RenduLocal):
+
+    def rendre(self, *, ditamap, output_format, dossier_sortie):
+        if output_format == "html5":
+            raise RuntimeError("moteur en panne")
+        return super().rendre(ditamap=ditamap, output_format=output_format, dossier_sortie=dossier_sortie)
+
+
+class PreparationEnPanne(RenduLocal):
+
+    def preparer_topic(self, xml, output_format):
+        raise RuntimeError("préparation en panne")
+
+
+class ExportMultiFormatsTest(_MapExportee, TestCase):
+
+    def test_un_bundle_par_format(self):
+        result = export_map_multi_formats(self.map_obj.pk, ["pdf", "html5"], concurrence=1)
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(list(result["formats"]), ["pdf", "html5"])
+        self.assertEqual(result["topics_count"], 2)
+        nom = f"map-{self.map_obj.pk}.ditamap"
+        pdf, html5 = (result["formats"][f]["dossier"] for f in ("pdf", "html5"))
+        # Ditamap écrite une fois, liée dans chaque bundle.
+        self.assertTrue(os.path.samefile(os.path.join(pdf, nom), os.path.join(html5, nom)))
+        for output_format, dossier in (("pdf", pdf), ("html5", html5)):
+            index = self._lire(os.path.join(dossier, "out", f"index.{output_format}.txt"))
+            self.assertIn(f"topics/rubrique-{self.section.pk}.dita", index)
+            self.assertEqual(result["formats"][output_format]["cache"]["generes"], 2)
+            self.assertIn("rendu", result["formats"][output_format]["durees_ms"])
+
+    def test_contenus_lus_une_seule_fois(self):
+        for i in range(10):
+            _attach(self.map_obj, _make_rubrique(self.projet, self.wip, self.user, titre=f"T{i}"), ordre=i + 2)
+        # Autant de requêtes que pour un seul format.
+        with self.assertNumQueries(4):
+            export_map_multi_formats(self.map_obj.pk, ["pdf", "html5", "markdown"], concurrence=1)
+
+    def test_rendus_paralleles(self):
+        result = export_map_multi_formats(self.map_obj.pk, ["pdf", "html5"], concurrence=2)
+
+        self.assertEqual(result["status"], "success")
+        for output_format, rendu in result["formats"].items():
+            self.assertTrue(
+                os.path.exists(os.path.join(rendu["dossier"], "out", f"index.{output_format}.txt"))
+            )
+
+    def test_echec_partiel_rapporte_par_format(self):
+        result = export_map_multi_formats(
+            self.map_obj.pk, ["pdf", "html5"], renderer=RenduEchecHtml5(), concurrence=1
+        )
+
+        self.assertEqual(result["status"], "partial")
+        self.assertEqual(result["formats"]["pdf"]["status"], "success")
+        self.assertEqual(result["formats"]["html5"]["status"], "error")
+        self.assertIn("moteur en panne", result["formats"]["html5"]["message"])
+
+    def test_map_introuvable(self):
+        result = export_map_multi_formats(999999, ["pdf", "html5"])
+        self.assertEqual(result["status"], "error")
@@ -8,16 +8,22 @@ Couverture :
 - _build_rubrique_revision_map()
 - _detect_changes()
 - publish_project() — service complet (mocked export)
+- Snapshots en delta et résolution de l'ensemble publié (snapshots_publies)
+- Registre des publications (Publication, Projet.derniere_publication)
 - get_publication_diff()
-- API POST /api/publier-map/{id}/
+- Cache du diff de publication (invalidation par révision, structure, publication)
+- API POST /api/publier-map/{id}/ (202 + tâche de publication)
 - API GET /api/projets/{id}/publication-diff/
+- API GET /api/projets/{id}/publications/ (historique paginé)
 """
 from unittest.mock import patch
 
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.core.cache import cache
+from django.db.models import Max, RestrictedError
+from django.test import TestCase, override_settings
 from django.urls import reverse
-from rest_framework.test import APITestCase
+from rest_framework.test import APIClient, APITestCase
 
 from documentation.models import (
     Gamme,
@@ -25,20 +31,26 @@ from documentation.models import (
     MapRubrique,
     Produit,
     Projet,
+    Publication,
     PublicationSnapshot,
     RevisionRubrique,
     Rubrique,
     VersionProjet,
 )
+from documentation import services
 from documentation.services import (
     _build_rubrique_revision_map,
     _detect_changes,
     _get_last_published_version,
+    add_rubrique_to_map,
     bump_minor_version,
     create_initial_revision,
+    create_revision_if_changed,
     get_publication_diff,
+    indent_map_rubrique,
     publish_project,
 )
+from documentation.utils import get_active_version, snapshots_publies
 
 
 # ---------------------------------------------------------------------------
@@ -81,9 +93,17 @@ def _attach(map_obj, rubrique, ordre=1, parent=None):
 
 
 def _publish_snapshot(version, rubrique, revision):
-    """Crée un PublicationSnapshot manuellement pour simuler une publication passée."""
+    """
+    Crée un PublicationSnapshot manuellement pour simuler une publication passée
+    (inscrite au registre, pointeur Projet.derniere_publication à jour).
+    """
     version.is_active = False
-    version.save(update_fields=["is_active"])
+    if version.rang_publication is None:
+        rang = VersionProjet.objects.filter(projet=version.projet).aggregate(m=Max("rang_publication"))["m"]
+        version.rang_publication = (rang or 0) + 1
+    version.save(update_fields=["is_active", "rang_publication"])
+    publication, _ = Publication.objects.get_or_create(projet=version.projet, version_projet=version)
+    Projet.objects.filter(pk=version.projet_id).update(derniere_publication=publication)
     return PublicationSnapshot.objects.create(
         version_projet=version, rubrique=rubrique, revision=revision
     )
@@ -157,6 +177,14 @@ class GetLastPublishedVersionTest(TestCase):
         last = _get_last_published_version(self.projet)
         self.assertEqual(last.version_numero, "1.1.0")
 
+    def test_lecture_par_pointeur_en_une_requete(self):
+        rubrique = _make_rubrique(self.projet, self.wip, self.user)
+        _publish_snapshot(self.wip, rubrique, rubrique.revisions.get(numero=1))
+
+        # Instance antérieure à la publication : le pointeur est relu en base.
+        with self.assertNumQueries(1):
+            self.assertEqual(_get_last_published_version(self.projet), self.wip)
+
 
 # ---------------------------------------------------------------------------
 # 3. _build_rubrique_revision_map
@@ -205,6 +233,19 @@ class BuildRubriqueRevisionMapTest(TestCase):
         result = _build_rubrique_revision_map(self.map_obj)
         self.assertEqual(result[r.id].numero, 2)
 
+    def test_une_seule_requete(self):
+        for i in range(5):
+            _attach(self.map_obj, _make_rubrique(self.projet, self.wip, self.user, titre=f"R{i}"), ordre=i)
+        with self.assertNumQueries(1):
+            result = _build_rubrique_revision_map(self.map_obj)
+        self.assertEqual(len(result), 5)
+
+    def test_rubrique_presente_deux_fois_dans_la_map(self):
+        r = _make_rubrique(self.projet, self.wip, self.user)
+        parent = _attach(self.map_obj, r, ordre=1)
+        _attach(self.map_obj, r, ordre=1, parent=parent)
+        self.assertEqual(list(_build_rubrique_revision_map(self.map_obj)), [r.id])
+
     def test_rubrique_hors_map_non_incluse(self):
         r_in = _make_rubrique(self.projet, self.wip, self.user, titre="in")
         r_out = _make_rubrique(self.projet, self.wip, self.user, titre="out", xml="<out/>")
@@ -221,89 +262,96 @@ class BuildRubriqueRevisionMapTest(TestCase):
 
 class DetectChangesTest(TestCase):
 
+    def setUp(self):
+        self.user = _make_user()
+        self.projet, self.wip, self.map_obj = _make_projet(self.user)
+
+    def _publier(self, *rubriques):
+        """Simule une publication figée de la WIP avec les révisions courantes."""
+        for r in rubriques:
+            PublicationSnapshot.objects.create(
+                version_projet=self.wip, rubrique=r, revision=r.revisions.get(numero=1)
+            )
+        self.wip.is_active = False
+        self.wip.rang_publication = 1
+        self.wip.save()
+        return self.wip
+
     def test_premiere_publication_tout_nouveau(self):
-        rubrique_revision_map = {1: object(), 2: object()}
-        result = _detect_changes(rubrique_revision_map, last_published=None)
+        r1 = _make_rubrique(self.projet, self.wip, self.user, titre="R1")
+        r2 = _make_rubrique(self.projet, self.wip, self.user, titre="R2")
+        _attach(self.map_obj, r1)
+        _attach(self.map_obj, r2, ordre=2)
+        result = _detect_changes(self.map_obj, last_published=None)
         self.assertTrue(result["has_changes"])
-        self.assertEqual(set(result["nouvelles"]), {1, 2})
+        self.assertEqual(set(result["nouvelles"]), {r1.id, r2.id})
         self.assertEqual(result["modifiees"], [])
         self.assertEqual(result["retirees"], [])
 
     def test_premiere_publication_map_vide(self):
-        result = _detect_changes({}, last_published=None)
+        result = _detect_changes(self.map_obj, last_published=None)
         self.assertFalse(result["has_changes"])
 
     def test_aucun_changement(self):
-        from unittest.mock import MagicMock
-
-        rev = MagicMock()
-        rev.id = 10
-
-        snap = MagicMock()
-        snap.rubrique_id = 1
-        snap.revision_id = 10
-
-        last_published = MagicMock()
-        last_published.publication_snapshots.all.return_value = [snap]
+        r = _make_rubrique(self.projet, self.wip, self.user)
+        _attach(self.map_obj, r)
+        last_published = self._publier(r)
 
-        result = _detect_changes({1: rev}, last_published=last_published)
+        result = _detect_changes(self.map_obj, last_published=last_published)
         self.assertFalse(result["has_changes"])
         self.assertEqual(result["nouvelles"], [])
         self.assertEqual(result["modifiees"], [])
         self.assertEqual(result["retirees"], [])
 
     def test_rubrique_modifiee(self):
-        from unittest.mock import MagicMock
-
-        rev_new = MagicMock()
-        rev_new.id = 20  # ≠ 10
-
-        snap = MagicMock()
-        snap.rubrique_id = 1
-        snap.revision_id = 10
+        from documentation.services import create_revision_if_changed
 
-        last_published = MagicMock()
-        last_published.publication_snapshots.all.return_value = [snap]
+        r = _make_rubrique(self.projet, self.wip, self.user)
+        _attach(self.map_obj, r)
+        last_published = self._publier(r)
+        create_revision_if_changed(rubrique=r, new_xml="<topic2/>", user=self.user)
 
-        result = _detect_changes({1: rev_new}, last_published=last_published)
+        result = _detect_changes(self.map_obj, last_published=last_published)
         self.assertTrue(result["has_changes"])
-        self.assertIn(1, result["modifiees"])
+        self.assertEqual(result["modifiees"], [r.id])
 
     def test_rubrique_retiree(self):
-        from unittest.mock import MagicMock
-
-        snap = MagicMock()
-        snap.rubrique_id = 99
-        snap.revision_id = 5
-
-        last_published = MagicMock()
-        last_published.publication_snapshots.all.return_value = [snap]
+        r = _make_rubrique(self.projet, self.wip, self.user)
+        noeud = _attach(self.map_obj, r)
+        last_published = self._publier(r)
+        # Map courante ne contient plus la rubrique
+        noeud.delete()
 
-        # Map courante ne contient plus la rubrique 99
-        result = _detect_changes({}, last_published=last_published)
+        result = _detect_changes(self.map_obj, last_published=last_published)
         self.assertTrue(result["has_changes"])
-        self.assertIn(99, result["retirees"])
+        self.assertEqual(result["retirees"], [r.id])
 
     def test_nouvelle_rubrique(self):
-        from unittest.mock import MagicMock
-
-        rev = MagicMock()
-        rev.id = 1
+        connue = _make_rubrique(self.projet, self.wip, self.user, titre="connue")
+        _attach(self.map_obj, connue)
+        last_published = self._publier(connue)
+        nouvelle = _make_rubrique(self.projet, self.wip, self.user, titre="nouvelle")
+        _attach(self.map_obj, nouvelle, ordre=2)
 
-        snap = MagicMock()
-        snap.rubrique_id = 10
-        snap.revision_id = 1
-
-        last_published = MagicMock()
-        last_published.publication_snapshots.all.return_value = [snap]
-
-        # Rubrique 10 connue + rubrique 20 nouvelle
-        rev2 = MagicMock()
-        rev2.id = 1
-
-        result = _detect_changes({10: rev, 20: rev2}, last_published=last_published)
+        result = _detect_changes(self.map_obj, last_published=last_published)
         self.assertTrue(result["has_changes"])
-        self.assertIn(20, result["nouvelles"])
+        self.assertEqual(result["nouvelles"], [nouvelle.id])
+        self.assertEqual(result["modifiees"], [])
+
+    def test_effectifs_sans_details(self):
+        r1 = _make_rubrique(self.projet, self.wip, self.user, titre="R1")
+        r2 = _make_rubrique(self.projet, self.wip, self.user, titre="R2")
+        _attach(self.map_obj, r1)
+        noeud = _attach(self.map_obj, r2, ordre=2)
+        last_published = self._publier(r1, r2)
+        noeud.delete()
+        _attach(self.map_obj, _make_rubrique(self.projet, self.wip, self.user, titre="R3"), ordre=3)
+
+        with self.assertNumQueries(3):
+            result = _detect_changes(self.map_obj, last_published=last_published, details=False)
+        self.assertEqual(
+            result, {"nouvelles": 1, "modifiees": 0, "retirees": 1, "has_changes": True}
+        )
 
 
 # ---------------------------------------------------------------------------
@@ -419,6 +467,179 @@ class PublishProjectServiceTest(TestCase):
         self.assertEqual(PublicationSnapshot.objects.count(), 2)
 
 
+class SnapshotsDeltaTest(TestCase):
+
+    def setUp(self):
+        self.user = _make_user()
+        self.projet, self.v1, self.map_obj = _make_projet(self.user)
+        self.r1, self.r2, self.r3 = (
+            _make_rubrique(self.projet, self.v1, self.user, titre=f"R{i}", xml=f"<topic>{i}</topic>")
+            for i in (1, 2, 3)
+        )
+        self.noeuds = {r.pk: _attach(self.map_obj, r, ordre=i) for i, r in enumerate((self.r1, self.r2, self.r3))}
+
+    @patch("documentation.services.export_map_to_dita", return_value=EXPORT_STUB)
+    def _publier(self, _mock):
+        publish_project(projet=self.projet, map_obj=self.map_obj, format_output="pdf", user=self.user)
+        return _get_last_published_version(self.projet)
+
+    def _publies(self, version):
+        return dict(snapshots_publies(version).values_list("rubrique_id", "revision__numero"))
+
+    def _deuxieme_publication(self):
+        """R2 modifiée, R3 retirée, R4 ajoutée."""
+        self._publier()
+        create_revision_if_changed(rubrique=self.r2, new_xml="<topic>2 bis</topic>", user=self.user)
+        self.noeuds[self.r3.pk].delete()
+        wip = get_active_version(self.projet)
+        self.r4 = _make_rubrique(self.projet, wip, self.user, titre="R4", xml="<topic>4</topic>")
+        _attach(self.map_obj, self.r4, ordre=9)
+        return self._publier()
+
+    def test_premiere_publication_complete(self):
+        v1 = self._publier()
+        self.assertEqual(v1.rang_publication, 1)
+        self.assertEqual(v1.publication_snapshots.count(), 3)
+
+    def test_publication_suivante_ne_stocke_que_le_delta(self):
+        v2 = self._deuxieme_publication()
+
+        self.assertEqual(v2.rang_publication, 2)
+        delta = dict(v2.publication_snapshots.values_list("rubrique_id", "revision__numero"))
+        self.assertEqual(delta, {self.r2.pk: 2, self.r3.pk: None, self.r4.pk: 1})
+
+    def test_resolution_de_l_ensemble_complet_en_une_requete(self):
+        v2 = self._deuxieme_publication()
+
+        with self.assertNumQueries(1):
+            publies = self._publies(v2)
+        self.assertEqual(publies, {self.r1.pk: 1, self.r2.pk: 2, self.r4.pk: 1})
+        # La version précédente reste résolue à l'identique.
+        self.v1.refresh_from_db()
+        self.assertEqual(self._publies(self.v1), {self.r1.pk: 1, self.r2.pk: 1, self.r3.pk: 1})
+
+    def test_registre_compte_l_ensemble_complet(self):
+        self._deuxieme_publication()
+        self.assertEqual(
+            list(Publication.objects.order_by("id").values_list("nb_snapshots", flat=True)), [3, 3]
+        )
+
+    def test_aucun_changement_detecte_apres_delta(self):
+        v2 = self._deuxieme_publication()
+        self.assertFalse(_detect_changes(self.map_obj, v2)["has_changes"])
+
+    def test_rubrique_retiree_puis_reintegree(self):
+        self._deuxieme_publication()
+        _attach(self.map_obj, self.r3, ordre=10)
+
+        v3 = self._publier()
+
+        self.assertEqual(self._publies(v3)[self.r3.pk], 1)
+        self.assertEqual(v3.publication_snapshots.count(), 1)
+
+    def test_version_publiee_intermediaire_non_supprimable(self):
+        v2 = self._deuxieme_publication()
+        create_revision_if_changed(rubrique=self.r1, new_xml="<topic>1 bis</topic>", user=self.user)
+        v3 = self._publier()
+        attendu = self._publies(v3)
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.delete(reverse("versionprojet-detail", args=[v2.pk]))
+        self.assertEqual(response.status_code, 400)
+        with self.assertRaises(RestrictedError):
+            v2.delete()
+
+        self.assertTrue(VersionProjet.objects.filter(pk=v2.pk).exists())
+        self.assertEqual(self._publies(v3), attendu)
+
+    def test_version_non_publiee_supprimable(self):
+        self._publier()
+        wip = get_active_version(self.projet)
+        self.assertIsNone(wip.rang_publication)
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.delete(reverse("versionprojet-detail", args=[wip.pk]))
+        self.assertEqual(response.status_code, 204)
+
+    def test_suppression_du_projet_entier_possible(self):
+        self._deuxieme_publication()
+        self.projet.delete()
+        self.assertFalse(PublicationSnapshot.objects.exists())
+        self.assertFalse(Publication.objects.exists())
+
+
+class RegistrePublicationsTest(TestCase):
+
+    def setUp(self):
+        self.user = _make_user()
+        self.projet, self.wip, self.map_obj = _make_projet(self.user)
+        self.rubrique = _make_rubrique(self.projet, self.wip, self.user)
+        _attach(self.map_obj, self.rubrique)
+
+    def _publier(self):
+        return publish_project(
+            projet=self.projet, map_obj=self.map_obj, format_output="pdf", user=self.user
+        )
+
+    @patch("documentation.services.export_map_to_dita", return_value=EXPORT_STUB)
+    def test_publication_inscrite_au_registre(self, _mock):
+        self._publier()
+
+        publication = Publication.objects.get()
+        self.assertEqual(publication.version_projet, self.wip)
+        self.assertTrue(publication.nouvelle_version)
+        self.assertEqual(publication.nb_snapshots, 1)
+        self.assertEqual(publication.formats, ["pdf"])
+        self.assertEqual(publication.auteur, self.user)
+        self.projet.refresh_from_db()
+        self.assertEqual(self.projet.derniere_publication, publication)
+
+    @patch("documentation.services.export_map_to_dita", return_value=EXPORT_STUB)
+    def test_republication_sans_changement_inscrite(self, _mock):
+        self._publier()
+        self._publier()
+
+        derniere, premiere = Publication.objects.order_by("-id")
+        self.assertFalse(derniere.nouvelle_version)
+        self.assertEqual(derniere.version_projet, premiere.version_projet)
+        self.assertEqual(derniere.nb_snapshots, 1)
+        self.projet.refresh_from_db()
+        self.assertEqual(self.projet.derniere_publication, derniere)
+
+    @patch(
+        "documentation.services.export_map_to_dita",
+        return_value={"status": "success", "format": "pdf", "dossier": "/exports/x", "rendu": {"sortie": "/exports/x/out"}},
+    )
+    def test_rendu_non_range_non_reference(self, _mock):
+        # Rendu introuvable : non rangé au magasin, donc pas d'emplacement enregistré.
+        self._publier()
+        self.assertEqual(Publication.objects.get().artefacts, {})
+
+    @patch("documentation.services.export_map_to_dita", return_value=EXPORT_STUB)
+    def test_suppression_publication_ne_vaut_pas_jamais_publie(self, _mock):
+        self._publier()
+        Publication.objects.all().delete()
+        self.projet.refresh_from_db()
+        self.assertIsNone(self.projet.derniere_publication)
+        publiee = _get_last_published_version(self.projet)
+        self.assertEqual(publiee, self.wip)
+        self.assertFalse(_detect_changes(self.map_obj, publiee)["has_changes"])
+
+        create_revision_if_changed(rubrique=self.rubrique, new_xml="<topic>bis</topic>", user=self.user)
+        self._publier()
+
+        version = _get_last_published_version(self.projet)
+        self.assertEqual(version.rang_publication, 2)
+        # Seul le delta est stocké : l'historique n'est pas repris comme nouveau.
+        self.assertEqual(version.publication_snapshots.count(), 1)
+        self.assertEqual(
+            dict(snapshots_publies(version).values_list("rubrique_id", "revision__numero")),
+            {self.rubrique.pk: 2},
+        )
+
+
 # ---------------------------------------------------------------------------
 # 6. get_publication_diff
 # ---------------------------------------------------------------------------
@@ -426,6 +647,7 @@ class PublishProjectServiceTest(TestCase):
 class GetPublicationDiffTest(TestCase):
 
     def setUp(self):
+        cache.clear()
         self.user = _make_user()
         self.projet, self.wip, self.map_obj = _make_projet(self.user)
 
@@ -458,6 +680,98 @@ class GetPublicationDiffTest(TestCase):
         self.assertEqual(diff["derniere_version_publiee"], "1.0.0")
 
 
+class PublicationDiffCacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = _make_user()
+        self.projet, self.wip, self.map_obj = _make_projet(self.user)
+        self.rubrique = _make_rubrique(self.projet, self.wip, self.user)
+        _attach(self.map_obj, self.rubrique)
+
+    def _diff(self):
+        return get_publication_diff(projet=self.projet, map_obj=self.map_obj)
+
+    def test_sondage_repete_en_une_requete(self):
+        premier = self._diff()
+        # Seule l'empreinte de la map est lue ; le diff vient du cache.
+        with self.assertNumQueries(1):
+            self.assertEqual(self._diff(), premier)
+
+    def test_ecriture_directe_sans_invalidation_non_servie_perimee(self):
+        self.assertEqual(self._diff()["changements"]["nouvelles"], 1)
+
+        # Rattachement hors services (admin, ORM) : aucun appel à invalider_publication_diff.
+        autre = _make_rubrique(self.projet, self.wip, self.user, titre="R2")
+        MapRubrique.objects.create(map=self.map_obj, rubrique=autre, ordre=99)
+
+        self.assertEqual(self._diff()["changements"]["nouvelles"], 2)
+
+    def test_detail_et_effectifs_caches_separement(self):
+        self._diff()
+        diff = get_publication_diff(projet=self.projet, map_obj=self.map_obj, details=False)
+        self.assertIsNone(diff["detail"])
+
+    @patch("documentation.services.export_map_to_dita", return_value=EXPORT_STUB)
+    def test_invalide_par_nouvelle_revision(self, _mock):
+        publish_project(projet=self.projet, map_obj=self.map_obj, format_output="pdf", user=self.user)
+        self.assertFalse(self._diff()["has_changes"])
+
+        create_revision_if_changed(rubrique=self.rubrique, new_xml="<topic><p/></topic>", user=self.user)
+
+        self.assertEqual(self._diff()["changements"]["modifiees"], 1)
+
+    @override_settings(REVISION_COALESCING_SECONDS=60)
+    def test_invalide_par_edition_regroupee_dans_le_brouillon(self):
+        create_revision_if_changed(rubrique=self.rubrique, new_xml="<topic><p/></topic>", user=self.user)
+        self._diff()
+
+        revision = create_revision_if_changed(
+            rubrique=self.rubrique, new_xml="<topic><p>bis</p></topic>", user=self.user
+        )
+        self.assertEqual(revision.numero, 2)
+
+        with patch(
+            "documentation.services._calculer_publication_diff",
+            wraps=services._calculer_publication_diff,
+        ) as calcul:
+            self._diff()
+        calcul.assert_called_once()
+
+    def test_invalide_par_changement_de_structure(self):
+        self.assertEqual(self._diff()["changements"]["nouvelles"], 1)
+
+        autre = _make_rubrique(self.projet, self.wip, self.user, titre="R2")
+        add_rubrique_to_map(map_id=self.map_obj.pk, rubrique_id=autre.pk)
+
+        self.assertEqual(self._diff()["changements"]["nouvelles"], 2)
+
+    def test_changement_de_hierarchie_invalide_aussi(self):
+        autre = _make_rubrique(self.projet, self.wip, self.user, titre="R2")
+        mr = add_rubrique_to_map(map_id=self.map_obj.pk, rubrique_id=autre.pk)
+        self._diff()
+
+        indent_map_rubrique(map_id=self.map_obj.pk, map_rubrique_id=mr.pk)
+
+        with patch(
+            "documentation.services._calculer_publication_diff",
+            wraps=services._calculer_publication_diff,
+        ) as calcul:
+            self._diff()
+        calcul.assert_called_once()
+
+    @patch("documentation.services.export_map_to_dita", return_value=EXPORT_STUB)
+    def test_invalide_par_publication(self, _mock):
+        self.assertTrue(self._diff()["has_changes"])
+
+        publish_project(projet=self.projet, map_obj=self.map_obj, format_output="pdf", user=self.user)
+
+        diff = self._diff()
+        self.assertFalse(diff["has_changes"])
+        self.assertEqual(diff["derniere_version_publiee"], "1.0.0")
+        self.assertEqual(diff["version_wip_courante"], "1.1.0")
+
+
 # ---------------------------------------------------------------------------
 # 7. API POST /api/publier-map/{id}/
 # ---------------------------------------------------------------------------
@@ -473,17 +787,20 @@ class PublierMapAPITest(APITestCase):
         return f"/api/publier-map/{map_id}/"
 
     @patch("documentation.services.export_map_to_dita", return_value=EXPORT_STUB)
-    def test_publication_reussie(self, _mock):
+    def test_publication_reussie(self, mock_export):
         r = _make_rubrique(self.projet, self.wip, self.user)
         _attach(self.map_obj, r)
 
         response = self.client.post(self._url(self.map_obj.id), {"format": "pdf"})
 
-        self.assertEqual(response.status_code, 200)
+        # Versionnage immédiat, export différé au worker
+        self.assertEqual(response.status_code, 202)
         data = response.json()
-        self.assertEqual(data["status"], "ok")
+        self.assertEqual(data["status"], "accepted")
         self.assertEqual(data["version_publiee"], "1.0.0")
         self.assertEqual(data["nouvelle_version_wip"], "1.1.0")
+        self.assertEqual(data["statut_url"], f"/api/publications/{data['tache_id']}/")
+        mock_export.assert_not_called()
 
     @patch("documentation.services.export_map_to_dita", return_value=EXPORT_STUB)
     def test_map_inexistante_retourne_404(self, _mock):
@@ -522,6 +839,7 @@ class PublierMapAPITest(APITestCase):
 class PublicationDiffAPITest(APITestCase):
 
     def setUp(self):
+        cache.clear()
         self.user = _make_user(username="diff_user")
         self.client.force_authenticate(user=self.user)
         self.projet, self.wip, self.map_obj = _make_projet(self.user)
@@ -540,6 +858,17 @@ class PublicationDiffAPITest(APITestCase):
         self.assertTrue(data["has_changes"])
         self.assertEqual(data["changements"]["nouvelles"], 1)
 
+    def test_diff_sans_detail(self):
+        r = _make_rubrique(self.projet, self.wip, self.user)
+        _attach(self.map_obj, r)
+
+        response = self.client.get(self._url(self.projet.id), {"detail": "false"})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["changements"], {"nouvelles": 1, "modifiees": 0, "retirees": 0})
+        self.assertIsNone(data["detail"])
+
     def test_projet_inexistant_retourne_404(self):
         response = self.client.get(self._url(99999))
         self.assertEqual(response.status_code, 404)
@@ -555,3 +884,35 @@ class PublicationDiffAPITest(APITestCase):
 
         response = self.client.get(self._url(self.projet.id))
         self.assertEqual(response.status_code, 404)
+
+
+class HistoriquePublicationsAPITest(APITestCase):
+
+    def setUp(self):
+        self.user = _make_user(username="histo_user")
+        self.client.force_authenticate(user=self.user)
+        self.projet, self.wip, self.map_obj = _make_projet(self.user)
+        self.rubrique = _make_rubrique(self.projet, self.wip, self.user)
+        _attach(self.map_obj, self.rubrique)
+
+    def _url(self, projet_id):
+        return f"/api/projets/{projet_id}/publications/"
+
+    @patch("documentation.services.export_map_to_dita", return_value=EXPORT_STUB)
+    def test_historique_du_plus_recent_au_plus_ancien(self, _mock):
+        for i in range(3):
+            create_revision_if_changed(rubrique=self.rubrique, new_xml=f"<topic>{i}</topic>", user=self.user)
+            publish_project(projet=self.projet, map_obj=self.map_obj, format_output="pdf", user=self.user)
+
+        response = self.client.get(self._url(self.projet.id), {"page_size": 2})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([p["version_publiee"] for p in data["results"]], ["1.2.0", "1.1.0"])
+        self.assertEqual(data["results"][0]["auteur_username"], "histo_user")
+        suite = self.client.get(data["next"]).json()
+        self.assertEqual([p["version_publiee"] for p in suite["results"]], ["1.0.0"])
+        self.assertIsNone(suite["next"])
+
+    def test_projet_inexistant_retourne_404(self):
+        self.assertEqual(self.client.get(self._url(99999)).status_code, 404)
@@ -0,0 +1,181 @@
+# documentation/tests/test_publication_jobs.py
+"""
+Tests de la publication asynchrone (TachePublication).
+
+Couverture :
+- planifier_publication() : versionnage immédiat + tâche en attente
+- Publication multi-format : une tâche, un rendu par format
+- Worker (run_publication_worker --once) : export, progression, journal
+- Échec d'export consigné sans effet sur la version publiée
+- Reprise d'une tâche abandonnée par un worker, abandon après N tentatives
+- API GET /api/publications/{id}/
+"""
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils.timezone import now
+from rest_framework.test import APITestCase
+
+from documentation.models import Publication, PublicationSnapshot, TachePublication, VersionProjet
+from documentation.services import (
+    MAX_TENTATIVES_PUBLICATION,
+    planifier_publication,
+    prendre_tache_publication,
+)
+
+from .test_publication import _attach, _make_projet, _make_rubrique, _make_user
+
+
+class _ExportLocalMixin:
+    """Exports écrits dans un dossier temporaire, rendu local (sans DITA-OT)."""
+
+    def setUp(self):
+        super().setUp()
+        self.dossier = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dossier, ignore_errors=True)
+        reglages = override_settings(
+            DITA_EXPORT_ROOT=self.dossier,
+            DITA_RENDERER="documentation.exporters.RenduLocal",
+            PUBLICATION_ARTEFACT_ROOT=os.path.join(self.dossier, "artefacts"),
+        )
+        reglages.enable()
+        self.addCleanup(reglages.disable)
+
+        self.user = _make_user()
+        self.projet, self.wip, self.map_obj = _make_projet(self.user)
+        _attach(self.map_obj, _make_rubrique(self.projet, self.wip, self.user))
+
+
+class PlanifierPublicationTest(_ExportLocalMixin, TestCase):
+
+    def _planifier(self):
+        return planifier_publication(
+            projet=self.projet, map_obj=self.map_obj, format_output="html5", user=self.user
+        )
+
+    def test_versionnage_immediat_et_tache_en_attente(self):
+        result, tache = self._planifier()
+        self.assertEqual(result["version_publiee"], "1.0.0")
+        self.assertEqual(PublicationSnapshot.objects.count(), 1)
+        self.assertEqual(tache.statut, "en_attente")
+        self.assertEqual(tache.version_projet, self.wip)
+
+    def test_worker_execute_l_export(self):
+        _, tache = self._planifier()
+        out = StringIO()
+        call_command("run_publication_worker", "--once", stdout=out)
+
+        tache.refresh_from_db()
+        self.assertEqual(tache.statut, "terminee")
+        self.assertEqual(tache.progression, 100)
+        self.assertEqual(tache.tentatives, 1)
+        self.assertEqual(tache.resultat["topics_count"], 1)
+        for phase in ("structure", "topics", "ditamap", "rendu"):
+            self.assertIn(f"Phase {phase}.", tache.journal)
+        self.assertIn("1 tâche(s) de publication traitée(s)", out.getvalue())
+
+    @patch(
+        "documentation.services.export_map_to_dita",
+        return_value={"status": "error", "message": "DITA-OT indisponible"},
+    )
+    def test_echec_export_sans_effet_sur_la_version(self, _mock):
+        _, tache = self._planifier()
+        call_command("run_publication_worker", "--once", stdout=StringIO())
+
+        tache.refresh_from_db()
+        self.assertEqual(tache.statut, "echec")
+        self.assertIn("DITA-OT indisponible", tache.journal)
+        self.assertTrue(VersionProjet.objects.filter(projet=self.projet, version_numero="1.1.0").exists())
+
+    @patch("documentation.services.export_map_to_dita", side_effect=RuntimeError("boom"))
+    def test_exception_consignee(self, _mock):
+        _, tache = self._planifier()
+        call_command("run_publication_worker", "--once", stdout=StringIO())
+        tache.refresh_from_db()
+        self.assertEqual(tache.statut, "echec")
+        self.assertIn("boom", tache.resultat["message"])
+
+    def test_tache_abandonnee_reprise(self):
+        _, tache = self._planifier()
+        self.assertEqual(prendre_tache_publication().pk, tache.pk)
+        # Worker arrêté : plus de battement de cœur.
+        TachePublication.objects.filter(pk=tache.pk).update(
+            date_mise_a_jour=now() - timedelta(hours=2)
+        )
+        reprise = prendre_tache_publication()
+        self.assertEqual(reprise.pk, tache.pk)
+        self.assertEqual(reprise.tentatives, 2)
+        self.assertIn("tâche reprise", reprise.journal)
+
+    def test_tache_en_cours_recente_non_reprise(self):
+        self._planifier()
+        prendre_tache_publication()
+        self.assertIsNone(prendre_tache_publication())
+
+    def test_abandon_apres_tentatives(self):
+        _, tache = self._planifier()
+        TachePublication.objects.filter(pk=tache.pk).update(tentatives=MAX_TENTATIVES_PUBLICATION)
+        self.assertIsNone(prendre_tache_publication())
+        tache.refresh_from_db()
+        self.assertEqual(tache.statut, "echec")
+
+
+class TachePublicationAPITest(_ExportLocalMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+
+    def test_publication_puis_suivi(self):
+        response = self.client.post(f"/api/publier-map/{self.map_obj.id}/", {"format": "pdf"})
+        self.assertEqual(response.status_code, 202)
+        statut_url = response.json()["statut_url"]
+
+        data = self.client.get(statut_url).json()
+        self.assertEqual(data["statut"], "en_attente")
+        self.assertIsNone(data["artefact"])
+
+        call_command("run_publication_worker", "--once", stdout=StringIO())
+        data = self.client.get(statut_url).json()
+        self.assertEqual(data["statut"], "terminee")
+        self.assertEqual(data["version_publiee"], "1.0.0")
+        self.assertTrue(data["artefact"].startswith(os.path.join(self.dossier, "artefacts")))
+        self.assertIsInstance(data["journal"], list)
+
+    @override_settings(DITA_RENDER_CONCURRENCY=1)
+    def test_publication_multi_format(self):
+        response = self.client.post(
+            f"/api/publier-map/{self.map_obj.id}/", {"formats": ["pdf", "html5"]}, format="json"
+        )
+        self.assertEqual(response.status_code, 202)
+        statut_url = response.json()["statut_url"]
+
+        call_command("run_publication_worker", "--once", stdout=StringIO())
+        data = self.client.get(statut_url).json()
+        self.assertEqual(data["statut"], "terminee")
+        self.assertEqual(data["formats"], ["pdf", "html5"])
+        self.assertEqual(set(data["artefact"]), {"pdf", "html5"})
+        self.assertTrue(any(ligne.endswith(" ms (topics : 0 réutilisé(s), 1 généré(s)).") for ligne in data["journal"]))
+        self.assertEqual(data["resultat"]["formats"]["html5"]["status"], "success")
+        publication = Publication.objects.get(tache_id=data["id"])
+        self.assertEqual(publication.formats, ["pdf", "html5"])
+        self.assertEqual(publication.artefacts, data["artefact"])
+
+    def test_multi_format_invalide_retourne_400(self):
+        response = self.client.post(
+            f"/api/publier-map/{self.map_obj.id}/", {"formats": ["pdf", "docx"]}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_tache_inexistante_retourne_404(self):
+        self.assertEqual(self.client.get("/api/publications/99999/").status_code, 404)
+
+    def test_non_authentifie_retourne_401(self):
+        self.client.force_authenticate(user=None)
+        self.assertIn(self.client.get("/api/publications/1/").status_code, [401, 403])
@@ -0,0 +1,125 @@
+# documentation/tests/test_revision_retention.py
+"""
+Tests de la rétention de l'historique des révisions (commande prune_revisions).
+
+Couverture :
+- Purge des révisions intermédiaires anciennes
+- Protection : révisions publiées, courante, brouillons
+- Compaction quotidienne (--keep-daily)
+- Dry-run (statistiques sans suppression)
+- Reprise depuis le PointDeReprise
+- Décrément des compteurs de références des blobs
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.timezone import now
+
+from documentation.models import (
+    BlobXml,
+    PointDeReprise,
+    PublicationSnapshot,
+    RevisionRubrique,
+    VersionProjet,
+)
+
+from .test_revision_storage import _editer, _make_rubrique, _variante
+
+
+class PruneRevisionsCommandTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="auteur", password="pw")
+        self.rubrique = _make_rubrique(self.user)
+        for i in range(2, 6):
+            _editer(self.rubrique, _variante(i), self.user)
+        # Historique vieilli : une révision par jour, il y a 200 à 196 jours.
+        for revision in RevisionRubrique.objects.filter(rubrique=self.rubrique):
+            RevisionRubrique.objects.filter(pk=revision.pk).update(
+                date_creation=now() - timedelta(days=201 - revision.numero)
+            )
+
+    def _numeros(self):
+        return list(
+            RevisionRubrique.objects.filter(rubrique=self.rubrique)
+            .order_by("numero")
+            .values_list("numero", flat=True)
+        )
+
+    def _publier(self, numero):
+        PublicationSnapshot.objects.create(
+            version_projet=self.rubrique.version_projet,
+            rubrique=self.rubrique,
+            revision=RevisionRubrique.objects.get(rubrique=self.rubrique, numero=numero),
+        )
+
+    def test_purge_conserve_la_revision_courante(self):
+        call_command("prune_revisions", "--days", "30", stdout=StringIO())
+        self.assertEqual(self._numeros(), [5])
+
+    def test_revision_publiee_conservee(self):
+        self._publier(2)
+        call_command("prune_revisions", "--days", "30", stdout=StringIO())
+        self.assertEqual(self._numeros(), [2, 5])
+
+    def test_brouillon_conserve(self):
+        RevisionRubrique.objects.filter(rubrique=self.rubrique, numero=3).update(brouillon=True)
+        call_command("prune_revisions", "--days", "30", stdout=StringIO())
+        self.assertEqual(self._numeros(), [3, 5])
+
+    def test_revisions_recentes_conservees(self):
+        RevisionRubrique.objects.filter(rubrique=self.rubrique, numero__gte=3).update(date_creation=now())
+        call_command("prune_revisions", "--days", "30", stdout=StringIO())
+        self.assertEqual(self._numeros(), [3, 4, 5])
+
+    def test_keep_daily_conserve_la_derniere_du_jour(self):
+        # Révisions 1 et 2 le même jour : seule la 2 reste.
+        r2 = RevisionRubrique.objects.get(rubrique=self.rubrique, numero=2)
+        RevisionRubrique.objects.filter(rubrique=self.rubrique, numero=1).update(
+            date_creation=r2.date_creation - timedelta(minutes=5)
+        )
+        call_command("prune_revisions", "--days", "30", "--keep-daily", stdout=StringIO())
+        self.assertEqual(self._numeros(), [2, 3, 4, 5])
+
+    def test_dry_run_ne_supprime_rien(self):
+        self._publier(2)
+        out = StringIO()
+        call_command("prune_revisions", "--days", "30", "--dry-run", stdout=out)
+        self.assertEqual(self._numeros(), [1, 2, 3, 4, 5])
+        self.assertIn("protégées (publiées)     : 1", out.getvalue())
+        self.assertIn("supprimables             : 3", out.getvalue())
+        self.assertFalse(PointDeReprise.objects.exists())
+
+    def test_compteurs_de_blobs_decrementes(self):
+        blob_id = RevisionRubrique.objects.get(rubrique=self.rubrique, numero=2).blob_id
+        call_command("prune_revisions", "--days", "30", stdout=StringIO())
+        self.assertEqual(BlobXml.objects.get(pk=blob_id).nb_references, 0)
+
+    def test_reprise_apres_interruption(self):
+        r3 = RevisionRubrique.objects.get(rubrique=self.rubrique, numero=3)
+        PointDeReprise.objects.create(nom="prune_revisions", dernier_id=r3.pk)
+        out = StringIO()
+        call_command("prune_revisions", "--days", "30", "--batch-size", "1", stdout=out)
+        # Révisions 1 à 3 déjà traitées par l'exécution précédente.
+        self.assertEqual(self._numeros(), [1, 2, 3, 5])
+        self.assertIn("Reprise après la révision", out.getvalue())
+        self.assertFalse(PointDeReprise.objects.exists())
+
+    def test_reset_ignore_le_point_de_reprise(self):
+        r3 = RevisionRubrique.objects.get(rubrique=self.rubrique, numero=3)
+        PointDeReprise.objects.create(nom="prune_revisions", dernier_id=r3.pk)
+        call_command("prune_revisions", "--days", "30", "--reset", stdout=StringIO())
+        self.assertEqual(self._numeros(), [5])
+
+    def test_suppression_de_la_rubrique_publiee_reste_possible(self):
+        self._publier(2)
+        self.rubrique.delete()
+        self.assertFalse(RevisionRubrique.objects.exists())
+
+    def test_suppression_de_la_version_publiee_reste_possible(self):
+        self._publier(2)
+        VersionProjet.objects.filter(pk=self.rubrique.version_projet_id).delete()
+        self.assertFalse(PublicationSnapshot.objects.exists())
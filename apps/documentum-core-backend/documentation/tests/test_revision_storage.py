@@ -0,0 +1,289 @@
+# documentation/tests/test_revision_storage.py
+"""
+Tests du stockage compressé des révisions (blobs adressés par empreinte, keyframes + deltas).
+
+Couverture :
+- Codec revision_storage (aller-retour keyframe / delta)
+- Choix keyframe / delta selon l'intervalle configuré
+- Partage des BlobXml par empreinte exacte et compteur de références
+- Reconstruction transparente de RevisionRubrique.contenu_xml (ORM et API)
+- Commande compress_revisions (transfert vers les blobs + rapport d'espace)
+- Commande gc_blobs (collecte des blobs non référencés)
+"""
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from documentation import revision_storage
+from documentation.models import (
+    BlobXml,
+    Gamme,
+    Projet,
+    RevisionRubrique,
+    Rubrique,
+    VersionProjet,
+)
+from documentation.services import create_initial_revision, create_revision_if_changed
+from documentation.utils import compute_xml_hash, empreinte_exacte
+
+PARAGRAPHES = "".join(f"<p>Paragraphe {i} du contenu de référence.</p>" for i in range(200))
+XML_BASE = f"<topic id='t1'><title>Titre</title><body>{PARAGRAPHES}</body></topic>"
+
+
+# Même hash canonique que XML_BASE, octets différents (DOCTYPE, commentaire, guillemets).
+XML_EQUIVALENT = '<!DOCTYPE topic><!-- relu -->' + XML_BASE.replace("id='t1'", 'id="t1"')
+
+
+def _variante(i):
+    return XML_BASE.replace("Paragraphe 42 ", f"Paragraphe 42 (édition {i}) ")
+
+
+def _make_rubrique(user, xml=XML_BASE, nom="G"):
+    gamme = Gamme.objects.create(nom=nom)
+    projet = Projet.objects.create(nom="P", description="", gamme=gamme, auteur=user)
+    version = VersionProjet.objects.create(projet=projet, version_numero="1.0.0", is_active=True)
+    rubrique = Rubrique.objects.create(
+        projet=projet, version_projet=version, titre="R", contenu_xml=xml, auteur=user
+    )
+    create_initial_revision(rubrique=rubrique, user=user)
+    return rubrique
+
+
+def _editer(rubrique, xml, user):
+    revision = create_revision_if_changed(rubrique=rubrique, new_xml=xml, user=user)
+    rubrique.contenu_xml = xml
+    rubrique.save(update_fields=["contenu_xml"])
+    return revision
+
+
+# ---------------------------------------------------------------------------
+# 1. Codec
+# ---------------------------------------------------------------------------
+
+class RevisionStorageCodecTest(SimpleTestCase):
+
+    def test_keyframe_aller_retour(self):
+        donnees = revision_storage.encode_keyframe(XML_BASE)
+        self.assertEqual(revision_storage.decode_keyframe(donnees), XML_BASE)
+        self.assertLess(len(donnees), len(XML_BASE.encode("utf-8")))
+
+    def test_delta_aller_retour(self):
+        cible = _variante(1)
+        donnees = revision_storage.encode_delta(XML_BASE, cible)
+        self.assertEqual(revision_storage.decode_delta(XML_BASE, donnees), cible)
+
+    def test_delta_suppression_et_insertion(self):
+        cible = XML_BASE.replace("<p>Paragraphe 3 du contenu de référence.</p>", "")
+        cible = cible.replace("<title>Titre</title>", "<title>Titre</title><shortdesc>é</shortdesc>")
+        donnees = revision_storage.encode_delta(XML_BASE, cible)
+        self.assertEqual(revision_storage.decode_delta(XML_BASE, donnees), cible)
+
+    def test_delta_plus_compact_que_keyframe(self):
+        stockage, _ = revision_storage.encode_revision(_variante(1), base_xml=XML_BASE, distance=1)
+        self.assertEqual(stockage, revision_storage.STOCKAGE_DELTA)
+
+    def test_keyframe_sans_base(self):
+        stockage, _ = revision_storage.encode_revision(XML_BASE, base_xml=None, distance=0)
+        self.assertEqual(stockage, revision_storage.STOCKAGE_KEYFRAME)
+
+    @override_settings(REVISION_KEYFRAME_INTERVAL=5)
+    def test_keyframe_quand_intervalle_atteint(self):
+        stockage, _ = revision_storage.encode_revision(_variante(1), base_xml=XML_BASE, distance=5)
+        self.assertEqual(stockage, revision_storage.STOCKAGE_KEYFRAME)
+
+
+# ---------------------------------------------------------------------------
+# 2. Service — création de révisions compressées
+# ---------------------------------------------------------------------------
+
+@override_settings(REVISION_KEYFRAME_INTERVAL=3)
+class RevisionStockageServiceTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="auteur", password="pw")
+        self.rubrique = _make_rubrique(self.user)
+
+    def _blobs(self):
+        return [
+            r.blob
+            for r in RevisionRubrique.objects.filter(rubrique=self.rubrique)
+            .select_related("blob")
+            .order_by("numero")
+        ]
+
+    def test_revision_initiale_porte_un_blob_keyframe(self):
+        revision = RevisionRubrique.objects.get(rubrique=self.rubrique, numero=1)
+        self.assertEqual(revision.stockage, revision_storage.STOCKAGE_BLOB)
+        self.assertEqual(revision.contenu_xml_brut, "")
+        self.assertEqual(revision.blob.stockage, revision_storage.STOCKAGE_KEYFRAME)
+        self.assertEqual(revision.blob.empreinte, empreinte_exacte(XML_BASE))
+
+    def test_keyframes_periodiques_et_deltas(self):
+        for i in range(2, 8):
+            _editer(self.rubrique, _variante(i), self.user)
+
+        K, D = revision_storage.STOCKAGE_KEYFRAME, revision_storage.STOCKAGE_DELTA
+        self.assertEqual([b.stockage for b in self._blobs()], [K, D, D, K, D, D, K])
+
+    def test_delta_reference_la_derniere_keyframe(self):
+        _editer(self.rubrique, _variante(2), self.user)
+        premier, second = self._blobs()
+        self.assertEqual(second.base_id, premier.pk)
+
+    def test_contenu_reconstruit_depuis_la_base(self):
+        for i in range(2, 6):
+            _editer(self.rubrique, _variante(i), self.user)
+        for revision in RevisionRubrique.objects.filter(rubrique=self.rubrique).select_related("blob__base"):
+            attendu = XML_BASE if revision.numero == 1 else _variante(revision.numero)
+            self.assertEqual(revision.contenu_xml, attendu)
+            self.assertEqual(revision.taille, len(attendu.encode("utf-8")))
+
+    def test_contenu_restaure_reutilise_le_blob(self):
+        _editer(self.rubrique, _variante(2), self.user)
+        _editer(self.rubrique, XML_BASE, self.user)
+        premier, _, troisieme = self._blobs()
+        self.assertEqual(premier.pk, troisieme.pk)
+        self.assertEqual(BlobXml.objects.count(), 2)
+        premier.refresh_from_db()
+        self.assertEqual(premier.nb_references, 2)
+
+    def test_meme_contenu_partage_entre_rubriques(self):
+        autre = _make_rubrique(self.user, nom="G2")
+        self.assertEqual(
+            RevisionRubrique.objects.get(rubrique=autre, numero=1).blob_id,
+            RevisionRubrique.objects.get(rubrique=self.rubrique, numero=1).blob_id,
+        )
+        self.assertEqual(BlobXml.objects.count(), 1)
+
+    def test_contenu_equivalent_non_identique_garde_sa_copie_exacte(self):
+        self.assertEqual(compute_xml_hash(XML_EQUIVALENT), compute_xml_hash(XML_BASE))
+        autre = _make_rubrique(self.user, xml=XML_EQUIVALENT, nom="G2")
+
+        self.assertEqual(BlobXml.objects.count(), 2)
+        self.assertEqual(RevisionRubrique.objects.get(rubrique=autre, numero=1).contenu_xml, XML_EQUIVALENT)
+        self.assertEqual(RevisionRubrique.objects.get(rubrique=self.rubrique, numero=1).contenu_xml, XML_BASE)
+
+
+@override_settings(REVISION_KEYFRAME_INTERVAL=3)
+class RevisionStockageAPITest(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="api", password="pw")
+        self.client.force_authenticate(user=self.user)
+
+    def test_revisions_endpoint_reconstruit_les_deltas(self):
+        rubrique = _make_rubrique(self.user)
+        _editer(rubrique, _variante(2), self.user)
+
+        contenus = {}
+        for numero in (1, 2):
+            response = self.client.get(f"/api/rubriques/{rubrique.id}/revisions/{numero}/")
+            self.assertEqual(response.status_code, 200)
+            contenus[numero] = response.json()["contenu_xml"]
+        self.assertEqual(contenus, {1: XML_BASE, 2: _variante(2)})
+
+
+# ---------------------------------------------------------------------------
+# 3. Commande compress_revisions
+# ---------------------------------------------------------------------------
+
+@override_settings(REVISION_KEYFRAME_INTERVAL=3)
+class CompressRevisionsCommandTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="auteur", password="pw")
+        self.rubrique = _make_rubrique(self.user)
+        # Historique "ancien format" : révisions en clair
+        RevisionRubrique.objects.filter(rubrique=self.rubrique).delete()
+        BlobXml.objects.all().delete()
+        for numero in range(1, 6):
+            RevisionRubrique.objects.create(
+                rubrique=self.rubrique,
+                numero=numero,
+                contenu_xml=_variante(numero),
+                hash_contenu=f"{numero:064d}",
+                auteur=self.user,
+            )
+
+    def test_conversion_preserve_le_contenu(self):
+        call_command("compress_revisions", stdout=StringIO())
+        revisions = RevisionRubrique.objects.filter(rubrique=self.rubrique).select_related("blob__base")
+        for revision in revisions:
+            self.assertEqual(revision.stockage, revision_storage.STOCKAGE_BLOB)
+            self.assertEqual(revision.contenu_xml, _variante(revision.numero))
+
+    def test_conversion_deduplique_les_contenus_connus(self):
+        # Révision 6 : retour au contenu de la révision 1
+        RevisionRubrique.objects.create(
+            rubrique=self.rubrique, numero=6, contenu_xml=_variante(1),
+            hash_contenu="0" * 64, auteur=self.user,
+        )
+        call_command("compress_revisions", stdout=StringIO())
+        self.assertEqual(BlobXml.objects.count(), 5)
+        r1, r6 = RevisionRubrique.objects.filter(rubrique=self.rubrique, numero__in=(1, 6)).order_by("numero")
+        self.assertEqual(r1.blob_id, r6.blob_id)
+
+    def test_conversion_ne_fusionne_pas_les_contenus_equivalents(self):
+        # Révision 6 : même hash canonique que la révision 1, octets différents.
+        equivalent = "<!-- relu -->" + _variante(1)
+        RevisionRubrique.objects.create(
+            rubrique=self.rubrique, numero=6, contenu_xml=equivalent,
+            hash_contenu="0" * 64, auteur=self.user,
+        )
+        call_command("compress_revisions", stdout=StringIO())
+        self.assertEqual(BlobXml.objects.count(), 6)
+        r6 = RevisionRubrique.objects.select_related("blob__base").get(rubrique=self.rubrique, numero=6)
+        self.assertEqual(r6.stockage, revision_storage.STOCKAGE_BLOB)
+        self.assertEqual(r6.contenu_xml, equivalent)
+
+    def test_rapport_espace_recupere(self):
+        out = StringIO()
+        call_command("compress_revisions", stdout=out)
+        self.assertIn("octets récupérés", out.getvalue())
+
+    def test_dry_run_n_ecrit_rien(self):
+        call_command("compress_revisions", "--dry-run", stdout=StringIO())
+        self.assertFalse(
+            RevisionRubrique.objects.filter(rubrique=self.rubrique)
+            .exclude(stockage=revision_storage.STOCKAGE_BRUT)
+            .exists()
+        )
+        self.assertFalse(BlobXml.objects.exists())
+
+
+# ---------------------------------------------------------------------------
+# 4. Commande gc_blobs
+# ---------------------------------------------------------------------------
+
+@override_settings(REVISION_KEYFRAME_INTERVAL=3)
+class GcBlobsCommandTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="auteur", password="pw")
+        self.rubrique = _make_rubrique(self.user)
+        _editer(self.rubrique, _variante(2), self.user)
+
+    def test_blobs_references_conserves(self):
+        call_command("gc_blobs", stdout=StringIO())
+        self.assertEqual(BlobXml.objects.count(), 2)
+
+    def test_recount_puis_collecte_apres_suppression(self):
+        # Suppression en cascade : les compteurs ne sont plus à jour.
+        self.rubrique.delete()
+        call_command("gc_blobs", stdout=StringIO())
+        self.assertEqual(BlobXml.objects.count(), 2)
+
+        out = StringIO()
+        call_command("gc_blobs", "--recount", stdout=out)
+        # Delta puis keyframe qui lui servait de base.
+        self.assertFalse(BlobXml.objects.exists())
+        self.assertIn("2 blob(s) supprimé(s)", out.getvalue())
+
+    def test_dry_run_ne_supprime_rien(self):
+        BlobXml.objects.update(nb_references=0)
+        RevisionRubrique.objects.filter(rubrique=self.rubrique).delete()
+        call_command("gc_blobs", "--dry-run", stdout=StringIO())
+        self.assertEqual(BlobXml.objects.count(), 2)
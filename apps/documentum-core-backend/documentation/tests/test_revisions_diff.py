@@ -0,0 +1,134 @@
+# documentation/tests/test_revisions_diff.py
+"""
+Tests du diff structurel entre révisions.
+
+Couverture :
+- Module xml_diff (opérations émises, sous-arbres identiques ignorés, plafond)
+- GET /api/rubriques/{id}/revisions/diff/?from=&to= (contrat, validation, 404)
+- Cache par paire de hash_contenu
+"""
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+
+from documentation import xml_diff
+from documentation.models import Gamme, Projet, Rubrique, VersionProjet
+from documentation.services import create_initial_revision, create_revision_if_changed
+
+XML_V1 = "<topic id='t'><title>T</title><body><p>a</p><p>b</p><p>c</p></body></topic>"
+XML_V2 = "<topic id='u'><title>T2</title><body><p>a</p><p>c</p><note>n</note></body></topic>"
+
+
+def _types(resultat):
+    return [(op["type"], op["chemin"]) for op in resultat["operations"]]
+
+
+# ---------------------------------------------------------------------------
+# 1. Module xml_diff
+# ---------------------------------------------------------------------------
+
+class XmlDiffTest(SimpleTestCase):
+
+    def _diff(self, avant, apres, **kwargs):
+        kwargs.setdefault("max_operations", 100)
+        kwargs.setdefault("max_octets", 100_000)
+        return xml_diff.diff_xml(avant, apres, **kwargs)
+
+    def test_contenus_identiques(self):
+        self.assertEqual(self._diff(XML_V1, XML_V1), {"operations": [], "tronque": False})
+
+    def test_operations_element_par_element(self):
+        self.assertEqual(
+            _types(self._diff(XML_V1, XML_V2)),
+            [
+                (xml_diff.OP_ATTRIBUT, "/topic[1]"),
+                (xml_diff.OP_TEXTE, "/topic[1]/title[1]"),
+                (xml_diff.OP_SUPPRESSION, "/topic[1]/body[1]/p[2]"),
+                (xml_diff.OP_AJOUT, "/topic[1]/body[1]/note[1]"),
+            ],
+        )
+
+    def test_element_ajoute_porte_son_xml(self):
+        ajout = self._diff(XML_V1, XML_V2)["operations"][-1]
+        self.assertEqual(ajout["xml"], "<note>n</note>")
+
+    def test_modification_profonde_localisee(self):
+        paragraphes = "".join(f"<p>P {i}</p>" for i in range(5000))
+        avant = f"<topic><body>{paragraphes}</body></topic>"
+        apres = avant.replace("<p>P 4000</p>", "<p>modifié</p>")
+        resultat = self._diff(avant, apres)
+        self.assertEqual(len(resultat["operations"]), 1)
+        self.assertEqual(resultat["operations"][0]["chemin"], "/topic[1]/body[1]/p[4001]")
+        self.assertEqual(resultat["operations"][0]["apres"], "modifié")
+
+    def test_plafond_d_operations(self):
+        avant = "<topic>" + "".join(f"<p>{i}</p>" for i in range(50)) + "</topic>"
+        apres = "<topic>" + "".join(f"<li>{i}</li>" for i in range(50)) + "</topic>"
+        resultat = self._diff(avant, apres, max_operations=10)
+        self.assertTrue(resultat["tronque"])
+        self.assertEqual(len(resultat["operations"]), 10)
+
+    def test_contenu_vide(self):
+        self.assertEqual(_types(self._diff("", "<topic/>")), [(xml_diff.OP_AJOUT, "/topic[1]")])
+
+    def test_xml_invalide(self):
+        with self.assertRaises(xml_diff.XmlDiffError):
+            self._diff("<topic>", XML_V1)
+
+
+# ---------------------------------------------------------------------------
+# 2. Endpoint
+# ---------------------------------------------------------------------------
+
+class RevisionsDiffEndpointTest(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="relecteur", password="pw")
+        self.client.force_authenticate(user=self.user)
+        gamme = Gamme.objects.create(nom="G")
+        projet = Projet.objects.create(nom="P", description="", gamme=gamme, auteur=self.user)
+        version = VersionProjet.objects.create(projet=projet, version_numero="1.0.0", is_active=True)
+        self.rubrique = Rubrique.objects.create(
+            projet=projet, version_projet=version, titre="R", contenu_xml=XML_V1, auteur=self.user
+        )
+        create_initial_revision(rubrique=self.rubrique, user=self.user)
+        create_revision_if_changed(rubrique=self.rubrique, new_xml=XML_V2, user=self.user)
+
+    def _get(self, **params):
+        return self.client.get(f"/api/rubriques/{self.rubrique.id}/revisions/diff/", params)
+
+    def test_diff_entre_deux_revisions(self):
+        response = self._get(**{"from": 1, "to": 2})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data["from"], data["to"]), (1, 2))
+        self.assertFalse(data["tronque"])
+        self.assertEqual(len(data["operations"]), 4)
+
+    def test_parametres_manquants_400(self):
+        self.assertEqual(self._get(**{"from": 1}).status_code, 400)
+        self.assertEqual(self._get(**{"from": "x", "to": 2}).status_code, 400)
+
+    def test_revision_introuvable_400(self):
+        self.assertEqual(self._get(**{"from": 1, "to": 9}).status_code, 400)
+
+    def test_rubrique_inexistante_404(self):
+        response = self.client.get("/api/rubriques/99999/revisions/diff/", {"from": 1, "to": 2})
+        self.assertEqual(response.status_code, 404)
+
+    def test_resultat_mis_en_cache_par_paire_de_hash(self):
+        with mock.patch.object(xml_diff, "diff_xml", wraps=xml_diff.diff_xml) as espion:
+            premier = self._get(**{"from": 1, "to": 2}).json()
+            second = self._get(**{"from": 1, "to": 2}).json()
+        self.assertEqual(espion.call_count, 1)
+        self.assertEqual(premier, second)
+
+    @override_settings(REVISION_DIFF_MAX_OPERATIONS=2)
+    def test_sortie_plafonnee(self):
+        data = self._get(**{"from": 1, "to": 2}).json()
+        self.assertTrue(data["tronque"])
+        self.assertEqual(len(data["operations"]), 2)
@@ -1,13 +1,17 @@
 # documentation/tests/test_revisions_endpoint.py
 """
-Tests de l'endpoint GET /api/rubriques/{id}/revisions/ (Lot 4).
+Tests des endpoints d'historique des révisions (Lot 4).
 
-Couverture :
+GET /api/rubriques/{id}/revisions/ — métadonnées paginées par curseur :
 - Rubrique avec plusieurs révisions — ordre décroissant garanti
 - Rubrique avec une seule révision
 - Rubrique inexistante → 404
-- Cohérence du payload (champs, types, valeurs)
+- Cohérence du payload (champs, types, valeurs, pas de contenu XML)
+- Pagination par curseur (page_size, next)
 - Accès non authentifié → 401/403
+
+GET /api/rubriques/{id}/revisions/{numero}/ — contenu d'une révision :
+- Contenu reconstruit, ETag = hash_contenu, If-None-Match → 304
 """
 from django.contrib.auth.models import User
 from rest_framework.test import APITestCase
@@ -53,6 +57,16 @@ def _url(rubrique_id):
     return f"/api/rubriques/{rubrique_id}/revisions/"
 
 
+def _url_revision(rubrique_id, numero):
+    return f"/api/rubriques/{rubrique_id}/revisions/{numero}/"
+
+
+def _editer(rubrique, xml, user):
+    create_revision_if_changed(rubrique=rubrique, new_xml=xml, user=user)
+    rubrique.contenu_xml = xml
+    rubrique.save(update_fields=["contenu_xml"])
+
+
 # ---------------------------------------------------------------------------
 # Tests
 # ---------------------------------------------------------------------------
@@ -83,38 +97,43 @@ class RubriqueRevisionsEndpointTest(APITestCase):
         rubrique = _make_rubrique(self.user)
         response = self.client.get(_url(rubrique.id))
         self.assertEqual(response.status_code, 200)
-        data = response.json()
+        data = response.json()["results"]
         self.assertIsInstance(data, list)
         self.assertEqual(len(data), 1)
 
     def test_une_revision_numero_est_1(self):
         rubrique = _make_rubrique(self.user)
         response = self.client.get(_url(rubrique.id))
-        self.assertEqual(response.json()[0]["numero"], 1)
+        self.assertEqual(response.json()["results"][0]["numero"], 1)
 
     # --- Cohérence du payload ---
 
     def test_payload_contient_tous_les_champs_attendus(self):
         rubrique = _make_rubrique(self.user)
         response = self.client.get(_url(rubrique.id))
-        item = response.json()[0]
-        for champ in ("id", "numero", "hash_contenu", "contenu_xml", "auteur_username", "date_creation"):
+        item = response.json()["results"][0]
+        for champ in ("id", "numero", "hash_contenu", "auteur_username", "date_creation", "taille"):
             self.assertIn(champ, item, f"Champ manquant : {champ}")
 
+    def test_liste_sans_contenu_xml(self):
+        rubrique = _make_rubrique(self.user)
+        response = self.client.get(_url(rubrique.id))
+        self.assertNotIn("contenu_xml", response.json()["results"][0])
+
     def test_auteur_username_est_correct(self):
         rubrique = _make_rubrique(self.user)
         response = self.client.get(_url(rubrique.id))
-        self.assertEqual(response.json()[0]["auteur_username"], self.user.username)
+        self.assertEqual(response.json()["results"][0]["auteur_username"], self.user.username)
 
-    def test_contenu_xml_correspond_au_xml_initial(self):
-        rubrique = _make_rubrique(self.user, xml="<topic id='t1'/>")
+    def test_taille_en_octets(self):
+        rubrique = _make_rubrique(self.user, xml="<topic id='é'/>")
         response = self.client.get(_url(rubrique.id))
-        self.assertEqual(response.json()[0]["contenu_xml"], "<topic id='t1'/>")
+        self.assertEqual(response.json()["results"][0]["taille"], len("<topic id='é'/>".encode()))
 
     def test_hash_contenu_est_chaine_64_chars(self):
         rubrique = _make_rubrique(self.user)
         response = self.client.get(_url(rubrique.id))
-        hash_val = response.json()[0]["hash_contenu"]
+        hash_val = response.json()["results"][0]["hash_contenu"]
         self.assertIsInstance(hash_val, str)
         self.assertEqual(len(hash_val), 64)
 
@@ -135,7 +154,7 @@ class RubriqueRevisionsEndpointTest(APITestCase):
 
         response = self.client.get(_url(rubrique.id))
         self.assertEqual(response.status_code, 200)
-        numeros = [item["numero"] for item in response.json()]
+        numeros = [item["numero"] for item in response.json()["results"]]
         self.assertEqual(numeros, sorted(numeros, reverse=True))
 
     def test_plusieurs_revisions_le_plus_recent_en_premier(self):
@@ -146,7 +165,7 @@ class RubriqueRevisionsEndpointTest(APITestCase):
         rubrique.save(update_fields=["contenu_xml"])
 
         response = self.client.get(_url(rubrique.id))
-        items = response.json()
+        items = response.json()["results"]
         self.assertEqual(items[0]["numero"], 2)
         self.assertEqual(items[-1]["numero"], 1)
 
@@ -160,7 +179,7 @@ class RubriqueRevisionsEndpointTest(APITestCase):
             rubrique.save(update_fields=["contenu_xml"])
 
         response = self.client.get(_url(rubrique.id))
-        self.assertEqual(len(response.json()), 5)
+        self.assertEqual(len(response.json()["results"]), 5)
 
     def test_revision_identique_ne_cree_pas_de_nouvelle_entree(self):
         rubrique = _make_rubrique(self.user, xml="<topic/>")
@@ -168,7 +187,25 @@ class RubriqueRevisionsEndpointTest(APITestCase):
         create_revision_if_changed(rubrique=rubrique, new_xml="<topic/>", user=self.user)
 
         response = self.client.get(_url(rubrique.id))
-        self.assertEqual(len(response.json()), 1)
+        self.assertEqual(len(response.json()["results"]), 1)
+
+    # --- Pagination par curseur ---
+
+    def test_pagination_par_curseur(self):
+        rubrique = _make_rubrique(self.user, xml="<v1/>")
+        for i in range(2, 6):
+            _editer(rubrique, f"<v{i}/>", self.user)
+
+        response = self.client.get(_url(rubrique.id), {"page_size": 2})
+        data = response.json()
+        self.assertEqual([item["numero"] for item in data["results"]], [5, 4])
+        self.assertIsNotNone(data["next"])
+
+        numeros = [item["numero"] for item in data["results"]]
+        while data["next"]:
+            data = self.client.get(data["next"]).json()
+            numeros += [item["numero"] for item in data["results"]]
+        self.assertEqual(numeros, [5, 4, 3, 2, 1])
 
     # --- Lecture seule : POST interdit ---
 
@@ -176,3 +213,42 @@ class RubriqueRevisionsEndpointTest(APITestCase):
         rubrique = _make_rubrique(self.user)
         response = self.client.post(_url(rubrique.id), {})
         self.assertEqual(response.status_code, 405)
+
+
+class RubriqueRevisionDetailEndpointTest(APITestCase):
+
+    def setUp(self):
+        self.user = _make_user("testuser")
+        self.client.force_authenticate(user=self.user)
+        self.rubrique = _make_rubrique(self.user, xml="<topic id='t1'/>")
+        _editer(self.rubrique, "<topic id='t2'/>", self.user)
+
+    def test_contenu_de_la_revision(self):
+        response = self.client.get(_url_revision(self.rubrique.id, 1))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["numero"], 1)
+        self.assertEqual(response.json()["contenu_xml"], "<topic id='t1'/>")
+
+    def test_etag_est_le_hash_de_la_revision(self):
+        revision = RevisionRubrique.objects.get(rubrique=self.rubrique, numero=2)
+        response = self.client.get(_url_revision(self.rubrique.id, 2))
+        self.assertEqual(response["ETag"], f'"{revision.hash_contenu}"')
+
+    def test_if_none_match_retourne_304(self):
+        etag = self.client.get(_url_revision(self.rubrique.id, 2))["ETag"]
+        response = self.client.get(_url_revision(self.rubrique.id, 2), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_if_none_match_different_retourne_200(self):
+        etag = self.client.get(_url_revision(self.rubrique.id, 1))["ETag"]
+        response = self.client.get(_url_revision(self.rubrique.id, 2), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_revision_inexistante_retourne_404(self):
+        response = self.client.get(_url_revision(self.rubrique.id, 99))
+        self.assertEqual(response.status_code, 404)
+
+    def test_rubrique_inexistante_retourne_404(self):
+        response = self.client.get(_url_revision(99999, 1))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,589 @@
+# documentation/tests/test_structure.py
+"""
+Tests des opérations de structure des maps (MapRubrique).
+
+Couverture :
+- Lot d'opérations (apply_map_structure_batch, POST /api/maps/{id}/structure/batch/)
+- Clés d'ordre espacées : une ligne écrite par insertion ou déplacement,
+  rééquilibrage d'un niveau épuisé, commande rebalance_map_ordre
+- Index de chemin (chemin, profondeur) : maintenu par les services et le lot,
+  requêtes descendants / ancêtres, commande check_map_chemins
+- Structure en arbre imbriqué (?format=tree) sur /api/maps/{id}/structure/
+  et /api/projets/{id}/structure/
+- Version de structure (Map.version_structure) : incrémentée par chaque
+  service de structure, ETag fort et 304 sur les vues /structure/
+"""
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APITestCase
+
+from documentation.models import Map, MapRubrique, Rubrique
+from documentation.services import (
+    ORDRE_ECART_MIN,
+    ORDRE_PAS,
+    _cles_ordre,
+    _fenetre_reequilibree,
+    add_rubrique_to_map,
+    ancetres_map_rubrique,
+    apply_map_structure_batch,
+    create_rubrique_in_map,
+    descendants_map_rubrique,
+    indent_map_rubrique,
+    outdent_map_rubrique,
+    reorder_map_rubriques,
+    verifier_chemins_map,
+)
+
+from .test_publication import _attach, _make_projet, _make_rubrique, _make_user
+
+
+def _arbre(map_obj) -> dict:
+    """{parent_id: [rubrique titre, ...]} dans l'ordre, pour comparer des structures."""
+    arbre = {}
+    for mr in MapRubrique.objects.filter(map=map_obj).select_related("rubrique", "parent__rubrique").order_by("ordre", "pk"):
+        cle = mr.parent.rubrique.titre if mr.parent_id else None
+        arbre.setdefault(cle, []).append(mr.rubrique.titre)
+    return arbre
+
+
+class _StructureMixin:
+    """Map : une racine et quatre chapitres A, B, C, D au premier niveau."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = _make_user()
+        self.projet, self.wip, self.map_obj = _make_projet(self.user)
+        self.racine = _attach(self.map_obj, _make_rubrique(self.projet, self.wip, self.user, titre="Racine"))
+        self.noeuds = {
+            titre: _attach(
+                self.map_obj,
+                _make_rubrique(self.projet, self.wip, self.user, titre=titre),
+                ordre=i * ORDRE_PAS,
+                parent=self.racine,
+            )
+            for i, titre in enumerate("ABCD", start=1)
+        }
+
+    def _id(self, titre):
+        return self.noeuds[titre].pk
+
+
+class StructureBatchServiceTest(_StructureMixin, TestCase):
+
+    def _lot(self, *operations):
+        return apply_map_structure_batch(map_id=self.map_obj.pk, operations=list(operations), auteur=self.user)
+
+    def test_operations_appliquees_dans_l_ordre(self):
+        self._lot(
+            {"op": "indent", "mapRubriqueId": self._id("B")},
+            {"op": "indent", "mapRubriqueId": self._id("C")},
+            {"op": "reorder", "parentId": self._id("A"), "orderedIds": [self._id("C"), self._id("B")]},
+            {"op": "outdent", "mapRubriqueId": self._id("C")},
+        )
+        self.assertEqual(
+            _arbre(self.map_obj),
+            {None: ["Racine"], "Racine": ["A", "C", "D"], "A": ["B"]},
+        )
+
+    def test_noeuds_crees_designes_par_reference(self):
+        resultat = self._lot(
+            {"op": "create", "titre": "N1", "contenu_xml": "<topic/>", "insert_after": self._id("A"), "ref": -1},
+            {"op": "create", "titre": "N2", "contenu_xml": "<topic/>", "parent": -1, "ref": -2},
+            {"op": "indent", "mapRubriqueId": self._id("B")},
+        )
+
+        self.assertEqual(
+            _arbre(self.map_obj),
+            {None: ["Racine"], "Racine": ["A", "N1", "C", "D"], "N1": ["N2", "B"]},
+        )
+        n1 = MapRubrique.objects.get(pk=resultat["refs"][-1])
+        self.assertEqual(n1.rubrique.titre, "N1")
+        self.assertEqual(n1.rubrique.revisions.count(), 1)
+
+    def test_attach_d_une_rubrique_existante(self):
+        rubrique = _make_rubrique(self.projet, self.wip, self.user, titre="E")
+        self._lot(
+            {"op": "attach", "rubrique_id": rubrique.pk, "parent_id": self.racine.pk, "ordre": 0, "ref": -1},
+            {"op": "indent", "mapRubriqueId": self._id("A")},
+        )
+        self.assertEqual(
+            _arbre(self.map_obj),
+            {None: ["Racine"], "Racine": ["E", "B", "C", "D"], "E": ["A"]},
+        )
+
+    def test_attach_meme_ordre_qu_en_unitaire(self):
+        payload = {"parent_id": self.racine.pk, "ordre": 2 * ORDRE_PAS}
+        rubrique = _make_rubrique(self.projet, self.wip, self.user, titre="E")
+        self._lot({"op": "attach", "rubrique_id": rubrique.pk, **payload})
+        par_lot = _arbre(self.map_obj)
+
+        MapRubrique.objects.filter(rubrique=rubrique).delete()
+        add_rubrique_to_map(map_id=self.map_obj.pk, rubrique_id=rubrique.pk, **payload)
+
+        self.assertEqual(par_lot, _arbre(self.map_obj))
+        self.assertEqual(par_lot["Racine"], ["A", "B", "E", "C", "D"])
+
+    def test_operation_invalide_annule_tout_le_lot(self):
+        avant = _arbre(self.map_obj)
+        with self.assertRaises(ValidationError) as ctx:
+            self._lot(
+                {"op": "create", "titre": "N1", "contenu_xml": "<topic/>", "parent": self.racine.pk},
+                {"op": "indent", "mapRubriqueId": self._id("B")},
+                {"op": "indent", "mapRubriqueId": self._id("A")},
+            )
+        self.assertIn(2, ctx.exception.detail["operations"])
+        self.assertEqual(_arbre(self.map_obj), avant)
+        self.assertFalse(Rubrique.objects.filter(titre="N1").exists())
+
+    def test_regles_des_services_unitaires(self):
+        cas = [
+            {"op": "outdent", "mapRubriqueId": self._id("A")},
+            {"op": "outdent", "mapRubriqueId": self.racine.pk},
+            {"op": "reorder", "parentId": self.racine.pk, "orderedIds": [self._id("A"), self._id("A")]},
+            {"op": "attach", "rubrique_id": self.noeuds["A"].rubrique_id},
+            {"op": "indent", "mapRubriqueId": 999999},
+        ]
+        for operation in cas:
+            with self.subTest(operation=operation), self.assertRaises(ValidationError):
+                self._lot(operation)
+
+    def test_seules_les_lignes_deplacees_sont_ecrites(self):
+        resultat = self._lot({
+            "op": "reorder",
+            "parentId": self.racine.pk,
+            "orderedIds": [self._id("D"), self._id("A"), self._id("B"), self._id("C")],
+        })
+        self.assertEqual(resultat["lignes_modifiees"], 1)
+
+    def test_nombre_de_requetes_independant_du_nombre_d_operations(self):
+        aller_retour = [
+            {"op": "indent", "mapRubriqueId": self._id("B")},
+            {"op": "outdent", "mapRubriqueId": self._id("B")},
+        ]
+        with CaptureQueriesContext(connection) as court:
+            self._lot(*aller_retour)
+        with CaptureQueriesContext(connection) as long:
+            self._lot(*(aller_retour * 20))
+        self.assertEqual(len(long.captured_queries), len(court.captured_queries))
+
+    @override_settings(STRUCTURE_BATCH_MAX_OPERATIONS=2)
+    def test_taille_du_lot_bornee(self):
+        with self.assertRaises(ValidationError):
+            self._lot(*[{"op": "indent", "mapRubriqueId": self._id("B")}] * 3)
+
+
+class StructureBatchAPITest(_StructureMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+        self.url = f"/api/maps/{self.map_obj.pk}/structure/batch/"
+
+    def test_lot_retourne_la_structure_resultante(self):
+        response = self.client.post(
+            self.url,
+            {"operations": [
+                {"op": "create", "titre": "N1", "contenu_xml": "<topic/>", "parent": self.racine.pk, "ref": -1},
+                {"op": "indent", "mapRubriqueId": -1},
+            ]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        cree = data["refs"]["-1"]
+        noeud = next(n for n in data["structure"] if n["id"] == cree)
+        self.assertEqual(noeud["parent"], self._id("D"))
+        self.assertEqual(len(data["structure"]), 6)
+
+    def test_operation_inconnue_retourne_400(self):
+        response = self.client.post(self.url, {"operations": [{"op": "move"}]}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_payload_invalide_retourne_400(self):
+        response = self.client.post(self.url, {"operations": [{"op": "indent"}]}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_regle_metier_retourne_400_avec_le_rang(self):
+        response = self.client.post(
+            self.url, {"operations": [{"op": "outdent", "mapRubriqueId": self._id("A")}]}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("0", response.json()["operations"])
+
+    def test_non_authentifie_refuse(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.post(self.url, {"operations": [{"op": "indent", "mapRubriqueId": 1}]}, format="json")
+        self.assertIn(response.status_code, [401, 403])
+
+
+# ---------------------------------------------------------------------------
+# Clés d'ordre espacées
+# ---------------------------------------------------------------------------
+
+class ClesOrdreTest(TestCase):
+
+    def test_deplacement_d_un_seul_noeud(self):
+        cles = _cles_ordre([4096, 1024, 2048, 3072])
+        self.assertEqual(cles[1:], [1024, 2048, 3072])
+        self.assertLess(cles[0], 1024)
+
+    def test_noeuds_nouveaux_places_dans_les_ecarts(self):
+        cles = _cles_ordre([1024, None, None, 2048, None])
+        self.assertEqual(cles, sorted(set(cles)))
+        self.assertEqual((cles[0], cles[3]), (1024, 2048))
+
+    def test_reequilibrage_limite_a_une_fenetre(self):
+        # Dix nœuds tassés en tête d'un niveau de mille frères espacés.
+        freres = [(i, i + 1) for i in range(10)] + [(i, i * ORDRE_PAS) for i in range(1, 1001)]
+        debut, cles = _fenetre_reequilibree(freres, 0)
+
+        self.assertEqual(debut, 0)
+        self.assertLess(len(cles), 50)
+        suivant = freres[len(cles)][1]
+        self.assertEqual(cles, sorted(cles))
+        self.assertGreaterEqual(min(b - a for a, b in zip([0] + cles, cles + [suivant], strict=True)), ORDRE_ECART_MIN)
+
+    def test_ecart_epuise_renumerote_le_niveau(self):
+        self.assertEqual(_cles_ordre([2, 1, 3]), [ORDRE_PAS, 2 * ORDRE_PAS, 3 * ORDRE_PAS])
+
+
+class OrdreEspaceServicesTest(_StructureMixin, TestCase):
+
+    def _cles(self, parent):
+        return list(
+            MapRubrique.objects.filter(map=self.map_obj, parent=parent)
+            .order_by("ordre", "pk")
+            .values_list("rubrique__titre", "ordre")
+        )
+
+    def _lignes_ecrites(self, action):
+        avant = dict(MapRubrique.objects.filter(map=self.map_obj).values_list("pk", "ordre"))
+        action()
+        apres = dict(MapRubrique.objects.filter(map=self.map_obj).values_list("pk", "ordre"))
+        return {pk for pk in avant if avant[pk] != apres[pk]}
+
+    def test_insertion_en_tete_sans_decalage(self):
+        ecrites = self._lignes_ecrites(lambda: create_rubrique_in_map(
+            map_id=self.map_obj.pk, titre="N", contenu_xml="<topic/>", auteur=self.user,
+            insert_before_id=self._id("A"),
+        ))
+        self.assertEqual(ecrites, set())
+        self.assertEqual([t for t, _ in self._cles(self.racine)], ["N", "A", "B", "C", "D"])
+
+    def test_insertion_apres_une_ancre(self):
+        create_rubrique_in_map(
+            map_id=self.map_obj.pk, titre="N", contenu_xml="<topic/>", auteur=self.user,
+            insert_after_id=self._id("B"),
+        )
+        self.assertEqual([t for t, _ in self._cles(self.racine)], ["A", "B", "N", "C", "D"])
+
+    def test_ajout_en_fin_espace(self):
+        rubrique = _make_rubrique(self.projet, self.wip, self.user, titre="E")
+        mr = add_rubrique_to_map(map_id=self.map_obj.pk, rubrique_id=rubrique.pk, parent_id=self.racine.pk)
+        self.assertEqual(mr.ordre, 5 * ORDRE_PAS)
+
+    def test_outdent_sans_decalage_des_suivants(self):
+        indent_map_rubrique(map_id=self.map_obj.pk, map_rubrique_id=self._id("B"))
+        ecrites = self._lignes_ecrites(
+            lambda: outdent_map_rubrique(map_id=self.map_obj.pk, map_rubrique_id=self._id("B"))
+        )
+        self.assertEqual(ecrites, {self._id("B")})
+        self.assertEqual([t for t, _ in self._cles(self.racine)], ["A", "B", "C", "D"])
+
+    def test_reorder_ecrit_la_seule_ligne_deplacee(self):
+        ecrites = self._lignes_ecrites(lambda: reorder_map_rubriques(
+            map_id=self.map_obj.pk,
+            parent_id=self.racine.pk,
+            ordered_ids=[self._id("B"), self._id("C"), self._id("D"), self._id("A")],
+        ))
+        self.assertEqual(ecrites, {self._id("A")})
+        self.assertEqual([t for t, _ in self._cles(self.racine)], ["B", "C", "D", "A"])
+
+    def test_insertions_repetees_en_tete_reequilibrent_le_niveau(self):
+        for i in range(15):
+            create_rubrique_in_map(
+                map_id=self.map_obj.pk, titre=f"N{i}", contenu_xml="<topic/>", auteur=self.user,
+                insert_before_id=MapRubrique.objects.filter(parent=self.racine).order_by("ordre").first().pk,
+            )
+        titres = [t for t, _ in self._cles(self.racine)]
+        self.assertEqual(titres, [f"N{i}" for i in reversed(range(15))] + list("ABCD"))
+        cles = [c for _, c in self._cles(self.racine)]
+        self.assertEqual(len(set(cles)), len(cles))
+
+    def test_commande_rebalance_reespace_les_niveaux_contigus(self):
+        MapRubrique.objects.filter(parent=self.racine).update(ordre=1)
+        out = StringIO()
+        call_command("rebalance_map_ordre", stdout=out)
+
+        self.assertEqual(
+            [c for _, c in self._cles(self.racine)], [ORDRE_PAS * i for i in range(1, 5)]
+        )
+        self.assertIn("1 niveau(x) rééquilibré(s)", out.getvalue())
+
+    def test_commande_rebalance_dry_run(self):
+        MapRubrique.objects.filter(parent=self.racine).update(ordre=1)
+        out = StringIO()
+        call_command("rebalance_map_ordre", "--dry-run", stdout=out)
+
+        self.assertEqual({c for _, c in self._cles(self.racine)}, {1})
+        self.assertIn("1 niveau(x) à rééquilibrer", out.getvalue())
+
+
+# ---------------------------------------------------------------------------
+# Index de chemin
+# ---------------------------------------------------------------------------
+
+class CheminStructureTest(_StructureMixin, TestCase):
+
+    def _noeud(self, titre):
+        return MapRubrique.objects.get(map=self.map_obj, rubrique__titre=titre)
+
+    def _indenter(self, *titres):
+        for titre in titres:
+            indent_map_rubrique(map_id=self.map_obj.pk, map_rubrique_id=self._id(titre))
+
+    def test_chemin_calcule_a_la_creation(self):
+        mr = create_rubrique_in_map(
+            map_id=self.map_obj.pk, titre="N", contenu_xml="<topic/>", auteur=self.user,
+            parent_id=self._id("A"),
+        )
+        self.assertEqual(mr.chemin, f"{self.racine.pk}/{self._id('A')}/")
+        self.assertEqual(mr.profondeur, 2)
+
+    def test_indent_deplace_le_sous_arbre(self):
+        self._indenter("C", "B")  # C sous B, puis B (et C) sous A
+
+        c = self._noeud("C")
+        self.assertEqual(c.ancetres_ids, [self.racine.pk, self._id("A"), self._id("B")])
+        self.assertEqual(c.profondeur, 3)
+        self.assertEqual(verifier_chemins_map(self.map_obj.pk)["incoherents"], [])
+
+    def test_outdent_remonte_le_sous_arbre(self):
+        self._indenter("C", "B")
+        outdent_map_rubrique(map_id=self.map_obj.pk, map_rubrique_id=self._id("B"))
+
+        self.assertEqual(self._noeud("C").ancetres_ids, [self.racine.pk, self._id("B")])
+        self.assertEqual(verifier_chemins_map(self.map_obj.pk)["incoherents"], [])
+
+    def test_lot_maintient_l_index(self):
+        apply_map_structure_batch(
+            map_id=self.map_obj.pk,
+            operations=[
+                {"op": "create", "titre": "N1", "contenu_xml": "<topic/>", "parent": self._id("D"), "ref": -1},
+                {"op": "create", "titre": "N2", "contenu_xml": "<topic/>", "parent": -1},
+                {"op": "indent", "mapRubriqueId": self._id("C")},
+                {"op": "indent", "mapRubriqueId": self._id("D")},
+                {"op": "outdent", "mapRubriqueId": self._id("C")},
+            ],
+            auteur=self.user,
+        )
+        self.assertEqual(verifier_chemins_map(self.map_obj.pk)["incoherents"], [])
+        self.assertEqual(self._noeud("N2").profondeur, 4)
+
+    def test_descendants_et_ancetres_en_une_requete(self):
+        self._indenter("C", "B")
+        a, c = self._noeud("A"), self._noeud("C")
+
+        with self.assertNumQueries(1):
+            descendants = set(descendants_map_rubrique(a).values_list("rubrique__titre", flat=True))
+        with self.assertNumQueries(1):
+            ancetres = list(ancetres_map_rubrique(c).values_list("rubrique__titre", flat=True))
+
+        self.assertEqual(descendants, {"B", "C"})
+        self.assertEqual(ancetres, ["Racine", "A", "B"])
+
+    def test_commande_reconstruit_l_index(self):
+        self._indenter("C", "B")
+        MapRubrique.objects.filter(map=self.map_obj).update(chemin="", profondeur=0)
+
+        out = StringIO()
+        call_command("check_map_chemins", stdout=out)
+        self.assertIn("Relancer avec --fix", out.getvalue())
+
+        call_command("check_map_chemins", "--fix", stdout=StringIO())
+        self.assertEqual(verifier_chemins_map(self.map_obj.pk)["incoherents"], [])
+        self.assertEqual(self._noeud("C").profondeur, 3)
+
+    def test_noeud_hors_arbre_signale(self):
+        a = self.noeuds["A"]
+        MapRubrique.objects.filter(pk=self.racine.pk).update(parent=a)
+
+        self.assertIn(a.pk, verifier_chemins_map(self.map_obj.pk)["hors_arbre"])
+
+
+# ---------------------------------------------------------------------------
+# Structure en arbre imbriqué (?format=tree)
+# ---------------------------------------------------------------------------
+
+class StructureArbreAPITest(_StructureMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+        indent_map_rubrique(map_id=self.map_obj.pk, map_rubrique_id=self._id("B"))
+
+    def _json(self, response):
+        self.assertEqual(response["Content-Type"], "application/json")
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_arbre_imbrique_dans_l_ordre(self):
+        arbre = self._json(self.client.get(f"/api/maps/{self.map_obj.pk}/structure/?format=tree"))
+
+        self.assertEqual(len(arbre), 1)
+        racine = arbre[0]
+        self.assertEqual(racine["rubrique"]["titre"], "Racine")
+        self.assertEqual([n["rubrique"]["titre"] for n in racine["enfants"]], ["A", "C", "D"])
+        a = racine["enfants"][0]
+        self.assertEqual(a["id"], self._id("A"))
+        self.assertEqual([n["rubrique"]["titre"] for n in a["enfants"]], ["B"])
+        self.assertEqual(a["enfants"][0]["enfants"], [])
+
+    def test_meme_structure_que_la_liste_a_plat(self):
+        url = f"/api/maps/{self.map_obj.pk}/structure/"
+        a_plat = self.client.get(url).json()
+        arbre = self._json(self.client.get(url + "?format=tree"))
+
+        aretes, pile = set(), [(n, None) for n in arbre]
+        while pile:
+            noeud, parent = pile.pop()
+            aretes.add((noeud["id"], parent, noeud["rubrique"]["titre"]))
+            pile.extend((e, noeud["id"]) for e in noeud["enfants"])
+        self.assertEqual(aretes, {(n["id"], n["parent"], n["rubrique"]["titre"]) for n in a_plat})
+
+    def test_projet_structure_en_arbre(self):
+        data = self._json(self.client.get(f"/api/projets/{self.projet.pk}/structure/?format=tree"))
+
+        self.assertEqual(data["projet"]["id"], self.projet.pk)
+        self.assertEqual(data["map"]["id"], self.map_obj.pk)
+        self.assertEqual(data["structure"][0]["rubrique"]["titre"], "Racine")
+
+    def test_liste_a_plat_inchangee(self):
+        response = self.client.get(f"/api/projets/{self.projet.pk}/structure/")
+
+        self.assertEqual(response.status_code, 200)
+        noeud = next(n for n in response.json()["structure"] if n["id"] == self._id("B"))
+        self.assertEqual(noeud["parent"], self._id("A"))
+
+    def test_map_inconnue_404(self):
+        response = self.client.get("/api/maps/999999/structure/?format=tree")
+        self.assertEqual(response.status_code, 404)
+
+
+# ---------------------------------------------------------------------------
+# Version de structure et ETag
+# ---------------------------------------------------------------------------
+
+class VersionStructureServicesTest(_StructureMixin, TestCase):
+
+    def _version(self):
+        return Map.objects.values_list("version_structure", flat=True).get(pk=self.map_obj.pk)
+
+    def test_chaque_service_incremente_la_version(self):
+        rubrique = _make_rubrique(self.projet, self.wip, self.user, titre="E")
+        services = [
+            lambda: add_rubrique_to_map(map_id=self.map_obj.pk, rubrique_id=rubrique.pk, parent_id=self.racine.pk),
+            lambda: create_rubrique_in_map(
+                map_id=self.map_obj.pk, titre="N", contenu_xml="<topic/>", auteur=self.user,
+                parent_id=self.racine.pk,
+            ),
+            lambda: indent_map_rubrique(map_id=self.map_obj.pk, map_rubrique_id=self._id("B")),
+            lambda: outdent_map_rubrique(map_id=self.map_obj.pk, map_rubrique_id=self._id("B")),
+            lambda: reorder_map_rubriques(
+                map_id=self.map_obj.pk, parent_id=self.racine.pk, ordered_ids=[self._id("B"), self._id("A")]
+            ),
+            lambda: apply_map_structure_batch(
+                map_id=self.map_obj.pk,
+                operations=[{"op": "indent", "mapRubriqueId": self._id("C")}],
+                auteur=self.user,
+            ),
+        ]
+        for service in services:
+            avant = self._version()
+            service()
+            with self.subTest(service=service):
+                self.assertGreater(self._version(), avant)
+
+    def test_lot_retourne_la_nouvelle_version(self):
+        resultat = apply_map_structure_batch(
+            map_id=self.map_obj.pk,
+            operations=[{"op": "indent", "mapRubriqueId": self._id("B")}],
+            auteur=self.user,
+        )
+        self.assertEqual(resultat["version"], self._version())
+
+    def test_operation_refusee_ne_change_pas_la_version(self):
+        avant = self._version()
+        with self.assertRaises(ValidationError):
+            indent_map_rubrique(map_id=self.map_obj.pk, map_rubrique_id=self._id("A"))
+        self.assertEqual(self._version(), avant)
+
+
+class StructureETagAPITest(_StructureMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+        self.url = f"/api/maps/{self.map_obj.pk}/structure/"
+
+    def _revalider(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_304_sans_lecture_de_la_structure(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        with CaptureQueriesContext(connection) as requetes:
+            response = self._revalider(self.url, etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertFalse(
+            [q for q in requetes.captured_queries if MapRubrique._meta.db_table in q["sql"]]
+        )
+
+    def test_modification_de_structure_change_l_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.client.post(f"{self.url}{self._id('B')}/indent/")
+
+        response = self._revalider(self.url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_renommage_d_une_rubrique_change_l_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        rubrique = self.noeuds["A"].rubrique
+        self.client.patch(f"/api/rubriques/{rubrique.pk}/", {"titre": "A renommée"}, format="json")
+
+        self.assertEqual(self._revalider(self.url, etag).status_code, 200)
+
+    def test_etag_distinct_par_representation(self):
+        a_plat = self.client.get(self.url)["ETag"]
+        arbre = self.client.get(self.url + "?format=tree")["ETag"]
+
+        self.assertNotEqual(a_plat, arbre)
+        self.assertEqual(self._revalider(self.url + "?format=tree", arbre).status_code, 304)
+        self.assertEqual(self._revalider(self.url + "?format=tree", a_plat).status_code, 200)
+
+    def test_etag_du_lot_valide_la_structure(self):
+        response = self.client.post(
+            f"{self.url}batch/",
+            {"operations": [{"op": "indent", "mapRubriqueId": self._id("B")}]},
+            format="json",
+        )
+        self.assertEqual(response.json()["version"], Map.objects.get(pk=self.map_obj.pk).version_structure)
+
+        self.assertEqual(self._revalider(self.url, response["ETag"]).status_code, 304)
+
+    def test_projet_structure_304(self):
+        url = f"/api/projets/{self.projet.pk}/structure/"
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self._revalider(url, etag).status_code, 304)
+
+        Map.objects.filter(pk=self.map_obj.pk).update(nom="Renommée")
+        self.assertEqual(self._revalider(url, etag).status_code, 200)
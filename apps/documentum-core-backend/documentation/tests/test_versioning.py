@@ -2,13 +2,20 @@
 Tests — Chantier 6 Lot 2 : service de révision documentaire.
 
 Couvre :
-- compute_xml_hash (déterminisme, normalisation, cas limites)
+- compute_xml_hash (déterminisme, normalisation, cas limites, calcul en flux)
 - create_revision_if_changed (service unitaire)
 - Intégration création rubrique → RevisionRubrique(1)
 - Intégration sauvegarde via PUT /api/rubriques/{id}/
 """
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.management import call_command
+from django.db.models.signals import post_save
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
 from rest_framework.test import APIClient
 
 from documentation.models import (
@@ -16,12 +23,19 @@ from documentation.models import (
     Map,
     MapRubrique,
     Projet,
+    PublicationSnapshot,
     RevisionRubrique,
     Rubrique,
     VersionProjet,
 )
-from documentation.services import create_project, create_revision_if_changed, create_rubrique_in_map
-from documentation.utils import compute_xml_hash
+from documentation.services import (
+    create_project,
+    create_revision_if_changed,
+    create_rubrique_in_map,
+    publish_project,
+)
+from documentation.management.commands.bench_xml_hash import generer_topic
+from documentation.utils import _compute_xml_hash_arbre, compute_xml_hash
 
 User = get_user_model()
 
@@ -91,6 +105,40 @@ class ComputeXmlHashTest(TestCase):
         self.assertEqual(compute_xml_hash(sans_decl), compute_xml_hash(avec_decl))
 
 
+class ComputeXmlHashFluxTest(SimpleTestCase):
+    """Le hash en flux doit être identique octet pour octet à l'implémentation historique."""
+
+    CAS = [
+        "<a/>",
+        "<a></a>",
+        "<a><b/>texte<c>u</c>queue</a>",
+        "<a x='1&amp;\n\t\"' y=\"&lt;\">&lt;é</a>",
+        "<a xml:lang='fr'>t</a>",
+        "<a xmlns='urn:x'><b/></a>",
+        "<x:a xmlns:x='urn:y' x:attr='v'/>",
+        "<a><!--commentaire-->t<?pi z?>u</a>",
+        "<a>\n <b/>\n</a>\n<!--après la racine-->",
+        "<?xml version='1.0'?><!DOCTYPE a [<!ENTITY e 'v&#38;'>]><a>&e;</a>",
+        "<a><![CDATA[<b>&]]></a>",
+        "<a>x</a>reste",
+        "<root><non_ferme>",
+    ]
+
+    def test_identique_a_l_arbre(self):
+        for xml in self.CAS:
+            with self.subTest(xml=xml):
+                self.assertEqual(compute_xml_hash(xml), _compute_xml_hash_arbre(xml.strip()))
+
+    def test_identique_sur_gros_topic(self):
+        xml = generer_topic(300 * 1024)
+        self.assertEqual(compute_xml_hash(xml), _compute_xml_hash_arbre(xml))
+
+    def test_commande_benchmark(self):
+        out = StringIO()
+        call_command("bench_xml_hash", "--sizes", "10KB", "--repeat", "1", stdout=out)
+        self.assertIn("Hashes identiques", out.getvalue())
+
+
 # ---------------------------------------------------------------------------
 # 2. Tests unitaires — create_revision_if_changed (service)
 # ---------------------------------------------------------------------------
@@ -234,6 +282,154 @@ class CreateRevisionIfChangedServiceTest(TestCase):
         self.assertEqual(self.rubrique.contenu_xml, xml_original)
 
 
+class RevisionCounterTest(TestCase):
+    """Compteur dénormalisé Rubrique.revision_courante_numero."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="auteur", password="pass")
+        self.gamme = Gamme.objects.create(nom="Gamme Test")
+        result = create_project(
+            data={"nom": "Projet Compteur", "description": "", "gamme": self.gamme},
+            user=self.user,
+        )
+        self.rubrique = result["rubrique"]
+
+    def test_compteur_initial_et_incremente(self):
+        self.rubrique.refresh_from_db()
+        self.assertEqual(self.rubrique.revision_courante_numero, 1)
+        create_revision_if_changed(rubrique=self.rubrique, new_xml=XML_V1, user=self.user)
+        self.rubrique.refresh_from_db()
+        self.assertEqual(self.rubrique.revision_courante_numero, 2)
+
+    def test_instance_perimee_ne_fait_pas_reculer_le_compteur(self):
+        perimee = Rubrique.objects.get(pk=self.rubrique.pk)
+        create_revision_if_changed(rubrique=self.rubrique, new_xml=XML_V1, user=self.user)
+        perimee.titre = "Renommée"
+        perimee.save()
+        self.rubrique.refresh_from_db()
+        self.assertEqual(self.rubrique.titre, "Renommée")
+        self.assertEqual(self.rubrique.revision_courante_numero, 2)
+
+    def test_sauvegarde_complete_ecrit_les_autres_champs(self):
+        perimee = Rubrique.objects.get(pk=self.rubrique.pk)
+        create_revision_if_changed(rubrique=self.rubrique, new_xml=XML_V1, user=self.user)
+        perimee.titre = "Renommée"
+        perimee.audience = "experts"
+        perimee.is_archived = True
+        signaux = []
+        post_save.connect(
+            lambda **kw: signaux.append(kw["update_fields"]),
+            sender=Rubrique, weak=False, dispatch_uid="test-sauvegarde-complete",
+        )
+        self.addCleanup(post_save.disconnect, sender=Rubrique, dispatch_uid="test-sauvegarde-complete")
+        perimee.save()
+
+        self.assertEqual(signaux, [None])
+        self.rubrique.refresh_from_db()
+        self.assertEqual(
+            (self.rubrique.titre, self.rubrique.audience, self.rubrique.is_archived),
+            ("Renommée", "experts", True),
+        )
+        self.assertEqual(self.rubrique.revision_courante_numero, 2)
+
+    def test_sauvegarde_complete_d_une_ligne_supprimee_la_recree(self):
+        rubrique = Rubrique.objects.get(pk=self.rubrique.pk)
+        Rubrique.objects.filter(pk=rubrique.pk).delete()
+        rubrique.save()
+        self.assertEqual(Rubrique.objects.get(pk=rubrique.pk).revision_courante_numero, 1)
+
+    def test_commande_detecte_et_corrige(self):
+        Rubrique.objects.filter(pk=self.rubrique.pk).update(revision_courante_numero=7)
+
+        out = StringIO()
+        call_command("check_revision_counters", stdout=out)
+        self.assertIn("1 compteur(s) incohérent(s)", out.getvalue())
+        self.rubrique.refresh_from_db()
+        self.assertEqual(self.rubrique.revision_courante_numero, 7)
+
+        call_command("check_revision_counters", "--fix", stdout=StringIO())
+        self.rubrique.refresh_from_db()
+        self.assertEqual(self.rubrique.revision_courante_numero, 1)
+
+        out = StringIO()
+        call_command("check_revision_counters", stdout=out)
+        self.assertIn("cohérents", out.getvalue())
+
+
+@override_settings(REVISION_COALESCING_SECONDS=60)
+class RevisionCoalescingTest(TestCase):
+    """Fenêtre de regroupement des autosaves (révision brouillon mise à jour en place)."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="auteur", password="pass")
+        self.autre = User.objects.create_user(username="relecteur", password="pass")
+        self.gamme = Gamme.objects.create(nom="Gamme Test")
+        result = create_project(
+            data={"nom": "Projet Brouillon", "description": "", "gamme": self.gamme},
+            user=self.user,
+        )
+        self.projet = result["projet"]
+        self.map = result["map"]
+        self.rubrique = result["rubrique"]
+
+    def _editer(self, xml, user):
+        revision = create_revision_if_changed(rubrique=self.rubrique, new_xml=xml, user=user)
+        self.rubrique.contenu_xml = xml
+        self.rubrique.save(update_fields=["contenu_xml"])
+        return revision
+
+    def _numeros(self):
+        return list(
+            RevisionRubrique.objects.filter(rubrique=self.rubrique)
+            .order_by("numero")
+            .values_list("numero", "brouillon")
+        )
+
+    def test_editions_du_meme_auteur_regroupees(self):
+        self._editer(XML_V1, self.user)
+        revision = self._editer(XML_V2, self.user)
+        self.assertEqual(revision.numero, 1)
+        self.assertEqual(self._numeros(), [(1, True)])
+        revision = RevisionRubrique.objects.select_related("blob__base").get(pk=revision.pk)
+        self.assertEqual(revision.contenu_xml, XML_V2)
+        self.assertEqual(revision.hash_contenu, compute_xml_hash(XML_V2))
+        self.rubrique.refresh_from_db()
+        self.assertEqual(self.rubrique.revision_courante_numero, 1)
+
+    def test_autre_auteur_scelle_le_brouillon(self):
+        self._editer(XML_V1, self.user)
+        revision = self._editer(XML_V2, self.autre)
+        self.assertEqual(revision.numero, 2)
+        self.assertEqual(self._numeros(), [(1, False), (2, True)])
+
+    def test_fenetre_expiree_scelle_le_brouillon(self):
+        self._editer(XML_V1, self.user)
+        RevisionRubrique.objects.filter(rubrique=self.rubrique).update(
+            date_mise_a_jour=timezone.now() - timedelta(seconds=61)
+        )
+        revision = self._editer(XML_V2, self.user)
+        self.assertEqual(revision.numero, 2)
+        self.assertEqual(self._numeros(), [(1, False), (2, True)])
+
+    @patch("documentation.services.export_map_to_dita", return_value={"status": "stub"})
+    def test_publication_scelle_le_brouillon(self, _mock):
+        self._editer(XML_V1, self.user)
+        publish_project(projet=self.projet, map_obj=self.map, format_output="pdf", user=self.user)
+        snapshot = PublicationSnapshot.objects.get(rubrique=self.rubrique)
+        self.assertFalse(snapshot.revision.brouillon)
+
+        revision = self._editer(XML_V2, self.user)
+        self.assertEqual(revision.numero, 2)
+        snapshot.revision.refresh_from_db()
+        self.assertEqual(snapshot.revision.hash_contenu, compute_xml_hash(XML_V1))
+
+    @override_settings(REVISION_COALESCING_SECONDS=0)
+    def test_fenetre_desactivee_une_revision_par_edition(self):
+        self._editer(XML_V1, self.user)
+        self._editer(XML_V2, self.user)
+        self.assertEqual(self._numeros(), [(1, False), (2, False), (3, False)])
+
+
 # ---------------------------------------------------------------------------
 # 3. Tests d'intégration — création de rubrique → RevisionRubrique(1)
 # ---------------------------------------------------------------------------
@@ -451,3 +647,19 @@ class RubriqueUpdateRevisionAPITest(TestCase):
             RevisionRubrique.objects.filter(rubrique_id=rubrique_id, numero=1).count(),
             1,
         )
+
+    # --- Hash canonique persisté sur la rubrique ---
+
+    def test_hash_contenu_persiste_a_la_creation(self):
+        self.rubrique.refresh_from_db()
+        self.assertEqual(self.rubrique.hash_contenu, compute_xml_hash(XML_V1))
+
+    def test_hash_contenu_mis_a_jour_apres_edition(self):
+        self._patch({"contenu_xml": XML_V2})
+        self.rubrique.refresh_from_db()
+        self.assertEqual(self.rubrique.hash_contenu, compute_xml_hash(XML_V2))
+
+    def test_hash_contenu_inchange_sur_renommage(self):
+        self._patch({"titre": "Nouveau titre"})
+        self.rubrique.refresh_from_db()
+        self.assertEqual(self.rubrique.hash_contenu, compute_xml_hash(XML_V1))
@@ -34,6 +34,8 @@ from .views import (
     publier_map,
     get_formats_publication,
     publication_diff_view,
+    tache_publication_view,
+    TelechargementArtefactView,
 )
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
@@ -65,6 +67,16 @@ urlpatterns = [
     path("projets/<int:pk>/details/", get_project_details, name="project_details"),
     path("api/", include(router.urls)),
     path("api/publier-map/<int:map_id>/", publier_map, name="publier_map"),
+    path(
+        "api/publications/<int:tache_id>/",
+        tache_publication_view,
+        name="tache_publication",
+    ),
+    path(
+        "api/artefacts/<int:artefact_id>/",
+        TelechargementArtefactView.as_view(),
+        name="telecharger_artefact",
+    ),
     path(
         "api/projets/<int:projet_id>/structure/",
         projet_structure_view,
@@ -1,11 +1,13 @@
 # documentation/utils.py
 # -- Fonctions utilitaires pour la gestion des rubriques et des versions de projet --
 import hashlib
+import json
 import xml.etree.ElementTree as ET
 from django.utils.timezone import now
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from .models import Rubrique, VersionProjet
+from django.db.models import Exists, OuterRef
+from .models import MapRubrique, PublicationSnapshot, Rubrique, VersionProjet
 
 # --- Gestion des exceptions personnalisées ---
 import logging
@@ -15,6 +17,107 @@ logger = logging.getLogger(__name__)
 
 # --- Hash déterministe du contenu XML ---
 
+# Taille des morceaux injectés dans le parseur et dans hashlib.
+_HASH_CHUNK = 64 * 1024
+_XML_NS = "{http://www.w3.org/XML/1998/namespace}"
+
+
+class _NamespaceNonGere(Exception):
+    """Levée par le hasheur en flux sur un nom qualifié qu'il ne sait pas préfixer."""
+
+
+class _CanonicalHashTarget:
+    """
+    Cible de parseur ElementTree qui reproduit à l'identique la sérialisation
+    de ET.tostring(root, encoding="unicode") et l'injecte au fil de l'eau dans
+    un hash SHA-256, sans construire l'arbre ni la chaîne sérialisée.
+
+    Une balise ouvrante reste "en attente" jusqu'à l'événement suivant : c'est
+    lui qui décide entre "<tag ...>" (texte ou enfants) et "<tag ... />" (vide),
+    comme le fait ElementTree. Les commentaires et instructions de traitement
+    sont ignorés (TreeBuilder ne les conserve pas non plus).
+    """
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+        self._sortie: list[str] = []
+        self._taille = 0
+        self._texte: list[str] = []
+        self._ouverte = False  # balise ouvrante émise sans son ">" final
+        self._profondeur = 0
+
+    def _ecrire(self, morceau: str) -> None:
+        self._sortie.append(morceau)
+        self._taille += len(morceau)
+        if self._taille >= _HASH_CHUNK:
+            self._vider()
+
+    def _vider(self) -> None:
+        if self._sortie:
+            self._hash.update("".join(self._sortie).encode("utf-8"))
+            self._sortie = []
+            self._taille = 0
+
+    def _texte_en_attente(self) -> str:
+        texte = "".join(self._texte)
+        self._texte = []
+        return texte
+
+    def start(self, tag, attrib):
+        if tag[:1] == "{":
+            raise _NamespaceNonGere(tag)
+        texte = self._texte_en_attente()
+        if self._ouverte:
+            self._ecrire(">")
+        if texte and self._profondeur:
+            self._ecrire(ET._escape_cdata(texte))
+        self._ecrire("<" + tag)
+        for cle, valeur in attrib.items():
+            if cle[:1] == "{":
+                if not cle.startswith(_XML_NS):
+                    raise _NamespaceNonGere(cle)
+                cle = "xml:" + cle[len(_XML_NS):]
+            self._ecrire(f' {cle}="{ET._escape_attrib(valeur)}"')
+        self._ouverte = True
+        self._profondeur += 1
+
+    def data(self, data):
+        self._texte.append(data)
+
+    def end(self, tag):
+        texte = self._texte_en_attente()
+        self._profondeur -= 1
+        if self._ouverte and not texte:
+            self._ecrire(" />")
+        else:
+            if self._ouverte:
+                self._ecrire(">")
+            self._ecrire(ET._escape_cdata(texte) + "</" + tag + ">")
+        self._ouverte = False
+
+    def close(self) -> str:
+        # Le texte après la racine (tail) n'est pas sérialisé par ET.tostring.
+        self._vider()
+        return self._hash.hexdigest()
+
+
+def _hash_texte_brut(stripped: str) -> str:
+    h = hashlib.sha256()
+    for i in range(0, len(stripped), _HASH_CHUNK):
+        h.update(stripped[i:i + _HASH_CHUNK].encode("utf-8"))
+    return h.hexdigest()
+
+
+def _compute_xml_hash_arbre(stripped: str) -> str:
+    """Implémentation historique : arbre complet puis re-sérialisation."""
+    try:
+        root = ET.fromstring(stripped)
+        normalized = ET.tostring(root, encoding="unicode")
+    except ET.ParseError:
+        normalized = stripped
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
 def compute_xml_hash(xml_str: str | None) -> str:
     """
     Calcule un hash SHA-256 déterministe du contenu XML fourni.
@@ -28,17 +131,39 @@ def compute_xml_hash(xml_str: str | None) -> str:
 
     Invariant : deux XML sémantiquement identiques produisent le même hash.
     Usage : détecter si un contenu XML a réellement changé avant de créer une révision.
+
+    Calcul en flux : les événements du parseur alimentent directement hashlib
+    (_CanonicalHashTarget), sans arbre ni chaîne sérialisée intermédiaires.
+    Le résultat est identique octet pour octet à l'implémentation historique
+    (_compute_xml_hash_arbre), vers laquelle on bascule pour les documents
+    à namespaces, dont ElementTree génère lui-même les préfixes.
     """
     stripped = (xml_str or "").strip()
     if not stripped:
         return hashlib.sha256(b"").hexdigest()
+
+    target = _CanonicalHashTarget()
+    parser = ET.XMLParser(target=target)
     try:
-        root = ET.fromstring(stripped)
-        normalized = ET.tostring(root, encoding="unicode")
+        for i in range(0, len(stripped), _HASH_CHUNK):
+            parser.feed(stripped[i:i + _HASH_CHUNK])
+        return parser.close()
     except ET.ParseError:
         # XML malformé : on hash le texte brut normalisé sans bloquer
-        normalized = stripped
-    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        return _hash_texte_brut(stripped)
+    except _NamespaceNonGere:
+        return _compute_xml_hash_arbre(stripped)
+
+
+def empreinte_exacte(xml_str: str | None) -> str:
+    """
+    SHA-256 des octets exacts (UTF-8) du texte, sans aucune normalisation.
+
+    À la différence de compute_xml_hash, distingue deux XML équivalents mais
+    non identiques (commentaires, instructions de traitement, DOCTYPE, guillemets,
+    espaces) : c'est l'adresse des BlobXml, qui conservent une copie exacte.
+    """
+    return hashlib.sha256((xml_str or "").encode()).hexdigest()
 
 
 # --- Fonction utilitaire pour obtenir les versions d'un projet ---
@@ -63,6 +188,106 @@ def get_active_version(projet):
     return VersionProjet.objects.filter(projet=projet, is_active=True).first()
 
 
+# --- Fonction utilitaire pour résoudre les snapshots publiés d'une version ---
+def snapshots_publies(version_projet):
+    """
+    Ensemble complet des PublicationSnapshot d'une version publiée, une ligne
+    par rubrique publiée, résolu en une requête depuis les deltas.
+
+    Pour chaque rubrique, la ligne retenue est celle de la publication la plus
+    récente du projet jusqu'à version_projet (rang_publication) ; une rubrique
+    dont cette ligne est un retrait (revision NULL) est exclue.
+
+    QuerySet non évalué, composable (filtres, values, sous-requêtes).
+    """
+    if version_projet is None or version_projet.rang_publication is None:
+        return PublicationSnapshot.objects.none()
+    chaine = PublicationSnapshot.objects.filter(
+        version_projet__projet_id=version_projet.projet_id,
+        version_projet__rang_publication__lte=version_projet.rang_publication,
+    )
+    redefinie_ensuite = chaine.filter(
+        rubrique_id=OuterRef("rubrique_id"),
+        version_projet__rang_publication__gt=OuterRef("version_projet__rang_publication"),
+    )
+    return chaine.filter(~Exists(redefinie_ensuite), revision__isnull=False)
+
+
+# --- Structure d'une map en arbre imbriqué (?format=tree) ---
+
+# Colonnes lues pour chaque nœud : celles de MapRubriqueStructureSerializer,
+# sans la jointure de la table sur elle-même (parent_id suffit).
+_COLONNES_ARBRE = (
+    "pk", "parent_id", "ordre",
+    "rubrique_id", "rubrique__titre", "rubrique__revision_numero",
+    "rubrique__is_active", "rubrique__is_archived",
+)
+
+# Nombre de nœuds sérialisés par morceau de la réponse en flux.
+_NOEUDS_PAR_MORCEAU = 1000
+
+
+def structure_en_arbre(map_id: int) -> tuple[list, dict]:
+    """
+    (racines, {parent_id: [enfants]}) de la map, en une requête et un passage
+    linéaire. Les nœuds sont les tuples de _COLONNES_ARBRE, dans l'ordre des
+    frères. Un nœud dont le parent est absent de la map est traité en racine.
+    """
+    lignes = (
+        MapRubrique.objects.filter(map_id=map_id)
+        .order_by("ordre", "pk")
+        .values_list(*_COLONNES_ARBRE)
+    )
+    enfants, ids = {}, set()
+    for ligne in lignes.iterator(chunk_size=5000):
+        enfants.setdefault(ligne[1], []).append(ligne)
+        ids.add(ligne[0])
+    racines = [n for parent_id, freres in enfants.items() if parent_id not in ids for n in freres]
+    return racines, enfants
+
+
+def flux_structure_arbre(map_id: int):
+    """
+    JSON de la structure en arbre, produit par morceaux (StreamingHttpResponse) :
+    [{"id", "ordre", "rubrique": {...}, "enfants": [...]}, ...], mêmes champs
+    que MapRubriqueStructureSerializer, le parent étant porté par l'imbrication.
+    Parcours préfixe sur pile explicite : pas de récursion, quelle que soit la
+    profondeur.
+    """
+    racines, enfants = structure_en_arbre(map_id)
+    morceaux = ["["]
+    pile = [(iter(racines), True)]
+    while pile:
+        freres, premier = pile[-1]
+        noeud = next(freres, None)
+        if noeud is None:
+            pile.pop()
+            morceaux.append("]}" if pile else "]")
+            continue
+        pile[-1] = (freres, False)
+        pk, _, ordre, rubrique_id, titre, revision_numero, is_active, is_archived = noeud
+        tete = json.dumps(
+            {
+                "id": pk,
+                "ordre": ordre,
+                "rubrique": {
+                    "id": rubrique_id,
+                    "titre": titre,
+                    "revision_numero": revision_numero,
+                    "is_active": is_active,
+                    "is_archived": is_archived,
+                },
+            },
+            ensure_ascii=False,
+        )
+        morceaux.append(("" if premier else ",") + tete[:-1] + ',"enfants":[')
+        pile.append((iter(enfants.get(pk, ())), True))
+        if len(morceaux) >= _NOEUDS_PAR_MORCEAU:
+            yield "".join(morceaux)
+            morceaux = []
+    yield "".join(morceaux)
+
+
 # --- Fonction utilitaire pour valider les versions d'un projet ---
 def validate_versions(projet):
     """
@@ -107,6 +332,8 @@ def clone_version(version_source):
                 r.locked_at = None
                 r.is_active = True
                 r.is_archived = False
+                # La copie n'hérite pas de l'historique de révisions de la source.
+                r.revision_courante_numero = 0
                 r.save()
                 logger.debug(f"Rubrique clonée : {r.titre}")
 
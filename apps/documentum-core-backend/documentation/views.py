@@ -1,5 +1,6 @@
 # documentation/views.py
 import csv
+import hashlib
 import io
 import os
 import json
@@ -19,10 +20,12 @@ from rest_framework.decorators import (
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.renderers import JSONRenderer
-from rest_framework.exceptions import ValidationError
-from django.db.models import Max
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.parsers import MultiPartParser
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.views import APIView
 from .models import (
+    ArtefactPublication,
     EvolutionProduit,
     ImpactDocumentaire,
     Projet,
@@ -39,6 +42,7 @@ from .models import (
     InterfaceUtilisateur,
     Rubrique,
     Media,
+    TachePublication,
 )
 from .utils import get_active_version, clone_version, generate_dita_template
 from documentation.constants.publication import TYPE_SORTIE_CHOICES
@@ -80,23 +84,32 @@ from .serializers import (
     MapRubriqueStructureSerializer,
     MapRubriqueCreateSerializer,
     RubriqueSerializer,
+    RubriqueMiniSerializer,
+    RevisionRubriqueMetaSerializer,
     RevisionRubriqueSerializer,
     CreateRubriqueInMapSerializer,
     MapStructureAttachSerializer,
+    MapStructureBatchSerializer,
     UserSerializer,
     MediaSerializer,
+    PublicationSerializer,
+    TachePublicationSerializer,
 )
 from .services import (
     add_rubrique_to_map,
+    apply_map_structure_batch,
     create_initial_revision,
     create_project,
     create_rubrique_in_map,
     create_revision_if_changed,
+    diff_revisions,
     indent_map_rubrique,
     outdent_map_rubrique,
     reorder_map_rubriques,
-    publish_project,
+    planifier_publication,
     get_publication_diff,
+    invalider_publication_diff,
+    incrementer_version_structure,
     publier_version_produit,
     reorder_evolutions_produit,
     create_impact_documentaire,
@@ -105,8 +118,15 @@ from .services import (
 )
 from .utils import compute_xml_hash
 from .exporters import export_map_to_dita
-from .utils import DITA_OUTPUT_FORMATS
+from .utils import DITA_OUTPUT_FORMATS, flux_structure_arbre
+from itertools import chain
+from rest_framework.settings import api_settings
 from django.utils.timezone import now
+from django.urls import reverse
+from django.utils.http import content_disposition_header, parse_etags, quote_etag
+from django.http import FileResponse, StreamingHttpResponse
+from .artefacts import chemin_absolu, lire_plage
+from .pagination import PublicationCursorPagination, RevisionCursorPagination
 
 
 @api_view(["GET"])
@@ -134,6 +154,18 @@ logger = logging.getLogger(__name__)
 LANGUAGETOOL_API_URL = "http://localhost:8010/v2/check"
 
 
+def _etag_correspond(request, etag: str) -> bool:
+    """
+    Vrai si If-None-Match désigne `etag`. Comparaison faible
+    (RFC 9110 §13.1.2) : le préfixe W/ est ignoré.
+    """
+    candidats = {
+        e.removeprefix("W/")
+        for e in parse_etags(request.headers.get("If-None-Match", ""))
+    }
+    return etag in candidats or "*" in candidats
+
+
 # Pages d'erreur personnalisées
 def custom_404(request):
     return render(request, "404.html", status=404)
@@ -311,6 +343,23 @@ class ProjetViewSet(viewsets.ModelViewSet):
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @action(detail=True, methods=["get"], url_path="publications")
+    def publications(self, request, pk=None):
+        """
+        GET /api/projets/{id}/publications/
+
+        Historique des publications du projet (registre), du plus récent au
+        plus ancien. Pagination par curseur : une lecture indexée par page.
+        """
+        projet = self.get_object()
+        qs = projet.publications.select_related("version_projet", "auteur").prefetch_related(
+            "artefacts_stockes"
+        )
+        paginator = PublicationCursorPagination()
+        page = paginator.paginate_queryset(qs, request, view=self)
+        serializer = PublicationSerializer(page, many=True, context={"request": request})
+        return paginator.get_paginated_response(serializer.data)
+
 
 # ViewSet pour les Versions de projet
 class VersionProjetViewSet(viewsets.ModelViewSet):
@@ -318,6 +367,15 @@ class VersionProjetViewSet(viewsets.ModelViewSet):
     serializer_class = VersionProjetSerializer
     permission_classes = [IsAuthenticated]
 
+    def perform_destroy(self, instance):
+        # Snapshots stockés en delta sur la publication précédente : supprimer une
+        # version publiée fausserait l'ensemble publié de toutes les suivantes.
+        if instance.rang_publication is not None:
+            raise ValidationError(
+                {"version_projet": ["Version publiée : suppression impossible (historique de publication)."]}
+            )
+        instance.delete()
+
     @action(detail=True, methods=["post"], url_path="clone")
     @transaction.atomic
     def clone(self, request, pk=None):
@@ -359,15 +417,65 @@ class VersionProjetViewSet(viewsets.ModelViewSet):
             )
 
 
+class ArbreStructureRenderer(JSONRenderer):
+    """
+    ?format=tree sur les vues de structure : la vue répond elle-même par
+    l'arbre imbriqué en flux (utils.flux_structure_arbre). Ce renderer ne sert
+    qu'à la négociation (DRF réserve ?format) et au rendu des erreurs.
+    """
+    format = "tree"
+
+
+_RENDUS_STRUCTURE = [*api_settings.DEFAULT_RENDERER_CLASSES, ArbreStructureRenderer]
+
+
+def _demande_arbre(request) -> bool:
+    return isinstance(request.accepted_renderer, ArbreStructureRenderer)
+
+
+def _reponse_arbre(morceaux) -> StreamingHttpResponse:
+    return StreamingHttpResponse(morceaux, content_type="application/json")
+
+
+def _etag_structure(request, map_id: int, version: int, *variantes) -> str:
+    """
+    ETag fort de la structure d'une map : version de structure, plus ce qui
+    distingue la représentation (format arbre, en-tête de réponse…). Lu avant
+    la structure : une modification concurrente ne peut que rendre l'ETag
+    trop ancien (requête complète au prochain appel), jamais trop récent.
+    """
+    if _demande_arbre(request):
+        variantes = (*variantes, "arbre")
+    return quote_etag("-".join(map(str, ("structure", map_id, version, *variantes))))
+
+
+def _reponse_non_modifiee(etag: str) -> Response:
+    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    return _entetes_structure(response, etag)
+
+
+def _entetes_structure(response, etag: str):
+    response["ETag"] = etag
+    # Revalidation à chaque usage : 304 sans requête sur la structure si rien n'a changé.
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
 # Vue pour obtenir la structure documentaire complète d’un projet
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@renderer_classes(_RENDUS_STRUCTURE)
 def projet_structure_view(request, projet_id: int):
     """
     Retourne la structure documentaire complète d’un projet :
     - projet
     - map master
-    - structure MapRubrique ordonnée
+    - structure MapRubrique ordonnée (liste à plat, parent par id)
+
+    ?format=tree : "structure" est l'arbre imbriqué ("enfants"), construit en
+    un passage et écrit en flux.
+    ETag fort (version de structure de la map master, noms du projet et de la
+    map) ; If-None-Match correspondant → 304 sans lecture de la structure.
     """
     try:
         projet = Projet.objects.get(pk=projet_id)
@@ -385,22 +493,35 @@ def projet_structure_view(request, projet_id: int):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    # Structure ordonnée de la map
+    logger.info(f"[ProjetStructure] Chargement structure projet_id={projet_id}")
+
+    entete = {
+        "projet": ProjetMiniSerializer(projet).data,
+        "map": MapMiniSerializer(map_master).data,
+    }
+    debut = json.dumps(entete, ensure_ascii=False)[:-1] + ',"structure":'
+    etag = _etag_structure(
+        request, map_master.pk, map_master.version_structure,
+        hashlib.sha256(debut.encode()).hexdigest()[:16],
+    )
+    if _etag_correspond(request, etag):
+        return _reponse_non_modifiee(etag)
+    if _demande_arbre(request):
+        return _entetes_structure(
+            _reponse_arbre(chain([debut], flux_structure_arbre(map_master.pk), ["}"])), etag
+        )
+
+    # Structure ordonnée de la map (parent exposé par parent_id : pas de jointure)
     structure_qs = (
         MapRubrique.objects.filter(map=map_master)
-        .select_related("rubrique", "parent")
+        .select_related("rubrique")
         .order_by("ordre")
     )
-
     data = {
-        "projet": ProjetMiniSerializer(projet).data,
-        "map": MapMiniSerializer(map_master).data,
+        **entete,
         "structure": MapRubriqueStructureSerializer(structure_qs, many=True).data,
     }
-
-    logger.info(f"[ProjetStructure] Chargement structure projet_id={projet_id}")
-
-    return Response(data, status=status.HTTP_200_OK)
+    return _entetes_structure(Response(data, status=status.HTTP_200_OK), etag)
 
 
 # ViewSet pour les maps
@@ -422,24 +543,39 @@ class MapViewSet(viewsets.ModelViewSet):
             serializer = MapRubriqueCreateSerializer(data=request.data)
             serializer.is_valid(raise_exception=True)
             map_rubrique = serializer.save(map=map_obj)
+            invalider_publication_diff(map_ids=[map_obj.pk])
+            incrementer_version_structure(map_ids=[map_obj.pk])
 
             return Response(
                 MapRubriqueSerializer(map_rubrique).data,
                 status=status.HTTP_201_CREATED,
             )
 
-    @action(detail=True, methods=["get"], url_path="structure")
+    @action(detail=True, methods=["get"], url_path="structure", renderer_classes=_RENDUS_STRUCTURE)
     def structure(self, request, pk=None):
+        """
+        GET /api/maps/{id}/structure/
+
+        Liste à plat, ordonnée (parent par id). ?format=tree : arbre imbriqué
+        ("enfants"), construit en un passage et écrit en flux.
+        ETag fort (Map.version_structure) ; If-None-Match correspondant → 304
+        sans lecture ni sérialisation de la structure.
+        """
         map_obj = self.get_object()
+        etag = _etag_structure(request, map_obj.pk, map_obj.version_structure)
+        if _etag_correspond(request, etag):
+            return _reponse_non_modifiee(etag)
+        if _demande_arbre(request):
+            return _entetes_structure(_reponse_arbre(flux_structure_arbre(map_obj.pk)), etag)
 
         structure_qs = (
             MapRubrique.objects.filter(map=map_obj)
-            .select_related("rubrique", "parent")
+            .select_related("rubrique")
             .order_by("ordre")
         )
 
         serializer = MapRubriqueStructureSerializer(structure_qs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return _entetes_structure(Response(serializer.data, status=status.HTTP_200_OK), etag)
 
     @action(detail=True, methods=["post"], url_path="structure/create")
     def structure_create(self, request, pk=None):
@@ -516,14 +652,53 @@ class MapViewSet(viewsets.ModelViewSet):
         )
         return Response(MapRubriqueSerializer(mr).data, status=status.HTTP_201_CREATED)
 
+    @action(detail=True, methods=["post"], url_path="structure/batch")
+    def structure_batch(self, request, pk=None):
+        """
+        POST /api/maps/{id}/structure/batch/
+
+        Applique une liste ordonnée d'opérations de structure (reorder, indent,
+        outdent, attach, create) en une transaction, via apply_map_structure_batch.
+        Une opération invalide annule tout le lot (400, rang de l'opération).
+        Retourne la structure résultante, sa version (et son ETag, celui de
+        GET structure/) et les ids des nœuds créés par référence.
+        """
+        serializer = MapStructureBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        resultat = apply_map_structure_batch(
+            map_id=int(pk),
+            operations=serializer.validated_data["operations"],
+            auteur=request.user,
+        )
+        structure_qs = (
+            MapRubrique.objects.filter(map_id=int(pk))
+            .select_related("rubrique")
+            .order_by("ordre")
+        )
+        response = Response(
+            {
+                "refs": resultat["refs"],
+                "version": resultat["version"],
+                "structure": MapRubriqueStructureSerializer(structure_qs, many=True).data,
+            },
+            status=status.HTTP_200_OK,
+        )
+        response["ETag"] = _etag_structure(request, int(pk), resultat["version"])
+        return response
+
 # ViewSet pour les rubriques
+# Champs de rubrique affichés dans la structure des maps : les modifier change
+# l'ETag des vues /structure/ (incrementer_version_structure).
+_CHAMPS_STRUCTURE_RUBRIQUE = [c for c in RubriqueMiniSerializer.Meta.fields if c != "id"]
+
+
 class RubriqueViewSet(viewsets.ModelViewSet):
-    # annotation revision_courante_numero : évite le N+1 sur les vues liste et détail.
-    # Lit Max(RevisionRubrique.numero) pour chaque rubrique en une seule requête agrégée.
+    # revision_courante_numero est une colonne de Rubrique (compteur dénormalisé) :
+    # aucun JOIN ni agrégat sur les révisions pour les vues liste et détail.
     queryset = (
         Rubrique.objects.select_related("projet", "version_projet", "type_rubrique")
         .select_related("fonctionnalite")
-        .annotate(revision_courante_numero=Max("revisions__numero"))
         .all()
     )
     serializer_class = RubriqueSerializer
@@ -551,7 +726,7 @@ class RubriqueViewSet(viewsets.ModelViewSet):
         logger.info(
             f"[Rubrique] '{rubrique.titre}' créée pour '{rubrique.projet.nom}' par {request.user.username}"
         )
-        # Re-fetch via queryset annoté pour exposer revision_courante_numero dans la réponse
+        # Re-fetch pour exposer revision_courante_numero (écrit par QuerySet.update())
         rubrique = self.get_queryset().get(pk=rubrique.pk)
         return Response(self.get_serializer(rubrique).data, status=201)
 
@@ -580,18 +755,25 @@ class RubriqueViewSet(viewsets.ModelViewSet):
             # l'état courant en DB (locked) avec le nouveau XML du payload.
             new_xml = serializer.validated_data.get("contenu_xml")
             if new_xml is not None:
-                create_revision_if_changed(
+                revision = create_revision_if_changed(
                     rubrique=rubrique,
                     new_xml=new_xml,
                     user=request.user,
                 )
+                # Hash du nouveau XML déjà connu : serializer.save() ne re-parse pas.
+                hash_new = revision.hash_contenu if revision else rubrique.hash_contenu
+                if hash_new:
+                    instance.definir_hash_contenu(new_xml, hash_new)
 
+            affichage_avant = [getattr(rubrique, champ) for champ in _CHAMPS_STRUCTURE_RUBRIQUE]
             rubrique = serializer.save()
+            if [getattr(rubrique, champ) for champ in _CHAMPS_STRUCTURE_RUBRIQUE] != affichage_avant:
+                incrementer_version_structure(rubrique_id=rubrique.pk)
             logger.info(
                 f"[Rubrique] '{rubrique.titre}' mise à jour par {request.user.username}"
             )
-            # serializer.save() retourne l'instance sans annotation.
-            # Re-fetch via queryset annoté pour exposer revision_courante_numero à jour.
+            # serializer.save() ne relit pas revision_courante_numero (écrit par
+            # QuerySet.update() dans le service) : re-fetch pour l'exposer à jour.
             rubrique = self.get_queryset().get(pk=rubrique.pk)
             return Response(self.get_serializer(rubrique).data, status=200)
 
@@ -614,21 +796,87 @@ class RubriqueViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["get"], url_path="revisions")
     def revisions(self, request, pk=None):
         """
-        GET /api/rubriques/{id}/revisions/
+        GET /api/rubriques/{id}/revisions/?cursor=&page_size=
 
-        Retourne l'historique complet des révisions de la rubrique, trié par numéro
-        décroissant (révision la plus récente en premier).
+        Historique des révisions de la rubrique, métadonnées seules (numero, hash,
+        auteur, date, taille), paginé par curseur sur numero décroissant
+        (révision la plus récente en premier). Le contenu XML d'une révision
+        est servi par GET /api/rubriques/{id}/revisions/{numero}/.
 
         Lecture seule — aucune écriture en base.
         404 si la rubrique n'existe pas.
         """
         rubrique = self.get_object()  # lève 404 si inexistant
-        qs = (
-            rubrique.revisions.select_related("auteur")
-            .order_by("-numero")
+        # Colonnes de contenu non chargées : la liste ne reconstruit aucun XML.
+        qs = rubrique.revisions.select_related("auteur").defer(
+            "contenu_xml_brut", "donnees"
         )
-        serializer = RevisionRubriqueSerializer(qs, many=True)
-        return Response(serializer.data)
+        paginator = RevisionCursorPagination()
+        page = paginator.paginate_queryset(qs, request, view=self)
+        serializer = RevisionRubriqueMetaSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path=r"revisions/(?P<numero>\d+)",
+        url_name="revision-detail",
+    )
+    def revision(self, request, pk=None, numero=None):
+        """
+        GET /api/rubriques/{id}/revisions/{numero}/
+
+        Contenu complet d'une révision. La réponse porte un ETag (hash_contenu) ;
+        If-None-Match correspondant → 304 sans reconstruction du contenu.
+        Mise en cache longue pour une révision scellée (immuable), revalidation
+        systématique pour un brouillon (cf. REVISION_COALESCING_SECONDS).
+
+        404 si la rubrique ou la révision n'existe pas.
+        """
+        rubrique = self.get_object()
+        revisions = rubrique.revisions.filter(numero=numero)
+        entete = revisions.values_list("hash_contenu", "brouillon").first()
+        if entete is None:
+            raise NotFound("Révision introuvable.")
+        hash_contenu, brouillon = entete
+
+        etag = quote_etag(hash_contenu)
+        if _etag_correspond(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            revision = revisions.select_related("auteur", "base", "blob__base").get()
+            response = Response(RevisionRubriqueSerializer(revision).data)
+        response["ETag"] = etag
+        # Un brouillon peut encore être mis à jour en place : revalidation systématique.
+        response["Cache-Control"] = (
+            "private, no-cache" if brouillon else "private, max-age=31536000, immutable"
+        )
+        return response
+
+    @action(detail=True, methods=["get"], url_path="revisions/diff")
+    def revisions_diff(self, request, pk=None):
+        """
+        GET /api/rubriques/{id}/revisions/diff/?from=<numero>&to=<numero>
+
+        Diff structurel (élément par élément) entre deux révisions de la rubrique.
+        Résultat mis en cache par paire de hash_contenu ; sortie plafonnée
+        ("tronque": true si le plafond est atteint).
+
+        400 si from/to sont absents, invalides, introuvables ou non parsables.
+        404 si la rubrique n'existe pas.
+        """
+        rubrique = self.get_object()
+        numeros = {}
+        for param in ("from", "to"):
+            valeur = request.query_params.get(param, "")
+            if not valeur.isdigit():
+                raise ValidationError({param: ["Numéro de révision entier attendu."]})
+            numeros[param] = int(valeur)
+
+        resultat = diff_revisions(
+            rubrique=rubrique, numero_from=numeros["from"], numero_to=numeros["to"]
+        )
+        return Response(resultat)
 
     @action(detail=True, methods=["get"], url_path="usages")
     def usages(self, request, pk=None):
@@ -1261,10 +1509,16 @@ def publier_map(request, map_id):
     """
     POST /api/publier-map/{map_id}/
     Body JSON : { "format": "pdf" }  (défaut : "pdf")
+             ou { "formats": ["pdf", "html5"] } (multi-format : préparation
+             commune, rendus en parallèle)
+
+    Orchestre la publication :
+    1. Versionnage métier (bump de version, snapshots) si des rubriques ont changé —
+       exécuté immédiatement, de façon atomique.
+    2. Export technique DITA confié au worker (TachePublication).
 
-    Orchestre la publication complète :
-    1. Versionnage métier (bump de version, snapshots) si des rubriques ont changé.
-    2. Export technique DITA via export_map_to_dita().
+    Réponse 202 : résultat du versionnage + tache_id ; suivi via
+    GET /api/publications/{tache_id}/.
 
     Contrainte v1 : la map doit être une map master.
     """
@@ -1282,8 +1536,8 @@ def publier_map(request, map_id):
             status=400,
         )
 
-    format_output = request.data.get("format", "pdf")
-    if format_output not in DITA_OUTPUT_FORMATS:
+    formats = request.data.get("formats") or [request.data.get("format", "pdf")]
+    if not isinstance(formats, list) or any(f not in DITA_OUTPUT_FORMATS for f in formats):
         return Response(
             {
                 "status": "error",
@@ -1293,13 +1547,14 @@ def publier_map(request, map_id):
         )
 
     try:
-        result = publish_project(
+        result, tache = planifier_publication(
             projet=map_obj.projet,
             map_obj=map_obj,
-            format_output=format_output,
+            formats=formats,
             user=request.user,
         )
-        return Response(result, status=200)
+        result["statut_url"] = reverse("tache_publication", args=[tache.pk])
+        return Response(result, status=status.HTTP_202_ACCEPTED)
     except ValidationError as exc:
         logger.warning("[publier_map] ValidationError map_id=%s : %s", map_id, exc.detail)
         return Response({"status": "error", "detail": exc.detail}, status=400)
@@ -1315,6 +1570,121 @@ def publier_map(request, map_id):
         )
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def tache_publication_view(request, tache_id):
+    """
+    GET /api/publications/{tache_id}/
+
+    État d'une tâche de publication : statut, progression, journal et
+    emplacement de l'artefact produit.
+    """
+    try:
+        tache = TachePublication.objects.select_related("version_projet", "auteur").get(pk=tache_id)
+    except TachePublication.DoesNotExist:
+        return Response({"detail": "Tâche de publication introuvable."}, status=404)
+    return Response(TachePublicationSerializer(tache).data, status=200)
+
+
+class _NegociationTelechargement(BaseContentNegotiation):
+    """Le fichier est servi tel quel : l'en-tête Accept du client est ignoré."""
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+def _plage_demandee(entete: str, taille: int):
+    """
+    (début, fin incluse) de l'en-tête Range "bytes=début-fin" (ou "bytes=-n" :
+    n derniers octets). None si l'en-tête est invalide ou multi-plages : la
+    réponse est alors complète (RFC 9110 §14.2). ValueError si la plage est
+    hors du fichier.
+    """
+    unite, _, spec = entete.partition("=")
+    debut, tiret, fin = spec.strip().partition("-")
+    if unite.strip().lower() != "bytes" or "," in spec or not tiret:
+        return None
+    if not (debut or fin) or (debut and not debut.isdigit()) or (fin and not fin.isdigit()):
+        return None
+    if not debut:
+        if int(fin) == 0 or taille == 0:
+            raise ValueError("Plage vide.")
+        return max(0, taille - int(fin)), taille - 1
+    debut = int(debut)
+    if fin and int(fin) < debut:
+        return None
+    if debut >= taille:
+        raise ValueError("Plage hors du fichier.")
+    return debut, (min(int(fin), taille - 1) if fin else taille - 1)
+
+
+class TelechargementArtefactView(APIView):
+    """
+    GET /api/artefacts/{id}/
+
+    Téléchargement d'un artefact de publication, lu en flux depuis le magasin
+    (jamais chargé en mémoire).
+    - ETag : empreinte SHA-256 du fichier ; If-None-Match correspondant → 304.
+    - Range "bytes=…" (une plage) → 206 ; plage hors du fichier → 416.
+      If-Range différent de l'ETag → réponse complète.
+    """
+    permission_classes = [IsAuthenticated]
+    content_negotiation_class = _NegociationTelechargement
+
+    def get(self, request, artefact_id):
+        artefact = get_object_or_404(ArtefactPublication, pk=artefact_id)
+        etag = quote_etag(artefact.empreinte)
+        if _etag_correspond(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response["ETag"] = etag
+            return response
+
+        chemin = chemin_absolu(artefact)
+        if not os.path.isfile(chemin):
+            logger.error("[Artefact] Fichier manquant artefact_id=%s chemin=%s", artefact.pk, chemin)
+            raise NotFound("Fichier de l'artefact introuvable.")
+
+        plage = None
+        entete_range = request.headers.get("Range")
+        # If-Range : la plage ne vaut que pour cette version du fichier.
+        if entete_range and request.headers.get("If-Range", etag) == etag:
+            try:
+                plage = _plage_demandee(entete_range, artefact.taille)
+            except ValueError:
+                response = Response(
+                    {"detail": "Plage demandée non satisfiable."},
+                    status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                )
+                response["Content-Range"] = f"bytes */{artefact.taille}"
+                return response
+
+        if plage is None:
+            response = FileResponse(
+                open(chemin, "rb"),
+                content_type=artefact.type_mime,
+                as_attachment=True,
+                filename=artefact.nom_fichier,
+            )
+        else:
+            debut, fin = plage
+            response = StreamingHttpResponse(
+                lire_plage(chemin, debut, fin - debut + 1),
+                status=status.HTTP_206_PARTIAL_CONTENT,
+                content_type=artefact.type_mime,
+            )
+            response["Content-Length"] = str(fin - debut + 1)
+            response["Content-Range"] = f"bytes {debut}-{fin}/{artefact.taille}"
+            response["Content-Disposition"] = content_disposition_header(True, artefact.nom_fichier)
+        response["ETag"] = etag
+        response["Accept-Ranges"] = "bytes"
+        # Contenu adressé par empreinte : immuable.
+        response["Cache-Control"] = "private, max-age=31536000, immutable"
+        return response
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def publication_diff_view(request, projet_id):
@@ -1323,6 +1693,8 @@ def publication_diff_view(request, projet_id):
 
     Retourne le diff entre l'état courant de la map master et la dernière version publiée.
     Lecture seule — aucune écriture en base.
+    ?detail=false : effectifs seulement ("detail" vaut null).
+    Résultat servi depuis le cache tant que la map n'a pas changé.
 
     Permet au frontend d'informer l'utilisateur avant une publication.
     """
@@ -1336,7 +1708,9 @@ def publication_diff_view(request, projet_id):
         return Response({"detail": "Aucune map master trouvée pour ce projet."}, status=404)
 
     try:
-        diff = get_publication_diff(projet=projet, map_obj=master_map)
+        # ?detail=false : effectifs seulement, sans les listes de rubriques.
+        details = request.query_params.get("detail", "true").lower() not in ("false", "0")
+        diff = get_publication_diff(projet=projet, map_obj=master_map, details=details)
         return Response(diff, status=200)
     except Exception:
         logger.exception("[publication_diff] Erreur inattendue projet_id=%s", projet_id)
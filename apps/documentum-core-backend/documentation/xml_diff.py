@@ -0,0 +1,222 @@
+# documentation/xml_diff.py
+# -- Diff structurel (élément par élément) entre deux contenus XML --
+"""
+Diff XML en temps linéaire sur les arbres parsés.
+
+Principe :
+1. Chaque nœud reçoit une empreinte de Merkle (tag, attributs, text, tail et
+   empreintes des enfants) calculée en un seul parcours post-ordre.
+2. Deux nœuds d'empreinte égale sont identiques : le sous-arbre est sauté.
+3. Les listes d'enfants sont alignées par appariement glouton des empreintes
+   identiques, dans l'ordre ; entre deux ancres, les enfants restants sont
+   appariés par position s'ils portent le même tag (descente dans le
+   sous-arbre), sinon émis en suppression / ajout.
+
+Chaque nœud est visité un nombre borné de fois : le coût est linéaire en la
+taille des deux arbres, sans l'alignement quadratique d'un diff textuel.
+
+La sortie est plafonnée (nombre d'opérations et volume de texte) : au-delà,
+le parcours s'arrête et le résultat est marqué "tronque".
+
+Aucune dépendance aux modèles : module pur (plafonds lus dans settings).
+"""
+import hashlib
+import xml.etree.ElementTree as ET
+from collections import defaultdict, deque
+
+from django.conf import settings
+
+# Types d'opérations émises
+OP_AJOUT = "element_ajoute"
+OP_SUPPRESSION = "element_supprime"
+OP_TEXTE = "texte_modifie"
+OP_ATTRIBUT = "attribut_modifie"
+
+# Plafonds de sortie par défaut (surcharge via settings)
+DEFAULT_MAX_OPERATIONS = 2000
+DEFAULT_MAX_OCTETS = 1024 * 1024
+
+
+def get_max_operations() -> int:
+    return max(1, int(getattr(settings, "REVISION_DIFF_MAX_OPERATIONS", DEFAULT_MAX_OPERATIONS)))
+
+
+def get_max_octets() -> int:
+    return max(1, int(getattr(settings, "REVISION_DIFF_MAX_OCTETS", DEFAULT_MAX_OCTETS)))
+
+
+class XmlDiffError(ValueError):
+    """Contenu non parsable : le diff structurel est impossible."""
+
+
+class _Plafond(Exception):
+    """Interrompt le parcours lorsque la sortie atteint son plafond."""
+
+
+def _empreintes(racine) -> dict:
+    """Empreinte de Merkle de chaque élément (id(element) → digest)."""
+    empreintes = {}
+    # Ordre préfixe inversé : tout descendant est traité avant son ancêtre.
+    for element in reversed(list(racine.iter())):
+        # "\x00" ne peut pas apparaître dans du XML : séparateur sans ambiguïté.
+        morceaux = [element.tag, element.text or "", element.tail or ""]
+        if element.attrib:
+            for cle, valeur in sorted(element.attrib.items()):
+                morceaux += (cle, valeur)
+        h = hashlib.blake2b("\x00".join(morceaux).encode("utf-8"), digest_size=16)
+        for enfant in element:
+            h.update(empreintes[id(enfant)])
+        empreintes[id(element)] = h.digest()
+    return empreintes
+
+
+def _serialiser(element) -> str:
+    """Sérialise un élément sans son tail (texte appartenant au parent)."""
+    tail, element.tail = element.tail, None
+    try:
+        return ET.tostring(element, encoding="unicode")
+    finally:
+        element.tail = tail
+
+
+def _chemins_enfants(chemin: str, enfants) -> list[str]:
+    """Chemins de type XPath (/topic[1]/body[1]/p[3]) des enfants d'un élément."""
+    compteurs = defaultdict(int)
+    chemins = []
+    for enfant in enfants:
+        compteurs[enfant.tag] += 1
+        chemins.append(f"{chemin}/{enfant.tag}[{compteurs[enfant.tag]}]")
+    return chemins
+
+
+class _Diff:
+
+    def __init__(self, avant, apres, *, max_operations: int, max_octets: int):
+        self.empreintes_avant = _empreintes(avant) if avant is not None else {}
+        self.empreintes_apres = _empreintes(apres) if apres is not None else {}
+        self.max_operations = max_operations
+        self.max_octets = max_octets
+        self.octets = 0
+        self.operations: list[dict] = []
+
+    def emettre(self, operation: dict) -> None:
+        if len(self.operations) >= self.max_operations:
+            raise _Plafond
+        taille = sum(len(v) for v in operation.values() if isinstance(v, str))
+        if self.octets + taille > self.max_octets:
+            raise _Plafond
+        self.octets += taille
+        self.operations.append(operation)
+
+    def comparer(self, a, b, chemin: str) -> None:
+        """
+        Compare deux éléments de même tag appariés à la même place.
+        Parcours en profondeur sur pile explicite : pas de limite de récursion
+        sur les documents très imbriqués, ordre de sortie = ordre du document.
+        """
+        pile = [(None, a, b, chemin)]
+        while pile:
+            type_op, a, b, chemin = pile.pop()
+            if type_op is not None:
+                # Sérialisation différée : rien n'est produit au-delà du plafond.
+                self.emettre({"type": type_op, "chemin": chemin, "xml": _serialiser(a if a is not None else b)})
+                continue
+            if self.empreintes_avant[id(a)] == self.empreintes_apres[id(b)]:
+                continue
+            for cle in sorted(set(a.attrib) | set(b.attrib)):
+                va, vb = a.attrib.get(cle), b.attrib.get(cle)
+                if va != vb:
+                    self.emettre({
+                        "type": OP_ATTRIBUT, "chemin": chemin, "attribut": cle,
+                        "avant": va, "apres": vb,
+                    })
+            for champ in ("text", "tail"):
+                va, vb = getattr(a, champ) or "", getattr(b, champ) or ""
+                if va != vb:
+                    self.emettre({
+                        "type": OP_TEXTE, "chemin": chemin, "champ": champ,
+                        "avant": va, "apres": vb,
+                    })
+            pile.extend(reversed(self._taches_enfants(a, b, chemin)))
+
+    def _taches_enfants(self, a, b, chemin: str) -> list:
+        """
+        Alignement des enfants, dans l'ordre du document :
+        (None, a, b, chemin) paire à comparer, (OP_*, a|None, b|None, chemin) ajout / suppression.
+        """
+        enfants_a, enfants_b = list(a), list(b)
+        chemins_a = _chemins_enfants(chemin, enfants_a)
+        chemins_b = _chemins_enfants(chemin, enfants_b)
+        ea = [self.empreintes_avant[id(e)] for e in enfants_a]
+        eb = [self.empreintes_apres[id(e)] for e in enfants_b]
+
+        # Appariement glouton des empreintes identiques, dans l'ordre.
+        positions = defaultdict(deque)
+        for i, empreinte in enumerate(ea):
+            positions[empreinte].append(i)
+        ancres = []
+        dernier = -1
+        for j, empreinte in enumerate(eb):
+            file = positions.get(empreinte)
+            while file and file[0] <= dernier:
+                file.popleft()
+            if file:
+                dernier = file.popleft()
+                ancres.append((dernier, j))
+        ancres.append((len(enfants_a), len(enfants_b)))  # sentinelle
+
+        # Entre deux ancres identiques : appariement positionnel par tag.
+        taches = []
+        i = j = 0
+        for ancre_a, ancre_b in ancres:
+            while i < ancre_a and j < ancre_b and enfants_a[i].tag == enfants_b[j].tag:
+                taches.append((None, enfants_a[i], enfants_b[j], chemins_b[j]))
+                i += 1
+                j += 1
+            taches.extend(
+                (OP_SUPPRESSION, enfants_a[k], None, chemins_a[k]) for k in range(i, ancre_a)
+            )
+            taches.extend(
+                (OP_AJOUT, None, enfants_b[k], chemins_b[k]) for k in range(j, ancre_b)
+            )
+            i, j = ancre_a + 1, ancre_b + 1
+        return taches
+
+
+def _parser(xml: str):
+    stripped = (xml or "").strip()
+    if not stripped:
+        return None  # rubrique racine : contenu vide
+    try:
+        return ET.fromstring(stripped)
+    except ET.ParseError as e:
+        raise XmlDiffError(f"Contenu XML mal structuré : {e}") from e
+
+
+def diff_xml(avant_xml: str, apres_xml: str, *, max_operations: int, max_octets: int) -> dict:
+    """
+    Diff structurel de avant_xml vers apres_xml.
+
+    Retourne {"operations": [...], "tronque": bool}. Chaque opération porte un
+    "type" (OP_*), le "chemin" de l'élément concerné et ses valeurs avant/après
+    (ou le XML de l'élément ajouté / supprimé).
+    Lève XmlDiffError si l'un des contenus n'est pas du XML bien formé.
+    """
+    racine_avant = _parser(avant_xml)
+    racine_apres = _parser(apres_xml)
+
+    diff = _Diff(racine_avant, racine_apres, max_operations=max_operations, max_octets=max_octets)
+    tronque = False
+    try:
+        if racine_avant is not None and racine_apres is not None and racine_avant.tag == racine_apres.tag:
+            diff.comparer(racine_avant, racine_apres, f"/{racine_apres.tag}[1]")
+        else:
+            if racine_avant is not None:
+                diff.emettre({"type": OP_SUPPRESSION, "chemin": f"/{racine_avant.tag}[1]",
+                              "xml": _serialiser(racine_avant)})
+            if racine_apres is not None:
+                diff.emettre({"type": OP_AJOUT, "chemin": f"/{racine_apres.tag}[1]",
+                              "xml": _serialiser(racine_apres)})
+    except _Plafond:
+        tronque = True
+    return {"operations": diff.operations, "tronque": tronque}
@@ -17,29 +17,75 @@ export const PUBLISH_FORMATS = [
 export type PublishFormat = (typeof PUBLISH_FORMATS)[number]["value"];
 
 /**
- * Réponse retournée par POST /api/publier-map/{map_id}/
+ * Réponse 202 retournée par POST /api/publier-map/{map_id}/
+ * Le versionnage est fait immédiatement ; l'export DITA est confié au worker
+ * et se suit via statut_url (GET /api/publications/{tache_id}/).
  */
 export interface PublishMapResult {
-  status: "success" | "error";
-  message: string;
-  map?: string;
-  rubriques_count?: number;
-  format?: string;
-  formats_supportes?: string[];
+  status: "accepted";
+  tache_id: number;
+  statut_url: string;
+  version_publiee: string | null;
+  nouvelle_version_wip: string | null;
+  has_changes: boolean;
+}
+
+/**
+ * État d'une tâche de publication — GET /api/publications/{tache_id}/
+ * Correspond à TachePublicationSerializer (backend).
+ */
+export interface PublicationTask {
+  id: number;
+  statut: "en_attente" | "en_cours" | "terminee" | "echec";
+  progression: number;
+  journal: string[];
+  version_publiee: string | null;
+  format: string;
+  formats: string[];
+  artefact: string | Record<string, string> | null;
+  resultat: { status?: string; message?: string } & Record<string, unknown>;
 }
 
 /**
  * Publie une map au format demandé.
  * Route canonique : POST /api/publier-map/{mapId}/
  * Payload : { format }
- * Note : le backend retourne toujours HTTP 200 même en cas d'erreur métier.
- * Vérifier result.status pour distinguer succès / erreur.
+ * Les erreurs (map introuvable, non master, format non supporté) sont des
+ * réponses HTTP 4xx/5xx : la promesse est rejetée.
  */
 export async function publishMap(mapId: number, format: string): Promise<PublishMapResult> {
   const { data } = await api.post<PublishMapResult>(`/api/publier-map/${mapId}/`, { format });
   return data;
 }
 
+export async function getPublicationTask(statutUrl: string): Promise<PublicationTask> {
+  const { data } = await api.get<PublicationTask>(statutUrl);
+  return data;
+}
+
+const PUBLICATION_POLL_INTERVAL_MS = 2000;
+const PUBLICATION_POLL_TIMEOUT_MS = 15 * 60 * 1000;
+
+/**
+ * Interroge statut_url jusqu'à la fin de la tâche (terminee | echec).
+ * Rejette si la tâche n'est pas terminée dans le délai imparti.
+ */
+export async function waitForPublication(
+  statutUrl: string,
+  onProgress?: (task: PublicationTask) => void,
+): Promise<PublicationTask> {
+  const limite = Date.now() + PUBLICATION_POLL_TIMEOUT_MS;
+  for (;;) {
+    const task = await getPublicationTask(statutUrl);
+    if (task.statut === "terminee" || task.statut === "echec") return task;
+    onProgress?.(task);
+    if (Date.now() > limite) {
+      throw new Error("Délai dépassé : la publication est toujours en cours.");
+    }
+    await new Promise((r) => setTimeout(r, PUBLICATION_POLL_INTERVAL_MS));
+  }
+}
+
 /**
  * DTO retourné par GET /api/maps/{id}/structure/
  * Correspond à MapRubriqueStructureSerializer (backend).
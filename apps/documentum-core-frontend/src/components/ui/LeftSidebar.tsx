@@ -7,7 +7,7 @@ import { MapModule } from "@/components/ui/MapModule";
 import type { MapItem } from "@/types/MapItem";
 import type { ProjectMap } from "@/types/ProjectMap";
 import type { ProjectDTO } from "@/types/ProjectDTO";
-import { publishMap } from "@/api/maps";
+import { publishMap, waitForPublication } from "@/api/maps";
 import { getInsertionParentId } from "@/lib/mapStructure";
 import useSelectedVersion from "@/hooks/useSelectedVersion";
 import { useNewRubriqueXml } from "@/hooks/useNewRubriqueXml";
@@ -244,15 +244,23 @@ export const LeftSidebar: React.FC<LeftSidebarProps> = ({
       return;
     }
 
+    const toastId = toast.loading("Publication en cours…");
     try {
-      const result = await publishMap(targetMap.id, format);
-      if (result.status === "error") {
-        toast.error(result.message ?? "Erreur lors de la publication.");
+      // 202 : versionnage fait, export suivi sur la tâche de publication.
+      const { statut_url } = await publishMap(targetMap.id, format);
+      const task = await waitForPublication(statut_url, ({ progression }) =>
+        toast.loading(`Publication en cours… ${progression} %`, { id: toastId }),
+      );
+      if (task.statut === "echec") {
+        const raison = task.resultat?.message ?? task.journal[task.journal.length - 1];
+        toast.error(raison ?? "Erreur lors de la publication.", { id: toastId });
       } else {
-        toast.success(result.message ?? "Publication réussie.");
+        toast.success(`Publication réussie (version ${task.version_publiee ?? "?"}).`, { id: toastId });
       }
-    } catch {
-      toast.error("Erreur lors de la publication.");
+    } catch (err: any) {
+      toast.error(err?.fields?.message ?? err?.message ?? "Erreur lors de la publication.", {
+        id: toastId,
+      });
     }
   };
 